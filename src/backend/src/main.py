@@ -19,6 +19,7 @@ from src.services.intent_service import intent_service
 from src.services.transcript_service import transcript_service
 from src.security.auth import auth_manager
 from src.security.rate_limiting import rate_limiter
+from src.security.audit import audit_logger
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -27,6 +28,15 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 auth_manager.init_app(app)
 rate_limiter.init_app(app)
 
+# Move records of a pre-segment audit.log into the indexed audit segments
+if os.getenv('AUDIT_IMPORT_LEGACY_ON_STARTUP', 'true').lower() == 'true':
+    audit_logger.import_legacy_log()
+
+@app.cli.command('import-legacy-audit-log')
+def import_legacy_audit_log():
+    """Import a pre-segment audit.log into the audit segments"""
+    print(f"Imported {audit_logger.import_legacy_log()} audit records")
+
 # Enable CORS for all routes
 CORS(app, origins="*")
 
@@ -224,7 +224,7 @@ async def get_performance_metrics():
         
         # Add real-time metrics
         metrics['active_sessions'] = len(ai_conductor.active_sessions)
-        metrics['queued_tasks'] = len(ai_conductor.task_queue)
+        metrics['queued_tasks'] = ai_conductor.queued_task_count
         metrics['completed_sessions_count'] = len(ai_conductor.completed_sessions)
         
         # Calculate additional metrics
@@ -316,7 +316,7 @@ async def health_check():
             'status': status,
             'performers_count': len(ai_conductor.performers),
             'active_sessions': len(ai_conductor.active_sessions),
-            'queued_tasks': len(ai_conductor.task_queue),
+            'queued_tasks': ai_conductor.queued_task_count,
             'unhealthy_performers': unhealthy_performers,
             'timestamp': datetime.utcnow().isoformat()
         }), 200 if status == 'healthy' else 206
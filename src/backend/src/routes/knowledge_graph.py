@@ -119,54 +119,63 @@ def get_concepts():
     
     Query parameters:
     - concept_type: Filter by concept type
-    - min_importance: Minimum importance score (0-1)
+    - min_importance: Minimum current (decayed) importance score (0-1)
     - min_mentions: Minimum mention count
+    - mentioned_after: Only concepts last mentioned at or after this ISO datetime
     - search: Search term for concept names
+    - sort: importance (default, current decayed value), mention_count or last_mentioned, descending
+    - fields: Comma-separated concept fields to return (default: all)
     - limit: Maximum number of concepts to return (default: 50)
-    - offset: Number of concepts to skip (default: 0)
+    - cursor: next_cursor from the previous page
+    - offset: Number of matching concepts to skip on the first page (default: 0, ignored with a cursor)
+    
+    total_count is only known when filtering on the sort field and concept_type;
+    for most filter combinations it is null. Each request reads a bounded number
+    of index rows, so a selective filter can return fewer than limit concepts
+    (even none) with a next_cursor; keep following next_cursor until it is null.
     """
     try:
         # Get query parameters
         concept_type = request.args.get('concept_type')
         min_importance = float(request.args.get('min_importance', 0.0))
         min_mentions = int(request.args.get('min_mentions', 0))
+        mentioned_after = request.args.get('mentioned_after')
         search_term = request.args.get('search', '').lower()
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
-        offset = int(request.args.get('offset', 0))
-        
-        # Get all concepts
-        all_concepts = list(knowledge_graph_service.concepts.values())
-        
-        # Apply filters
-        filtered_concepts = all_concepts
-        
-        if concept_type:
-            filtered_concepts = [c for c in filtered_concepts if c.concept_type.value == concept_type]
-        
-        if min_importance > 0:
-            filtered_concepts = [c for c in filtered_concepts if c.importance_score >= min_importance]
-        
-        if min_mentions > 0:
-            filtered_concepts = [c for c in filtered_concepts if c.mention_count >= min_mentions]
-        
-        if search_term:
-            filtered_concepts = [c for c in filtered_concepts if search_term in c.name.lower()]
-        
-        # Sort by importance score
-        filtered_concepts.sort(key=lambda x: x.importance_score, reverse=True)
-        
-        # Apply pagination
-        paginated_concepts = filtered_concepts[offset:offset + limit]
+        sort = request.args.get('sort', 'importance')
+        fields = _parse_fields(request.args.get('fields'))
+        limit = max(1, min(int(request.args.get('limit', 50)), 100))  # 1 to 100
+        offset = max(0, int(request.args.get('offset', 0)))
+        cursor = request.args.get('cursor')
+        
+        # Walk the secondary index from the cursor until the page is full
+        try:
+            page = knowledge_graph_service.query_concepts(
+                concept_type=concept_type,
+                min_importance=min_importance,
+                min_mentions=min_mentions,
+                mentioned_after=datetime.fromisoformat(mentioned_after.replace('Z', '+00:00')) if mentioned_after else None,
+                search=search_term or None,
+                sort=sort,
+                limit=limit,
+                cursor=cursor,
+                offset=offset
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
         
         # Serialize concepts
-        serialized_concepts = [_serialize_concept(c) for c in paginated_concepts]
+        serialized_concepts = [_serialize_concept(c, fields) for c in page['items']]
         
         return jsonify({
             'status': 'success',
             'data': {
                 'concepts': serialized_concepts,
-                'total_count': len(filtered_concepts),
+                'total_count': page['total_count'],
                 'returned_count': len(serialized_concepts),
+                'next_cursor': page['next_cursor'],
                 'offset': offset,
                 'limit': limit
             },
@@ -181,6 +190,60 @@ def get_concepts():
             'status': 'error'
         }), 500
 
+@knowledge_graph_bp.route('/concepts/<concept_id>/neighborhood', methods=['GET'])
+@require_auth
+@rate_limit(limit=300, window=3600)  # 300 requests per hour
+def get_concept_neighborhood(concept_id):
+    """
+    Get the concepts within a few hops of a concept and the relationships among them
+    
+    Query parameters:
+    - hops: Maximum hop distance (default: 2, max 3)
+    - limit: Maximum number of concepts, nearest first (default: 100, max 500)
+    - max_edges: Maximum number of relationships (default: 500, max 2000)
+    - relationship_type: Comma-separated relationship types to traverse
+    - fields: Comma-separated concept fields to return (default: all)
+    """
+    try:
+        hops = max(1, min(int(request.args.get('hops', 2)), 3))
+        limit = max(1, min(int(request.args.get('limit', 100)), 500))
+        max_edges = max(0, min(int(request.args.get('max_edges', 500)), 2000))
+        relationship_types = _parse_fields(request.args.get('relationship_type'))
+        fields = _parse_fields(request.args.get('fields'))
+        
+        if concept_id not in knowledge_graph_service.concepts:
+            return jsonify({
+                'error': 'Concept not found',
+                'status': 'error'
+            }), 404
+        
+        subgraph = knowledge_graph_service.get_concept_subgraph(
+            concept_id,
+            hops=hops,
+            limit=limit,
+            relationship_types=relationship_types,
+            max_edges=max_edges
+        )
+        if fields:
+            subgraph['nodes'] = [
+                {key: value for key, value in node.items() if key in fields or key in ('id', 'distance')}
+                for node in subgraph['nodes']
+            ]
+        
+        return jsonify({
+            'status': 'success',
+            'data': subgraph,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error("Concept neighborhood retrieval failed", concept_id=concept_id, error=str(e))
+        return jsonify({
+            'error': 'Concept neighborhood retrieval failed',
+            'details': str(e),
+            'status': 'error'
+        }), 500
+
 @knowledge_graph_bp.route('/relationships', methods=['GET'])
 @require_auth
 @rate_limit(limit=300, window=3600)  # 300 requests per hour
@@ -193,8 +256,15 @@ def get_relationships():
     - min_strength: Minimum relationship strength (0-1)
     - source_concept: Filter by source concept ID
     - target_concept: Filter by target concept ID
+    - fields: Comma-separated relationship fields to return (default: all)
     - limit: Maximum number of relationships to return (default: 50)
-    - offset: Number of relationships to skip (default: 0)
+    - cursor: next_cursor from the previous page
+    - offset: Number of matching relationships to skip on the first page (default: 0, ignored with a cursor)
+    
+    total_count is null when filtering by source_concept or target_concept. Each
+    request reads a bounded number of index rows, so a page can hold fewer than
+    limit relationships with a next_cursor; keep following next_cursor until it
+    is null.
     """
     try:
         # Get query parameters
@@ -202,42 +272,38 @@ def get_relationships():
         min_strength = float(request.args.get('min_strength', 0.0))
         source_concept = request.args.get('source_concept')
         target_concept = request.args.get('target_concept')
-        limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
-        offset = int(request.args.get('offset', 0))
-        
-        # Get all relationships
-        all_relationships = list(knowledge_graph_service.relationships.values())
-        
-        # Apply filters
-        filtered_relationships = all_relationships
-        
-        if relationship_type:
-            filtered_relationships = [r for r in filtered_relationships if r.relationship_type.value == relationship_type]
-        
-        if min_strength > 0:
-            filtered_relationships = [r for r in filtered_relationships if r.strength >= min_strength]
-        
-        if source_concept:
-            filtered_relationships = [r for r in filtered_relationships if r.source_concept_id == source_concept]
-        
-        if target_concept:
-            filtered_relationships = [r for r in filtered_relationships if r.target_concept_id == target_concept]
-        
-        # Sort by strength
-        filtered_relationships.sort(key=lambda x: x.strength, reverse=True)
-        
-        # Apply pagination
-        paginated_relationships = filtered_relationships[offset:offset + limit]
+        fields = _parse_fields(request.args.get('fields'))
+        limit = max(1, min(int(request.args.get('limit', 50)), 100))  # 1 to 100
+        offset = max(0, int(request.args.get('offset', 0)))
+        cursor = request.args.get('cursor')
+        
+        # Walk the strength index (or the endpoint's relationships) from the cursor
+        try:
+            page = knowledge_graph_service.query_relationships(
+                relationship_type=relationship_type,
+                min_strength=min_strength,
+                source_concept=source_concept,
+                target_concept=target_concept,
+                limit=limit,
+                cursor=cursor,
+                offset=offset
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
         
         # Serialize relationships
-        serialized_relationships = [_serialize_relationship(r) for r in paginated_relationships]
+        serialized_relationships = [_serialize_relationship(r, fields) for r in page['items']]
         
         return jsonify({
             'status': 'success',
             'data': {
                 'relationships': serialized_relationships,
-                'total_count': len(filtered_relationships),
+                'total_count': page['total_count'],
                 'returned_count': len(serialized_relationships),
+                'next_cursor': page['next_cursor'],
                 'offset': offset,
                 'limit': limit
             },
@@ -424,38 +490,55 @@ def get_learning_events():
         }), 500
 
 # Serialization helper functions
-def _serialize_concept(concept):
-    """Serialize Concept for JSON response"""
+CONCEPT_FIELDS = {
+    'id': lambda c: c.id,
+    'name': lambda c: c.name,
+    'concept_type': lambda c: c.concept_type.value,
+    'description': lambda c: c.description,
+    'attributes': lambda c: c.attributes,
+    'first_mentioned': lambda c: c.first_mentioned.isoformat(),
+    'last_mentioned': lambda c: c.last_mentioned.isoformat(),
+    'mention_count': lambda c: c.mention_count,
+    'importance_score': lambda c: c.importance_score,
+    'current_importance': lambda c: knowledge_graph_service.current_importance(c),
+    'related_meetings': lambda c: list(c.related_meetings),
+    'evolution_history_count': lambda c: len(c.evolution_history),
+    'created_at': lambda c: c.created_at.isoformat()
+}
+
+RELATIONSHIP_FIELDS = {
+    'id': lambda r: r.id,
+    'source_concept_id': lambda r: r.source_concept_id,
+    'target_concept_id': lambda r: r.target_concept_id,
+    'relationship_type': lambda r: r.relationship_type.value,
+    'strength': lambda r: r.strength,
+    'confidence': lambda r: r.confidence,
+    'evidence': lambda r: r.evidence,
+    'first_observed': lambda r: r.first_observed.isoformat(),
+    'last_observed': lambda r: r.last_observed.isoformat(),
+    'observation_count': lambda r: r.observation_count,
+    'context': lambda r: r.context,
+    'created_at': lambda r: r.created_at.isoformat()
+}
+
+def _parse_fields(value):
+    """Split a comma-separated query parameter, None when absent"""
+    if not value:
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+def _serialize_concept(concept, fields=None):
+    """Serialize Concept for JSON response, optionally only the requested fields"""
     return {
-        'id': concept.id,
-        'name': concept.name,
-        'concept_type': concept.concept_type.value,
-        'description': concept.description,
-        'attributes': concept.attributes,
-        'first_mentioned': concept.first_mentioned.isoformat(),
-        'last_mentioned': concept.last_mentioned.isoformat(),
-        'mention_count': concept.mention_count,
-        'importance_score': concept.importance_score,
-        'related_meetings': list(concept.related_meetings),
-        'evolution_history_count': len(concept.evolution_history),
-        'created_at': concept.created_at.isoformat()
+        name: getter(concept) for name, getter in CONCEPT_FIELDS.items()
+        if fields is None or name in fields or name == 'id'
     }
 
-def _serialize_relationship(relationship):
-    """Serialize Relationship for JSON response"""
+def _serialize_relationship(relationship, fields=None):
+    """Serialize Relationship for JSON response, optionally only the requested fields"""
     return {
-        'id': relationship.id,
-        'source_concept_id': relationship.source_concept_id,
-        'target_concept_id': relationship.target_concept_id,
-        'relationship_type': relationship.relationship_type.value,
-        'strength': relationship.strength,
-        'confidence': relationship.confidence,
-        'evidence': relationship.evidence,
-        'first_observed': relationship.first_observed.isoformat(),
-        'last_observed': relationship.last_observed.isoformat(),
-        'observation_count': relationship.observation_count,
-        'context': relationship.context,
-        'created_at': relationship.created_at.isoformat()
+        name: getter(relationship) for name, getter in RELATIONSHIP_FIELDS.items()
+        if fields is None or name in fields or name == 'id'
     }
 
 def _serialize_wisdom_assessment(assessment):
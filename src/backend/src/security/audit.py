@@ -4,10 +4,21 @@ Handles security auditing and compliance logging
 """
 
 import os
+import gzip
 import json
+import time
+import uuid
+import fcntl
+import heapq
+import queue
+import atexit
 import logging
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import itertools
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from datetime import datetime, timedelta
 from enum import Enum
 import structlog
 
@@ -33,6 +44,733 @@ class AuditSeverity(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+class AuditSegmentIndex:
+    """Sidecar index for one audit segment
+    
+    Records are addressed by their ordinal (line number) within the segment.
+    Holds the segment's time range, event_type and user_id postings, one
+    severity bitmap per level and the rollup used for audit statistics.
+    """
+    
+    def __init__(self, date: str):
+        self.date = date
+        self.count = 0
+        self.start_time: Optional[str] = None
+        self.end_time: Optional[str] = None
+        self.event_types: Dict[str, List[int]] = {}
+        self.user_ids: Dict[str, List[int]] = {}
+        self.severity_bitmaps: Dict[str, bytearray] = {}
+        self.rollup = self.empty_rollup()
+    
+    @staticmethod
+    def empty_rollup() -> Dict[str, Any]:
+        """Zeroed statistics rollup"""
+        return {
+            'total_events': 0,
+            'events_by_type': {},
+            'events_by_severity': {},
+            'events_by_outcome': {},
+            'unique_users': [],
+            'security_violations': 0,
+            'failed_authentications': 0
+        }
+    
+    def add(self, entry: Dict[str, Any]):
+        """Index the next record of the segment"""
+        ordinal = self.count
+        self.count += 1
+        
+        timestamp = entry.get('timestamp')
+        if timestamp:
+            if self.start_time is None or timestamp < self.start_time:
+                self.start_time = timestamp
+            if self.end_time is None or timestamp > self.end_time:
+                self.end_time = timestamp
+        
+        event_type = entry.get('event_type')
+        severity = entry.get('severity')
+        outcome = entry.get('outcome')
+        user_id = entry.get('user_id')
+        
+        self.event_types.setdefault(event_type, []).append(ordinal)
+        if user_id:
+            self.user_ids.setdefault(user_id, []).append(ordinal)
+        bitmap = self.severity_bitmaps.setdefault(severity, bytearray())
+        byte_index = ordinal >> 3
+        if byte_index >= len(bitmap):
+            bitmap.extend(bytes(byte_index + 1 - len(bitmap)))
+        bitmap[byte_index] |= 1 << (ordinal & 7)
+        
+        rollup = self.rollup
+        rollup['total_events'] += 1
+        rollup['events_by_type'][event_type] = rollup['events_by_type'].get(event_type, 0) + 1
+        rollup['events_by_severity'][severity] = rollup['events_by_severity'].get(severity, 0) + 1
+        rollup['events_by_outcome'][outcome] = rollup['events_by_outcome'].get(outcome, 0) + 1
+        if user_id and len(self.user_ids[user_id]) == 1:
+            rollup['unique_users'].append(user_id)
+        if event_type == AuditEventType.SECURITY_VIOLATION.value:
+            rollup['security_violations'] += 1
+        if event_type == AuditEventType.AUTHENTICATION.value and outcome != 'success':
+            rollup['failed_authentications'] += 1
+    
+    def skip(self):
+        """Reserve the ordinal of an unparseable line"""
+        self.count += 1
+    
+    def overlaps(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+        """Whether any record may fall inside the time range"""
+        if self.start_time is None:
+            return False
+        if start_date and datetime.fromisoformat(self.end_time) < start_date:
+            return False
+        if end_date and datetime.fromisoformat(self.start_time) > end_date:
+            return False
+        return True
+    
+    def contained_in(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+        """Whether every record falls inside the time range"""
+        if self.start_time is None:
+            return False
+        if start_date and datetime.fromisoformat(self.start_time) < start_date:
+            return False
+        if end_date and datetime.fromisoformat(self.end_time) > end_date:
+            return False
+        return True
+    
+    def candidates(self, event_type: Optional[str] = None, user_id: Optional[str] = None,
+                   severity: Optional[str] = None) -> Optional[List[int]]:
+        """Sorted ordinals matching the filters, or None when nothing is filtered"""
+        postings = []
+        if event_type is not None:
+            postings.append(self.event_types.get(event_type, []))
+        if user_id is not None:
+            postings.append(self.user_ids.get(user_id, []))
+        
+        if postings:
+            postings.sort(key=len)
+            matches = postings[0]
+            for other in postings[1:]:
+                other_set = set(other)
+                matches = [ordinal for ordinal in matches if ordinal in other_set]
+            if severity is not None:
+                bitmap = self.severity_bitmaps.get(severity, bytearray())
+                matches = [ordinal for ordinal in matches if self._bit_set(bitmap, ordinal)]
+            return matches
+        
+        if severity is not None:
+            return self._bitmap_ordinals(self.severity_bitmaps.get(severity, bytearray()))
+        
+        return None
+    
+    @staticmethod
+    def _bit_set(bitmap: bytearray, ordinal: int) -> bool:
+        """Whether an ordinal is present in a bitmap"""
+        byte_index = ordinal >> 3
+        return byte_index < len(bitmap) and bool(bitmap[byte_index] & (1 << (ordinal & 7)))
+    
+    @staticmethod
+    def _bitmap_ordinals(bitmap: bytearray) -> List[int]:
+        """Set bit positions in ascending order"""
+        ordinals = []
+        for byte_index, byte in enumerate(bitmap):
+            if byte:
+                base = byte_index << 3
+                ordinals.extend(base + bit for bit in range(8) if byte & (1 << bit))
+        return ordinals
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable sidecar form"""
+        return {
+            'date': self.date,
+            'count': self.count,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'event_types': self.event_types,
+            'user_ids': self.user_ids,
+            'severity_bitmaps': {severity: bitmap.hex() for severity, bitmap in self.severity_bitmaps.items()},
+            'rollup': self.rollup
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AuditSegmentIndex':
+        """Rebuild an index from its sidecar form"""
+        index = cls(data['date'])
+        index.count = data['count']
+        index.start_time = data['start_time']
+        index.end_time = data['end_time']
+        index.event_types = data['event_types']
+        index.user_ids = data['user_ids']
+        index.severity_bitmaps = {severity: bytearray.fromhex(bitmap) for severity, bitmap in data['severity_bitmaps'].items()}
+        index.rollup = data['rollup']
+        return index
+
+class PartitionedAuditStore:
+    """Daily-rotated audit segments with sidecar indexes and rollups
+    
+    Each store instance (one per worker process) appends to segments of its own,
+    ``audit-YYYY-MM-DD.<writer>.jsonl``, and holds an exclusive ``flock`` on a
+    segment while it is open, so every segment has exactly one writer and record
+    ordinals never shift. Segments of other writers are indexed by tailing them
+    up to their last complete line. Once a day is over and its writer has closed
+    the segment, the worker holding ``.seal.lock`` seals it: compressed to
+    ``.jsonl.gz`` with its index written to ``.idx.json`` and its statistics
+    rollup to ``.stats.json``.
+    """
+    
+    SEGMENT_PREFIX = 'audit-'
+    SEAL_LOCK = '.seal.lock'
+    INDEX_CACHE_SIZE = 32
+    
+    def __init__(self, directory: str, retention_days: int):
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self.directory.mkdir(parents=True, exist_ok=True)
+        
+        self._handles: Dict[str, Tuple[Any, str]] = {}
+        self._unsealed: Dict[str, List[Any]] = {}
+        self._index_cache: "OrderedDict[str, AuditSegmentIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+        
+        self.seal_completed_days()
+    
+    def _segment_path(self, name: str, sealed: bool) -> Path:
+        """Location of a segment"""
+        suffix = '.jsonl.gz' if sealed else '.jsonl'
+        return self.directory / f"{self.SEGMENT_PREFIX}{name}{suffix}"
+    
+    def _sidecar_path(self, name: str, kind: str) -> Path:
+        """Location of a sealed segment's index or stats sidecar"""
+        return self.directory / f"{self.SEGMENT_PREFIX}{name}.{kind}.json"
+    
+    def _segment_names(self, sealed: bool) -> List[str]:
+        """Names of the segments on disk, sealed or unsealed"""
+        suffix = '.jsonl.gz' if sealed else '.jsonl'
+        return [
+            path.name[len(self.SEGMENT_PREFIX):-len(suffix)]
+            for path in self.directory.glob(f"{self.SEGMENT_PREFIX}*{suffix}")
+        ]
+    
+    def append(self, entry: Dict[str, Any], line: Optional[str] = None):
+        """Append a record to this writer's segment of its day"""
+        self.append_many([entry], [line or json.dumps(entry)])
+    
+    def append_many(self, entries: List[Dict[str, Any]], lines: Optional[List[str]] = None):
+        """Append records with one write per run of same-day records"""
+        lines = lines or [json.dumps(entry) for entry in entries]
+        
+        with self._lock:
+            start = 0
+            while start < len(entries):
+                date = entries[start]['timestamp'][:10]
+                end = start + 1
+                while end < len(entries) and entries[end]['timestamp'][:10] == date:
+                    end += 1
+                
+                handle, name = self._writer(date)
+                data = ('\n'.join(lines[start:end]) + '\n').encode()
+                handle.write(data)
+                handle.flush()
+                state = self._unsealed.setdefault(name, [AuditSegmentIndex(date), 0])
+                for entry in entries[start:end]:
+                    state[0].add(entry)
+                state[1] += len(data)
+                start = end
+    
+    def sync(self):
+        """fsync open segments so written records survive a crash"""
+        with self._lock:
+            for handle, _ in self._handles.values():
+                handle.flush()
+                os.fsync(handle.fileno())
+    
+    def _writer(self, date: str) -> Tuple[Any, str]:
+        """Append handle and name of this writer's segment for a day
+        
+        A new segment is created and locked under a hidden name, then renamed
+        into place, so no sealer can pick it up before its writer holds the lock.
+        A day whose segment was already closed (a late record) gets a new one.
+        """
+        if date not in self._handles:
+            name = f"{date}.{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            path = self._segment_path(name, sealed=False)
+            staging = path.with_name('.' + path.name)
+            handle = open(staging, 'ab')
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            os.replace(staging, path)
+            self._handles[date] = (handle, name)
+        return self._handles[date]
+    
+    def _refresh(self):
+        """Index records other writers appended to unsealed segments since the last call"""
+        names = set(self._segment_names(sealed=False))
+        for name in list(self._unsealed):
+            if name not in names:
+                del self._unsealed[name]
+        for name in names:
+            self._tail(name, self._unsealed.setdefault(name, [AuditSegmentIndex(name[:10]), 0]))
+    
+    def _tail(self, name: str, state: List[Any]):
+        """Index the complete lines of a segment past its indexed byte offset"""
+        index, offset = state
+        try:
+            with open(self._segment_path(name, sealed=False), 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        
+        end = data.rfind(b'\n') + 1
+        if not end:
+            return
+        for line in data[:end - 1].split(b'\n'):
+            try:
+                index.add(json.loads(line))
+            except json.JSONDecodeError:
+                index.skip()
+        state[1] = offset + end
+    
+    def seal_completed_days(self, today: Optional[str] = None):
+        """Close this writer's segments of earlier days and seal every finished segment
+        
+        Only one worker seals at a time; the others skip sealing while
+        ``.seal.lock`` is held. Segments still locked by their writer are left
+        for a later call.
+        """
+        today = today or datetime.utcnow().date().isoformat()
+        
+        with self._lock:
+            for date in [date for date in self._handles if date < today]:
+                handle, _ = self._handles.pop(date)
+                handle.close()
+            
+            with open(self.directory / self.SEAL_LOCK, 'a') as seal_lock:
+                try:
+                    fcntl.flock(seal_lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                
+                self._refresh()
+                for name in sorted(self._unsealed):
+                    if name[:10] < today:
+                        self._seal(name)
+                self._enforce_retention(today)
+    
+    def _seal(self, name: str):
+        """Compress a finished segment and write its sidecars, unless its writer still has it open"""
+        source = self._segment_path(name, sealed=False)
+        try:
+            src = open(source, 'rb')
+        except FileNotFoundError:
+            self._unsealed.pop(name, None)
+            return
+        
+        with src:
+            try:
+                fcntl.flock(src.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            
+            self._tail(name, self._unsealed[name])
+            index = self._unsealed.pop(name)[0]
+            target = self._segment_path(name, sealed=True)
+            tmp_target = target.with_suffix('.tmp')
+            with gzip.open(tmp_target, 'wb') as dst:
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            
+            self._write_json(self._sidecar_path(name, 'idx'), index.to_dict())
+            self._write_json(self._sidecar_path(name, 'stats'), index.rollup)
+            os.replace(tmp_target, target)
+            source.unlink()
+        
+        self._cache_index(name, index)
+        logger.info("Audit segment sealed", segment=name, events=index.count)
+    
+    def _enforce_retention(self, today: str):
+        """Delete sealed segments older than the retention period"""
+        cutoff = (datetime.fromisoformat(today) - timedelta(days=self.retention_days)).date().isoformat()
+        for name in self._segment_names(sealed=True):
+            if name[:10] >= cutoff:
+                continue
+            for path in (self._segment_path(name, sealed=True), self._sidecar_path(name, 'idx'),
+                         self._sidecar_path(name, 'stats')):
+                path.unlink(missing_ok=True)
+            self._index_cache.pop(name, None)
+    
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """Atomically write a sidecar file"""
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    def sealed_dates(self) -> List[str]:
+        """Days with sealed segments in ascending order"""
+        return sorted({name[:10] for name in self._segment_names(sealed=True)})
+    
+    def _load_sealed_index(self, name: str) -> AuditSegmentIndex:
+        """Sidecar index of a sealed segment, cached by recency"""
+        index = self._index_cache.get(name)
+        if index is not None:
+            self._index_cache.move_to_end(name)
+            return index
+        
+        with open(self._sidecar_path(name, 'idx'), 'r') as f:
+            index = AuditSegmentIndex.from_dict(json.load(f))
+        self._cache_index(name, index)
+        return index
+    
+    def _cache_index(self, name: str, index: AuditSegmentIndex):
+        """Keep a sealed index in the bounded cache"""
+        self._index_cache[name] = index
+        self._index_cache.move_to_end(name)
+        while len(self._index_cache) > self.INDEX_CACHE_SIZE:
+            self._index_cache.popitem(last=False)
+    
+    def _segments(self, start_date: Optional[datetime],
+                  end_date: Optional[datetime]) -> List[Tuple[str, bool]]:
+        """``(name, sealed)`` of all segments intersecting the range, oldest day first
+        
+        A segment caught between compression and removal of its source counts
+        once, as sealed.
+        """
+        sealed = set(self._segment_names(sealed=True))
+        first = start_date.date().isoformat() if start_date else None
+        last = end_date.date().isoformat() if end_date else None
+        return sorted(
+            (name, name in sealed) for name in sealed | set(self._unsealed)
+            if (first is None or name[:10] >= first) and (last is None or name[:10] <= last)
+        )
+    
+    def _index(self, name: str, sealed: bool) -> AuditSegmentIndex:
+        """Index of a segment, sealed or being written"""
+        return self._load_sealed_index(name) if sealed else self._unsealed[name][0]
+    
+    def search(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+               event_type: Optional[str] = None, user_id: Optional[str] = None,
+               severity: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Matching records in chronological order, up to ``limit``
+        
+        Segments of one day, one per writer, are merged by timestamp.
+        """
+        results = []
+        
+        with self._lock:
+            self._refresh()
+            segments = self._segments(start_date, end_date)
+            for _, day in itertools.groupby(segments, key=lambda segment: segment[0][:10]):
+                streams = []
+                for name, sealed in day:
+                    index = self._index(name, sealed)
+                    if not index.overlaps(start_date, end_date):
+                        continue
+                    
+                    ordinals = index.candidates(event_type, user_id, severity)
+                    if ordinals is not None and not ordinals:
+                        continue
+                    streams.append(self._matching(name, sealed, index, ordinals, start_date, end_date))
+                
+                for entry in heapq.merge(*streams, key=lambda entry: entry.get('timestamp', '')):
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results
+        
+        return results
+    
+    def _matching(self, name: str, sealed: bool, index: AuditSegmentIndex, ordinals: Optional[List[int]],
+                  start_date: Optional[datetime], end_date: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+        """Records of one segment at the candidate ordinals that fall inside the time range"""
+        check_time = not index.contained_in(start_date, end_date)
+        for entry in self._read_ordinals(name, sealed, index.count, ordinals):
+            if check_time:
+                timestamp = datetime.fromisoformat(entry['timestamp'])
+                if (start_date and timestamp < start_date) or (end_date and timestamp > end_date):
+                    continue
+            yield entry
+    
+    def _open_segment(self, name: str, sealed: bool):
+        """Text handle on a segment, following it to its sealed form if it was sealed meanwhile"""
+        if not sealed:
+            try:
+                return open(self._segment_path(name, sealed=False), 'rt')
+            except FileNotFoundError:
+                pass
+        return gzip.open(self._segment_path(name, sealed=True), 'rt')
+    
+    def _read_ordinals(self, name: str, sealed: bool, count: int,
+                       ordinals: Optional[List[int]]) -> Iterator[Dict[str, Any]]:
+        """Yield the records at the given ordinals (the first ``count`` when None)"""
+        wanted = iter(ordinals if ordinals is not None else range(count))
+        target = next(wanted, None)
+        if target is None:
+            return
+        
+        with self._open_segment(name, sealed) as f:
+            for ordinal, line in enumerate(f):
+                if ordinal != target:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    pass
+                target = next(wanted, None)
+                if target is None:
+                    return
+    
+    def statistics(self, since_date: str) -> Dict[str, Any]:
+        """Merge per-segment rollups of every day on or after ``since_date``"""
+        stats = AuditSegmentIndex.empty_rollup()
+        unique_users = set()
+        
+        with self._lock:
+            self._refresh()
+            for name, sealed in self._segments(datetime.fromisoformat(since_date), None):
+                if sealed:
+                    with open(self._sidecar_path(name, 'stats'), 'r') as f:
+                        rollup = json.load(f)
+                else:
+                    rollup = self._unsealed[name][0].rollup
+                
+                stats['total_events'] += rollup['total_events']
+                stats['security_violations'] += rollup['security_violations']
+                stats['failed_authentications'] += rollup['failed_authentications']
+                for key in ('events_by_type', 'events_by_severity', 'events_by_outcome'):
+                    for label, count in rollup[key].items():
+                        stats[key][label] = stats[key].get(label, 0) + count
+                unique_users.update(rollup['unique_users'])
+        
+        stats['unique_users'] = len(unique_users)
+        return stats
+    
+    def close(self):
+        """Close this writer's open segments, releasing them for sealing"""
+        with self._lock:
+            for handle, _ in self._handles.values():
+                handle.close()
+            self._handles.clear()
+
+class AuditWriter:
+    """Background writer that batches audit records into the segment store
+    
+    ``submit`` only enqueues the record on a bounded queue; a daemon thread
+    wakes every ``flush_interval`` seconds (or on flush/overflow), writes queued
+    records with one write per batch, and fsyncs at most every ``fsync_interval``
+    seconds. Records are serialized on the caller's thread when submitted, so a
+    record that cannot be serialized is dropped alone and later changes to the
+    caller's dict do not alter what is logged. The writer thread also seals
+    finished days once the date rolls over. When the queue is full the overflow
+    policy decides whether the caller waits for space (``block``, the default),
+    the new record is dropped (``drop_newest``) or the oldest queued record is
+    dropped (``drop_oldest``). A blocked caller waits at most ``block_timeout``
+    seconds (forever when None) before its record is dropped. Every drop is
+    logged as a warning.
+    """
+    
+    OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+    
+    def __init__(self, store: PartitionedAuditStore, max_queue_size: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.2,
+                 fsync_interval: float = 1.0, overflow_policy: str = 'block',
+                 block_timeout: Optional[float] = None):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+        
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], str]]" = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._sealed_day = datetime.utcnow().date().isoformat()
+        
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'batches': 0,
+            'fsyncs': 0,
+            'write_errors': 0,
+            'max_queue_depth': 0
+        }
+        
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue a record for writing; returns False if it was dropped"""
+        if self._stop.is_set():
+            self._drop("writer stopped")
+            return False
+        
+        try:
+            line = json.dumps(entry)
+        except (TypeError, ValueError) as e:
+            self._count('dropped')
+            logger.error("Audit record not serializable", error=str(e))
+            return False
+        
+        # The index reads only top-level fields, so a shallow copy is enough
+        item = (dict(entry), line)
+        try:
+            self._queue.put_nowait(item)
+        
+        except queue.Full:
+            self._wake.set()
+            if self.overflow_policy == 'block':
+                try:
+                    self._queue.put(item, timeout=self.block_timeout)
+                except queue.Full:
+                    self._drop("queue full after blocking")
+                    return False
+            elif self.overflow_policy == 'drop_newest':
+                self._drop("queue full")
+                return False
+            elif not self._drop_oldest_and_put(item):
+                return False
+        
+        self._count('enqueued')
+        return True
+    
+    def _drop_oldest_and_put(self, item: Tuple[Dict[str, Any], str]) -> bool:
+        """Make room by discarding the head of the queue, then enqueue"""
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._drop("queue full, oldest record discarded")
+        except queue.Empty:
+            pass
+        
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self._drop("queue full")
+            return False
+    
+    def _drop(self, reason: str):
+        """Count a dropped audit record and report it"""
+        self._count('dropped')
+        logger.warning("Audit record dropped", reason=reason,
+                       overflow_policy=self.overflow_policy, dropped=self.stats['dropped'])
+    
+    def _count(self, name: str, amount: int = 1):
+        """Increment a counter shared with request threads"""
+        with self._stats_lock:
+            self.stats[name] += amount
+    
+    def _run(self):
+        """Drain the queue every flush interval (or when woken) until stopped"""
+        while not (self._stop.is_set() and self._queue.empty()):
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            
+            depth = self._queue.qsize()
+            if depth > self.stats['max_queue_depth']:
+                self.stats['max_queue_depth'] = depth
+            
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    break
+                
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+            
+            self._maybe_fsync()
+            self._maybe_seal()
+    
+    def _write_batch(self, batch: List[Tuple[Dict[str, Any], str]]):
+        """Append one batch of serialized records"""
+        try:
+            entries, lines = zip(*batch)
+            self.store.append_many(list(entries), list(lines))
+            self._unsynced = True
+            self._count('written', len(batch))
+            self._count('batches')
+            self._maybe_fsync()
+        except Exception as e:
+            self._count('write_errors')
+            self._count('dropped', len(batch))
+            logger.error("Audit batch write failed", records=len(batch), error=str(e))
+    
+    def _maybe_fsync(self, force: bool = False):
+        """fsync written records once the interval has passed"""
+        if not self._unsynced:
+            return
+        if not force and time.monotonic() - self._last_fsync < self.fsync_interval:
+            return
+        
+        try:
+            self.store.sync()
+            self._unsynced = False
+            self._last_fsync = time.monotonic()
+            self._count('fsyncs')
+        except Exception as e:
+            logger.error("Audit fsync failed", error=str(e))
+    
+    def _maybe_seal(self):
+        """Seal finished days once the date has rolled over since the last check"""
+        today = datetime.utcnow().date().isoformat()
+        if today == self._sealed_day:
+            return
+        
+        try:
+            self.store.seal_completed_days(today)
+            self._sealed_day = today
+        except Exception as e:
+            logger.error("Audit segment sealing failed", error=str(e))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record is written; returns False on timeout"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self._wake.set()
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def shutdown(self, timeout: float = 5.0):
+        """Write out queued records, fsync and stop the writer thread"""
+        if self._stop.is_set():
+            return
+        
+        self.flush(timeout)
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._maybe_fsync(force=True)
+        self.store.close()
+        logger.info("Audit writer stopped", **self.get_stats())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer counters and current queue depth"""
+        with self._stats_lock:
+            return {
+                **self.stats,
+                'queue_depth': self._queue.qsize(),
+                'overflow_policy': self.overflow_policy
+            }
+
 class AuditLogger:
     """Security audit logging manager"""
     
@@ -40,23 +778,37 @@ class AuditLogger:
         self.audit_log_file = os.getenv('AUDIT_LOG_FILE', 'logs/audit.log')
         self.enable_console_output = os.getenv('AUDIT_CONSOLE_OUTPUT', 'false').lower() == 'true'
         self.audit_retention_days = int(os.getenv('AUDIT_RETENTION_DAYS', '90'))
+        self.audit_segment_dir = os.getenv(
+            'AUDIT_SEGMENT_DIR', os.path.join(os.path.dirname(self.audit_log_file), 'audit')
+        )
         
         # Ensure audit log directory exists
         os.makedirs(os.path.dirname(self.audit_log_file), exist_ok=True)
         
+        # Daily-rotated, indexed audit segments
+        self.store = PartitionedAuditStore(self.audit_segment_dir, self.audit_retention_days)
+        
+        # Non-blocking batched writer; synchronous writes when disabled
+        self.writer: Optional[AuditWriter] = None
+        if os.getenv('AUDIT_ASYNC_WRITES', 'true').lower() == 'true':
+            self.writer = AuditWriter(
+                self.store,
+                max_queue_size=int(os.getenv('AUDIT_QUEUE_SIZE', '10000')),
+                batch_size=int(os.getenv('AUDIT_BATCH_SIZE', '500')),
+                flush_interval=float(os.getenv('AUDIT_FLUSH_INTERVAL_SECONDS', '0.2')),
+                fsync_interval=float(os.getenv('AUDIT_FSYNC_INTERVAL_SECONDS', '1.0')),
+                overflow_policy=os.getenv('AUDIT_OVERFLOW_POLICY', 'block'),
+                block_timeout=float(os.getenv('AUDIT_BLOCK_TIMEOUT_SECONDS', '5.0')) or None
+            )
+            atexit.register(self.shutdown)
+        
         # Configure audit logger
         self.audit_logger = logging.getLogger('audit')
         self.audit_logger.setLevel(logging.INFO)
-        
-        # File handler for audit logs
-        file_handler = logging.FileHandler(self.audit_log_file)
-        file_handler.setLevel(logging.INFO)
+        self.audit_logger.propagate = False
         
         # JSON formatter for structured logging
         formatter = logging.Formatter('%(message)s')
-        file_handler.setFormatter(formatter)
-        
-        self.audit_logger.addHandler(file_handler)
         
         # Console handler if enabled
         if self.enable_console_output:
@@ -65,6 +817,40 @@ class AuditLogger:
             console_handler.setFormatter(formatter)
             self.audit_logger.addHandler(console_handler)
     
+    def import_legacy_log(self) -> int:
+        """Move records from a pre-segment audit.log file into daily segments
+        
+        Called at app startup (unless AUDIT_IMPORT_LEGACY_ON_STARTUP is false) and by
+        the ``flask import-legacy-audit-log`` command. The file is claimed by renaming
+        it, so of several concurrent callers only one imports it. Returns the number
+        of imported records.
+        """
+        claimed = self.audit_log_file + '.importing'
+        try:
+            os.rename(self.audit_log_file, claimed)
+        except FileNotFoundError:
+            return 0
+        
+        try:
+            imported = 0
+            with open(claimed, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line.strip())
+                        self.store.append(entry, line.strip())
+                        imported += 1
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+            
+            self.store.seal_completed_days()
+            os.replace(claimed, self.audit_log_file + '.imported')
+            logger.info("Legacy audit log imported into segments", events=imported)
+            return imported
+        
+        except Exception as e:
+            logger.error("Legacy audit log import failed", error=str(e))
+            return 0
+    
     def log_event(self, event_type: AuditEventType, severity: AuditSeverity,
                   message: str, user_id: Optional[str] = None,
                   session_id: Optional[str] = None, ip_address: Optional[str] = None,
@@ -88,8 +874,13 @@ class AuditLogger:
                 'additional_data': additional_data or {}
             }
             
-            # Log as JSON
-            self.audit_logger.info(json.dumps(audit_entry))
+            # Hand off to the background writer; console output if enabled
+            if self.writer is not None:
+                self.writer.submit(audit_entry)
+            else:
+                self.store.append(audit_entry)
+            if self.enable_console_output:
+                self.audit_logger.info(json.dumps(audit_entry))
             
         except Exception as e:
             logger.error("Audit logging failed", error=str(e))
@@ -282,39 +1073,20 @@ class AuditLogger:
     def search_audit_logs(self, start_date: datetime = None, end_date: datetime = None,
                          event_type: AuditEventType = None, user_id: str = None,
                          severity: AuditSeverity = None, limit: int = 100) -> List[Dict[str, Any]]:
-        """Search audit logs (basic implementation)"""
+        """Search audit logs using the segment indexes"""
         try:
-            results = []
-            
-            with open(self.audit_log_file, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        
-                        # Apply filters
-                        if start_date and datetime.fromisoformat(entry['timestamp']) < start_date:
-                            continue
-                        if end_date and datetime.fromisoformat(entry['timestamp']) > end_date:
-                            continue
-                        if event_type and entry['event_type'] != event_type.value:
-                            continue
-                        if user_id and entry['user_id'] != user_id:
-                            continue
-                        if severity and entry['severity'] != severity.value:
-                            continue
-                        
-                        results.append(entry)
-                        
-                        if len(results) >= limit:
-                            break
-                            
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-            
-            return results
+            self._prepare_read()
+            return self.store.search(
+                start_date=start_date,
+                end_date=end_date,
+                event_type=event_type.value if event_type else None,
+                user_id=user_id,
+                severity=severity.value if severity else None,
+                limit=limit
+            )
             
         except FileNotFoundError:
-            logger.warning("Audit log file not found")
+            logger.warning("Audit segment not found")
             return []
         except Exception as e:
             logger.error("Audit log search failed", error=str(e))
@@ -324,67 +1096,41 @@ class AuditLogger:
         """Get audit statistics for the specified number of days"""
         try:
             cutoff_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            cutoff_date = cutoff_date.replace(day=cutoff_date.day - days)
+            cutoff_date = cutoff_date - timedelta(days=days)
             
-            stats = {
-                'total_events': 0,
-                'events_by_type': {},
-                'events_by_severity': {},
-                'events_by_outcome': {},
-                'unique_users': set(),
-                'security_violations': 0,
-                'failed_authentications': 0
-            }
-            
-            with open(self.audit_log_file, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        
-                        # Check if within date range
-                        if datetime.fromisoformat(entry['timestamp']) < cutoff_date:
-                            continue
-                        
-                        stats['total_events'] += 1
-                        
-                        # Count by type
-                        event_type = entry['event_type']
-                        stats['events_by_type'][event_type] = stats['events_by_type'].get(event_type, 0) + 1
-                        
-                        # Count by severity
-                        severity = entry['severity']
-                        stats['events_by_severity'][severity] = stats['events_by_severity'].get(severity, 0) + 1
-                        
-                        # Count by outcome
-                        outcome = entry['outcome']
-                        stats['events_by_outcome'][outcome] = stats['events_by_outcome'].get(outcome, 0) + 1
-                        
-                        # Track unique users
-                        if entry['user_id']:
-                            stats['unique_users'].add(entry['user_id'])
-                        
-                        # Count security violations
-                        if event_type == AuditEventType.SECURITY_VIOLATION.value:
-                            stats['security_violations'] += 1
-                        
-                        # Count failed authentications
-                        if event_type == AuditEventType.AUTHENTICATION.value and outcome != 'success':
-                            stats['failed_authentications'] += 1
-                            
-                    except (json.JSONDecodeError, KeyError):
-                        continue
-            
-            # Convert set to count
-            stats['unique_users'] = len(stats['unique_users'])
-            
-            return stats
+            self._prepare_read()
+            return self.store.statistics(cutoff_date.date().isoformat())
             
         except FileNotFoundError:
-            logger.warning("Audit log file not found")
+            logger.warning("Audit segment statistics not found")
             return {'total_events': 0}
         except Exception as e:
             logger.error("Audit statistics generation failed", error=str(e))
             return {'error': str(e)}
 
+    def _prepare_read(self):
+        """Make queued records visible to a read; sealing is left to the writer thread"""
+        if self.writer is None:
+            self.store.seal_completed_days()
+        else:
+            self.flush()
+    
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait for queued audit records to reach the segment store"""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+    
+    def shutdown(self):
+        """Flush-on-shutdown hook: drain the writer and close the store"""
+        if self.writer is not None:
+            self.writer.shutdown()
+        else:
+            self.store.close()
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Background writer counters (empty in synchronous mode)"""
+        return self.writer.get_stats() if self.writer is not None else {}
+
 # Global audit logger instance
 audit_logger = AuditLogger()
\ No newline at end of file
@@ -4,8 +4,11 @@ Implements comprehensive rate limiting for API endpoints
 """
 
 import os
+import math
 import time
+import threading
 import redis
+from collections import OrderedDict
 from flask import request, jsonify, current_app
 from functools import wraps
 from typing import Dict, Optional, Callable
@@ -13,6 +16,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# GCRA in a single atomic call. The key holds the theoretical arrival time (TAT)
+# in milliseconds; up to ``limit`` requests fit in any ``window``. Grants up to
+# ARGV[4] tokens at once, but never more than half of what is still available,
+# so local leases are only handed to clients that are clearly under the limit.
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local emission = tonumber(ARGV[2])
+local tolerance = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local available = math.floor((now + tolerance - tat) / emission)
+if available < 1 then
+    return {0, 0, tostring(tat)}
+end
+
+local granted = math.max(1, math.min(requested, math.floor(available / 2)))
+local new_tat = tat + granted * emission
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {granted, available - granted, tostring(new_tat)}
+"""
+
+class LocalLease:
+    """Tokens granted in advance by Redis and spent without a round trip"""
+    
+    __slots__ = ('tokens', 'remaining', 'reset_time', 'expires_at')
+    
+    def __init__(self, tokens: int, remaining: int, reset_time: int, expires_at: float):
+        self.tokens = tokens
+        self.remaining = remaining
+        self.reset_time = reset_time
+        self.expires_at = expires_at
+
 class RateLimiter:
     """Comprehensive rate limiting manager"""
     
@@ -21,6 +61,25 @@ class RateLimiter:
         self.redis_client = redis_client
         self.enabled = True
         
+        # Bounded GCRA state for the in-memory backend (key -> TAT in seconds)
+        self.memory_max_keys = int(os.getenv('RATE_LIMIT_MEMORY_MAX_KEYS', '10000'))
+        self._memory_store: "OrderedDict[str, float]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        
+        # Local token leases that save Redis round trips for clients far below their limit
+        self.lease_max_tokens = int(os.getenv('RATE_LIMIT_LEASE_MAX_TOKENS', '10'))
+        self.lease_seconds = float(os.getenv('RATE_LIMIT_LEASE_SECONDS', '1.0'))
+        self.lease_max_keys = int(os.getenv('RATE_LIMIT_LEASE_MAX_KEYS', '10000'))
+        self._leases: "OrderedDict[str, LocalLease]" = OrderedDict()
+        self._lease_lock = threading.Lock()
+        
+        self._gcra_script = None
+        self.stats = {
+            'redis_calls': 0,
+            'lease_hits': 0,
+            'memory_evictions': 0
+        }
+        
         if app is not None:
             self.init_app(app)
     
@@ -39,7 +98,6 @@ class RateLimiter:
             except Exception as e:
                 logger.warning(f"Redis connection failed, using in-memory storage: {str(e)}")
                 self.redis_client = None
-                self._memory_store = {}
         else:
             logger.info("Rate limiting disabled")
     
@@ -56,44 +114,94 @@ class RateLimiter:
     
     def _get_key(self, identifier: str, window: int) -> str:
         """Generate Redis key for rate limiting"""
-        timestamp = int(time.time() // window)
-        return f"rate_limit:{identifier}:{timestamp}"
+        return f"rate_limit:{identifier}:{window}"
+    
+    def _script(self):
+        """GCRA script registered on the current Redis client (EVALSHA with EVAL fallback)"""
+        if self._gcra_script is None or self._gcra_script.registered_client is not self.redis_client:
+            self._gcra_script = self.redis_client.register_script(GCRA_SCRIPT)
+        return self._gcra_script
+    
+    def _lease_size(self, limit: int) -> int:
+        """Tokens to request per Redis call; 1 disables leasing"""
+        return max(1, min(self.lease_max_tokens, limit // 10))
+    
+    def _take_lease(self, key: str) -> Optional[Dict]:
+        """Spend a locally leased token if one is available"""
+        with self._lease_lock:
+            lease = self._leases.get(key)
+            if lease is None:
+                return None
+            if lease.tokens <= 0 or time.time() >= lease.expires_at:
+                del self._leases[key]
+                return None
+            
+            lease.tokens -= 1
+            return {'tokens_left': lease.tokens, 'remaining': lease.remaining, 'reset_time': lease.reset_time}
+    
+    def _store_lease(self, key: str, lease: LocalLease):
+        """Keep a lease, dropping expired ones and the oldest beyond the key cap
+        
+        Leases are kept in insertion order and all last ``lease_seconds``, so expired
+        ones sit at the front. Dropping a lease only forfeits tokens Redis already
+        counted, so it can never let a client exceed its limit.
+        """
+        now = time.time()
+        with self._lease_lock:
+            self._leases.pop(key, None)
+            self._leases[key] = lease
+            
+            while self._leases:
+                oldest = next(iter(self._leases.values()))
+                if oldest.expires_at > now and len(self._leases) <= self.lease_max_keys:
+                    break
+                self._leases.popitem(last=False)
     
     def _check_rate_limit_redis(self, key: str, limit: int, window: int) -> Dict:
-        """Check rate limit using Redis backend"""
+        """Check rate limit using one atomic Redis script call (or a local lease)"""
+        leased = self._take_lease(key)
+        if leased is not None:
+            self.stats['lease_hits'] += 1
+            remaining = leased['remaining'] + leased['tokens_left']
+            return {
+                'allowed': True,
+                'count': limit - remaining,
+                'limit': limit,
+                'remaining': remaining,
+                'reset_time': leased['reset_time']
+            }
+        
         try:
-            current_count = self.redis_client.get(key)
-            if current_count is None:
-                # First request in this window
-                self.redis_client.setex(key, window, 1)
-                return {
-                    'allowed': True,
-                    'count': 1,
-                    'limit': limit,
-                    'remaining': limit - 1,
-                    'reset_time': int(time.time()) + window
-                }
+            now_ms = time.time() * 1000
+            emission_ms = window * 1000 / limit
+            self.stats['redis_calls'] += 1
+            granted, remaining, tat = self._script()(
+                keys=[key],
+                args=[now_ms, emission_ms, window * 1000, self._lease_size(limit)]
+            )
+            granted, remaining, tat = int(granted), int(remaining), float(tat)
             
-            current_count = int(current_count)
-            if current_count >= limit:
-                # Rate limit exceeded
-                ttl = self.redis_client.ttl(key)
+            if granted < 1:
+                # Next token frees up once the TAT falls back inside the window
                 return {
                     'allowed': False,
-                    'count': current_count,
+                    'count': limit,
                     'limit': limit,
                     'remaining': 0,
-                    'reset_time': int(time.time()) + ttl
+                    'reset_time': math.ceil((tat - window * 1000 + emission_ms) / 1000)
                 }
             
-            # Increment counter
-            new_count = self.redis_client.incr(key)
+            reset_time = math.ceil(tat / 1000)
+            if granted > 1:
+                self._store_lease(key, LocalLease(granted - 1, remaining, reset_time,
+                                                  time.time() + self.lease_seconds))
+            
             return {
                 'allowed': True,
-                'count': new_count,
+                'count': limit - remaining - (granted - 1),
                 'limit': limit,
-                'remaining': limit - new_count,
-                'reset_time': int(time.time()) + self.redis_client.ttl(key)
+                'remaining': remaining + granted - 1,
+                'reset_time': reset_time
             }
             
         except Exception as e:
@@ -108,36 +216,39 @@ class RateLimiter:
             }
     
     def _check_rate_limit_memory(self, key: str, limit: int, window: int) -> Dict:
-        """Check rate limit using in-memory storage"""
-        current_time = time.time()
-        window_start = int(current_time // window) * window
-        
-        if key not in self._memory_store:
-            self._memory_store[key] = {'count': 0, 'window_start': window_start}
-        
-        entry = self._memory_store[key]
+        """Check rate limit using GCRA over a bounded LRU in-memory store"""
+        now = time.time()
+        emission = window / limit
         
-        # Reset if new window
-        if entry['window_start'] < window_start:
-            entry['count'] = 0
-            entry['window_start'] = window_start
-        
-        if entry['count'] >= limit:
-            return {
-                'allowed': False,
-                'count': entry['count'],
-                'limit': limit,
-                'remaining': 0,
-                'reset_time': int(window_start + window)
-            }
+        with self._memory_lock:
+            tat = max(self._memory_store.get(key, now), now)
+            available = math.floor((now + window - tat) / emission + 1e-9)
+            
+            if available < 1:
+                self._memory_store.move_to_end(key)
+                return {
+                    'allowed': False,
+                    'count': limit,
+                    'limit': limit,
+                    'remaining': 0,
+                    'reset_time': math.ceil(tat - window + emission)
+                }
+            
+            tat += emission
+            self._memory_store[key] = tat
+            self._memory_store.move_to_end(key)
+            
+            # Evicting a least recently used client forgets at most one window of history
+            while len(self._memory_store) > self.memory_max_keys:
+                self._memory_store.popitem(last=False)
+                self.stats['memory_evictions'] += 1
         
-        entry['count'] += 1
         return {
             'allowed': True,
-            'count': entry['count'],
+            'count': limit - available + 1,
             'limit': limit,
-            'remaining': limit - entry['count'],
-            'reset_time': int(window_start + window)
+            'remaining': available - 1,
+            'reset_time': math.ceil(tat)
         }
     
     def check_rate_limit(self, identifier: str, limit: int, window: int) -> Dict:
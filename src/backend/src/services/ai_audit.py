@@ -6,7 +6,10 @@ Provides comprehensive logging and audit capabilities for AI decision-making pro
 import os
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, List, Optional, Any, Tuple, Callable, Iterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
@@ -71,6 +74,23 @@ class AuditEvent:
             'context': self.context,
             'metadata': self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AuditEvent':
+        """Rebuild an audit event from its serialized form"""
+        return cls(
+            id=data['id'],
+            event_type=AuditEventType(data['event_type']),
+            level=AuditLevel(data['level']),
+            performer_id=data['performer_id'],
+            session_id=data.get('session_id'),
+            task_id=data.get('task_id'),
+            message_id=data.get('message_id'),
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            event_data=data.get('event_data', {}),
+            context=data.get('context', {}),
+            metadata=data.get('metadata', {})
+        )
 
 @dataclass
 class DecisionTrace:
@@ -87,17 +107,317 @@ class DecisionTrace:
     timestamp: datetime = field(default_factory=datetime.utcnow)
     session_id: Optional[str] = None
     task_id: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert decision trace to dictionary for serialization"""
+        return {
+            'id': self.id,
+            'performer_id': self.performer_id,
+            'decision_type': self.decision_type,
+            'input_data': self.input_data,
+            'reasoning_steps': self.reasoning_steps,
+            'final_decision': self.final_decision,
+            'confidence_score': self.confidence_score,
+            'alternative_options': self.alternative_options,
+            'influencing_factors': self.influencing_factors,
+            'timestamp': self.timestamp.isoformat(),
+            'session_id': self.session_id,
+            'task_id': self.task_id
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DecisionTrace':
+        """Rebuild a decision trace from its serialized form"""
+        return cls(
+            id=data['id'],
+            performer_id=data['performer_id'],
+            decision_type=data['decision_type'],
+            input_data=data.get('input_data', {}),
+            reasoning_steps=data.get('reasoning_steps', []),
+            final_decision=data.get('final_decision', {}),
+            confidence_score=data.get('confidence_score', 0.0),
+            alternative_options=data.get('alternative_options', []),
+            influencing_factors=data.get('influencing_factors', []),
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            session_id=data.get('session_id'),
+            task_id=data.get('task_id')
+        )
+
+class IndexedAuditLog:
+    """Bounded, time-ordered in-memory log with secondary indexes
+    
+    Records are kept in a ring buffer in timestamp order and each index maps a
+    key to the ascending sequence numbers of its records. Queries walk the
+    shortest matching posting list (or the time range, found by binary search)
+    newest first, so they cost O(matches) rather than O(all records).
+    """
+    
+    def __init__(self, capacity: int, index_fields: Dict[str, Callable[[Any], Any]]):
+        self.capacity = capacity
+        self.index_fields = index_fields
+        self._slots: List[Any] = [None] * capacity
+        self._head = 0  # Sequence number of the oldest retained record
+        self._next = 0  # Sequence number assigned to the next record
+        self._indexes: Dict[str, Dict[Any, deque]] = {name: {} for name in index_fields}
+    
+    def __len__(self) -> int:
+        return self._next - self._head
+    
+    def __iter__(self) -> Iterator[Any]:
+        for seq in range(self._head, self._next):
+            yield self._record(seq)
+    
+    def append(self, record: Any):
+        """Add a record, evicting the oldest when at capacity"""
+        if len(self) == self.capacity:
+            self._evict_oldest()
+        
+        seq = self._next
+        self._slots[seq % self.capacity] = record
+        self._next += 1
+        
+        for name, key_of in self.index_fields.items():
+            key = key_of(record)
+            if key is not None:
+                self._indexes[name].setdefault(key, deque()).append(seq)
+    
+    def expire_before(self, cutoff: datetime) -> int:
+        """Drop records older than the cut-off; returns the number removed"""
+        removed = 0
+        while len(self) > 0 and self._record(self._head).timestamp < cutoff:
+            self._evict_oldest()
+            removed += 1
+        return removed
+    
+    def query(self, filters: Dict[str, Any], start_time: datetime = None,
+              end_time: datetime = None, limit: Optional[int] = None) -> List[Any]:
+        """Records matching all index filters within the time range, newest first"""
+        filters = {name: value for name, value in filters.items() if value is not None}
+        low, high = self._time_range(start_time, end_time)
+        
+        if filters:
+            postings = [self._indexes[name].get(value, ()) for name, value in filters.items()]
+            candidates = reversed(min(postings, key=len))
+        else:
+            candidates = range(high - 1, low - 1, -1)
+        
+        results = []
+        for seq in candidates:
+            if seq >= high:
+                continue
+            if seq < low:
+                break
+            
+            record = self._record(seq)
+            if all(self.index_fields[name](record) == value for name, value in filters.items()):
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    break
+        
+        return results
+    
+    def _record(self, seq: int) -> Any:
+        """Record stored under a sequence number"""
+        return self._slots[seq % self.capacity]
+    
+    def _time_range(self, start_time: Optional[datetime], end_time: Optional[datetime]) -> Tuple[int, int]:
+        """Half-open sequence range of records within [start_time, end_time]"""
+        low, high = self._head, self._next
+        if start_time:
+            low = self._bisect(start_time, bisect_left)
+        if end_time:
+            high = self._bisect(end_time, bisect_right)
+        return low, max(low, high)
+    
+    def _bisect(self, when: datetime, bisect_fn) -> int:
+        """Sequence number bounding the given time"""
+        timestamps = _SequenceView(self)
+        return self._head + bisect_fn(timestamps, when)
+    
+    def _evict_oldest(self):
+        """Remove the oldest record from the ring and the head of its postings"""
+        record = self._record(self._head)
+        for name, key_of in self.index_fields.items():
+            key = key_of(record)
+            if key is None:
+                continue
+            postings = self._indexes[name][key]
+            postings.popleft()
+            if not postings:
+                del self._indexes[name][key]
+        
+        self._slots[self._head % self.capacity] = None
+        self._head += 1
+
+class _SequenceView:
+    """Read-only view of a log's timestamps for binary search"""
+    
+    def __init__(self, log: IndexedAuditLog):
+        self.log = log
+    
+    def __len__(self) -> int:
+        return len(self.log)
+    
+    def __getitem__(self, index: int) -> datetime:
+        return self.log._record(self.log._head + index).timestamp
+
+class AuditSegmentStore:
+    """Append-only, segment-based on-disk audit store
+    
+    Records are buffered in memory and written in batches off the event loop.
+    Without a running flusher a full batch is written inline, so the buffer stays
+    bounded. Segments rotate daily and by size.
+    """
+    
+    SEGMENT_PREFIX = "segment_"
+    
+    def __init__(self, storage_path: str, max_segment_bytes: int = 16 * 1024 * 1024,
+                 batch_size: int = 500, flush_interval: float = 1.0):
+        self.segment_path = Path(storage_path) / "segments"
+        self.max_segment_bytes = max_segment_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._flush_requested = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._file_lock = threading.Lock()  # Inline writes may overlap a flush running in a thread
+        self._flusher_running = False
+        self._current_segment: Optional[Path] = None
+        self._current_date: Optional[str] = None
+        self._current_size = 0
+        self.records_written = 0
+        
+        self.segment_path.mkdir(parents=True, exist_ok=True)
+    
+    def append(self, record_type: str, data: Dict[str, Any]):
+        """Buffer a record for the next batched write"""
+        self._buffer.append(json.dumps({'record_type': record_type, 'data': data}, default=str) + '\n')
+        if len(self._buffer) >= self.batch_size:
+            if self._flusher_running:
+                self._flush_requested.set()
+            else:
+                batch, self._buffer = self._buffer, []
+                self._write_batch(batch)
+    
+    async def run_flusher(self):
+        """Flush buffered records periodically or when a batch fills up"""
+        self._flusher_running = True
+        try:
+            await self._flush_loop()
+        finally:
+            self._flusher_running = False
+    
+    async def _flush_loop(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_requested.clear()
+                await self.flush()
+                
+            except asyncio.CancelledError:
+                await self.flush()
+                break
+            except Exception as e:
+                logger.error("Audit segment flush failed", error=str(e))
+    
+    async def flush(self):
+        """Write all buffered records in one batch"""
+        if not self._buffer:
+            return
+        
+        async with self._write_lock:
+            batch, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write_batch, batch)
+    
+    def _write_batch(self, lines: List[str]):
+        """Append a batch to the current segment, rotating first if needed"""
+        payload = ''.join(lines)
+        date_str = datetime.utcnow().strftime('%Y-%m-%d')
+        
+        with self._file_lock:
+            if (self._current_segment is None or date_str != self._current_date or
+                    self._current_size + len(payload) > self.max_segment_bytes):
+                self._current_segment = self._new_segment_path(date_str)
+                self._current_date = date_str
+                self._current_size = 0
+            
+            with open(self._current_segment, 'a') as f:
+                f.write(payload)
+            
+            self._current_size += len(payload)
+            self.records_written += len(lines)
+    
+    def _new_segment_path(self, date_str: str) -> Path:
+        """Next unused segment file name for the date"""
+        existing = sorted(self.segment_path.glob(f"{self.SEGMENT_PREFIX}{date_str}_*.jsonl"))
+        number = int(existing[-1].stem.rsplit('_', 1)[1]) + 1 if existing else 0
+        return self.segment_path / f"{self.SEGMENT_PREFIX}{date_str}_{number:06d}.jsonl"
+    
+    @property
+    def buffered_records(self) -> int:
+        return len(self._buffer)
+    
+    def segments(self) -> List[Path]:
+        """Segment files in write order"""
+        return sorted(self.segment_path.glob(f"{self.SEGMENT_PREFIX}*.jsonl"))
+    
+    def replay(self, since: datetime = None, newest_first: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (record_type, data) from all segments on or after the given date
+        
+        With ``newest_first`` segments and their lines are read in reverse, so a
+        caller that only needs the latest records can stop early.
+        """
+        since_str = since.strftime('%Y-%m-%d') if since else ''
+        segments = [segment for segment in self.segments() if self._segment_date(segment) >= since_str]
+        
+        for segment in (reversed(segments) if newest_first else segments):
+            with open(segment, 'r') as f:
+                lines = reversed(f.readlines()) if newest_first else f
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                        yield record['record_type'], record['data']
+                    except (ValueError, KeyError):
+                        logger.warning("Skipping corrupt audit record", segment=str(segment))
+    
+    def delete_segments_before(self, cutoff: datetime) -> int:
+        """Remove whole segments older than the cut-off date"""
+        cutoff_str = cutoff.strftime('%Y-%m-%d')
+        removed = 0
+        for segment in self.segments():
+            if self._segment_date(segment) < cutoff_str and segment != self._current_segment:
+                segment.unlink()
+                removed += 1
+        return removed
+    
+    def _segment_date(self, segment: Path) -> str:
+        """Date portion of a segment file name"""
+        return segment.stem[len(self.SEGMENT_PREFIX):].rsplit('_', 1)[0]
 
 class AIAuditSystem:
     """Comprehensive audit system for AI decision transparency"""
     
     def __init__(self):
-        self.audit_events: List[AuditEvent] = []
-        self.decision_traces: List[DecisionTrace] = []
         self.audit_storage_path = os.getenv('AUDIT_STORAGE_PATH', './audit_logs')
         self.max_memory_events = int(os.getenv('MAX_MEMORY_AUDIT_EVENTS', '10000'))
         self.audit_retention_days = int(os.getenv('AUDIT_RETENTION_DAYS', '90'))
         
+        # Indexed in-memory views over the persisted audit segments
+        self.audit_events = IndexedAuditLog(self.max_memory_events, {
+            'session_id': lambda e: e.session_id,
+            'performer_id': lambda e: e.performer_id,
+            'event_type': lambda e: e.event_type
+        })
+        self.decision_traces = IndexedAuditLog(self.max_memory_events, {
+            'id': lambda t: t.id,
+            'performer_id': lambda t: t.performer_id,
+            'session_id': lambda t: t.session_id,
+            'task_id': lambda t: t.task_id
+        })
+        
         # Performance metrics
         self.metrics = {
             'total_events': 0,
@@ -110,16 +430,22 @@ class AIAuditSystem:
         
         # Ensure audit directory exists
         Path(self.audit_storage_path).mkdir(parents=True, exist_ok=True)
+        self.segment_store = AuditSegmentStore(self.audit_storage_path)
     
     async def initialize(self):
         """Initialize the audit system"""
         try:
-            # Start background cleanup task
+            # Rebuild in-memory indexes from persisted segments
+            replayed = await asyncio.to_thread(self._replay_segments)
+            
+            # Start batched segment writer and background cleanup task
+            self.flush_task = asyncio.create_task(self.segment_store.run_flusher())
             self.cleanup_task = asyncio.create_task(self._background_cleanup())
             
             logger.info("AI Audit System initialized successfully",
                        storage_path=self.audit_storage_path,
-                       max_memory_events=self.max_memory_events)
+                       max_memory_events=self.max_memory_events,
+                       replayed_records=replayed)
             
         except Exception as e:
             logger.error("Failed to initialize AI Audit System", error=str(e))
@@ -163,9 +489,8 @@ class AIAuditSystem:
                 self.metrics['events_by_performer'][performer_id] = 0
             self.metrics['events_by_performer'][performer_id] += 1
             
-            # Persist to storage if critical or error
-            if level in [AuditLevel.ERROR, AuditLevel.CRITICAL]:
-                await self._persist_event(event)
+            # Persist to the buffered segment store
+            self._persist_event(event)
             
             # Log to structured logger
             logger.log(
@@ -209,6 +534,7 @@ class AIAuditSystem:
             )
             
             self.decision_traces.append(decision_trace)
+            self.segment_store.append('decision_trace', decision_trace.to_dict())
             self.metrics['decisions_traced'] += 1
             
             # Log the decision event
@@ -302,29 +628,16 @@ class AIAuditSystem:
                             limit: int = 100) -> List[Dict[str, Any]]:
         """Get audit trail with filtering options"""
         try:
-            filtered_events = self.audit_events.copy()
-            
-            # Apply filters
-            if session_id:
-                filtered_events = [e for e in filtered_events if e.session_id == session_id]
-            
-            if performer_id:
-                filtered_events = [e for e in filtered_events if e.performer_id == performer_id]
-            
-            if event_type:
-                filtered_events = [e for e in filtered_events if e.event_type == event_type]
-            
-            if start_time:
-                filtered_events = [e for e in filtered_events if e.timestamp >= start_time]
-            
-            if end_time:
-                filtered_events = [e for e in filtered_events if e.timestamp <= end_time]
-            
-            # Sort by timestamp (most recent first)
-            filtered_events.sort(key=lambda e: e.timestamp, reverse=True)
-            
-            # Apply limit
-            filtered_events = filtered_events[:limit]
+            filtered_events = self.audit_events.query(
+                {
+                    'session_id': session_id,
+                    'performer_id': performer_id,
+                    'event_type': event_type
+                },
+                start_time=start_time,
+                end_time=end_time,
+                limit=limit
+            )
             
             return [event.to_dict() for event in filtered_events]
             
@@ -336,41 +649,14 @@ class AIAuditSystem:
                                session_id: str = None, task_id: str = None) -> List[Dict[str, Any]]:
         """Get decision traces with filtering options"""
         try:
-            filtered_traces = self.decision_traces.copy()
-            
-            # Apply filters
-            if trace_id:
-                filtered_traces = [t for t in filtered_traces if t.id == trace_id]
-            
-            if performer_id:
-                filtered_traces = [t for t in filtered_traces if t.performer_id == performer_id]
-            
-            if session_id:
-                filtered_traces = [t for t in filtered_traces if t.session_id == session_id]
-            
-            if task_id:
-                filtered_traces = [t for t in filtered_traces if t.task_id == task_id]
-            
-            # Sort by timestamp (most recent first)
-            filtered_traces.sort(key=lambda t: t.timestamp, reverse=True)
+            filtered_traces = self.decision_traces.query({
+                'id': trace_id,
+                'performer_id': performer_id,
+                'session_id': session_id,
+                'task_id': task_id
+            })
             
-            return [
-                {
-                    'id': trace.id,
-                    'performer_id': trace.performer_id,
-                    'decision_type': trace.decision_type,
-                    'input_data': trace.input_data,
-                    'reasoning_steps': trace.reasoning_steps,
-                    'final_decision': trace.final_decision,
-                    'confidence_score': trace.confidence_score,
-                    'alternative_options': trace.alternative_options,
-                    'influencing_factors': trace.influencing_factors,
-                    'timestamp': trace.timestamp.isoformat(),
-                    'session_id': trace.session_id,
-                    'task_id': trace.task_id
-                }
-                for trace in filtered_traces
-            ]
+            return [trace.to_dict() for trace in filtered_traces]
             
         except Exception as e:
             logger.error("Failed to get decision traces", error=str(e))
@@ -460,39 +746,64 @@ class AIAuditSystem:
             logger.error("Failed to calculate transparency score", error=str(e))
             return 0.0
     
-    async def _persist_event(self, event: AuditEvent):
-        """Persist an audit event to storage"""
+    def _persist_event(self, event: AuditEvent):
+        """Queue an audit event for the next batched segment write"""
         try:
-            # Create daily log file
-            date_str = event.timestamp.strftime('%Y-%m-%d')
-            log_file = Path(self.audit_storage_path) / f"audit_{date_str}.jsonl"
+            self.segment_store.append('audit_event', event.to_dict())
             
-            # Append event to file
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(event.to_dict()) + '\n')
-                
         except Exception as e:
             logger.error("Failed to persist audit event", error=str(e))
     
+    def _replay_segments(self) -> int:
+        """Load the newest retained events and traces from disk into the in-memory indexes
+        
+        Segments are read newest first and reading stops once both logs would be
+        full, so startup cost follows ``max_memory_events`` rather than retention.
+        """
+        cutoff_time = datetime.utcnow() - timedelta(days=self.audit_retention_days)
+        remaining = {'audit_event': self.max_memory_events, 'decision_trace': self.max_memory_events}
+        recent = []
+        
+        for record_type, data in self.segment_store.replay(since=cutoff_time, newest_first=True):
+            if remaining.get(record_type, 0) > 0:
+                remaining[record_type] -= 1
+                recent.append((record_type, data))
+                if not any(remaining.values()):
+                    break
+        
+        replayed = 0
+        for record_type, data in reversed(recent):
+            try:
+                if record_type == 'audit_event':
+                    self.audit_events.append(AuditEvent.from_dict(data))
+                elif record_type == 'decision_trace':
+                    self.decision_traces.append(DecisionTrace.from_dict(data))
+                replayed += 1
+            except Exception as e:
+                logger.warning("Failed to replay audit record", record_type=record_type, error=str(e))
+        
+        return replayed
+    
+    async def shutdown(self):
+        """Flush buffered audit records and stop background tasks"""
+        for task in (getattr(self, 'flush_task', None), getattr(self, 'cleanup_task', None)):
+            if task:
+                task.cancel()
+        await self.segment_store.flush()
+    
     async def _background_cleanup(self):
         """Background task for cleaning up old audit data"""
         while True:
             try:
                 await asyncio.sleep(3600)  # Run every hour
                 
-                # Clean up memory storage
-                if len(self.audit_events) > self.max_memory_events:
-                    # Keep only the most recent events
-                    self.audit_events = self.audit_events[-self.max_memory_events:]
-                
-                # Clean up old decision traces
+                # Memory is bounded by the indexed logs; expire by retention
                 cutoff_time = datetime.utcnow() - timedelta(days=self.audit_retention_days)
-                self.decision_traces = [
-                    trace for trace in self.decision_traces
-                    if trace.timestamp > cutoff_time
-                ]
+                self.audit_events.expire_before(cutoff_time)
+                self.decision_traces.expire_before(cutoff_time)
                 
-                # Clean up old log files
+                # Clean up old segments and log files
+                await asyncio.to_thread(self.segment_store.delete_segments_before, cutoff_time)
                 await self._cleanup_old_log_files()
                 
             except asyncio.CancelledError:
@@ -533,6 +844,11 @@ class AIAuditSystem:
                     'decision_traces': len(self.decision_traces),
                     'max_memory_events': self.max_memory_events
                 },
+                'storage': {
+                    'segments': len(self.segment_store.segments()),
+                    'records_written': self.segment_store.records_written,
+                    'buffered_records': self.segment_store.buffered_records
+                },
                 'configuration': {
                     'storage_path': self.audit_storage_path,
                     'retention_days': self.audit_retention_days
@@ -4,9 +4,11 @@ Enables AI performers to share insights and collaborate on complex analysis
 """
 
 import os
+import time
 import asyncio
+import itertools
 import logging
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
@@ -14,6 +16,7 @@ import json
 import uuid
 import structlog
 from abc import ABC, abstractmethod
+from collections import Counter, defaultdict, deque
 
 logger = structlog.get_logger(__name__)
 
@@ -79,6 +82,98 @@ class CollaborationSession:
     end_time: Optional[datetime] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+class MessageHistory:
+    """Fixed-capacity ring buffer of messages in arrival order
+    
+    Secondary indexes by session, sender and message type hold ring sequence
+    numbers in ascending order, so evicting the oldest message pops the head of
+    each index and retention cut-offs cost O(expired).
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: List[Optional[Tuple[datetime, AIMessage]]] = [None] * capacity
+        self._head = 0  # Sequence number of the oldest retained message
+        self._next = 0  # Sequence number assigned to the next message
+        self._by_session: Dict[str, deque] = {}
+        self._by_sender: Dict[str, deque] = {}
+        self._by_type: Dict[MessageType, deque] = {}
+    
+    def __len__(self) -> int:
+        return self._next - self._head
+    
+    def __iter__(self):
+        for seq in range(self._head, self._next):
+            yield self._slots[seq % self.capacity][1]
+    
+    def append(self, message: AIMessage, recorded_at: Optional[datetime] = None):
+        """Add a message, evicting the oldest when at capacity"""
+        if len(self) == self.capacity:
+            self._evict_oldest()
+        
+        seq = self._next
+        self._slots[seq % self.capacity] = (recorded_at or datetime.utcnow(), message)
+        self._next += 1
+        
+        for index, key in self._index_keys(message):
+            index.setdefault(key, deque()).append(seq)
+    
+    def expire_before(self, cutoff: datetime) -> int:
+        """Drop messages recorded before the cut-off; returns the number removed"""
+        removed = 0
+        while len(self) > 0 and self._slots[self._head % self.capacity][0] < cutoff:
+            self._evict_oldest()
+            removed += 1
+        return removed
+    
+    def since(self, cutoff: datetime) -> List[AIMessage]:
+        """Messages recorded at or after the cut-off, oldest first"""
+        low, high = self._head, self._next
+        while low < high:
+            mid = (low + high) // 2
+            if self._slots[mid % self.capacity][0] < cutoff:
+                low = mid + 1
+            else:
+                high = mid
+        return [self._slots[seq % self.capacity][1] for seq in range(low, self._next)]
+    
+    def by_session(self, session_id: str) -> List[AIMessage]:
+        """Retained messages for a collaboration session, oldest first"""
+        return self._lookup(self._by_session, session_id)
+    
+    def by_sender(self, sender_id: str) -> List[AIMessage]:
+        """Retained messages from a sender, oldest first"""
+        return self._lookup(self._by_sender, sender_id)
+    
+    def by_type(self, message_type: MessageType) -> List[AIMessage]:
+        """Retained messages of a type, oldest first"""
+        return self._lookup(self._by_type, message_type)
+    
+    def _lookup(self, index: Dict[Any, deque], key: Any) -> List[AIMessage]:
+        """Messages for an index key, oldest first"""
+        return [self._slots[seq % self.capacity][1] for seq in index.get(key, ())]
+    
+    def _index_keys(self, message: AIMessage):
+        """(index, key) pairs a message is filed under"""
+        keys = [(self._by_sender, message.sender_id), (self._by_type, message.message_type)]
+        if message.session_id:
+            keys.append((self._by_session, message.session_id))
+        return keys
+    
+    def _evict_oldest(self):
+        """Remove the oldest message from the ring and the head of its indexes"""
+        slot = self._head % self.capacity
+        _, message = self._slots[slot]
+        
+        for index, key in self._index_keys(message):
+            postings = index[key]
+            postings.popleft()
+            if not postings:
+                del index[key]
+        
+        self._slots[slot] = None
+        self._head += 1
+
 class AIMessageHandler(ABC):
     """Abstract base class for AI message handlers"""
     
@@ -98,14 +193,27 @@ class AICommunicationHub:
     def __init__(self):
         self.message_handlers: Dict[str, AIMessageHandler] = {}
         self.active_sessions: Dict[str, CollaborationSession] = {}
-        self.message_queue: List[AIMessage] = []
-        self.message_history: List[AIMessage] = []
+        self.message_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.mailboxes: Dict[str, asyncio.PriorityQueue] = {}
         self.performer_registry: Dict[str, Dict[str, Any]] = {}
         
         # Configuration
         self.max_message_history = 1000
         self.message_retention_days = 7
         self.max_collaboration_duration = timedelta(hours=2)
+        self.mailbox_concurrency = int(os.getenv('AI_MAILBOX_CONCURRENCY', '2'))  # Workers per recipient
+        self.handler_timeout = float(os.getenv('AI_HANDLER_TIMEOUT_SECONDS', '30'))
+        self.housekeeping_interval = 1.0  # Seconds between session checks and cleanup
+        
+        # Bounded, indexed message history
+        self.message_history = MessageHistory(self.max_message_history)
+        
+        # Delivery state
+        self._message_sequence = itertools.count()
+        self._running = False
+        self._worker_tasks: List[asyncio.Task] = []
+        self._broadcast_tasks: Set[asyncio.Task] = set()  # Strong references until each broadcast finishes
+        self._delivery_latencies: deque = deque(maxlen=1000)
         
         # Performance metrics
         self.metrics = {
@@ -114,13 +222,21 @@ class AICommunicationHub:
             'collaborations_initiated': 0,
             'collaborations_successful': 0,
             'conflicts_resolved': 0,
-            'average_response_time': 0.0
+            'delivery_timeouts': 0,
+            'delivery_failures': 0
         }
     
     async def initialize(self):
-        """Initialize the communication hub"""
+        """Initialize the communication hub; later calls are no-ops"""
+        if self._running:
+            return
+        
         try:
-            # Start background message processor
+            # Start message dispatcher, recipient mailboxes and housekeeping
+            self._running = True
+            self.dispatch_task = asyncio.create_task(self._dispatch_loop())
+            for performer_id in self.message_handlers:
+                self._start_mailbox_workers(performer_id)
             self.processing_task = asyncio.create_task(self._background_processor())
             
             logger.info("AI Communication Hub initialized successfully")
@@ -144,6 +260,11 @@ class AICommunicationHub:
             
             self.message_handlers[performer_id] = message_handler
             
+            if performer_id not in self.mailboxes:
+                self.mailboxes[performer_id] = asyncio.PriorityQueue()
+                if self._running:
+                    self._start_mailbox_workers(performer_id)
+            
             logger.info("AI performer registered", performer_id=performer_id)
             
         except Exception as e:
@@ -158,8 +279,8 @@ class AICommunicationHub:
                 logger.error("Invalid message", message_id=message.id)
                 return False
             
-            # Add to queue for processing
-            self.message_queue.append(message)
+            # Add to queue for processing; the dispatcher wakes immediately
+            self.message_queue.put_nowait(self._queue_entry(message, time.perf_counter()))
             self.message_history.append(message)
             
             # Update metrics
@@ -309,14 +430,20 @@ class AICommunicationHub:
             logger.error("Error resolving conflict", session_id=session_id, error=str(e))
             return False
     
+    def _queue_entry(self, message: AIMessage, enqueued_at: float) -> Tuple[int, int, float, AIMessage]:
+        """Priority queue entry: highest priority first, FIFO within a priority"""
+        return (-message.priority.value, next(self._message_sequence), enqueued_at, message)
+    
+    def _start_mailbox_workers(self, performer_id: str):
+        """Start the bounded pool of delivery workers for a recipient mailbox"""
+        for _ in range(self.mailbox_concurrency):
+            self._worker_tasks.append(asyncio.create_task(self._mailbox_worker(performer_id)))
+    
     async def _background_processor(self):
-        """Background processor for handling messages and maintaining sessions"""
+        """Background processor for maintaining sessions and message history"""
         while True:
             try:
-                await asyncio.sleep(0.1)  # Process every 100ms
-                
-                # Process message queue
-                await self._process_message_queue()
+                await asyncio.sleep(self.housekeeping_interval)
                 
                 # Check collaboration sessions
                 await self._check_collaboration_sessions()
@@ -330,72 +457,108 @@ class AICommunicationHub:
                 logger.error("Background processor error", error=str(e))
                 await asyncio.sleep(1)  # Wait before retrying
     
-    async def _process_message_queue(self):
-        """Process pending messages in the queue"""
+    async def _dispatch_loop(self):
+        """Route queued messages to recipient mailboxes or fan out broadcasts"""
+        while True:
+            try:
+                _, _, enqueued_at, message = await self.message_queue.get()
+                
+                if message.recipient_id:
+                    mailbox = self.mailboxes.get(message.recipient_id)
+                    if mailbox is not None:
+                        mailbox.put_nowait(self._queue_entry(message, enqueued_at))
+                    else:
+                        logger.warning("Recipient not found", recipient_id=message.recipient_id)
+                else:
+                    task = asyncio.create_task(self._deliver_broadcast(message, enqueued_at))
+                    self._broadcast_tasks.add(task)
+                    task.add_done_callback(self._broadcast_tasks.discard)
+                    
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Message dispatch failed", error=str(e))
+    
+    async def _mailbox_worker(self, performer_id: str):
+        """Deliver direct messages for one recipient, highest priority first"""
+        mailbox = self.mailboxes[performer_id]
+        while True:
+            try:
+                _, _, enqueued_at, message = await mailbox.get()
+                if await self._deliver_to_handler(performer_id, message, enqueued_at):
+                    self.metrics['messages_received'] += 1
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Mailbox delivery failed", performer_id=performer_id, error=str(e))
+    
+    async def _deliver_broadcast(self, message: AIMessage, enqueued_at: float):
+        """Deliver a broadcast to all recipients concurrently"""
         try:
-            messages_to_process = self.message_queue.copy()
-            self.message_queue.clear()
+            excluded = message.metadata.get('excluded', [])
+            recipients = [pid for pid in self.message_handlers if pid not in excluded]
+            
+            delivered = await asyncio.gather(*[
+                self._deliver_to_handler(performer_id, message, enqueued_at)
+                for performer_id in recipients
+            ])
+            if any(delivered):
+                self.metrics['messages_received'] += 1
             
-            for message in messages_to_process:
-                await self._deliver_message(message)
-                
         except Exception as e:
-            logger.error("Message queue processing failed", error=str(e))
+            logger.error("Broadcast delivery failed", message_id=message.id, error=str(e))
     
-    async def _deliver_message(self, message: AIMessage):
-        """Deliver a message to its intended recipient(s)"""
+    async def _deliver_to_handler(self, performer_id: str, message: AIMessage, enqueued_at: float) -> bool:
+        """Deliver a message to one handler under the per-handler timeout; True if it was handled"""
+        handler = self.message_handlers.get(performer_id)
+        if handler is None:
+            logger.warning("Recipient not found", recipient_id=performer_id)
+            return False
+        
         try:
-            start_time = datetime.utcnow()
+            response = await asyncio.wait_for(handler.handle_message(message), timeout=self.handler_timeout)
             
-            if message.recipient_id:
-                # Direct message
-                if message.recipient_id in self.message_handlers:
-                    handler = self.message_handlers[message.recipient_id]
-                    response = await handler.handle_message(message)
-                    
-                    # Update recipient metrics
-                    if message.recipient_id in self.performer_registry:
-                        self.performer_registry[message.recipient_id]['messages_received'] += 1
-                        self.performer_registry[message.recipient_id]['last_activity'] = datetime.utcnow()
-                    
-                    # Handle response if provided
-                    if response:
-                        await self.send_message(response)
-                else:
-                    logger.warning("Recipient not found", recipient_id=message.recipient_id)
-            else:
-                # Broadcast message
-                excluded = message.metadata.get('excluded', [])
-                
-                for performer_id, handler in self.message_handlers.items():
-                    if performer_id not in excluded:
-                        try:
-                            response = await handler.handle_message(message)
-                            
-                            # Update recipient metrics
-                            if performer_id in self.performer_registry:
-                                self.performer_registry[performer_id]['messages_received'] += 1
-                                self.performer_registry[performer_id]['last_activity'] = datetime.utcnow()
-                            
-                            # Handle response if provided
-                            if response:
-                                await self.send_message(response)
-                                
-                        except Exception as e:
-                            logger.error("Failed to deliver broadcast message", 
-                                       performer_id=performer_id,
-                                       error=str(e))
-            
-            # Update response time metrics
-            response_time = (datetime.utcnow() - start_time).total_seconds()
-            self.metrics['average_response_time'] = (
-                (self.metrics['average_response_time'] * self.metrics['messages_received'] + response_time) /
-                (self.metrics['messages_received'] + 1)
-            )
-            self.metrics['messages_received'] += 1
+            # Update recipient metrics
+            if performer_id in self.performer_registry:
+                self.performer_registry[performer_id]['messages_received'] += 1
+                self.performer_registry[performer_id]['last_activity'] = datetime.utcnow()
+            
+            self._delivery_latencies.append(time.perf_counter() - enqueued_at)
+            
+            # Handle response if provided
+            if response:
+                await self.send_message(response)
             
+            return True
+                
+        except asyncio.TimeoutError:
+            self.metrics['delivery_timeouts'] += 1
+            logger.error("Message handler timed out",
+                       performer_id=performer_id,
+                       message_id=message.id,
+                       timeout=self.handler_timeout)
         except Exception as e:
-            logger.error("Message delivery failed", message_id=message.id, error=str(e))
+            self.metrics['delivery_failures'] += 1
+            logger.error("Failed to deliver message",
+                       performer_id=performer_id,
+                       message_id=message.id,
+                       error=str(e))
+        return False
+    
+    def _delivery_latency_percentiles(self) -> Dict[str, float]:
+        """Percentiles (seconds) of recent enqueue-to-delivery latencies"""
+        if not self._delivery_latencies:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'samples': 0}
+        
+        samples = sorted(self._delivery_latencies)
+        last = len(samples) - 1
+        return {
+            'p50': samples[int(0.50 * last)],
+            'p95': samples[int(0.95 * last)],
+            'p99': samples[int(0.99 * last)],
+            'samples': len(samples)
+        }
     
     async def _check_collaboration_sessions(self):
         """Check and update collaboration sessions"""
@@ -434,22 +597,29 @@ class AICommunicationHub:
     async def _cleanup_old_messages(self):
         """Clean up old messages from history"""
         try:
-            if len(self.message_history) > self.max_message_history:
-                # Keep only the most recent messages
-                self.message_history = self.message_history[-self.max_message_history:]
-            
-            # Remove expired messages
-            current_time = datetime.utcnow()
-            cutoff_time = current_time - timedelta(days=self.message_retention_days)
-            
-            self.message_history = [
-                msg for msg in self.message_history
-                if msg.timestamp > cutoff_time
-            ]
-            
+            # Capacity is enforced on append; only expired messages need removing
+            cutoff_time = datetime.utcnow() - timedelta(days=self.message_retention_days)
+            self.message_history.expire_before(cutoff_time)
+        
         except Exception as e:
             logger.error("Message cleanup failed", error=str(e))
     
+    def get_session_messages(self, session_id: str,
+                             message_type: Optional[MessageType] = None) -> List[AIMessage]:
+        """Retained messages exchanged within a collaboration session, oldest first"""
+        messages = self.message_history.by_session(session_id)
+        if message_type:
+            messages = [m for m in messages if m.message_type == message_type]
+        return messages
+    
+    def get_messages_from(self, sender_id: str) -> List[AIMessage]:
+        """Retained messages sent by a performer, oldest first"""
+        return self.message_history.by_sender(sender_id)
+    
+    def get_messages_by_type(self, message_type: MessageType) -> List[AIMessage]:
+        """Retained messages of a given type, oldest first"""
+        return self.message_history.by_type(message_type)
+    
     async def _resolve_collaboration_conflict(self, session: CollaborationSession, 
                                             conflict_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Resolve conflicts in collaboration sessions"""
@@ -462,21 +632,49 @@ class AICommunicationHub:
             if conflict_type == 'confidence_disagreement':
                 # Use weighted average based on performer confidence scores
                 conflicting_insights = conflict_data.get('insights', [])
+                disputed_keys = set(conflict_data.get('keys', []))
+                for insight in conflicting_insights:
+                    if isinstance(insight.get('data'), dict):
+                        disputed_keys.update(insight['data'])
                 
-                if len(conflicting_insights) >= 2:
-                    total_weight = sum(insight.get('confidence', 0.5) for insight in conflicting_insights)
+                # Fall back to the numeric insights shared within the session on the same keys
+                if len(conflicting_insights) < 2:
+                    session_insights = [
+                        message.content
+                        for message in self.get_session_messages(session.id, MessageType.INSIGHT_SHARE)
+                        if message.content.get('data') and self._has_numeric_data(message.content)
+                    ]
+                    if disputed_keys:
+                        session_insights = [insight for insight in session_insights
+                                            if disputed_keys & set(insight['data'])]
+                    conflicting_insights = conflicting_insights + [
+                        insight for insight in session_insights if insight not in conflicting_insights
+                    ]
+                
+                # Only numeric data can be averaged; anything else goes to human review
+                if len(conflicting_insights) >= 2 and all(
+                        self._has_numeric_data(insight) for insight in conflicting_insights):
+                    weighted_sums = defaultdict(float)
+                    key_weights = defaultdict(float)
+                    key_counts = Counter()
+                    for insight in conflicting_insights:
+                        weight = insight.get('confidence', 0.5)
+                        for key, value in insight.get('data', {}).items():
+                            weighted_sums[key] += value * weight
+                            key_weights[key] += weight
+                            key_counts[key] += 1
+                    
+                    # Each key is averaged over the insights that report it. Without known
+                    # disputed keys, only keys reported by several insights are in conflict.
+                    weighted_result = {
+                        key: weighted_sums[key] / key_weights[key]
+                        for key in weighted_sums
+                        if key_weights[key] > 0 and (key in disputed_keys if disputed_keys
+                                                     else key_counts[key] >= 2)
+                    }
                     
-                    if total_weight > 0:
-                        weighted_result = {}
-                        for insight in conflicting_insights:
-                            weight = insight.get('confidence', 0.5) / total_weight
-                            # Merge insights with weights (simplified)
-                            for key, value in insight.get('data', {}).items():
-                                if key not in weighted_result:
-                                    weighted_result[key] = value * weight
-                                else:
-                                    weighted_result[key] += value * weight
-                        
+                    if weighted_result:
+                        total_weight = sum(insight.get('confidence', 0.5) for insight in conflicting_insights)
                         return {
                             'resolution_type': 'weighted_average',
                             'result': weighted_result,
@@ -508,6 +706,14 @@ class AICommunicationHub:
             logger.error("Conflict resolution failed", error=str(e))
             return None
     
+    @staticmethod
+    def _has_numeric_data(insight: Dict[str, Any]) -> bool:
+        """Whether every value in an insight's data can be weighted and summed"""
+        data = insight.get('data', {})
+        return isinstance(data, dict) and all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) for value in data.values()
+        )
+    
     def _validate_message(self, message: AIMessage) -> bool:
         """Validate message format and content"""
         try:
@@ -543,9 +749,10 @@ class AICommunicationHub:
                 'status': 'active',
                 'registered_performers': len(self.performer_registry),
                 'active_collaborations': len(self.active_sessions),
-                'queued_messages': len(self.message_queue),
+                'queued_messages': self.message_queue.qsize() + sum(m.qsize() for m in self.mailboxes.values()),
                 'message_history_size': len(self.message_history),
                 'metrics': self.metrics,
+                'delivery_latency': self._delivery_latency_percentiles(),
                 'performer_stats': {
                     performer_id: {
                         'last_activity': stats['last_activity'].isoformat(),
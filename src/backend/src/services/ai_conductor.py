@@ -4,6 +4,9 @@ Orchestrates multiple AI engines for comprehensive meeting analysis
 """
 
 import os
+import time
+import heapq
+import itertools
 import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple, Callable
@@ -110,9 +113,20 @@ class AIConductor:
         self.performers: Dict[str, AIPerformer] = {}
         self.ai_performers: Dict[str, BaseAIPerformer] = {}
         self.active_sessions: Dict[str, AnalysisSession] = {}
-        self.task_queue: List[AnalysisTask] = []
         self.completed_sessions: List[str] = []
         
+        # Event-driven scheduling: one priority heap per dimension, woken on
+        # task submission or when a performer frees a slot
+        self.task_queues: Dict[AnalysisDimension, List[Tuple[int, int, AnalysisTask]]] = {
+            dimension: [] for dimension in AnalysisDimension
+        }
+        self.performers_by_dimension: Dict[AnalysisDimension, List[AIPerformer]] = {
+            dimension: [] for dimension in AnalysisDimension
+        }
+        self._task_sequence = itertools.count()
+        self._task_enqueued_at: Dict[str, float] = {}
+        self._scheduler_condition = asyncio.Condition()
+        
         # OpenAI client for AI processing
         self.openai_client = None
         
@@ -127,7 +141,9 @@ class AIConductor:
             'successful_sessions': 0,
             'failed_sessions': 0,
             'average_session_time': 0.0,
-            'total_tasks_processed': 0
+            'total_tasks_processed': 0,
+            'total_tasks_dispatched': 0,
+            'average_dispatch_latency': 0.0
         }
         
         # Initialize AI performers
@@ -168,7 +184,8 @@ class AIConductor:
                 
                 logger.info(f"AI performer initialized and registered: {performer_id}")
             
-            # Start background task processor
+            # Start task dispatcher and background maintenance
+            self.dispatch_task = asyncio.create_task(self._dispatch_loop())
             self.processing_task = asyncio.create_task(self._background_processor())
             
             logger.info("AI Conductor initialized successfully",
@@ -239,6 +256,15 @@ class AIConductor:
             max_concurrent_tasks=2,
             capabilities=self.ai_performers['human_needs_analyzer'].capabilities
         )
+        
+        for performer in self.performers.values():
+            for dimension in performer.specialties:
+                self.performers_by_dimension[dimension].append(performer)
+    
+    @property
+    def queued_task_count(self) -> int:
+        """Number of tasks waiting for a performer"""
+        return sum(len(queue) for queue in self.task_queues.values())
     
     async def start_analysis_session(self, meeting_id: str = None, transcript_id: str = None,
                                    input_data: Dict[str, Any] = None) -> AnalysisSession:
@@ -264,9 +290,9 @@ class AIConductor:
                     priority=self._determine_task_priority(dimension, input_data)
                 )
                 session.tasks.append(task)
-                self.task_queue.append(task)
             
             self.active_sessions[session_id] = session
+            await self._enqueue_tasks(session.tasks)
             self.performance_metrics['total_sessions'] += 1
             
             # Log session start event
@@ -316,14 +342,40 @@ class AIConductor:
         else:
             return Priority.MEDIUM
     
+    async def _enqueue_tasks(self, tasks: List[AnalysisTask]):
+        """Queue tasks on their dimension heaps and wake the dispatcher"""
+        async with self._scheduler_condition:
+            for task in tasks:
+                heapq.heappush(
+                    self.task_queues[task.dimension],
+                    (-task.priority.value, next(self._task_sequence), task)
+                )
+                self._task_enqueued_at[task.id] = time.perf_counter()
+            self._scheduler_condition.notify()
+    
+    async def _notify_scheduler(self):
+        """Wake the dispatcher after performer capacity changed"""
+        async with self._scheduler_condition:
+            self._scheduler_condition.notify()
+    
+    async def _dispatch_loop(self):
+        """Dispatch queued tasks whenever work arrives or a performer frees a slot"""
+        async with self._scheduler_condition:
+            while True:
+                try:
+                    await self._process_task_queue()
+                    await self._scheduler_condition.wait()
+                    
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error("Task dispatcher error", error=str(e))
+    
     async def _background_processor(self):
-        """Background task processor that manages task assignment and execution"""
+        """Background processor for session and performer housekeeping"""
         while True:
             try:
-                await asyncio.sleep(1)  # Process every second
-                
-                # Process pending tasks
-                await self._process_task_queue()
+                await asyncio.sleep(1)  # Housekeeping every second
                 
                 # Check for completed sessions
                 await self._check_completed_sessions()
@@ -341,43 +393,56 @@ class AIConductor:
                 await asyncio.sleep(5)  # Wait before retrying
     
     async def _process_task_queue(self):
-        """Process pending tasks in the queue"""
+        """Assign queued tasks to performers with free capacity, highest priority first"""
         try:
-            # Sort tasks by priority
-            self.task_queue.sort(key=lambda t: t.priority.value, reverse=True)
-            
-            # Process tasks
-            tasks_to_remove = []
-            
-            for task in self.task_queue:
-                if task.status != ProcessingStatus.PENDING:
-                    tasks_to_remove.append(task)
-                    continue
-                
-                # Find available performer
-                performer = await self._find_available_performer(task.dimension)
-                if performer:
-                    # Assign task to performer
+            for dimension, queue in self.task_queues.items():
+                while queue:
+                    _, _, task = queue[0]
+                    if task.status != ProcessingStatus.PENDING:
+                        heapq.heappop(queue)
+                        self._task_enqueued_at.pop(task.id, None)
+                        continue
+                    
+                    performer = self._find_available_performer(dimension)
+                    if not performer:
+                        break
+                    
+                    heapq.heappop(queue)
+                    self._record_dispatch_latency(task)
                     await self._assign_task_to_performer(task, performer)
-                    tasks_to_remove.append(task)
-            
-            # Remove processed tasks from queue
-            for task in tasks_to_remove:
-                if task in self.task_queue:
-                    self.task_queue.remove(task)
                     
         except Exception as e:
             logger.error("Task queue processing failed", error=str(e))
     
-    async def _find_available_performer(self, dimension: AnalysisDimension) -> Optional[AIPerformer]:
-        """Find an available performer for the given dimension"""
+    def _record_dispatch_latency(self, task: AnalysisTask):
+        """Track the running average time tasks wait in the queue"""
+        enqueued_at = self._task_enqueued_at.pop(task.id, None)
+        if enqueued_at is None:
+            return
+        
+        latency = time.perf_counter() - enqueued_at
+        metrics = self.performance_metrics
+        metrics['total_tasks_dispatched'] += 1
+        metrics['average_dispatch_latency'] += (
+            latency - metrics['average_dispatch_latency']
+        ) / metrics['total_tasks_dispatched']
+    
+    def _find_available_performer(self, dimension: AnalysisDimension) -> Optional[AIPerformer]:
+        """Find the least-loaded ready performer with a free slot for the given dimension"""
         try:
-            for performer in self.performers.values():
-                if (dimension in performer.specialties and 
-                    len(performer.current_tasks) < performer.max_concurrent_tasks and
-                    performer.status == "ready"):
-                    return performer
-            return None
+            best_performer = None
+            best_load = 1.0
+            
+            for performer in self.performers_by_dimension.get(dimension, []):
+                if performer.status != "ready":
+                    continue
+                
+                load = len(performer.current_tasks) / performer.max_concurrent_tasks
+                if load < best_load:
+                    best_performer = performer
+                    best_load = load
+            
+            return best_performer
             
         except Exception as e:
             logger.error("Performer search failed", error=str(e))
@@ -426,9 +491,10 @@ class AIConductor:
             task.processing_time = (task.end_time - task.start_time).total_seconds()
             task.confidence = result.get('confidence', 0.8)
             
-            # Update performer stats
+            # Update performer stats and release the slot
             performer.current_tasks.remove(task.id)
             performer.total_tasks_completed += 1
+            await self._notify_scheduler()
             
             # Update session results
             await self._update_session_results(task)
@@ -451,6 +517,7 @@ class AIConductor:
             
             if task.id in performer.current_tasks:
                 performer.current_tasks.remove(task.id)
+                await self._notify_scheduler()
     
 
     
@@ -590,7 +657,7 @@ class AIConductor:
             return {
                 'status': 'active',
                 'active_sessions': len(self.active_sessions),
-                'queued_tasks': len(self.task_queue),
+                'queued_tasks': self.queued_task_count,
                 'performers': {
                     performer_id: {
                         'name': performer.name,
@@ -14,6 +14,8 @@ import openai
 import structlog
 
 from .message_handlers import BasePerformerMessageHandler
+from .response_cache import llm_response_cache
+from .llm_gateway import llm_gateway
 
 logger = structlog.get_logger(__name__)
 
@@ -35,6 +37,7 @@ class BaseAIPerformer(ABC):
         self.failed_tasks = 0
         self.total_processing_time = 0.0
         self.last_activity = None
+        self.cache_stats = {'hits': 0, 'coalesced': 0, 'misses': 0}
         
         # Capabilities and configuration
         self.capabilities = self._get_capabilities()
@@ -151,24 +154,20 @@ class BaseAIPerformer(ABC):
             # Generate user prompt
             user_prompt = await self._generate_user_prompt(input_data)
             
-            # Call OpenAI API
-            response = await self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
+            # Call OpenAI API, served from the shared response cache when possible
+            cache_key = llm_response_cache.make_key(
+                self.performer_id, self.model, self.system_prompt, user_prompt, self.temperature
             )
-            
-            # Get response text
-            response_text = response.choices[0].message.content
+            response_text, cache_source = await llm_response_cache.get_or_compute(
+                cache_key, lambda: self._request_completion(user_prompt)
+            )
+            self._record_cache_lookup(cache_source)
             
             # Process response
             result = await self._process_response(response_text, input_data)
             result['processing_method'] = 'openai'
             result['model_used'] = self.model
+            result['response_cache'] = cache_source
             
             return result
             
@@ -180,6 +179,30 @@ class BaseAIPerformer(ABC):
             # Try fallback
             return await self._process_with_fallback(input_data)
     
+    async def _request_completion(self, user_prompt: str) -> str:
+        """Send a chat completion request through the shared gateway and return the response text"""
+        response = await llm_gateway.chat_completion(
+            self.openai_client,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        
+        return response.choices[0].message.content
+    
+    def _record_cache_lookup(self, source: str):
+        """Count response cache outcomes for this performer"""
+        if source in ('memory', 'disk'):
+            self.cache_stats['hits'] += 1
+        elif source == 'coalesced':
+            self.cache_stats['coalesced'] += 1
+        else:
+            self.cache_stats['misses'] += 1
+    
     async def _process_with_fallback(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process task using fallback method when AI is unavailable"""
         try:
@@ -217,6 +240,12 @@ class BaseAIPerformer(ABC):
                 'average_processing_time': self.total_processing_time / self.total_tasks_processed if self.total_tasks_processed > 0 else 0.0,
                 'last_activity': self.last_activity.isoformat() if self.last_activity else None
             },
+            'response_cache': {
+                **self.cache_stats,
+                'hit_rate': self._cache_hit_rate(),
+                'shared': llm_response_cache.get_stats()
+            },
+            'llm_gateway': llm_gateway.get_stats(),
             'configuration': {
                 'model': self.model,
                 'temperature': self.temperature,
@@ -224,6 +253,12 @@ class BaseAIPerformer(ABC):
             }
         }
     
+    def _cache_hit_rate(self) -> float:
+        """Share of completions served without a new API call"""
+        served = self.cache_stats['hits'] + self.cache_stats['coalesced']
+        lookups = served + self.cache_stats['misses']
+        return served / lookups if lookups > 0 else 0.0
+    
     def _extract_json_from_text(self, text: str) -> Dict[str, Any]:
         """Extract JSON from text response"""
         try:
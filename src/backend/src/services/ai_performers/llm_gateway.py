@@ -0,0 +1,257 @@
+"""
+LLM Gateway for Intelligence OS
+Shared admission control, retries and latency tracking for AI performer completions
+"""
+
+import os
+import time
+import random
+import asyncio
+from bisect import bisect_left
+from typing import Dict, List, Optional, Any
+import openai
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate"""
+    
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.refill_rate = rate_per_minute / 60.0  # Tokens per second
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        """Add tokens accrued since the last update"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+    
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Wait until ``amount`` tokens are available and take them; returns seconds waited"""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                
+                delay = (amount - self.tokens) / self.refill_rate
+                await asyncio.sleep(delay)
+                waited += delay
+    
+    def adjust(self, amount: float):
+        """Debit (positive) or credit (negative) tokens after the fact"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed bucket boundaries in seconds"""
+    
+    BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+    
+    def observe(self, seconds: float):
+        """Record one call latency"""
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+    
+    def percentile(self, fraction: float) -> float:
+        """Upper bucket bound containing the given percentile"""
+        if self.total == 0:
+            return 0.0
+        
+        target = fraction * self.total
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else float('inf')
+        return float('inf')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Bucket counts and summary percentiles"""
+        labels = [f"le_{bound}" for bound in self.BUCKETS] + ['le_inf']
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.total,
+            'average': self.sum / self.total if self.total > 0 else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99)
+        }
+
+class LLMGateway:
+    """Single entry point for chat completions issued by AI performers
+    
+    Applies a global and per-model concurrency limit, request and token per-minute
+    budgets, one deadline shared by all attempts of a call (throttling, backoff and
+    retries included) and jittered retries on rate-limit and server errors, and
+    records latency histograms per model.
+    """
+    
+    RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+    
+    def __init__(self):
+        self.max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+        self.max_concurrency_per_model = int(os.getenv('LLM_MAX_CONCURRENCY_PER_MODEL', '4'))
+        self.requests_per_minute = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))
+        self.tokens_per_minute = int(os.getenv('LLM_TOKENS_PER_MINUTE', '150000'))
+        self.max_retries = int(os.getenv('LLM_MAX_RETRIES', '3'))
+        self.call_timeout = float(os.getenv('LLM_CALL_TIMEOUT_SECONDS', '60'))  # Deadline across all attempts
+        self.backoff_base = float(os.getenv('LLM_BACKOFF_BASE_SECONDS', '0.5'))
+        self.backoff_max = float(os.getenv('LLM_BACKOFF_MAX_SECONDS', '20'))
+        
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._request_bucket = TokenBucket(self.requests_per_minute)
+        self._token_bucket = TokenBucket(self.tokens_per_minute)
+        
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.stats = {
+            'requests': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'timeouts': 0,
+            'rate_limited': 0,
+            'in_flight': 0,
+            'throttle_wait_seconds': 0.0
+        }
+    
+    async def chat_completion(self, client: Any, model: str, messages: List[Dict[str, str]],
+                              temperature: float, max_tokens: int,
+                              timeout: Optional[float] = None) -> Any:
+        """Issue a chat completion under the gateway's limits, retrying transient failures
+        
+        ``timeout`` (``call_timeout`` by default) bounds the whole call: each attempt
+        gets what is left of it, and no retry is started once backing off would
+        run past it.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.call_timeout)
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        client = client.with_options(max_retries=0)  # Retries are handled here
+        self.stats['requests'] += 1
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                remaining = deadline - loop.time()
+                return await asyncio.wait_for(
+                    self._attempt(client, model, messages, temperature, max_tokens, remaining, estimated_tokens),
+                    timeout=remaining
+                )
+            
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and loop.time() >= deadline:
+                    self.stats['timeouts'] += 1
+                delay = self._backoff_delay(attempt, e) if self._is_retryable(e) else None
+                if attempt >= self.max_retries or delay is None or loop.time() + delay >= deadline:
+                    self.stats['failures'] += 1
+                    logger.error("LLM call failed", model=model, attempt=attempt + 1, error=str(e))
+                    raise
+                
+                self.stats['retries'] += 1
+                logger.warning("Retrying LLM call", model=model, attempt=attempt + 1,
+                               delay=round(delay, 3), error=str(e))
+                await asyncio.sleep(delay)
+    
+    async def _attempt(self, client: Any, model: str, messages: List[Dict[str, str]],
+                       temperature: float, max_tokens: int, timeout: float,
+                       estimated_tokens: int) -> Any:
+        """Run one admission-controlled completion attempt with ``timeout`` seconds left"""
+        self.stats['throttle_wait_seconds'] += await self._request_bucket.acquire(1)
+        self.stats['throttle_wait_seconds'] += await self._token_bucket.acquire(estimated_tokens)
+        
+        async with self._global_semaphore, self._model_semaphore(model):
+            self.stats['in_flight'] += 1
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout
+                )
+            except openai.APITimeoutError:
+                self.stats['timeouts'] += 1
+                raise
+            finally:
+                self.stats['in_flight'] -= 1
+                self.latency.setdefault(model, LatencyHistogram()).observe(time.perf_counter() - start)
+        
+        # Reconcile the token budget with actual usage when the provider reports it
+        usage = getattr(response, 'usage', None)
+        if usage is not None and getattr(usage, 'total_tokens', None):
+            self._token_bucket.adjust(usage.total_tokens - estimated_tokens)
+        
+        self.stats['successes'] += 1
+        return response
+    
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        """Concurrency limit for a single model, created on first use"""
+        if model not in self._model_semaphores:
+            self._model_semaphores[model] = asyncio.Semaphore(self.max_concurrency_per_model)
+        return self._model_semaphores[model]
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Rate limits, server errors, timeouts and connection failures are transient"""
+        if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code == 429:
+                self.stats['rate_limited'] += 1
+            return error.status_code in self.RETRYABLE_STATUS_CODES
+        
+        return False
+    
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when present"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        
+        return delay
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Rough prompt size (~4 characters per token) plus the completion budget"""
+        prompt_characters = sum(len(message.get('content') or '') for message in messages)
+        return prompt_characters // 4 + max_tokens
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Gateway counters, limits and per-model latency histograms"""
+        return {
+            **self.stats,
+            'limits': {
+                'max_concurrency': self.max_concurrency,
+                'max_concurrency_per_model': self.max_concurrency_per_model,
+                'requests_per_minute': self.requests_per_minute,
+                'tokens_per_minute': self.tokens_per_minute,
+                'max_retries': self.max_retries,
+                'call_timeout': self.call_timeout
+            },
+            'latency': {model: histogram.to_dict() for model, histogram in self.latency.items()}
+        }
+
+# Global LLM gateway shared by all performers
+llm_gateway = LLMGateway()
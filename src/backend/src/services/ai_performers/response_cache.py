@@ -0,0 +1,222 @@
+"""
+LLM Response Cache for Intelligence OS
+Content-addressed cache for AI performer completions with single-flight de-duplication
+"""
+
+import os
+import time
+import json
+import asyncio
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any, Tuple, Callable, Awaitable
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + on-disk) cache of LLM completions
+    
+    Entries are keyed on a hash of everything that determines the completion, so
+    re-analyzing the same transcript with the same prompt is served without a new
+    API call. Concurrent identical requests share a single in-flight call.
+    """
+    
+    def __init__(self):
+        self.enabled = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+        self.storage_path = os.getenv('LLM_CACHE_PATH', './llm_cache')
+        self.ttl_seconds = int(os.getenv('LLM_CACHE_TTL_SECONDS', '86400'))  # 24 hours
+        self.max_memory_entries = int(os.getenv('LLM_CACHE_MAX_MEMORY_ENTRIES', '1000'))
+        self.max_disk_entries = int(os.getenv('LLM_CACHE_MAX_DISK_ENTRIES', '10000'))
+        self.disk_prune_interval = 100  # Writes between disk size checks
+        
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._writes_since_prune = 0
+        
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'coalesced': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+    
+    @staticmethod
+    def make_key(performer_id: str, model: str, system_prompt: str,
+                 user_prompt: str, temperature: float) -> str:
+        """Content address for a completion request"""
+        payload = json.dumps([performer_id, model, system_prompt, user_prompt, temperature])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def get_or_compute(self, key: str,
+                             compute: Callable[[], Awaitable[str]]) -> Tuple[str, str]:
+        """Return (value, source) where source is memory, disk, coalesced or miss
+        
+        Waiters on a shared call are not cancelled with its leader: when the leading
+        request is cancelled they retry, and the first of them leads a new call.
+        """
+        if not self.enabled:
+            return await compute(), 'miss'
+        
+        while True:
+            value = self._get_memory(key)
+            if value is not None:
+                self.stats['memory_hits'] += 1
+                return value, 'memory'
+            
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # This waiter was cancelled, not the shared call
+                continue
+            self.stats['coalesced'] += 1
+            return value, 'coalesced'
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._read_disk(key)
+            if entry is not None:
+                # Promoted entries keep their original age, so the TTL still counts from the write
+                created_at, value = entry
+                self.stats['disk_hits'] += 1
+                source = 'disk'
+            else:
+                self.stats['misses'] += 1
+                source = 'miss'
+                value = await compute()
+                created_at = time.time()
+                await self._write_disk(key, value, created_at)
+            
+            self._put_memory(key, value, created_at)
+            future.set_result(value)
+            return value, source
+        
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache counters and hit rate"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['coalesced']
+        lookups = hits + self.stats['misses']
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'memory_entries': len(self._memory),
+            'inflight': len(self._inflight),
+            'hit_rate': hits / lookups if lookups > 0 else 0.0
+        }
+    
+    def clear(self):
+        """Drop all in-memory entries"""
+        self._memory.clear()
+    
+    def _get_memory(self, key: str) -> Optional[str]:
+        """Fresh in-memory entry, refreshed as most recently used"""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        
+        created_at, value = entry
+        if time.time() - created_at > self.ttl_seconds:
+            del self._memory[key]
+            self.stats['expired'] += 1
+            return None
+        
+        self._memory.move_to_end(key)
+        return value
+    
+    def _put_memory(self, key: str, value: str, created_at: float):
+        """Insert an entry and evict least recently used beyond the limit"""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    def _disk_path(self, key: str) -> Path:
+        """Sharded on-disk location of an entry"""
+        return Path(self.storage_path) / key[:2] / f"{key}.json"
+    
+    async def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        """Read an entry from disk without blocking the event loop"""
+        try:
+            return await asyncio.to_thread(self._read_disk_sync, key)
+        except Exception as e:
+            logger.warning("LLM cache disk read failed", key=key, error=str(e))
+            return None
+    
+    def _read_disk_sync(self, key: str) -> Optional[Tuple[float, str]]:
+        """Creation time and value of an unexpired entry on disk"""
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        
+        with open(path, 'r') as f:
+            entry = json.load(f)
+        
+        if time.time() - entry['created_at'] > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            self.stats['expired'] += 1
+            return None
+        
+        return entry['created_at'], entry['value']
+    
+    async def _write_disk(self, key: str, value: str, created_at: float):
+        """Persist an entry without blocking the event loop"""
+        try:
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= self.disk_prune_interval
+            if prune:
+                self._writes_since_prune = 0
+            await asyncio.to_thread(self._write_disk_sync, key, value, created_at, prune)
+        except Exception as e:
+            logger.warning("LLM cache disk write failed", key=key, error=str(e))
+    
+    def _write_disk_sync(self, key: str, value: str, created_at: float, prune: bool):
+        """Atomically write an entry, pruning the disk tier periodically"""
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'created_at': created_at, 'value': value}, f)
+        os.replace(tmp_path, path)
+        
+        if prune:
+            self._prune_disk_sync()
+    
+    def _prune_disk_sync(self):
+        """Remove expired entries, then the oldest beyond the size limit"""
+        now = time.time()
+        entries = []
+        for path in Path(self.storage_path).glob('*/*.json'):
+            mtime = path.stat().st_mtime
+            if now - mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                self.stats['expired'] += 1
+            else:
+                entries.append((mtime, path))
+        
+        if len(entries) > self.max_disk_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_disk_entries]:
+                path.unlink(missing_ok=True)
+                self.stats['evictions'] += 1
+
+# Global LLM response cache shared by all performers
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,133 @@
+"""
+Detector Graph Runner for Intelligence OS
+Runs independent analysis detectors concurrently on a thread pool with timings and deadlines
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Set, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DetectorFunc = Callable[[], Awaitable[Any]]
+
+@dataclass
+class DetectorRun:
+    """Outcome of one detector graph execution"""
+    results: Dict[str, Any]
+    timings_ms: Dict[str, float]
+    failed: List[str] = field(default_factory=list)
+    pending: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+    
+    @property
+    def partial(self) -> bool:
+        return bool(self.pending)
+
+class DetectorGraphRunner:
+    """Execute a dependency graph of async detectors on worker threads
+    
+    Each detector is a zero-argument coroutine function. It runs on the pool inside
+    its own event loop, so detectors that spend their time in NumPy or scikit-learn
+    overlap while the GIL is released. A detector starts once everything it depends
+    on has finished, successfully or not. With a deadline, the run returns whatever
+    finished within the budget and lists the rest as pending; those keep running in
+    the background. The next run, and callers of ``wait_idle`` about to mutate state
+    the detectors read, wait for every such straggler first.
+    """
+    
+    def __init__(self, max_workers: int = 4, thread_name_prefix: str = "detector"):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._inflight: Set[Future] = set()  # Submitted detectors not yet finished
+    
+    @staticmethod
+    def _execute(func: DetectorFunc) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        result = asyncio.run(func())
+        return result, (time.perf_counter() - start) * 1000
+    
+    async def _run_detector(self, func: DetectorFunc) -> Tuple[Any, float]:
+        future = self.executor.submit(self._execute, func)
+        self._inflight.add(future)
+        return await asyncio.wrap_future(future)
+    
+    async def wait_idle(self):
+        """Wait for detectors still running from earlier deadline-cut runs"""
+        pending = [future for future in self._inflight if not future.done()]
+        if pending:
+            await asyncio.wait([asyncio.wrap_future(future) for future in pending])
+        self._inflight.clear()
+    
+    @staticmethod
+    def _check_graph(detectors: Dict[str, Tuple[DetectorFunc, List[str]]]):
+        unknown = {dep for _, deps in detectors.values() for dep in deps} - set(detectors)
+        if unknown:
+            raise ValueError(f"Unknown detector dependencies: {sorted(unknown)}")
+        
+        waiting = {name: set(deps) for name, (_, deps) in detectors.items()}
+        while waiting:
+            ready = [name for name, deps in waiting.items() if not deps]
+            if not ready:
+                raise ValueError(f"Detector dependency cycle: {sorted(waiting)}")
+            for name in ready:
+                del waiting[name]
+            for deps in waiting.values():
+                deps.difference_update(ready)
+    
+    async def run(self, detectors: Dict[str, Tuple[DetectorFunc, List[str]]],
+                  deadline_seconds: Optional[float] = None) -> DetectorRun:
+        """Run ``{name: (func, depends_on)}`` and collect results within an optional deadline"""
+        self._check_graph(detectors)
+        await self.wait_idle()
+        
+        start = time.perf_counter()
+        deadline = start + deadline_seconds if deadline_seconds else None
+        run = DetectorRun(results={}, timings_ms={})
+        
+        waiting = {name: set(deps) for name, (_, deps) in detectors.items()}
+        running: Dict[asyncio.Task, str] = {}
+        
+        def launch_ready():
+            for name in [name for name, deps in waiting.items() if not deps]:
+                del waiting[name]
+                task = asyncio.ensure_future(self._run_detector(detectors[name][0]))
+                running[task] = name
+        
+        launch_ready()
+        while running:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+            
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            
+            for task in done:
+                name = running.pop(task)
+                try:
+                    run.results[name], run.timings_ms[name] = task.result()
+                except Exception as e:
+                    logger.error("Detector failed", detector=name, error=str(e))
+                    run.failed.append(name)
+                
+                for deps in waiting.values():
+                    deps.discard(name)
+            launch_ready()
+        
+        for task in running:
+            task.cancel()  # Detectors still queued are dropped; running ones finish in the background
+        run.pending = sorted(set(running.values()) | set(waiting))
+        run.elapsed_ms = (time.perf_counter() - start) * 1000
+        if run.pending:
+            logger.warning("Detector deadline reached", pending=run.pending, elapsed_ms=run.elapsed_ms)
+        return run
+    
+    def shutdown(self):
+        """Stop the worker threads once running detectors finish"""
+        self.executor.shutdown(wait=True)
@@ -16,6 +16,7 @@ import re
 import structlog
 from collections import defaultdict
 import numpy as np
+from scipy import sparse
 
 logger = structlog.get_logger(__name__)
 
@@ -101,6 +102,59 @@ class TransformationRoadmap:
     success_metrics: List[Dict[str, Any]]
     timeline: Dict[str, Any]
 
+class TechnologyTermMatrix:
+    """Sparse meeting x term presence matrix over every technology keyword and use case
+    
+    Each distinct term is tested once per meeting with the same substring semantics
+    as ``term in content.lower()``; technology relevance then comes from sparse
+    products against per-technology keyword and use case count vectors.
+    """
+    
+    def __init__(self, technologies: Dict[str, ExponentialTechnology]):
+        self.technologies = list(technologies.values())
+        
+        terms = set()
+        for tech in self.technologies:
+            terms.update(keyword.lower() for keyword in tech.keywords)
+            terms.update(use_case.lower() for use_case in tech.use_cases)
+        self.terms = sorted(terms)
+        self.term_index = {term: index for index, term in enumerate(self.terms)}
+        
+        # Per-technology term count vectors, one column per technology
+        self.keyword_counts = self._count_matrix([tech.keywords for tech in self.technologies])
+        self.use_case_counts = self._count_matrix([tech.use_cases for tech in self.technologies])
+        self.keyword_totals = np.array([max(len(tech.keywords), 1) for tech in self.technologies], dtype=float)
+        
+        # Stable order matching ``sort(key=disruption_potential, reverse=True)``
+        self.disruption_order = sorted(range(len(self.technologies)),
+                                       key=lambda i: self.technologies[i].disruption_potential,
+                                       reverse=True)
+    
+    def _count_matrix(self, term_lists: List[List[str]]) -> sparse.csr_matrix:
+        """Term x technology matrix counting how often each term is listed"""
+        counts = sparse.lil_matrix((len(self.terms), len(term_lists)))
+        for col, term_list in enumerate(term_lists):
+            for term in term_list:
+                counts[self.term_index[term.lower()], col] += 1
+        return counts.tocsr()
+    
+    def vectorize(self, lowered_contents: List[str]) -> sparse.csr_matrix:
+        """Binary presence matrix for already-lowercased meeting contents"""
+        indptr = [0]
+        indices = []
+        for content in lowered_contents:
+            indices.extend(col for col, term in enumerate(self.terms) if term in content)
+            indptr.append(len(indices))
+        
+        return sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+                                 shape=(len(lowered_contents), len(self.terms)))
+    
+    def technology_relevance(self, presence: sparse.csr_matrix) -> np.ndarray:
+        """Meeting x technology relevance scores from keyword and use case matches"""
+        keyword_matches = (presence @ self.keyword_counts).toarray()
+        use_case_matches = (presence @ self.use_case_counts).toarray()
+        return (keyword_matches * 0.6 + use_case_matches * 0.4) / self.keyword_totals
+
 class ExponentialOpportunityAnalyzer:
     """System for identifying exponential opportunities and transformation paths"""
     
@@ -111,8 +165,24 @@ class ExponentialOpportunityAnalyzer:
         self.identified_opportunities = {}
         self.generated_roadmaps = {}
         
+        # Precompiled matchers shared by single and batch analysis
+        self.term_matrix = TechnologyTermMatrix(self.exponential_technologies)
+        self.pattern_matchers = [
+            re.compile(pattern['example_pattern'], re.IGNORECASE)
+            for pattern in self.opportunity_patterns.values()
+        ]
+        # pattern_alignment[t, p] = 1 when technology t is related to pattern p
+        self.pattern_alignment = sparse.csr_matrix(np.array([
+            [tech.id in pattern['related_technologies'] for pattern in self.opportunity_patterns.values()]
+            for tech in self.term_matrix.technologies
+        ], dtype=float))
+        
         # Analysis configuration
         self.impact_threshold = 0.7  # Minimum impact score for high-potential opportunities
+        self.relevance_threshold = 0.2  # Minimum technology relevance score
+        self.max_technologies = 10
+        self.max_patterns = 8
+        self.batch_top_k = int(os.getenv('EXPONENTIAL_BATCH_TOP_K', '10'))
         self.readiness_weights = {
             'technology_familiarity': 0.3,
             'capability_alignment': 0.25,
@@ -257,13 +327,16 @@ class ExponentialOpportunityAnalyzer:
             ]
         }
         
-        return templates    
-   
- async def analyze_exponential_opportunities(self, content: str, 
+        return templates
+    
+    async def analyze_exponential_opportunities(self, content: str, 
                                              organization_context: Dict[str, Any] = None,
                                              focus_domains: List[ExponentialDomain] = None) -> Dict[str, Any]:
         """Analyze content for exponential opportunities"""
         try:
+            if not isinstance(content, str):
+                raise ValueError("Content must be a string")
+            
             if focus_domains is None:
                 focus_domains = list(ExponentialDomain)
             
@@ -273,55 +346,156 @@ class ExponentialOpportunityAnalyzer:
             # Identify opportunity patterns
             opportunity_patterns = await self._identify_opportunity_patterns(content, relevant_technologies)
             
-            # Generate opportunity assessments
-            opportunity_assessments = await self._generate_opportunity_assessments(
-                content, relevant_technologies, opportunity_patterns, organization_context
+            return await self._complete_analysis(
+                content, relevant_technologies, opportunity_patterns, organization_context, focus_domains
             )
             
-            # Assess organizational readiness
-            readiness_assessment = await self._assess_organizational_readiness(
-                opportunity_assessments, organization_context
-            )
+        except Exception as e:
+            logger.error("Exponential opportunity analysis failed", error=str(e))
+            return {
+                'analysis_id': str(uuid.uuid4()),
+                'exponential_potential': 0.5,
+                'relevant_technologies': [],
+                'opportunity_assessments': [],
+                'readiness_assessment': {},
+                'transformation_roadmap': {},
+                'error': str(e),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+    
+    async def analyze_meetings_batch(self, meetings: List[Dict[str, Any]],
+                                     organization_context: Dict[str, Any] = None,
+                                     focus_domains: List[ExponentialDomain] = None,
+                                     top_k: int = None) -> Dict[str, Any]:
+        """Screen many meetings from one term matrix and fully analyze only the top candidates"""
+        try:
+            if focus_domains is None:
+                focus_domains = list(ExponentialDomain)
+            top_k = self.batch_top_k if top_k is None else top_k
             
-            # Generate transformation roadmap
-            transformation_roadmap = await self._generate_transformation_roadmap(
-                opportunity_assessments, readiness_assessment, organization_context
-            )
+            meeting_ids = [meeting.get('meeting_id', meeting.get('id', index))
+                           for index, meeting in enumerate(meetings)]
+            contents = [meeting.get('content') or meeting.get('transcript') or '' for meeting in meetings]
             
-            # Calculate exponential potential score
-            exponential_potential = self._calculate_exponential_potential(
-                opportunity_assessments, readiness_assessment
-            )
+            technologies, patterns = self._screen_meetings(contents, focus_domains)
+            
+            screening = []
+            for meeting_id, meeting_techs, meeting_patterns in zip(meeting_ids, technologies, patterns):
+                screening.append({
+                    'meeting_id': meeting_id,
+                    'screening_score': sum(
+                        p['confidence'] * p['pattern']['transformation_potential'] for p in meeting_patterns
+                    ),
+                    'relevant_technologies': [tech.id for tech in meeting_techs],
+                    'opportunity_patterns': [p['pattern_id'] for p in meeting_patterns]
+                })
+            
+            # Readiness and roadmap generation only run for the strongest meetings
+            ranked = sorted((index for index, entry in enumerate(screening) if entry['screening_score'] > 0),
+                            key=lambda index: screening[index]['screening_score'], reverse=True)
+            top_opportunities = []
+            for index in ranked[:top_k]:
+                analysis = await self._complete_analysis(
+                    contents[index], technologies[index], patterns[index], organization_context, focus_domains
+                )
+                top_opportunities.append({'meeting_id': meeting_ids[index], **analysis})
             
-            # Store results for future reference
-            analysis_id = str(uuid.uuid4())
-            self.identified_opportunities[analysis_id] = opportunity_assessments
-            self.generated_roadmaps[analysis_id] = transformation_roadmap
+            technology_frequency = defaultdict(int)
+            for meeting_techs in technologies:
+                for tech in meeting_techs:
+                    technology_frequency[tech.id] += 1
             
             return {
-                'analysis_id': analysis_id,
-                'exponential_potential': exponential_potential,
-                'relevant_technologies': self._serialize_technologies(relevant_technologies),
-                'opportunity_assessments': self._serialize_opportunities(opportunity_assessments),
-                'readiness_assessment': readiness_assessment,
-                'transformation_roadmap': self._serialize_roadmap(transformation_roadmap),
+                'batch_id': str(uuid.uuid4()),
+                'meetings_analyzed': len(meetings),
+                'candidates_analyzed': len(top_opportunities),
+                'screening': screening,
+                'top_opportunities': top_opportunities,
+                'technology_frequency': dict(technology_frequency),
                 'timestamp': datetime.utcnow().isoformat(),
                 'domains_analyzed': [domain.value for domain in focus_domains]
             }
             
         except Exception as e:
-            logger.error("Exponential opportunity analysis failed", error=str(e))
+            logger.error("Batch exponential opportunity analysis failed", error=str(e))
             return {
-                'analysis_id': str(uuid.uuid4()),
-                'exponential_potential': 0.5,
-                'relevant_technologies': [],
-                'opportunity_assessments': [],
-                'readiness_assessment': {},
-                'transformation_roadmap': {},
+                'batch_id': str(uuid.uuid4()),
+                'meetings_analyzed': 0,
+                'candidates_analyzed': 0,
+                'screening': [],
+                'top_opportunities': [],
+                'technology_frequency': {},
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
     
+    def _screen_meetings(self, contents: List[str], focus_domains: List[ExponentialDomain]
+                         ) -> Tuple[List[List[ExponentialTechnology]], List[List[Dict[str, Any]]]]:
+        """Relevant technologies and opportunity patterns for every meeting from sparse products"""
+        lowered = [content.lower() for content in contents]
+        relevance = self.term_matrix.technology_relevance(self.term_matrix.vectorize(lowered))
+        
+        domain_mask = np.array([tech.domain in focus_domains for tech in self.term_matrix.technologies])
+        relevant = (relevance > self.relevance_threshold) & domain_mask
+        
+        # Keep the most disruptive relevant technologies of each meeting
+        order = self.term_matrix.disruption_order
+        ordered = relevant[:, order]
+        selected = np.zeros_like(relevant)
+        selected[:, order] = ordered & (np.cumsum(ordered, axis=1) <= self.max_technologies)
+        
+        aligned = (sparse.csr_matrix(selected, dtype=float) @ self.pattern_alignment).toarray() > 0
+        
+        technologies = []
+        patterns = []
+        for row, content_lower in enumerate(lowered):
+            technologies.append([self.term_matrix.technologies[col] for col in order if selected[row, col]])
+            patterns.append(self._rank_patterns(content_lower, aligned[row]))
+        
+        return technologies, patterns
+    
+    async def _complete_analysis(self, content: str,
+                                 relevant_technologies: List[ExponentialTechnology],
+                                 opportunity_patterns: List[Dict[str, Any]],
+                                 organization_context: Dict[str, Any],
+                                 focus_domains: List[ExponentialDomain]) -> Dict[str, Any]:
+        """Assess opportunities, readiness and roadmap for one meeting's matches"""
+        # Generate opportunity assessments
+        opportunity_assessments = await self._generate_opportunity_assessments(
+            content, relevant_technologies, opportunity_patterns, organization_context
+        )
+        
+        # Assess organizational readiness
+        readiness_assessment = await self._assess_organizational_readiness(
+            opportunity_assessments, organization_context
+        )
+        
+        # Generate transformation roadmap
+        transformation_roadmap = await self._generate_transformation_roadmap(
+            opportunity_assessments, readiness_assessment, organization_context
+        )
+        
+        # Calculate exponential potential score
+        exponential_potential = self._calculate_exponential_potential(
+            opportunity_assessments, readiness_assessment
+        )
+        
+        # Store results for future reference
+        analysis_id = str(uuid.uuid4())
+        self.identified_opportunities[analysis_id] = opportunity_assessments
+        self.generated_roadmaps[analysis_id] = transformation_roadmap
+        
+        return {
+            'analysis_id': analysis_id,
+            'exponential_potential': exponential_potential,
+            'relevant_technologies': self._serialize_technologies(relevant_technologies),
+            'opportunity_assessments': self._serialize_opportunities(opportunity_assessments),
+            'readiness_assessment': readiness_assessment,
+            'transformation_roadmap': self._serialize_roadmap(transformation_roadmap),
+            'timestamp': datetime.utcnow().isoformat(),
+            'domains_analyzed': [domain.value for domain in focus_domains]
+        }
+    
     async def _identify_relevant_technologies(self, content: str, 
                                            focus_domains: List[ExponentialDomain]) -> List[ExponentialTechnology]:
         """Identify relevant exponential technologies in content"""
@@ -344,13 +518,13 @@ class ExponentialOpportunityAnalyzer:
                 # Calculate relevance score
                 relevance_score = (keyword_matches * 0.6 + use_case_matches * 0.4) / max(len(tech.keywords), 1)
                 
-                if relevance_score > 0.2:  # Threshold for relevance
+                if relevance_score > self.relevance_threshold:
                     relevant_techs.append(tech)
             
             # Sort by disruption potential and relevance
             relevant_techs.sort(key=lambda t: t.disruption_potential, reverse=True)
             
-            return relevant_techs[:10]  # Return top 10 most relevant technologies
+            return relevant_techs[:self.max_technologies]
             
         except Exception as e:
             logger.error("Technology identification failed", error=str(e))
@@ -360,42 +534,47 @@ class ExponentialOpportunityAnalyzer:
                                            relevant_technologies: List[ExponentialTechnology]) -> List[Dict[str, Any]]:
         """Identify opportunity patterns in content"""
         try:
-            content_lower = content.lower()
-            identified_patterns = []
-            
-            for pattern_id, pattern in self.opportunity_patterns.items():
-                # Check for pattern keywords
-                pattern_match = re.search(pattern['example_pattern'], content_lower, re.IGNORECASE)
-                
-                # Check for related technology alignment
-                tech_alignment = any(tech.id in pattern['related_technologies'] 
-                                   for tech in relevant_technologies)
-                
-                if pattern_match or tech_alignment:
-                    confidence = 0.7 if pattern_match else 0.5
-                    if tech_alignment:
-                        confidence += 0.2
-                    
-                    identified_patterns.append({
-                        'pattern_id': pattern_id,
-                        'pattern': pattern,
-                        'confidence': min(confidence, 1.0),
-                        'match_evidence': pattern_match.group() if pattern_match else None,
-                        'tech_alignment': tech_alignment
-                    })
-            
-            # Sort by confidence and transformation potential
-            identified_patterns.sort(
-                key=lambda p: p['confidence'] * p['pattern']['transformation_potential'], 
-                reverse=True
-            )
-            
-            return identified_patterns[:8]  # Return top 8 patterns
+            relevant_ids = {tech.id for tech in relevant_technologies}
+            tech_alignment = [
+                any(tech_id in relevant_ids for tech_id in pattern['related_technologies'])
+                for pattern in self.opportunity_patterns.values()
+            ]
+            return self._rank_patterns(content.lower(), tech_alignment)
             
         except Exception as e:
             logger.error("Pattern identification failed", error=str(e))
             return []
     
+    def _rank_patterns(self, content_lower: str, tech_alignment: List[bool]) -> List[Dict[str, Any]]:
+        """Match opportunity patterns and rank them by confidence and transformation potential"""
+        identified_patterns = []
+        
+        for (pattern_id, pattern), matcher, aligned in zip(self.opportunity_patterns.items(),
+                                                           self.pattern_matchers, tech_alignment):
+            # Check for pattern keywords
+            pattern_match = matcher.search(content_lower)
+            
+            if pattern_match or aligned:
+                confidence = 0.7 if pattern_match else 0.5
+                if aligned:
+                    confidence += 0.2
+                
+                identified_patterns.append({
+                    'pattern_id': pattern_id,
+                    'pattern': pattern,
+                    'confidence': min(confidence, 1.0),
+                    'match_evidence': pattern_match.group() if pattern_match else None,
+                    'tech_alignment': bool(aligned)
+                })
+        
+        # Sort by confidence and transformation potential
+        identified_patterns.sort(
+            key=lambda p: p['confidence'] * p['pattern']['transformation_potential'], 
+            reverse=True
+        )
+        
+        return identified_patterns[:self.max_patterns]
+    
     async def _generate_opportunity_assessments(self, content: str,
                                               relevant_technologies: List[ExponentialTechnology],
                                               opportunity_patterns: List[Dict[str, Any]],
@@ -944,11 +1123,8 @@ class ExponentialOpportunityAnalyzer:
             'success_metrics': roadmap.success_metrics,
             'timeline': roadmap.timeline
         }
-
-# Global exponential opportunity analyzer instance
-exponential_opportunity_analyzer = ExponentialOpportunityAnalyzer()    
     
-def _generate_roadmap_phases(self, template: Dict[str, Any], 
+    def _generate_roadmap_phases(self, template: Dict[str, Any], 
                                 opportunities: List[OpportunityAssessment],
                                 readiness_assessment: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate customized roadmap phases"""
@@ -1214,4 +1390,7 @@ def _generate_roadmap_phases(self, template: Dict[str, Any],
                 f'Month {i * 6 + 3}: {phase["name"]} mid-point review'
                 for i, phase in enumerate(phases)
             ]
-        }
\ No newline at end of file
+        }
+
+# Global exponential opportunity analyzer instance
+exponential_opportunity_analyzer = ExponentialOpportunityAnalyzer()
@@ -0,0 +1,170 @@
+"""
+Knowledge Graph Co-occurrence for Intelligence OS
+Sparse concept-by-segment incidence per meeting and a running concept co-occurrence matrix
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Any, Iterable, Tuple
+import numpy as np
+from scipy import sparse
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+def segment_incidence(names: List[str], texts: List[str]) -> sparse.csr_matrix:
+    """Binary concepts x segments matrix marking which segments mention each concept name
+    
+    Names match as whole words, so "ai" does not match inside "said". Texts are
+    lowercased and joined with NUL separators once; each name is located with one
+    compiled pattern, jumping to the next segment after a hit, so the cost follows
+    the meeting text length rather than concepts x segments.
+    """
+    texts = [text.lower() for text in texts]
+    starts = []
+    position = 0
+    for text in texts:
+        starts.append(position)
+        position += len(text) + 1
+    
+    joined = '\x00'.join(texts)
+    rows, columns = [], []
+    for row, name in enumerate(names):
+        name = name.lower().strip()
+        if not name:
+            continue
+        pattern = re.compile(r'(?<!\w)' + re.escape(name) + r'(?!\w)')
+        match = pattern.search(joined)
+        while match:
+            index = bisect_right(starts, match.start()) - 1
+            rows.append(row)
+            columns.append(index)
+            if index + 1 == len(texts):
+                break
+            match = pattern.search(joined, starts[index + 1])
+    
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (rows, columns)),
+        shape=(len(names), len(texts))
+    )
+
+class CooccurrenceMatrix:
+    """Running symmetric count of segments in which two concepts appear together
+    
+    Each meeting contributes ``B @ B.T`` for its binary concept-by-segment incidence
+    ``B``, added into the global counts, so the diagonal holds how many segments
+    mention a concept and off-diagonal entries how many mention both. Relationship
+    strength is the cosine (Ochiai) coefficient ``C[i, j] / sqrt(C[i, i] * C[j, j])``
+    of those counts. Concepts get stable row indices in first-seen order.
+    
+    Counts accumulate in one dict per row, so a meeting costs only its own nonzero
+    entries; the CSR ``matrix`` is built on demand for snapshots and bulk reads.
+    """
+    
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._counts: List[Dict[int, int]] = []
+        self._csr = None
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """CSR form of the counts, cached until the next update"""
+        if self._csr is None:
+            size = len(self.ids)
+            indptr = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum([len(row) for row in self._counts], out=indptr[1:])
+            indices, data = [], []
+            for row in self._counts:
+                columns = sorted(row)
+                indices.extend(columns)
+                data.extend(row[column] for column in columns)
+            self._csr = sparse.csr_matrix(
+                (np.array(data, dtype=np.int64), np.array(indices, dtype=np.int64), indptr),
+                shape=(size, size)
+            )
+        return self._csr
+    
+    def _rows(self, concept_ids: Iterable[str]) -> np.ndarray:
+        rows = []
+        for concept_id in concept_ids:
+            if concept_id not in self.index:
+                self.index[concept_id] = len(self.ids)
+                self.ids.append(concept_id)
+                self._counts.append({})
+            rows.append(self.index[concept_id])
+        return np.array(rows, dtype=np.int64)
+    
+    def add(self, concept_ids: List[str], incidence: sparse.csr_matrix) -> sparse.coo_matrix:
+        """Fold one meeting's incidence into the running counts and return its local counts"""
+        rows = self._rows(concept_ids)
+        local = (incidence @ incidence.T).tocoo()
+        self._add_counts(rows[local.row], rows[local.col], local.data)
+        return local
+    
+    def _add_counts(self, rows: np.ndarray, columns: np.ndarray, counts: np.ndarray):
+        for row, column, count in zip(rows.tolist(), columns.tolist(), counts.tolist()):
+            entries = self._counts[row]
+            entries[column] = entries.get(column, 0) + count
+        self._csr = None
+    
+    def increments(self, concept_ids: List[str], local: sparse.coo_matrix) -> List[List[Any]]:
+        """Upper-triangle ``[id_a, id_b, count]`` entries of a meeting's counts, for the WAL"""
+        upper = local.row <= local.col
+        return [
+            [concept_ids[row], concept_ids[column], int(count)]
+            for row, column, count in zip(local.row[upper].tolist(), local.col[upper].tolist(),
+                                          local.data[upper].tolist())
+        ]
+    
+    def apply_increments(self, increments: List[List[Any]]):
+        """Replay ``increments`` output, mirroring off-diagonal entries"""
+        if not increments:
+            return
+        firsts, seconds, counts = zip(*increments)
+        rows = self._rows(firsts)
+        columns = self._rows(seconds)
+        counts = np.array(counts, dtype=np.int64)
+        off_diagonal = rows != columns
+        self._add_counts(np.concatenate([rows, columns[off_diagonal]]),
+                         np.concatenate([columns, rows[off_diagonal]]),
+                         np.concatenate([counts, counts[off_diagonal]]))
+    
+    def strengths(self, pairs: List[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Cosine strength and co-occurrence count of each concept pair"""
+        if not pairs:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        rows = [self.index[a] for a, _ in pairs]
+        columns = [self.index[b] for _, b in pairs]
+        counts = np.array([self._counts[i].get(j, 0) for i, j in zip(rows, columns)], dtype=np.int64)
+        norms = np.sqrt(np.array([
+            float(self._counts[i].get(i, 0)) * self._counts[j].get(j, 0) for i, j in zip(rows, columns)
+        ]))
+        strengths = np.divide(counts, norms, out=np.zeros(len(pairs)), where=norms > 0)
+        return strengths, counts
+    
+    def to_table(self, node_index: Any) -> Dict[str, np.ndarray]:
+        """Snapshot columns: node index of each row plus the CSR arrays"""
+        matrix = self.matrix
+        return {
+            'node': np.array([node_index(concept_id) for concept_id in self.ids], dtype=np.int32),
+            'indptr': matrix.indptr.astype(np.int64),
+            'indices': matrix.indices.astype(np.int32),
+            'count': matrix.data.astype(np.int64)
+        }
+    
+    @classmethod
+    def from_table(cls, columns: Dict[str, Any], node_ids: List[str]) -> 'CooccurrenceMatrix':
+        cooccurrence = cls()
+        cooccurrence.ids = [node_ids[node] for node in columns['node'].tolist()]
+        cooccurrence.index = {concept_id: i for i, concept_id in enumerate(cooccurrence.ids)}
+        indptr = np.asarray(columns['indptr']).tolist()
+        indices = np.asarray(columns['indices']).tolist()
+        counts = np.asarray(columns['count']).tolist()
+        cooccurrence._counts = [
+            dict(zip(indices[start:end], counts[start:end])) for start, end in zip(indptr, indptr[1:])
+        ]
+        return cooccurrence
@@ -0,0 +1,344 @@
+"""
+Knowledge Graph Index for Intelligence OS
+Compressed sparse row adjacency with compact concept records for read-heavy graph queries
+"""
+
+import functools
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+NO_TYPE = 255  # Type code for nodes without a concept and edges without a relationship
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class ConceptRecord:
+    """Read-side concept fields without the per-concept sets and dicts"""
+    __slots__ = ('id', 'name', 'concept_type', 'importance_score', 'mention_count', 'last_mentioned')
+    
+    def __init__(self, id: str, name: str, concept_type: str, importance_score: float,
+                 mention_count: int, last_mentioned: datetime):
+        self.id = id
+        self.name = name
+        self.concept_type = concept_type
+        self.importance_score = importance_score
+        self.mention_count = mention_count
+        self.last_mentioned = last_mentioned
+    
+    @classmethod
+    def from_concept(cls, concept: Any) -> 'ConceptRecord':
+        return cls(concept.id, concept.name, concept.concept_type.value, concept.importance_score,
+                   concept.mention_count, concept.last_mentioned)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'type': self.concept_type,
+            'importance_score': self.importance_score,
+            'mention_count': self.mention_count,
+            'last_mentioned': self.last_mentioned.isoformat()
+        }
+
+class CSRGraphIndex:
+    """Integer-indexed CSR copy of a ``VersionedDiGraph`` for neighbor and traversal queries
+    
+    Nodes get stable integer ids in insertion order; removed nodes keep their slot
+    with an empty row. Out-edges live in ``offsets``/``targets``/``weights``/
+    ``edge_types`` arrays, and the reverse (in-edge) CSR is derived on demand.
+    ``refresh`` asks the graph which nodes changed since the indexed version and
+    rewrites only those rows, copying the rest with one vectorized scatter, and
+    falls back to a full rebuild when the graph's change log no longer reaches back.
+    Records are refreshed with their rows, so they hold stored (undecayed) scores;
+    importance ranking is served by ``KnowledgeGraphQueryIndex``.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph = None
+        self.version = -1
+        self.node_ids: List[Any] = []
+        self.node_index: Dict[Any, int] = {}
+        self.records: List[Optional[ConceptRecord]] = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.targets = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.edge_types = np.empty(0, dtype=np.uint8)
+        self.type_codes: Dict[str, int] = {}  # relationship type value -> code
+        self.type_names: List[str] = []
+        self._views: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    
+    def _type_code(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_TYPE
+        code = self.type_codes.get(value)
+        if code is None:
+            code = len(self.type_names)
+            if code >= NO_TYPE:
+                raise ValueError("Too many distinct types for the graph index")
+            self.type_codes[value] = code
+            self.type_names.append(value)
+        return code
+    
+    def _codes(self, values: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        return np.array([self.type_codes[value] for value in values if value in self.type_codes], dtype=np.uint8)
+    
+    def _add_node(self, node: Any) -> int:
+        index = len(self.node_ids)
+        self.node_ids.append(node)
+        self.node_index[node] = index
+        self.records.append(None)
+        return index
+    
+    def _set_record(self, index: int, concept: Any):
+        self.records[index] = ConceptRecord.from_concept(concept) if concept is not None else None
+    
+    def _row(self, graph: Any, node: Any) -> Tuple[List[int], List[float], List[int]]:
+        targets, weights, types = [], [], []
+        if node in graph:
+            for neighbor, attributes in graph.adj[node].items():
+                targets.append(self.node_index[neighbor])
+                weights.append(attributes.get('weight', 1.0))
+                types.append(self._type_code(attributes.get('relationship_type')))
+        return targets, weights, types
+    
+    @_locked
+    def refresh(self, graph: Any, concepts: Dict[str, Any]):
+        """Bring the index up to ``graph.version``, pulling node records from ``concepts``"""
+        if graph is self._graph and graph.version == self.version:
+            return
+        changed = graph.changed_since(self.version) if graph is self._graph else None
+        if changed is None:
+            self._rebuild(graph, concepts)
+        else:
+            self._apply_changes(graph, concepts, changed)
+        self._graph = graph
+        self.version = graph.version
+        self._views = {}
+    
+    def _rebuild(self, graph: Any, concepts: Dict[str, Any]):
+        self.node_ids, self.node_index, self.records = [], {}, []
+        for node in graph.nodes:
+            self._add_node(node)
+        count = len(self.node_ids)
+        for index, node in enumerate(self.node_ids):
+            self._set_record(index, concepts.get(node))
+        
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        targets, weights, types = [], [], []
+        for index, node in enumerate(self.node_ids):
+            row_targets, row_weights, row_types = self._row(graph, node)
+            targets.extend(row_targets)
+            weights.extend(row_weights)
+            types.extend(row_types)
+            offsets[index + 1] = len(targets)
+        self.offsets = offsets
+        self.targets = np.array(targets, dtype=np.int32)
+        self.weights = np.array(weights, dtype=np.float32)
+        self.edge_types = np.array(types, dtype=np.uint8)
+    
+    def _apply_changes(self, graph: Any, concepts: Dict[str, Any], changed: set):
+        old_count = len(self.node_ids)
+        for node in changed:
+            if node not in self.node_index and node in graph:
+                self._add_node(node)
+        count = len(self.node_ids)
+        
+        dirty_rows = sorted(self.node_index[node] for node in changed if node in self.node_index)
+        rows = {index: self._row(graph, self.node_ids[index]) for index in dirty_rows}
+        for index in dirty_rows:
+            node = self.node_ids[index]
+            self._set_record(index, concepts.get(node) if node in graph else None)
+        
+        old_lengths = np.diff(self.offsets)
+        lengths = np.zeros(count, dtype=np.int64)
+        lengths[:old_count] = old_lengths
+        dirty = np.zeros(count, dtype=bool)
+        dirty[dirty_rows] = True
+        for index, (row_targets, _, _) in rows.items():
+            lengths[index] = len(row_targets)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        
+        # Rows that did not change keep their edges; scatter them to their new offsets
+        edge_rows = np.repeat(np.arange(old_count), old_lengths)
+        keep = ~dirty[edge_rows]
+        kept_rows = edge_rows[keep]
+        positions = offsets[kept_rows] + (np.flatnonzero(keep) - self.offsets[kept_rows])
+        targets = np.empty(offsets[-1], dtype=np.int32)
+        weights = np.empty(offsets[-1], dtype=np.float32)
+        types = np.empty(offsets[-1], dtype=np.uint8)
+        targets[positions] = self.targets[keep]
+        weights[positions] = self.weights[keep]
+        types[positions] = self.edge_types[keep]
+        
+        for index, (row_targets, row_weights, row_types) in rows.items():
+            start, end = offsets[index], offsets[index + 1]
+            targets[start:end] = row_targets
+            weights[start:end] = row_weights
+            types[start:end] = row_types
+        
+        self.offsets, self.targets, self.weights, self.edge_types = offsets, targets, weights, types
+    
+    def _view(self, direction: str) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """(offsets, neighbors, forward edge positions) of the out-, in- or undirected CSR
+        
+        The in-edge and undirected views are derived from the out-edge arrays on first
+        use after a refresh; positions map back to ``weights`` and ``edge_types``.
+        """
+        if direction == 'out':
+            return self.offsets, self.targets, None
+        if direction not in ('in', 'both'):
+            raise ValueError(f"Unknown direction: {direction}")
+        
+        if direction not in self._views:
+            count = len(self.node_ids)
+            sources = np.repeat(np.arange(count, dtype=np.int32), np.diff(self.offsets))
+            positions = np.arange(len(self.targets))
+            if direction == 'in':
+                owners, neighbors = self.targets, sources
+            else:
+                owners = np.concatenate([sources, self.targets])
+                neighbors = np.concatenate([self.targets, sources])
+                positions = np.concatenate([positions, positions])
+            order = np.argsort(owners, kind='stable')
+            offsets = np.zeros(count + 1, dtype=np.int64)
+            np.cumsum(np.bincount(owners, minlength=count), out=offsets[1:])
+            self._views[direction] = (offsets, neighbors[order], positions[order])
+        return self._views[direction]
+    
+    def _expand(self, frontier: np.ndarray, view: Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]],
+                type_codes: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """(neighbor, forward edge position) for every edge of the frontier nodes in a view"""
+        offsets, neighbors, positions = view
+        if len(frontier) == 1:
+            edge_index = np.arange(offsets[frontier[0]], offsets[frontier[0] + 1])
+        else:
+            starts = offsets[frontier]
+            lengths = offsets[frontier + 1] - starts
+            edge_index = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        edge_positions = edge_index if positions is None else positions[edge_index]
+        found = neighbors[edge_index]
+        if type_codes is not None:
+            mask = np.isin(self.edge_types[edge_positions], type_codes)
+            found, edge_positions = found[mask], edge_positions[mask]
+        return found, edge_positions
+    
+    @_locked
+    def neighbors(self, node: Any, direction: str = 'out',
+                  relationship_types: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Adjacent nodes with edge weight and relationship type"""
+        index = self.node_index.get(node)
+        if index is None:
+            return []
+        offsets, neighbors, positions = self._view(direction)
+        start, end = offsets[index], offsets[index + 1]
+        edges = slice(start, end) if positions is None else positions[start:end]
+        type_codes = self._codes(relationship_types)
+        allowed = set(type_codes.tolist()) if type_codes is not None else None
+        type_names = self.type_names
+        return [
+            {
+                'id': self.node_ids[neighbor],
+                'weight': weight,
+                'relationship_type': type_names[code] if code != NO_TYPE else None
+            }
+            for neighbor, weight, code in zip(neighbors[start:end].tolist(), self.weights[edges].tolist(),
+                                              self.edge_types[edges].tolist())
+            if allowed is None or code in allowed
+        ]
+    
+    @_locked
+    def k_hop(self, node: Any, hops: int = 2, direction: str = 'both',
+              relationship_types: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None) -> Dict[Any, int]:
+        """Hop distance of every node within ``hops`` of ``node``, at most ``limit`` nodes
+        
+        Breadth-first by level, so a truncated result keeps all of the nearest levels.
+        """
+        index = self.node_index.get(node)
+        if index is None:
+            return {}
+        type_codes = self._codes(relationship_types)
+        view = self._view(direction)
+        visited = np.zeros(len(self.node_ids), dtype=bool)
+        visited[index] = True
+        distances = {node: 0}
+        frontier = np.array([index])
+        for hop in range(1, hops + 1):
+            if not len(frontier) or (limit is not None and len(distances) >= limit):
+                break
+            neighbors = np.unique(self._expand(frontier, view, type_codes)[0])
+            frontier = neighbors[~visited[neighbors]]
+            if limit is not None:
+                frontier = frontier[:limit - len(distances)]
+            visited[frontier] = True
+            distances.update(dict.fromkeys(map(self.node_ids.__getitem__, frontier.tolist()), hop))
+        return distances
+    
+    @_locked
+    def edges(self, relationship_types: Optional[Iterable[str]] = None,
+              limit: Optional[int] = None) -> List[Tuple[Any, Any, float]]:
+        """(source, target, weight) for edges of the given relationship types"""
+        positions = np.arange(len(self.targets))
+        type_codes = self._codes(relationship_types)
+        if type_codes is not None:
+            positions = np.flatnonzero(np.isin(self.edge_types, type_codes))
+        if limit is not None:
+            positions = positions[:limit]
+        sources = np.searchsorted(self.offsets, positions, side='right') - 1
+        return [
+            (self.node_ids[source], self.node_ids[target], float(weight))
+            for source, target, weight in zip(sources.tolist(), self.targets[positions].tolist(),
+                                              self.weights[positions].tolist())
+        ]
+    
+    @_locked
+    def induced_edges(self, nodes: Iterable[Any], relationship_types: Optional[Iterable[str]] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Edges whose endpoints are both among ``nodes``, at most ``limit``"""
+        indices = np.array([self.node_index[node] for node in nodes if node in self.node_index], dtype=np.int64)
+        member = np.zeros(len(self.node_ids), dtype=bool)
+        member[indices] = True
+        
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        sources = np.repeat(indices, lengths)
+        keep = member[self.targets[positions]]
+        type_codes = self._codes(relationship_types)
+        if type_codes is not None:
+            keep &= np.isin(self.edge_types[positions], type_codes)
+        positions, sources = positions[keep][:limit], sources[keep][:limit]
+        
+        type_names = self.type_names
+        return [
+            {
+                'source': self.node_ids[source],
+                'target': self.node_ids[target],
+                'weight': weight,
+                'relationship_type': type_names[code] if code != NO_TYPE else None
+            }
+            for source, target, weight, code in zip(sources.tolist(), self.targets[positions].tolist(),
+                                                    self.weights[positions].tolist(),
+                                                    self.edge_types[positions].tolist())
+        ]
+    
+    def record(self, node: Any) -> Optional[ConceptRecord]:
+        index = self.node_index.get(node)
+        return self.records[index] if index is not None else None
+    
+    def memory_bytes(self) -> int:
+        """Bytes held by the adjacency arrays"""
+        return sum(array.nbytes for array in (self.offsets, self.targets, self.weights, self.edge_types))
@@ -0,0 +1,307 @@
+"""
+Knowledge Graph Metrics for Intelligence OS
+Versioned concept graph with incremental clustering and sampled path length estimation
+"""
+
+import math
+import random
+from bisect import bisect_right
+from collections import deque
+from statistics import NormalDist
+from typing import Dict, List, Optional, Any, Set
+import networkx as nx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class IncrementalClustering:
+    """Triangle counts and degrees of the undirected projection, updated per edge change
+    
+    Matches ``nx.average_clustering(G.to_undirected())``: self-loops are ignored and
+    nodes with fewer than two neighbors count as zero. Adding or removing an edge
+    touches only the two endpoints and their common neighbors.
+    """
+    
+    def __init__(self):
+        self.adjacency: Dict[Any, Set[Any]] = {}
+        self.triangles: Dict[Any, int] = {}
+        self.coefficient_sum = 0.0
+    
+    def _coefficient(self, node: Any) -> float:
+        degree = len(self.adjacency[node])
+        if degree < 2:
+            return 0.0
+        return 2 * self.triangles[node] / (degree * (degree - 1))
+    
+    def add_node(self, node: Any):
+        if node not in self.adjacency:
+            self.adjacency[node] = set()
+            self.triangles[node] = 0
+    
+    def remove_node(self, node: Any):
+        if node not in self.adjacency:
+            return
+        for neighbor in list(self.adjacency[node]):
+            self.remove_edge(node, neighbor)
+        del self.adjacency[node]
+        del self.triangles[node]
+    
+    def add_edge(self, u: Any, v: Any):
+        self.add_node(u)
+        self.add_node(v)
+        if u == v or v in self.adjacency[u]:
+            return
+        self._update(u, v, 1)
+    
+    def remove_edge(self, u: Any, v: Any):
+        if u == v or u not in self.adjacency or v not in self.adjacency[u]:
+            return
+        self._update(u, v, -1)
+    
+    def _update(self, u: Any, v: Any, sign: int):
+        common = self.adjacency[u] & self.adjacency[v]
+        affected = [u, v, *common]
+        before = sum(self._coefficient(node) for node in affected)
+        
+        if sign > 0:
+            self.adjacency[u].add(v)
+            self.adjacency[v].add(u)
+        else:
+            self.adjacency[u].discard(v)
+            self.adjacency[v].discard(u)
+        self.triangles[u] += sign * len(common)
+        self.triangles[v] += sign * len(common)
+        for node in common:
+            self.triangles[node] += sign
+        
+        self.coefficient_sum += sum(self._coefficient(node) for node in affected) - before
+    
+    def clear(self):
+        self.adjacency.clear()
+        self.triangles.clear()
+        self.coefficient_sum = 0.0
+    
+    def rebuild(self, adjacency: Dict[Any, Set[Any]], triangles: Optional[Dict[Any, int]] = None):
+        """Replace the state with a whole undirected adjacency, counting triangles unless given"""
+        self.adjacency = adjacency
+        if triangles is None:
+            triangles = {
+                node: sum(len(neighbors & adjacency[neighbor]) for neighbor in neighbors) // 2
+                for node, neighbors in adjacency.items()
+            }
+        self.triangles = triangles
+        self.coefficient_sum = sum(self._coefficient(node) for node in adjacency)
+    
+    def average_clustering(self) -> float:
+        if not self.adjacency:
+            return 0.0
+        return max(self.coefficient_sum, 0.0) / len(self.adjacency)
+
+def _node_key(node: Any) -> Any:
+    """Node of an ``add_nodes_from`` item, which is either a node or a (node, attrs) pair"""
+    try:
+        hash(node)
+        return node
+    except TypeError:
+        return node[0]
+
+class VersionedDiGraph(nx.DiGraph):
+    """DiGraph whose structural mutations bump ``version`` and update clustering counts
+    
+    Every networkx mutator that adds or removes nodes or edges is routed through the
+    ``IncrementalClustering`` of the undirected projection, so cached metrics can be
+    keyed on ``version`` while callers keep using the plain networkx API. Mutators
+    also log the nodes whose attributes or out-edges changed, so derived structures
+    can catch up with ``changed_since`` instead of rebuilding. Attribute dicts edited
+    in place are not tracked; re-add the node or edge to record the change.
+    """
+    
+    change_log_size = 100_000
+    
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.version = 0
+        self.clustering = IncrementalClustering()
+        self._change_versions: List[int] = []  # Ascending; parallel to _change_nodes for bisect
+        self._change_nodes: List[Any] = []
+        self._changes_floor = 0  # Every change after this version is in the log
+        super().__init__(incoming_graph_data, **attr)
+    
+    def _record(self, nodes: List[Any]):
+        self.version += 1
+        if len(self._change_nodes) + len(nodes) > self.change_log_size:
+            self._clear_change_log()
+            return
+        self._change_versions.extend([self.version] * len(nodes))
+        self._change_nodes.extend(nodes)
+    
+    def changed_since(self, version: int) -> Optional[Set[Any]]:
+        """Nodes whose attributes or out-edges changed after ``version``, None if not logged"""
+        if version < self._changes_floor:
+            return None
+        return set(self._change_nodes[bisect_right(self._change_versions, version):])
+    
+    def _clear_change_log(self):
+        """Forget logged changes; callers asking about older versions must rebuild"""
+        self._change_versions.clear()
+        self._change_nodes.clear()
+        self._changes_floor = self.version
+    
+    def _undirected_adjacent(self, u: Any, v: Any) -> bool:
+        return (u in self._succ and v in self._succ[u]) or (v in self._succ and u in self._succ[v])
+    
+    def _sync_nodes(self):
+        for node in self._node:
+            self.clustering.add_node(node)
+    
+    def add_node(self, node_for_adding, **attr):
+        super().add_node(node_for_adding, **attr)
+        self.clustering.add_node(node_for_adding)
+        self._record([node_for_adding])
+    
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        nodes_for_adding = list(nodes_for_adding)
+        super().add_nodes_from(nodes_for_adding, **attr)
+        self._sync_nodes()
+        self._record([_node_key(node) for node in nodes_for_adding])
+    
+    def remove_node(self, n):
+        predecessors = list(self._pred[n]) if n in self._pred else []
+        super().remove_node(n)
+        self.clustering.remove_node(n)
+        self._record([n, *predecessors])
+    
+    def remove_nodes_from(self, nodes):
+        nodes = list(nodes)
+        predecessors = [pred for node in nodes if node in self._pred for pred in self._pred[node]]
+        super().remove_nodes_from(nodes)
+        for node in nodes:
+            if node not in self._node:
+                self.clustering.remove_node(node)
+        self._record(nodes + predecessors)
+    
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self.clustering.add_edge(u_of_edge, v_of_edge)
+        self._record([u_of_edge, v_of_edge])
+    
+    def add_edges_from(self, ebunch_to_add, **attr):
+        edges = list(ebunch_to_add)
+        super().add_edges_from(edges, **attr)
+        for edge in edges:
+            self.clustering.add_edge(edge[0], edge[1])
+        self._record([node for edge in edges for node in edge[:2]])
+    
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        if not self._undirected_adjacent(u, v):
+            self.clustering.remove_edge(u, v)
+        self._record([u])
+    
+    def remove_edges_from(self, ebunch):
+        edges = list(ebunch)
+        super().remove_edges_from(edges)
+        for edge in edges:
+            if not self._undirected_adjacent(edge[0], edge[1]):
+                self.clustering.remove_edge(edge[0], edge[1])
+        self._record([edge[0] for edge in edges])
+    
+    def bulk_load(self, nodes, edges, triangles: Optional[Dict[Any, int]] = None):
+        """Add nodes and edges without per-edge clustering updates, then rebuild the counts once"""
+        nx.DiGraph.add_nodes_from(self, nodes)
+        nx.DiGraph.add_edges_from(self, edges)
+        adjacency = {node: set(self._succ[node]) | set(self._pred[node]) for node in self._node}
+        for node, neighbors in adjacency.items():
+            neighbors.discard(node)
+        self.clustering.rebuild(adjacency, triangles)
+        self.version += 1
+        self._clear_change_log()
+    
+    def clear(self):
+        super().clear()
+        self.clustering.clear()
+        self.version += 1
+        self._clear_change_log()
+    
+    def clear_edges(self):
+        super().clear_edges()
+        self.clustering.clear()
+        self._sync_nodes()
+        self.version += 1
+        self._clear_change_log()
+
+def largest_component(adjacency: Dict[Any, Set[Any]]) -> List[Any]:
+    """Nodes of the largest connected component of an undirected adjacency"""
+    seen: Set[Any] = set()
+    largest: List[Any] = []
+    for start in adjacency:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = [start]
+        queue = deque([start])
+        while queue:
+            for neighbor in adjacency[queue.popleft()]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    component.append(neighbor)
+                    queue.append(neighbor)
+        if len(component) > len(largest):
+            largest = component
+    return largest
+
+def _mean_distance_from(adjacency: Dict[Any, Set[Any]], source: Any, component_size: int) -> float:
+    distances = {source: 0}
+    queue = deque([source])
+    total = 0
+    while queue:
+        node = queue.popleft()
+        next_distance = distances[node] + 1
+        for neighbor in adjacency[node]:
+            if neighbor not in distances:
+                distances[neighbor] = next_distance
+                total += next_distance
+                queue.append(neighbor)
+    return total / (component_size - 1)
+
+def estimate_average_path_length(adjacency: Dict[Any, Set[Any]], relative_error: float = 0.05,
+                                 confidence: float = 0.95, min_samples: int = 10,
+                                 max_samples: int = 200, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Average shortest path length of the largest component from BFS on sampled sources
+    
+    Each BFS gives the mean distance from one source to every other node, and the mean
+    over sources is an unbiased estimate of the all-pairs average. Sources are drawn
+    without replacement until the confidence interval half-width is within
+    ``relative_error`` of the estimate, ``max_samples`` is reached, or every node has
+    been a source (which makes the result exact).
+    """
+    component = largest_component(adjacency)
+    size = len(component)
+    if size < 2:
+        return {'average_path_length': 0.0, 'error_bound': 0.0, 'samples': 0, 'exact': True}
+    
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    sources = random.Random(seed).sample(component, min(size, max(max_samples, min_samples)))
+    total = 0.0
+    total_squares = 0.0
+    half_width = math.inf
+    count = 0
+    for source in sources:
+        mean_distance = _mean_distance_from(adjacency, source, size)
+        count += 1
+        total += mean_distance
+        total_squares += mean_distance * mean_distance
+        
+        if count >= min(min_samples, size):
+            mean = total / count
+            variance = max(total_squares - count * mean * mean, 0.0) / max(count - 1, 1)
+            population_correction = (size - count) / (size - 1)
+            half_width = z * math.sqrt(variance / count * population_correction)
+            if half_width <= relative_error * mean:
+                break
+    
+    return {
+        'average_path_length': total / count,
+        'error_bound': half_width,
+        'samples': count,
+        'exact': count == size
+    }
@@ -0,0 +1,332 @@
+"""
+Knowledge Graph Query Layer for Intelligence OS
+Secondary indexes with cursor pagination for concept and relationship listings
+"""
+
+import base64
+import json
+import math
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Callable, Iterator, Set, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_MAX_ID = chr(0x10FFFF)  # Sorts after every id, for inclusive value bounds
+
+CONCEPT_SORTS = ('importance', 'mention_count', 'last_mentioned')
+
+SECONDS_PER_DAY = 86400.0
+
+def epoch_seconds(value: datetime) -> float:
+    """Epoch seconds, treating naive datetimes as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def decay_importance(score: float, updated_at: datetime, at: datetime, decay_factor: float) -> float:
+    """Importance ``score`` set at ``updated_at``, decayed by ``decay_factor`` per day until ``at``"""
+    days = max(epoch_seconds(at) - epoch_seconds(updated_at), 0.0) / SECONDS_PER_DAY
+    return score * decay_factor ** days
+
+def importance_key(score: float, updated_at: datetime, decay_factor: float) -> float:
+    """Time-invariant sort key for a decaying importance
+    
+    ``log(score * f**(now - t)) = log(score) - t*log(f) + now*log(f)`` and the last
+    term is shared by every concept, so ordering by ``log(score) - t*log(f)`` ranks
+    concepts by their current importance at any ``now`` without rewriting scores.
+    """
+    if score <= 0:
+        return -math.inf
+    return math.log(score) - epoch_seconds(updated_at) / SECONDS_PER_DAY * math.log(decay_factor)
+
+def encode_cursor(sort: str, value: float, item_id: str, skip: int = 0) -> str:
+    fields = [sort, value, item_id] + ([skip] if skip else [])
+    payload = json.dumps(fields, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[float, str, int]:
+    """(value, id) of the last row read and the offset still to skip; ValueError if malformed"""
+    try:
+        cursor_sort, value, item_id, *rest = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        skip = int(rest[0]) if rest else 0
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    return float(value), str(item_id), skip
+
+class SortedIndex:
+    """Ids ordered by descending value, ties broken by ascending id"""
+    
+    def __init__(self):
+        self.keys: List[Tuple[float, str]] = []
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def add(self, value: float, item_id: str):
+        insort(self.keys, (-value, item_id))
+    
+    def remove(self, value: float, item_id: str):
+        key = (-value, item_id)
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+    
+    def count_at_least(self, min_value: float) -> int:
+        return bisect_right(self.keys, (-min_value, _MAX_ID))
+    
+    def scan(self, after: Optional[Tuple[float, str]] = None,
+             min_value: Optional[float] = None) -> Iterator[Tuple[float, str]]:
+        """(value, id) in order, starting after a cursor and stopping below ``min_value``"""
+        start = bisect_right(self.keys, (-after[0], after[1])) if after else 0
+        stop = self.count_at_least(min_value) if min_value is not None else len(self.keys)
+        for position in range(start, stop):
+            negative, item_id = self.keys[position]
+            yield -negative, item_id
+
+class KnowledgeGraphQueryIndex:
+    """Secondary indexes over concepts and relationships for paginated listings
+    
+    Concepts are indexed by importance, mention count and last mention, each both
+    globally and per concept type, so a page sorted on one of them walks a single
+    ordered list from the cursor and stops after ``limit`` matches. Importance is
+    stored as of ``last_mentioned`` and decays daily by ``importance_decay_factor``;
+    it is indexed by ``importance_key``, so the top ``k`` concepts right now are the
+    first ``k`` entries and no score is rewritten as time passes. Relationships
+    are indexed by strength, globally and per relationship type, and by source and
+    target concept. Index keys are copies of the values at upsert time; callers
+    upsert after mutating a concept or relationship, and rows are re-checked
+    against the live objects when paging.
+    
+    Filters other than the sort field (and the type or endpoint the index is keyed
+    by) are checked row by row, so a selective one could walk most of an index.
+    Each request reads at most ``max_scan_rows`` rows; when that cuts a page short
+    it is returned partial, possibly empty, with a cursor that resumes the walk.
+    """
+    
+    def __init__(self, importance_decay_factor: float = 1.0, max_scan_rows: int = 10000):
+        if not 0 < importance_decay_factor <= 1:
+            raise ValueError("importance_decay_factor must be in (0, 1]")
+        if max_scan_rows < 1:
+            raise ValueError("max_scan_rows must be positive")
+        self.importance_decay_factor = importance_decay_factor
+        self.max_scan_rows = max_scan_rows
+        self._lock = threading.RLock()
+        self._reset()
+    
+    def _reset(self):
+        self._concept_keys: Dict[str, Tuple[str, Tuple[float, ...]]] = {}
+        self._concept_indexes: Dict[str, Dict[Optional[str], SortedIndex]] = {
+            sort: defaultdict(SortedIndex) for sort in CONCEPT_SORTS
+        }
+        self._relationship_keys: Dict[str, Tuple[str, float, str, str]] = {}
+        self._strength_indexes: Dict[Optional[str], SortedIndex] = defaultdict(SortedIndex)
+        self._by_source: Dict[str, Set[str]] = defaultdict(set)
+        self._by_target: Dict[str, Set[str]] = defaultdict(set)
+    
+    def _importance_key(self, concept: Any) -> float:
+        return importance_key(concept.importance_score, concept.last_mentioned, self.importance_decay_factor)
+    
+    def _concept_values(self, concept: Any) -> Tuple[float, ...]:
+        return (self._importance_key(concept), float(concept.mention_count), epoch_seconds(concept.last_mentioned))
+    
+    def indexed_counts(self) -> Tuple[int, int]:
+        """Number of indexed concepts and relationships"""
+        return len(self._concept_keys), len(self._relationship_keys)
+    
+    def upsert_concept(self, concept: Any):
+        with self._lock:
+            self.remove_concept(concept.id)
+            concept_type = concept.concept_type.value
+            values = self._concept_values(concept)
+            for sort, value in zip(CONCEPT_SORTS, values):
+                self._concept_indexes[sort][None].add(value, concept.id)
+                self._concept_indexes[sort][concept_type].add(value, concept.id)
+            self._concept_keys[concept.id] = (concept_type, values)
+    
+    def remove_concept(self, concept_id: str):
+        with self._lock:
+            previous = self._concept_keys.pop(concept_id, None)
+            if previous:
+                concept_type, values = previous
+                for sort, value in zip(CONCEPT_SORTS, values):
+                    self._concept_indexes[sort][None].remove(value, concept_id)
+                    self._concept_indexes[sort][concept_type].remove(value, concept_id)
+    
+    def upsert_relationship(self, relationship: Any):
+        with self._lock:
+            self.remove_relationship(relationship.id)
+            relationship_type = relationship.relationship_type.value
+            self._strength_indexes[None].add(relationship.strength, relationship.id)
+            self._strength_indexes[relationship_type].add(relationship.strength, relationship.id)
+            self._by_source[relationship.source_concept_id].add(relationship.id)
+            self._by_target[relationship.target_concept_id].add(relationship.id)
+            self._relationship_keys[relationship.id] = (
+                relationship_type, relationship.strength,
+                relationship.source_concept_id, relationship.target_concept_id
+            )
+    
+    def remove_relationship(self, relationship_id: str):
+        with self._lock:
+            previous = self._relationship_keys.pop(relationship_id, None)
+            if previous:
+                relationship_type, strength, source, target = previous
+                self._strength_indexes[None].remove(strength, relationship_id)
+                self._strength_indexes[relationship_type].remove(strength, relationship_id)
+                self._by_source[source].discard(relationship_id)
+                self._by_target[target].discard(relationship_id)
+    
+    def rebuild(self, concepts: Dict[str, Any], relationships: Dict[str, Any]):
+        """Re-index everything, sorting each index once instead of inserting one by one"""
+        with self._lock:
+            self._reset()
+            entries = {sort: defaultdict(list) for sort in CONCEPT_SORTS}
+            for concept in concepts.values():
+                concept_type = concept.concept_type.value
+                values = self._concept_values(concept)
+                for sort, value in zip(CONCEPT_SORTS, values):
+                    entries[sort][None].append((-value, concept.id))
+                    entries[sort][concept_type].append((-value, concept.id))
+                self._concept_keys[concept.id] = (concept_type, values)
+            for sort, groups in entries.items():
+                for key, keys in groups.items():
+                    self._concept_indexes[sort][key].keys = sorted(keys)
+            
+            strengths = defaultdict(list)
+            for relationship in relationships.values():
+                relationship_type = relationship.relationship_type.value
+                strengths[None].append((-relationship.strength, relationship.id))
+                strengths[relationship_type].append((-relationship.strength, relationship.id))
+                self._by_source[relationship.source_concept_id].add(relationship.id)
+                self._by_target[relationship.target_concept_id].add(relationship.id)
+                self._relationship_keys[relationship.id] = (
+                    relationship_type, relationship.strength,
+                    relationship.source_concept_id, relationship.target_concept_id
+                )
+            for key, keys in strengths.items():
+                self._strength_indexes[key].keys = sorted(keys)
+    
+    def _page(self, rows: Iterator[Tuple[float, str]], items: Dict[str, Any], matches: Callable[[Any], bool],
+              sort: str, limit: int, offset: int) -> Tuple[List[Any], Optional[str]]:
+        """First ``limit`` matching items after skipping ``offset``, plus the next cursor
+        
+        Stops after ``max_scan_rows`` rows; the cursor then points past the last row
+        read and carries whatever part of ``offset`` is still to be skipped.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        offset = max(offset, 0)
+        page: List[Tuple[float, Any]] = []
+        skipped = 0
+        last_read: Optional[Tuple[float, str]] = None
+        for scanned, (value, item_id) in enumerate(rows):
+            if scanned == self.max_scan_rows:
+                return [item for _, item in page], encode_cursor(sort, last_read[0], last_read[1], offset - skipped)
+            last_read = (value, item_id)
+            item = items.get(item_id)
+            if item is None or not matches(item):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(page) == limit:
+                last_value, last_item = page[-1]
+                return [item for _, item in page], encode_cursor(sort, last_value, last_item.id)
+            page.append((value, item))
+        return [item for _, item in page], None
+    
+    def query_concepts(self, concepts: Dict[str, Any], concept_type: Optional[str] = None,
+                       min_importance: float = 0.0, min_mentions: int = 0,
+                       mentioned_after: Optional[datetime] = None, search: Optional[str] = None,
+                       sort: str = 'importance', limit: int = 50, cursor: Optional[str] = None,
+                       offset: int = 0, at: Optional[datetime] = None) -> Dict[str, Any]:
+        """One page of concepts matching the filters, in descending ``sort`` order
+        
+        Importance is compared and ranked as decayed to ``at`` (now by default).
+        ``total_count`` is returned when the index can count the matches directly
+        (filters on the sort field and type only) and is None otherwise, which is
+        the case for most filter combinations. A page is short of ``limit`` with a
+        ``next_cursor`` when the scan cap was reached first.
+        """
+        if sort not in CONCEPT_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        after = None
+        if cursor:
+            # The cursor carries any offset still to skip, so ``offset`` only shapes the first page
+            after_value, after_id, offset = decode_cursor(cursor, sort)
+            after = (after_value, after_id)
+        after_timestamp = epoch_seconds(mentioned_after) if mentioned_after else None
+        search = search.lower() if search else None
+        min_key = None
+        if min_importance:
+            min_key = importance_key(min_importance, at or datetime.utcnow(), self.importance_decay_factor)
+        thresholds = {
+            'importance': min_key,
+            'mention_count': float(min_mentions) if min_mentions else None,
+            'last_mentioned': after_timestamp
+        }
+        
+        def matches(concept: Any) -> bool:
+            return ((min_key is None or self._importance_key(concept) >= min_key)
+                    and concept.mention_count >= min_mentions
+                    and (after_timestamp is None or epoch_seconds(concept.last_mentioned) >= after_timestamp)
+                    and (search is None or search in concept.name.lower())
+                    and (concept_type is None or concept.concept_type.value == concept_type))
+        
+        with self._lock:
+            index = self._concept_indexes[sort].get(concept_type) or SortedIndex()
+            page, next_cursor = self._page(index.scan(after, thresholds[sort]), concepts, matches,
+                                           sort, limit, offset)
+            other_filters = [value for name, value in thresholds.items() if name != sort and value is not None]
+            total_count = None
+            if not other_filters and not search:
+                total_count = index.count_at_least(thresholds[sort]) if thresholds[sort] is not None else len(index)
+        
+        return {'items': page, 'next_cursor': next_cursor, 'total_count': total_count}
+    
+    def query_relationships(self, relationships: Dict[str, Any], relationship_type: Optional[str] = None,
+                            min_strength: float = 0.0, source_concept: Optional[str] = None,
+                            target_concept: Optional[str] = None, limit: int = 50,
+                            cursor: Optional[str] = None, offset: int = 0) -> Dict[str, Any]:
+        """One page of relationships matching the filters, strongest first
+        
+        ``total_count`` is None when filtering by source or target concept. As with
+        concepts, a page is short of ``limit`` with a ``next_cursor`` when the scan
+        cap was reached first.
+        """
+        after = None
+        if cursor:
+            # The cursor carries any offset still to skip, so ``offset`` only shapes the first page
+            after_value, after_id, offset = decode_cursor(cursor, 'strength')
+            after = (after_value, after_id)
+        
+        def matches(relationship: Any) -> bool:
+            return (relationship.strength >= min_strength
+                    and (relationship_type is None or relationship.relationship_type.value == relationship_type)
+                    and (source_concept is None or relationship.source_concept_id == source_concept)
+                    and (target_concept is None or relationship.target_concept_id == target_concept))
+        
+        with self._lock:
+            if source_concept or target_concept:
+                # Endpoint filters are selective; order just their relationships
+                candidates = None
+                if source_concept:
+                    candidates = set(self._by_source.get(source_concept, ()))
+                if target_concept:
+                    targets = self._by_target.get(target_concept, set())
+                    candidates = candidates & targets if candidates is not None else set(targets)
+                index = SortedIndex()
+                index.keys = sorted((-self._relationship_keys[item_id][1], item_id) for item_id in candidates)
+                total_count = None
+            else:
+                index = self._strength_indexes.get(relationship_type) or SortedIndex()
+                total_count = index.count_at_least(min_strength) if min_strength else len(index)
+            page, next_cursor = self._page(index.scan(after, min_strength or None), relationships, matches,
+                                           'strength', limit, offset)
+        
+        return {'items': page, 'next_cursor': next_cursor, 'total_count': total_count}
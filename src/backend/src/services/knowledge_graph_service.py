@@ -4,6 +4,10 @@ Tracks concept relationships and evolution over time for organizational learning
 """
 
 import os
+import gc
+import time
+import heapq
+import itertools
 import asyncio
 import logging
 import uuid
@@ -18,6 +22,17 @@ import networkx as nx
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from .knowledge_graph_metrics import VersionedDiGraph, estimate_average_path_length
+from .knowledge_graph_index import CSRGraphIndex
+from .knowledge_graph_query import KnowledgeGraphQueryIndex, decay_importance, epoch_seconds
+from .knowledge_graph_cooccurrence import CooccurrenceMatrix, segment_incidence
+from .knowledge_graph_store import (
+    KnowledgeGraphStore,
+    encode_record,
+    decode_record,
+    encode_datetimes,
+    decode_datetimes
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -126,8 +141,8 @@ class LearningMetrics:
 class KnowledgeGraphService:
     """Service for managing organizational knowledge graph"""
     
-    def __init__(self):
-        self.graph = nx.DiGraph()  # Directed graph for concepts and relationships
+    def __init__(self, data_dir: Optional[str] = None):
+        self.graph = VersionedDiGraph()  # Directed graph for concepts and relationships
         self.concepts = {}  # concept_id -> Concept
         self.relationships = {}  # relationship_id -> Relationship
         self.evolution_history = []  # List of KnowledgeEvolution
@@ -146,11 +161,44 @@ class KnowledgeGraphService:
             'relationship_strength_threshold': 0.3,  # Minimum strength for relationships
             'evolution_detection_window_days': 30,  # Window for detecting evolution
             'importance_decay_factor': 0.95,  # Daily decay for concept importance
-            'max_concepts_per_meeting': 20  # Maximum concepts to extract per meeting
+            'max_concepts_per_meeting': 20,  # Maximum concepts to extract per meeting
+            'path_length_relative_error': float(os.getenv('KG_PATH_LENGTH_RELATIVE_ERROR', '0.05')),
+            'path_length_max_samples': int(os.getenv('KG_PATH_LENGTH_MAX_SAMPLES', '200')),
+            'snapshot_interval_meetings': int(os.getenv('KG_SNAPSHOT_INTERVAL_MEETINGS', '50')),
+            'query_max_scan_rows': int(os.getenv('KG_QUERY_MAX_SCAN_ROWS', '10000'))  # Index rows read per listing page
         }
+        
+        # Connectivity metrics keyed on (graph version, exact)
+        self._connectivity_cache: Dict[Tuple[int, bool], Dict[str, float]] = {}
+        
+        # Array-backed adjacency for read queries, caught up lazily from the graph's change log
+        self.graph_index = CSRGraphIndex()
+        
+        # Secondary indexes for paginated concept and relationship listings and top-k importance
+        self.query_index = KnowledgeGraphQueryIndex(self.config['importance_decay_factor'],
+                                                    self.config['query_max_scan_rows'])
+        self._indexed_collections = (self.concepts, self.relationships)
+        
+        # Running concept co-occurrence counts behind relationship strengths
+        self.cooccurrence = CooccurrenceMatrix()
+        self._unpersisted_cooccurrence: List[List[Any]] = []
+        
+        # Durable snapshot + WAL store; state is restored from it on startup
+        data_dir = data_dir or os.getenv('KNOWLEDGE_GRAPH_DATA_DIR')
+        self.store = None
+        self._deltas_since_snapshot = 0
+        if data_dir:
+            try:
+                self.store = KnowledgeGraphStore(data_dir, fsync=os.getenv('KG_WAL_FSYNC', 'true').lower() == 'true')
+            except BlockingIOError:
+                logger.warning("Knowledge graph data directory owned by another process, persistence disabled",
+                               data_dir=data_dir)
+            else:
+                self._restore_from_store()
     
     async def process_meeting_knowledge(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process a meeting to extract and update knowledge graph"""
+        pending_cooccurrence = len(self._unpersisted_cooccurrence)
         try:
             meeting_id = meeting_data.get('meeting_id', str(uuid.uuid4()))
             meeting_date = datetime.fromisoformat(meeting_data.get('date', datetime.utcnow().isoformat()).replace('Z', '+00:00'))
@@ -186,6 +234,9 @@ class KnowledgeGraphService:
                 'processing_timestamp': datetime.utcnow().isoformat()
             }
             
+            if self.store and (updated_concepts or updated_relationships or evolutions or self._unpersisted_cooccurrence):
+                self._persist_meeting_delta(meeting_id, updated_concepts, updated_relationships, evolutions)
+            
             logger.info("Meeting knowledge processing completed",
                        meeting_id=meeting_id,
                        concepts_count=len(updated_concepts),
@@ -194,6 +245,8 @@ class KnowledgeGraphService:
             return result
             
         except Exception as e:
+            # Failed meetings are not logged; drop their co-occurrence increments so the next delta doesn't carry them
+            del self._unpersisted_cooccurrence[pending_cooccurrence:]
             logger.error("Meeting knowledge processing failed", error=str(e))
             raise
     
@@ -220,10 +273,8 @@ class KnowledgeGraphService:
             
             # Deduplicate and rank concepts
             deduplicated_concepts = self._deduplicate_concepts(concepts)
-            ranked_concepts = self._rank_concepts(deduplicated_concepts)
-            
             # Return top concepts
-            return ranked_concepts[:self.config['max_concepts_per_meeting']]
+            return self._rank_concepts(deduplicated_concepts, self.config['max_concepts_per_meeting'])
             
         except Exception as e:
             logger.error("Concept extraction failed", error=str(e))
@@ -346,6 +397,43 @@ class KnowledgeGraphService:
             logger.error("Action concept extraction failed", error=str(e))
             return []
     
+    async def _extract_concepts_from_strategic_data(self, meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract concepts from the meeting's strategic implications"""
+        concepts = []
+        
+        try:
+            implications = meeting_data.get('strategic_implications', [])
+            if isinstance(implications, dict):
+                # Oracle analyses group implications by kind, e.g. {'action_plans': [...]}
+                implications = [item for items in implications.values() if isinstance(items, list) for item in items]
+            
+            for implication in implications:
+                if isinstance(implication, str):
+                    implication = {'description': implication}
+                description = implication.get('description', '')
+                
+                # Named implication as a concept
+                title = implication.get('title')
+                if title:
+                    concepts.append({
+                        'name': title,
+                        'type': self._classify_concept_type(title, description),
+                        'relevance_score': implication.get('confidence_score', 0.5),
+                        'context': description,
+                        'source': 'strategic_implications'
+                    })
+                
+                # Extract concepts from implication description
+                if description.strip():
+                    desc_concepts = self._extract_concepts_from_text(description, 'strategic_context')
+                    concepts.extend(desc_concepts)
+            
+            return concepts
+            
+        except Exception as e:
+            logger.error("Strategic concept extraction failed", error=str(e))
+            return []
+    
     def _classify_concept_type(self, term: str, context: str) -> ConceptType:
         """Classify the type of a concept based on term and context"""
         term_lower = term.lower()
@@ -484,9 +572,11 @@ class KnowledgeGraphService:
         
         return list(deduplicated.values())
     
-    def _rank_concepts(self, concepts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Rank concepts by relevance and importance"""
+    def _rank_concepts(self, concepts: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rank concepts by relevance and importance, keeping the top ``limit`` if given"""
         # Sort by relevance score
+        if limit is not None:
+            return heapq.nlargest(limit, concepts, key=lambda x: x.get('relevance_score', 0))
         return sorted(concepts, key=lambda x: x.get('relevance_score', 0), reverse=True)
     
     async def _update_concepts(self, extracted_concepts: List[Dict[str, Any]], 
@@ -503,19 +593,22 @@ class KnowledgeGraphService:
                 existing_concept = self._find_concept_by_name(concept_name)
                 
                 if existing_concept:
+                    # Update importance score, decayed from the last mention to this meeting
+                    relevance = concept_data.get('relevance_score', 0.5)
+                    decayed = self.current_importance(existing_concept, meeting_date)
+                    existing_concept.importance_score = (decayed * 0.8) + (relevance * 0.2)
+                    
                     # Update existing concept
-                    existing_concept.last_mentioned = meeting_date
+                    existing_concept.last_mentioned = max(existing_concept.last_mentioned, meeting_date,
+                                                          key=epoch_seconds)
                     existing_concept.mention_count += 1
                     existing_concept.related_meetings.add(meeting_id)
                     
-                    # Update importance score
-                    relevance = concept_data.get('relevance_score', 0.5)
-                    existing_concept.importance_score = (existing_concept.importance_score * 0.8) + (relevance * 0.2)
-                    
                     # Update attributes
                     if concept_data.get('attributes'):
                         existing_concept.attributes.update(concept_data['attributes'])
                     
+                    self.query_index.upsert_concept(existing_concept)
                     updated_concepts.append(existing_concept)
                 else:
                     # Create new concept
@@ -534,6 +627,7 @@ class KnowledgeGraphService:
                     )
                     
                     self.concepts[new_concept.id] = new_concept
+                    self.query_index.upsert_concept(new_concept)
                     updated_concepts.append(new_concept)
             
             return updated_concepts
@@ -542,6 +636,270 @@ class KnowledgeGraphService:
             logger.error("Concept update failed", error=str(e))
             return []
     
+    def _meeting_segments(self, meeting_data: Dict[str, Any]) -> List[str]:
+        """Text units that define co-occurrence: transcript segments, decisions and actions"""
+        segments = [
+            segment.get('text', '')
+            for segment in meeting_data.get('transcript_analysis', {}).get('segments', [])
+        ]
+        for item in meeting_data.get('decisions', []) + meeting_data.get('actions', []):
+            segments.append(f"{item.get('title', '')}. {item.get('description', '')}")
+        return segments
+    
+    async def _extract_relationships(self, meeting_data: Dict[str, Any],
+                                     concepts: List[Concept]) -> List[Dict[str, Any]]:
+        """Fold the meeting's concept co-occurrences into the running counts
+        
+        Returns candidate relationships for concept pairs that co-occur in this
+        meeting and whose cosine strength over all meetings reaches
+        ``relationship_strength_threshold``. Existing co-occurrence relationships
+        of the meeting's concepts are returned too, since their strengths change
+        with the concepts' segment counts; pairs outside the meeting are untouched.
+        """
+        try:
+            segments = self._meeting_segments(meeting_data)
+            concepts = list({concept.id: concept for concept in concepts}.values())
+            if len(concepts) < 2 or not segments:
+                return []
+            
+            concept_ids = [concept.id for concept in concepts]
+            incidence = segment_incidence([concept.name for concept in concepts], segments)
+            local = self.cooccurrence.add(concept_ids, incidence)
+            if self.store:
+                self._unpersisted_cooccurrence.extend(self.cooccurrence.increments(concept_ids, local))
+            
+            pairs = local.row < local.col
+            rows, columns = local.row[pairs].tolist(), local.col[pairs].tolist()
+            ordered = [
+                (concept_ids[a], concept_ids[b])
+                if self.cooccurrence.index[concept_ids[a]] < self.cooccurrence.index[concept_ids[b]]
+                else (concept_ids[b], concept_ids[a])
+                for a, b in zip(rows, columns)
+            ]
+            
+            # Existing relationships of these concepts whose pair did not co-occur this meeting
+            seen = set(ordered)
+            stale = []
+            for concept_id in concept_ids:
+                if concept_id not in self.graph:
+                    continue
+                for source, target in itertools.chain(self.graph.out_edges(concept_id), self.graph.in_edges(concept_id)):
+                    if (source, target) not in seen and self._find_cooccurrence_relationship(source, target):
+                        seen.add((source, target))
+                        stale.append((source, target))
+            strengths, totals = self.cooccurrence.strengths(ordered + stale)
+            
+            threshold = self.config['relationship_strength_threshold']
+            incidence = incidence.tolil()
+            relationships = []
+            for i, ((source, target), strength, total) in enumerate(zip(ordered + stale, strengths.tolist(),
+                                                                        totals.tolist())):
+                existing = self._find_cooccurrence_relationship(source, target)
+                if strength < threshold and existing is None:
+                    continue
+                shared = []
+                if i < len(ordered):
+                    shared = sorted(set(incidence.rows[rows[i]]) & set(incidence.rows[columns[i]]))
+                relationships.append({
+                    'source_concept_id': source,
+                    'target_concept_id': target,
+                    'relationship_type': RelationshipType.RELATES_TO,
+                    'strength': strength,
+                    'confidence': 1.0 - 1.0 / (1.0 + total),
+                    'co_occurrences': len(shared),
+                    'evidence': segments[shared[0]][:200] if shared else '',
+                    'existing': existing
+                })
+            return relationships
+            
+        except Exception as e:
+            logger.error("Relationship extraction failed", error=str(e))
+            return []
+    
+    def _find_cooccurrence_relationship(self, source: str, target: str) -> Optional[Relationship]:
+        """The co-occurrence relationship already recorded on the graph edge between two concepts"""
+        edge = self.graph.get_edge_data(source, target)
+        relationship = self.relationships.get(edge.get('relationship_id')) if edge else None
+        if relationship and relationship.context.get('source') == 'co_occurrence':
+            return relationship
+        return None
+    
+    async def _update_relationships(self, new_relationships: List[Dict[str, Any]],
+                                    meeting_id: str, meeting_date: datetime) -> List[Relationship]:
+        """Create or refresh relationships from extracted candidates"""
+        updated_relationships = []
+        
+        try:
+            for relationship_data in new_relationships:
+                relationship = relationship_data.get('existing')
+                if relationship:
+                    # Update existing relationship
+                    relationship.strength = relationship_data['strength']
+                    relationship.confidence = relationship_data['confidence']
+                    if relationship_data['co_occurrences']:
+                        relationship.last_observed = max(relationship.last_observed, meeting_date,
+                                                         key=epoch_seconds)
+                        relationship.observation_count += relationship_data['co_occurrences']
+                        relationship.evidence = (relationship.evidence + [relationship_data['evidence']])[-5:]
+                        meetings = relationship.context.setdefault('meetings', [])
+                        if meeting_id not in meetings:
+                            meetings.append(meeting_id)
+                else:
+                    # Create new relationship
+                    relationship = Relationship(
+                        id=str(uuid.uuid4()),
+                        source_concept_id=relationship_data['source_concept_id'],
+                        target_concept_id=relationship_data['target_concept_id'],
+                        relationship_type=relationship_data['relationship_type'],
+                        strength=relationship_data['strength'],
+                        confidence=relationship_data['confidence'],
+                        evidence=[relationship_data['evidence']] if relationship_data['evidence'] else [],
+                        first_observed=meeting_date,
+                        last_observed=meeting_date,
+                        observation_count=relationship_data['co_occurrences'],
+                        context={'source': 'co_occurrence', 'meetings': [meeting_id]}
+                    )
+                    self.relationships[relationship.id] = relationship
+                
+                self.query_index.upsert_relationship(relationship)
+                updated_relationships.append(relationship)
+            
+            return updated_relationships
+            
+        except Exception as e:
+            logger.error("Relationship update failed", error=str(e))
+            return updated_relationships
+    
+    async def _detect_knowledge_evolution(self, concepts: List[Concept],
+                                          meeting_date: datetime) -> List[KnowledgeEvolution]:
+        """Knowledge evolution shown by this meeting's concepts
+        
+        No evolution rules are defined yet, so nothing is reported.
+        """
+        return []
+    
+    async def _update_graph_structure(self, concepts: List[Concept], relationships: List[Relationship]):
+        """Mirror concepts and relationships into the graph as nodes and edges"""
+        self._apply_graph_structure(concepts, relationships)
+    
+    def _apply_graph_structure(self, concepts: List[Concept], relationships: List[Relationship]):
+        for concept in concepts:
+            self.graph.add_node(concept.id, **self._node_attributes(concept))
+        for relationship in relationships:
+            self.graph.add_edge(relationship.source_concept_id, relationship.target_concept_id,
+                                **self._edge_attributes(relationship))
+    
+    @staticmethod
+    def _node_attributes(concept: Concept) -> Dict[str, Any]:
+        return {'name': concept.name, 'concept_type': concept.concept_type.value}
+    
+    @staticmethod
+    def _edge_attributes(relationship: Relationship) -> Dict[str, Any]:
+        return {
+            'relationship_id': relationship.id,
+            'relationship_type': relationship.relationship_type.value,
+            'weight': relationship.strength
+        }
+    
+    async def _calculate_learning_metrics(self, meeting_date: datetime) -> Dict[str, Any]:
+        """Learning metrics for the period ending at ``meeting_date``
+        
+        No learning metrics are defined yet, so the result is empty.
+        """
+        return {}
+    
+    async def _get_graph_statistics(self) -> Dict[str, Any]:
+        """Sizes of the knowledge graph and its histories"""
+        return {
+            'total_concepts': len(self.concepts),
+            'total_relationships': len(self.relationships),
+            'total_evolutions': len(self.evolution_history),
+            'graph_nodes': self.graph.number_of_nodes(),
+            'graph_edges': self.graph.number_of_edges(),
+            'graph_version': self.graph.version
+        }
+    
+    def get_graph_index(self) -> CSRGraphIndex:
+        """CSR index of the graph, refreshed to the current graph version"""
+        self.graph_index.refresh(self.graph, self.concepts)
+        return self.graph_index
+    
+    async def get_top_concepts(self, k: int = 10, concept_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most important concepts right now, optionally of one type"""
+        try:
+            now = datetime.utcnow()
+            return [
+                {
+                    'id': c.id,
+                    'name': c.name,
+                    'type': c.concept_type.value,
+                    'importance_score': self.current_importance(c, now),
+                    'mention_count': c.mention_count,
+                    'last_mentioned': c.last_mentioned.isoformat()
+                } for c in self.top_concepts(k, concept_type, now)
+            ]
+        except Exception as e:
+            logger.error("Top concept lookup failed", error=str(e))
+            return []
+    
+    def current_importance(self, concept: Concept, at: Optional[datetime] = None) -> float:
+        """Importance of a concept at ``at`` (now by default); the stored score is as of its last mention"""
+        return decay_importance(concept.importance_score, concept.last_mentioned,
+                                at or datetime.utcnow(), self.config['importance_decay_factor'])
+    
+    def top_concepts(self, k: int = 10, concept_type: Optional[str] = None,
+                     at: Optional[datetime] = None) -> List[Concept]:
+        """The ``k`` concepts with the highest decayed importance, read off the front of the index"""
+        return self.query_concepts(concept_type=concept_type, limit=k, at=at)['items']
+    
+    def _sync_query_index(self):
+        """Re-index when the concept or relationship dicts were replaced or filled directly"""
+        concepts, relationships = self._indexed_collections
+        if (concepts is not self.concepts or relationships is not self.relationships
+                or self.query_index.indexed_counts() != (len(self.concepts), len(self.relationships))):
+            self._rebuild_query_index()
+    
+    def _rebuild_query_index(self):
+        self.query_index.rebuild(self.concepts, self.relationships)
+        self._indexed_collections = (self.concepts, self.relationships)
+    
+    def query_concepts(self, **filters) -> Dict[str, Any]:
+        """One cursor-paginated page of concepts; see ``KnowledgeGraphQueryIndex.query_concepts``"""
+        self._sync_query_index()
+        return self.query_index.query_concepts(self.concepts, **filters)
+    
+    def query_relationships(self, **filters) -> Dict[str, Any]:
+        """One cursor-paginated page of relationships, strongest first"""
+        self._sync_query_index()
+        return self.query_index.query_relationships(self.relationships, **filters)
+    
+    def get_concept_subgraph(self, concept_id: str, hops: int = 2, limit: int = 100,
+                             relationship_types: Optional[List[str]] = None,
+                             max_edges: int = 500) -> Dict[str, Any]:
+        """Nodes within ``hops`` of a concept (nearest first, at most ``limit``) and the edges among them
+        
+        Node importance is reported decayed to now, like the concept listings.
+        """
+        index = self.get_graph_index()
+        distances = index.k_hop(concept_id, hops, 'both', relationship_types, limit)
+        now = datetime.utcnow()
+        nodes = []
+        for node, distance in distances.items():
+            record = index.record(node)
+            if record is None:
+                nodes.append({'id': node, 'distance': distance})
+                continue
+            importance = decay_importance(record.importance_score, record.last_mentioned, now,
+                                          self.config['importance_decay_factor'])
+            nodes.append({**record.to_dict(), 'importance_score': importance, 'distance': distance})
+        edges = index.induced_edges(distances, relationship_types, max_edges + 1)
+        return {
+            'center': concept_id,
+            'nodes': nodes,
+            'edges': edges[:max_edges],
+            'truncated': len(distances) >= limit or len(edges) > max_edges
+        }
+    
     def _find_concept_by_name(self, name: str) -> Optional[Concept]:
         """Find a concept by name (case-insensitive)"""
         name_lower = name.lower()
@@ -550,7 +908,7 @@ class KnowledgeGraphService:
                 return concept
         return None
     
-    async def get_knowledge_graph_summary(self) -> Dict[str, Any]:
+    async def get_knowledge_graph_summary(self, exact_metrics: bool = False) -> Dict[str, Any]:
         """Get a summary of the current knowledge graph"""
         try:
             # Basic statistics
@@ -567,12 +925,9 @@ class KnowledgeGraphService:
             for relationship in self.relationships.values():
                 relationship_types[relationship.relationship_type.value] += 1
             
-            # Top concepts by importance
-            top_concepts = sorted(
-                self.concepts.values(),
-                key=lambda x: x.importance_score,
-                reverse=True
-            )[:10]
+            # Top concepts by current (decayed) importance
+            now = datetime.utcnow()
+            top_concepts = self.top_concepts(10, at=now)
             
             # Recent evolutions
             recent_evolutions = sorted(
@@ -582,7 +937,7 @@ class KnowledgeGraphService:
             )[:5]
             
             # Graph connectivity metrics
-            connectivity_metrics = await self._calculate_connectivity_metrics()
+            connectivity_metrics = await self._calculate_connectivity_metrics(exact=exact_metrics)
             
             return {
                 'total_concepts': total_concepts,
@@ -593,7 +948,7 @@ class KnowledgeGraphService:
                     {
                         'name': c.name,
                         'type': c.concept_type.value,
-                        'importance_score': c.importance_score,
+                        'importance_score': self.current_importance(c, now),
                         'mention_count': c.mention_count
                     } for c in top_concepts
                 ],
@@ -613,39 +968,338 @@ class KnowledgeGraphService:
             logger.error("Knowledge graph summary generation failed", error=str(e))
             return {'error': 'Summary generation failed'}
     
-    async def _calculate_connectivity_metrics(self) -> Dict[str, float]:
-        """Calculate graph connectivity metrics"""
+    async def _calculate_connectivity_metrics(self, exact: bool = False) -> Dict[str, float]:
+        """Calculate graph connectivity metrics
+        
+        Results are cached per graph version. Clustering comes from the graph's
+        incrementally maintained triangle counts and the average path length from a
+        sampled BFS estimate within ``path_length_relative_error``; ``exact=True``
+        runs the all-pairs networkx computations for offline use.
+        """
         try:
             if not self.graph.nodes():
                 return {'density': 0.0, 'average_clustering': 0.0, 'average_path_length': 0.0}
             
-            # Graph density
-            density = nx.density(self.graph)
+            cache_key = (self.graph.version, exact)
+            if cache_key in self._connectivity_cache:
+                return dict(self._connectivity_cache[cache_key])
             
-            # Average clustering coefficient
-            clustering = nx.average_clustering(self.graph.to_undirected())
-            
-            # Average shortest path length (for connected components)
-            try:
-                if nx.is_connected(self.graph.to_undirected()):
-                    avg_path_length = nx.average_shortest_path_length(self.graph.to_undirected())
-                else:
-                    # Calculate for largest connected component
-                    largest_cc = max(nx.connected_components(self.graph.to_undirected()), key=len)
-                    subgraph = self.graph.subgraph(largest_cc).to_undirected()
-                    avg_path_length = nx.average_shortest_path_length(subgraph)
-            except:
-                avg_path_length = 0.0
+            if exact:
+                metrics = self._exact_connectivity_metrics()
+            else:
+                estimate = estimate_average_path_length(
+                    self.graph.clustering.adjacency,
+                    relative_error=self.config['path_length_relative_error'],
+                    max_samples=self.config['path_length_max_samples']
+                )
+                metrics = {
+                    'density': nx.density(self.graph),
+                    'average_clustering': self.graph.clustering.average_clustering(),
+                    'average_path_length': estimate['average_path_length'],
+                    'path_length_error_bound': estimate['error_bound'],
+                    'path_length_samples': estimate['samples']
+                }
             
-            return {
-                'density': density,
-                'average_clustering': clustering,
-                'average_path_length': avg_path_length
-            }
+            self._connectivity_cache = {cache_key: metrics}
+            return dict(metrics)
             
         except Exception as e:
             logger.error("Connectivity metrics calculation failed", error=str(e))
             return {'density': 0.0, 'average_clustering': 0.0, 'average_path_length': 0.0}
+    
+    def _exact_connectivity_metrics(self) -> Dict[str, float]:
+        """All-pairs connectivity metrics computed by networkx"""
+        undirected = self.graph.to_undirected()
+        
+        # Average shortest path length (for the largest connected component)
+        try:
+            largest_cc = max(nx.connected_components(undirected), key=len)
+            avg_path_length = nx.average_shortest_path_length(undirected.subgraph(largest_cc))
+        except Exception as e:
+            logger.error("Exact path length calculation failed", error=str(e))
+            avg_path_length = 0.0
+        
+        return {
+            'density': nx.density(self.graph),
+            'average_clustering': nx.average_clustering(undirected),
+            'average_path_length': float(avg_path_length),
+            'path_length_error_bound': 0.0,
+            'path_length_samples': undirected.number_of_nodes()
+        }
+    
+    def _persist_meeting_delta(self, meeting_id: str, concepts: List[Concept],
+                               relationships: List[Relationship], evolutions: List[KnowledgeEvolution]):
+        """Append one meeting's changes to the WAL and snapshot on the configured interval"""
+        try:
+            self.store.append({
+                'meeting_id': meeting_id,
+                'concepts': [encode_record(c) for c in concepts],
+                'relationships': [encode_record(r) for r in relationships],
+                'evolutions': [encode_record(e) for e in evolutions],
+                'cooccurrence': self._unpersisted_cooccurrence
+            })
+            self._unpersisted_cooccurrence = []
+            self._deltas_since_snapshot += 1
+            if self._deltas_since_snapshot >= self.config['snapshot_interval_meetings']:
+                self.save_snapshot()
+        except Exception as e:
+            logger.error("Knowledge graph WAL append failed", meeting_id=meeting_id, error=str(e))
+    
+    def _apply_delta(self, delta: Dict[str, Any]):
+        """Replay one WAL delta as upserts of the recorded concept and relationship states"""
+        concepts = [decode_record(Concept, record) for record in delta.get('concepts', [])]
+        relationships = [decode_record(Relationship, record) for record in delta.get('relationships', [])]
+        for concept in concepts:
+            self.concepts[concept.id] = concept
+            self.query_index.upsert_concept(concept)
+        for relationship in relationships:
+            self.relationships[relationship.id] = relationship
+            self.query_index.upsert_relationship(relationship)
+        self.evolution_history.extend(
+            decode_record(KnowledgeEvolution, record) for record in delta.get('evolutions', [])
+        )
+        self.cooccurrence.apply_increments(delta.get('cooccurrence', []))
+        self._apply_graph_structure(concepts, relationships)
+    
+    def save_snapshot(self) -> Optional[int]:
+        """Write a snapshot of the current state and drop the WAL segments it covers"""
+        if not self.store:
+            return None
+        
+        try:
+            start = time.perf_counter()
+            sequence = self.store.write_snapshot(*self._snapshot_tables())
+            self._deltas_since_snapshot = 0
+            logger.info("Knowledge graph snapshot written",
+                       sequence=sequence,
+                       concepts=len(self.concepts),
+                       edges=self.graph.number_of_edges(),
+                       duration_ms=(time.perf_counter() - start) * 1000)
+            return sequence
+        except Exception as e:
+            logger.error("Knowledge graph snapshot failed", error=str(e))
+            return None
+    
+    def _snapshot_tables(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Columnar tables for concepts, relationships, CSR adjacency and co-occurrence counts
+        
+        Every id is interned in one node table (graph nodes first) so concepts,
+        relationship endpoints and adjacency refer to it by integer index. Graph
+        node and edge attributes are derived from concepts and relationships on
+        load; other edges keep only their weight.
+        """
+        node_ids = [str(node) for node in self.graph.nodes]
+        graph_nodes = len(node_ids)
+        index = {node: i for i, node in enumerate(node_ids)}
+        
+        def node_index(node_id: str) -> int:
+            if node_id not in index:
+                index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+            return index[node_id]
+        
+        concepts = list(self.concepts.values())
+        concept_types = list(ConceptType)
+        first_mentioned = encode_datetimes([c.first_mentioned for c in concepts])
+        last_mentioned = encode_datetimes([c.last_mentioned for c in concepts])
+        concept_created = encode_datetimes([c.created_at for c in concepts])
+        concept_table = {
+            'node': np.array([node_index(c.id) for c in concepts], dtype=np.int32),
+            'name': [c.name for c in concepts],
+            'concept_type': np.array([concept_types.index(c.concept_type) for c in concepts], dtype=np.uint8),
+            'description': [c.description for c in concepts],
+            'mention_count': np.array([c.mention_count for c in concepts], dtype=np.int64),
+            'importance_score': np.array([c.importance_score for c in concepts], dtype=np.float64),
+            'first_mentioned': first_mentioned[0], 'first_mentioned_aware': first_mentioned[1],
+            'last_mentioned': last_mentioned[0], 'last_mentioned_aware': last_mentioned[1],
+            'created_at': concept_created[0], 'created_at_aware': concept_created[1],
+            'extras': [
+                json.dumps({
+                    'attributes': c.attributes,
+                    'evolution_history': c.evolution_history,
+                    'related_meetings': sorted(c.related_meetings)
+                }, default=str) for c in concepts
+            ]
+        }
+        
+        relationships = list(self.relationships.values())
+        relationship_index = {r.id: i for i, r in enumerate(relationships)}
+        relationship_types = list(RelationshipType)
+        first_observed = encode_datetimes([r.first_observed for r in relationships])
+        last_observed = encode_datetimes([r.last_observed for r in relationships])
+        relationship_created = encode_datetimes([r.created_at for r in relationships])
+        relationship_table = {
+            'id': [r.id for r in relationships],
+            'source': np.array([node_index(r.source_concept_id) for r in relationships], dtype=np.int32),
+            'target': np.array([node_index(r.target_concept_id) for r in relationships], dtype=np.int32),
+            'relationship_type': np.array([relationship_types.index(r.relationship_type) for r in relationships],
+                                          dtype=np.uint8),
+            'strength': np.array([r.strength for r in relationships], dtype=np.float64),
+            'confidence': np.array([r.confidence for r in relationships], dtype=np.float64),
+            'observation_count': np.array([r.observation_count for r in relationships], dtype=np.int64),
+            'first_observed': first_observed[0], 'first_observed_aware': first_observed[1],
+            'last_observed': last_observed[0], 'last_observed_aware': last_observed[1],
+            'created_at': relationship_created[0], 'created_at_aware': relationship_created[1],
+            'extras': [json.dumps({'evidence': r.evidence, 'context': r.context}, default=str) for r in relationships]
+        }
+        
+        indptr = np.zeros(graph_nodes + 1, dtype=np.int64)
+        indices, edge_relationships, weights = [], [], []
+        for i, node in enumerate(self.graph.nodes):
+            for neighbor, attributes in self.graph.adj[node].items():
+                indices.append(index[str(neighbor)])
+                edge_relationships.append(relationship_index.get(attributes.get('relationship_id'), -1))
+                weights.append(attributes.get('weight', np.nan))
+            indptr[i + 1] = len(indices)
+        
+        tables = {
+            'nodes': {'id': node_ids},
+            'concepts': concept_table,
+            'relationships': relationship_table,
+            'adjacency': {
+                'indptr': indptr,
+                'indices': np.array(indices, dtype=np.int32),
+                'relationship': np.array(edge_relationships, dtype=np.int64),
+                'weight': np.array(weights, dtype=np.float64),
+                'triangles': np.array([self.graph.clustering.triangles[node] for node in self.graph.nodes],
+                                      dtype=np.int64)
+            },
+            'evolutions': {'record': [json.dumps(encode_record(e), default=str) for e in self.evolution_history]},
+            'cooccurrence': self.cooccurrence.to_table(node_index)
+        }
+        return tables, {'graph_nodes': graph_nodes}
+    
+    def _restore_from_store(self):
+        """Load the latest snapshot and replay the WAL tail written after it
+        
+        If that fails the store is detached, leaving its files untouched.
+        """
+        gc_enabled = gc.isenabled()
+        gc.disable()  # Bulk allocation of long-lived records only triggers futile collections
+        try:
+            start = time.perf_counter()
+            snapshot = self.store.load_snapshot()
+            sequence = 0
+            if snapshot:
+                sequence, tables, metadata = snapshot
+                self._restore_snapshot(tables, metadata)
+            
+            replayed = 0
+            for _, delta in self.store.replay(sequence):
+                self._apply_delta(delta)
+                replayed += 1
+            self._deltas_since_snapshot = replayed
+            
+            logger.info("Knowledge graph restored",
+                       snapshot_sequence=sequence,
+                       wal_deltas=replayed,
+                       concepts=len(self.concepts),
+                       edges=self.graph.number_of_edges(),
+                       duration_ms=(time.perf_counter() - start) * 1000)
+        except Exception as e:
+            # Snapshots and compaction would overwrite the durable state with this partial one
+            logger.error("Knowledge graph restore failed, persistence disabled", error=str(e))
+            self.store.close()
+            self.store = None
+        finally:
+            if gc_enabled:
+                gc.enable()
+    
+    def _restore_snapshot(self, tables: Dict[str, Dict[str, Any]], metadata: Dict[str, Any]):
+        node_ids = list(tables['nodes']['id'])
+        
+        columns = tables['concepts']
+        concept_types = list(ConceptType)
+        first_mentioned = decode_datetimes(columns['first_mentioned'], columns['first_mentioned_aware'])
+        last_mentioned = decode_datetimes(columns['last_mentioned'], columns['last_mentioned_aware'])
+        created_at = decode_datetimes(columns['created_at'], columns['created_at_aware'])
+        concepts = {}
+        for i, (node, name, concept_type, description, mention_count, importance, extras) in enumerate(zip(
+                columns['node'].tolist(), columns['name'], columns['concept_type'].tolist(),
+                columns['description'], columns['mention_count'].tolist(),
+                columns['importance_score'].tolist(), columns['extras'].json_values())):
+            concepts[node_ids[node]] = Concept(
+                id=node_ids[node],
+                name=name,
+                concept_type=concept_types[concept_type],
+                description=description,
+                attributes=extras['attributes'],
+                first_mentioned=first_mentioned[i],
+                last_mentioned=last_mentioned[i],
+                mention_count=mention_count,
+                importance_score=importance,
+                evolution_history=extras['evolution_history'],
+                related_meetings=set(extras['related_meetings']),
+                created_at=created_at[i]
+            )
+        
+        columns = tables['relationships']
+        relationship_types = list(RelationshipType)
+        first_observed = decode_datetimes(columns['first_observed'], columns['first_observed_aware'])
+        last_observed = decode_datetimes(columns['last_observed'], columns['last_observed_aware'])
+        created_at = decode_datetimes(columns['created_at'], columns['created_at_aware'])
+        relationship_ids = list(columns['id'])
+        relationship_codes = columns['relationship_type'].tolist()
+        strengths = columns['strength'].tolist()
+        relationship_list = []
+        for i, (relationship_id, source, target, relationship_type, strength, confidence, count, extras) in enumerate(zip(
+                relationship_ids, columns['source'].tolist(), columns['target'].tolist(),
+                relationship_codes, strengths, columns['confidence'].tolist(),
+                columns['observation_count'].tolist(), columns['extras'].json_values())):
+            relationship_list.append(Relationship(
+                id=relationship_id,
+                source_concept_id=node_ids[source],
+                target_concept_id=node_ids[target],
+                relationship_type=relationship_types[relationship_type],
+                strength=strength,
+                confidence=confidence,
+                evidence=extras['evidence'],
+                first_observed=first_observed[i],
+                last_observed=last_observed[i],
+                observation_count=count,
+                context=extras['context'],
+                created_at=created_at[i]
+            ))
+        
+        graph_nodes = node_ids[:metadata['graph_nodes']]
+        type_values = [relationship_type.value for relationship_type in relationship_types]
+        adjacency = tables['adjacency']
+        indptr = adjacency['indptr'].tolist()
+        indices = adjacency['indices'].tolist()
+        edge_relationships = adjacency['relationship'].tolist()
+        weights = adjacency['weight'].tolist()
+        
+        def edges():
+            for i, node in enumerate(graph_nodes):
+                for j in range(indptr[i], indptr[i + 1]):
+                    relationship = edge_relationships[j]
+                    if relationship >= 0:
+                        attributes = {
+                            'relationship_id': relationship_ids[relationship],
+                            'relationship_type': type_values[relationship_codes[relationship]],
+                            'weight': strengths[relationship]
+                        }
+                    else:
+                        attributes = {} if weights[j] != weights[j] else {'weight': weights[j]}
+                    yield node, node_ids[indices[j]], attributes
+        
+        # Triangle counts come from the snapshot, so clustering needs no per-edge intersections
+        graph = VersionedDiGraph()
+        graph.bulk_load(
+            ((node, self._node_attributes(concepts[node]) if node in concepts else {}) for node in graph_nodes),
+            edges(),
+            dict(zip(graph_nodes, adjacency['triangles'].tolist()))
+        )
+        
+        self.concepts = concepts
+        self.relationships = {relationship.id: relationship for relationship in relationship_list}
+        self.evolution_history = [
+            decode_record(KnowledgeEvolution, record) for record in tables['evolutions']['record'].json_values()
+        ]
+        self.graph = graph
+        if 'cooccurrence' in tables:
+            self.cooccurrence = CooccurrenceMatrix.from_table(tables['cooccurrence'], node_ids)
+        self._rebuild_query_index()
 
 # Global service instance
 knowledge_graph_service = KnowledgeGraphService()
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Knowledge Graph Store for Intelligence OS
+Columnar binary snapshots plus an append-only write-ahead log of per-meeting deltas
+"""
+
+import os
+import json
+import fcntl
+import shutil
+import struct
+import zlib
+from dataclasses import fields
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, List, Optional, Any, Iterator, Tuple, Union
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+Column = Union[np.ndarray, List[str]]
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+
+def encode_record(obj: Any) -> Dict[str, Any]:
+    """JSON-ready dict of a dataclass with enums, datetimes and sets converted"""
+    record = {}
+    for f in fields(obj):
+        value = getattr(obj, f.name)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, set):
+            value = sorted(value)
+        record[f.name] = value
+    return record
+
+def decode_record(cls: type, record: Dict[str, Any]) -> Any:
+    """Rebuild a dataclass from ``encode_record`` output using its field types"""
+    values = {}
+    for f in fields(cls):
+        value = record[f.name]
+        if isinstance(f.type, type) and issubclass(f.type, Enum):
+            value = f.type(value)
+        elif f.type is datetime:
+            value = datetime.fromisoformat(value)
+        elif getattr(f.type, '__origin__', None) is set:
+            value = set(value)
+        values[f.name] = value
+    return cls(**values)
+
+def encode_datetimes(values: List[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+    """Microseconds since the epoch plus a timezone-aware flag per datetime"""
+    micros = np.empty(len(values), dtype=np.int64)
+    aware = np.empty(len(values), dtype=np.bool_)
+    for i, value in enumerate(values):
+        aware[i] = value.tzinfo is not None
+        delta = value - _EPOCH_UTC if aware[i] else value - _EPOCH
+        micros[i] = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return micros, aware
+
+def decode_datetimes(micros: np.ndarray, aware: np.ndarray) -> List[datetime]:
+    """Inverse of ``encode_datetimes``; aware values come back in UTC"""
+    naive = np.asarray(micros).astype('datetime64[us]').tolist()
+    return [
+        value.replace(tzinfo=timezone.utc) if is_aware else value
+        for value, is_aware in zip(naive, aware.tolist())
+    ]
+
+class StringColumn:
+    """UTF-8 strings stored as one byte blob and an offsets array, decoded on access"""
+    
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+    
+    @staticmethod
+    def encode(values: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+    
+    def __iter__(self) -> Iterator[str]:
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+    
+    def json_values(self) -> List[Any]:
+        """Parse every value as JSON in a single decoder call"""
+        return json.loads('[' + ','.join(self) + ']')
+
+class KnowledgeGraphStore:
+    """Durable knowledge graph state as a snapshot directory plus WAL segments
+    
+    A snapshot is a set of named tables whose columns are written as ``.npy`` files
+    (string columns as a byte blob plus offsets) and loaded back memory-mapped.
+    Deltas are appended to the WAL as length- and CRC-framed JSON records with a
+    sequence number. Writing a snapshot at sequence ``n`` starts a new WAL segment at
+    ``n + 1`` and drops older segments, so startup reads one snapshot and the tail.
+    A torn record at the end of the log is truncated on replay.
+    
+    The directory has a single owner: the store takes an exclusive ``flock`` on
+    ``LOCK`` and raises ``BlockingIOError`` if another process (such as a second
+    gunicorn worker) holds it, since two writers would reuse sequence numbers and
+    compact away each other's WAL segments. Give each worker its own directory or
+    run one writer process.
+    """
+    
+    HEADER = struct.Struct('<QII')  # sequence, payload length, crc32
+    
+    def __init__(self, directory: str, fsync: bool = True):
+        self.directory = directory
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, 'LOCK'), 'a')
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise
+        self.sequence = self._latest_sequence()
+        self._wal = None
+    
+    def _snapshot_path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{sequence:012d}")
+    
+    def _wal_segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith('wal-') and name.endswith('.log'):
+                segments.append((int(name[4:-4]), os.path.join(self.directory, name)))
+        return sorted(segments)
+    
+    def snapshot_sequence(self) -> int:
+        """Sequence number covered by the current snapshot, 0 if none"""
+        current = os.path.join(self.directory, 'CURRENT')
+        if not os.path.exists(current):
+            return 0
+        with open(current) as f:
+            return int(f.read().strip())
+    
+    def _latest_sequence(self) -> int:
+        sequence = self.snapshot_sequence()
+        for record_sequence, _ in self.replay(sequence):
+            sequence = record_sequence
+        return sequence
+    
+    def append(self, delta: Dict[str, Any]) -> int:
+        """Durably append one delta and return its sequence number"""
+        if self._wal is None:
+            segments = self._wal_segments()
+            path = segments[-1][1] if segments else os.path.join(self.directory, f"wal-{self.sequence + 1:012d}.log")
+            self._wal = open(path, 'ab')
+        
+        self.sequence += 1
+        payload = json.dumps(delta, default=str, separators=(',', ':')).encode('utf-8')
+        self._wal.write(self.HEADER.pack(self.sequence, len(payload), zlib.crc32(payload)) + payload)
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        return self.sequence
+    
+    def replay(self, after_sequence: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """WAL deltas with a sequence above ``after_sequence``, in order"""
+        for _, path in self._wal_segments():
+            with open(path, 'rb') as f:
+                valid_end = 0
+                while True:
+                    header = f.read(self.HEADER.size)
+                    if not header:
+                        break
+                    if len(header) < self.HEADER.size:
+                        self._truncate(path, valid_end)
+                        break
+                    sequence, length, checksum = self.HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != checksum:
+                        self._truncate(path, valid_end)
+                        break
+                    valid_end = f.tell()
+                    if sequence > after_sequence:
+                        yield sequence, json.loads(payload)
+    
+    def _truncate(self, path: str, size: int):
+        logger.warning("Truncating torn knowledge graph WAL record", path=path, size=size)
+        with open(path, 'r+b') as f:
+            f.truncate(size)
+    
+    def write_snapshot(self, tables: Dict[str, Dict[str, Column]], metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Persist tables as the snapshot of everything up to the current sequence"""
+        sequence = self.sequence
+        final_path = self._snapshot_path(sequence)
+        temp_path = final_path + '.tmp'
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        
+        schema = {}
+        for table, columns in tables.items():
+            schema[table] = {}
+            for name, values in columns.items():
+                prefix = os.path.join(temp_path, f"{table}.{name}")
+                if isinstance(values, np.ndarray):
+                    np.save(prefix + '.npy', values)
+                    schema[table][name] = 'array'
+                else:
+                    blob, offsets = StringColumn.encode(values)
+                    np.save(prefix + '.blob.npy', blob)
+                    np.save(prefix + '.offsets.npy', offsets)
+                    schema[table][name] = 'string'
+        
+        with open(os.path.join(temp_path, 'meta.json'), 'w') as f:
+            json.dump({'sequence': sequence, 'schema': schema, 'metadata': metadata or {}}, f)
+        if self.fsync:
+            for name in os.listdir(temp_path):
+                with open(os.path.join(temp_path, name), 'rb') as f:
+                    os.fsync(f.fileno())
+        
+        shutil.rmtree(final_path, ignore_errors=True)
+        os.rename(temp_path, final_path)
+        self._write_current(sequence)
+        self._compact(sequence)
+        return sequence
+    
+    def _write_current(self, sequence: int):
+        temp_current = os.path.join(self.directory, 'CURRENT.tmp')
+        with open(temp_current, 'w') as f:
+            f.write(str(sequence))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temp_current, os.path.join(self.directory, 'CURRENT'))
+    
+    def _compact(self, sequence: int):
+        """Start a new WAL segment after the snapshot and drop what it covers"""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        for first_sequence, path in self._wal_segments():
+            if first_sequence <= sequence:
+                os.remove(path)
+        for name in os.listdir(self.directory):
+            if name.startswith('snapshot-') and not name.endswith(f"{sequence:012d}"):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+    
+    def load_snapshot(self) -> Optional[Tuple[int, Dict[str, Dict[str, Any]], Dict[str, Any]]]:
+        """(sequence, tables, metadata) of the current snapshot with memory-mapped columns"""
+        if not os.path.exists(os.path.join(self.directory, 'CURRENT')):
+            return None
+        sequence = self.snapshot_sequence()
+        
+        path = self._snapshot_path(sequence)
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        
+        tables: Dict[str, Dict[str, Any]] = {}
+        for table, columns in meta['schema'].items():
+            tables[table] = {}
+            for name, kind in columns.items():
+                prefix = os.path.join(path, f"{table}.{name}")
+                if kind == 'array':
+                    tables[table][name] = np.load(prefix + '.npy', mmap_mode='r')
+                else:
+                    tables[table][name] = StringColumn(
+                        np.load(prefix + '.blob.npy', mmap_mode='r'),
+                        np.load(prefix + '.offsets.npy', mmap_mode='r')
+                    )
+        return sequence, tables, meta['metadata']
+    
+    def close(self):
+        """Close the WAL and release the directory lock"""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        self._lock_file.close()
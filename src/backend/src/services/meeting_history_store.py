@@ -0,0 +1,169 @@
+"""
+Meeting History Store for Intelligence OS
+Append-ordered meeting history with a sorted date index, derived columns and optional disk spill
+"""
+
+import os
+import json
+import tempfile
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple, Union
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+class MeetingHistoryStore:
+    """Meeting payloads in arrival order with columnar derived fields
+    
+    Recency windows (``store[-5:]``) index the arrival order directly. Meeting dates
+    are parsed once on append and kept in a sorted array, so period queries are a
+    binary search plus the matches. Derived fields are computed once per meeting by
+    the ``columns`` extractors. With ``spill_path`` set, raw payloads beyond the
+    newest ``max_in_memory`` are written to a JSONL file and read back on access.
+    Each store creates its own file next to ``spill_path`` with an exclusive create
+    and unlinks it at once, keeping only the descriptor. Worker processes sharing
+    the setting never see each other's file, and nothing is left on disk once the
+    store is closed or its process exits.
+    """
+    
+    def __init__(self, columns: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+                 spill_path: Optional[str] = None, max_in_memory: int = 1000):
+        self.extractors = columns or {}
+        self.spill_path = spill_path
+        self.max_in_memory = max_in_memory
+        self._spill_fd: Optional[int] = None  # Unlinked spill file; read with pread from worker threads
+        self._spill_size = 0
+        self.clear()
+    
+    def clear(self):
+        """Drop every stored meeting"""
+        self.close()
+        self._payloads: List[Union[Dict[str, Any], Tuple[int, int]]] = []  # dict, or spill (offset, length)
+        self._spilled = 0  # Payloads before this ordinal live on disk
+        self.columns: Dict[str, List[Any]] = {name: [] for name in self.extractors}
+        self.meeting_ids: List[Any] = []
+        self.timestamps: List[Optional[float]] = []
+        self._dates: List[float] = []  # Sorted epoch seconds
+        self._date_ordinals: List[int] = []  # Ordinal of each entry in _dates
+    
+    @staticmethod
+    def parse_date(value: Any) -> Optional[float]:
+        """Epoch seconds for an ISO string or datetime; naive values are taken as UTC"""
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    
+    def append(self, meeting: Dict[str, Any]):
+        """Store a meeting and index its date and derived fields"""
+        ordinal = len(self._payloads)
+        self._payloads.append(meeting)
+        self.meeting_ids.append(meeting.get('meeting_id'))
+        
+        for name, extractor in self.extractors.items():
+            try:
+                value = extractor(meeting)
+            except Exception as e:
+                logger.error("Meeting column extraction failed", column=name, error=str(e))
+                value = None
+            self.columns[name].append(value)
+        
+        timestamp = self.parse_date(meeting.get('date'))
+        self.timestamps.append(timestamp)
+        if timestamp is not None:
+            position = bisect_right(self._dates, timestamp)
+            self._dates.insert(position, timestamp)
+            self._date_ordinals.insert(position, ordinal)
+        
+        if self.spill_path and ordinal + 1 - self._spilled > self.max_in_memory:
+            self._spill_oldest()
+    
+    def extend(self, meetings: List[Dict[str, Any]]):
+        """Store several meetings in order"""
+        for meeting in meetings:
+            self.append(meeting)
+    
+    def _spill_oldest(self):
+        """Move the oldest in-memory payload to the spill file"""
+        if self._spill_fd is None:
+            directory, name = os.path.split(os.path.abspath(self.spill_path))
+            self._spill_fd, path = tempfile.mkstemp(prefix=f"{name}.", dir=directory)
+            os.unlink(path)
+            self._spill_size = 0
+        
+        line = json.dumps(self._payloads[self._spilled], default=str).encode('utf-8') + b'\n'
+        written = 0
+        while written < len(line):
+            written += os.pwrite(self._spill_fd, line[written:], self._spill_size + written)
+        self._payloads[self._spilled] = (self._spill_size, len(line))
+        self._spill_size += len(line)
+        self._spilled += 1
+    
+    def _load(self, ordinal: int) -> Dict[str, Any]:
+        payload = self._payloads[ordinal]
+        if isinstance(payload, dict):
+            return payload
+        
+        if self._spill_fd is None:
+            raise ValueError("Spilled meeting is no longer available; the store was closed")
+        offset, length = payload
+        return json.loads(os.pread(self._spill_fd, length, offset))
+    
+    def __len__(self) -> int:
+        return len(self._payloads)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self._load(ordinal) for ordinal in range(len(self._payloads))[index]]
+        return self._load(range(len(self._payloads))[index])
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for ordinal in range(len(self._payloads)):
+            yield self._load(ordinal)
+    
+    def window(self, size: int) -> range:
+        """Ordinals of the newest ``size`` meetings"""
+        return range(max(0, len(self._payloads) - size), len(self._payloads))
+    
+    def ordinals_in_period(self, start_date: datetime, end_date: datetime) -> List[int]:
+        """Ordinals of meetings dated within [start_date, end_date], in date order"""
+        start = self.parse_date(start_date)
+        end = self.parse_date(end_date)
+        if start is None or end is None:
+            return []
+        return self._date_ordinals[bisect_left(self._dates, start):bisect_right(self._dates, end)]
+    
+    def in_period(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Meetings dated within [start_date, end_date], in date order"""
+        return [self._load(ordinal) for ordinal in self.ordinals_in_period(start_date, end_date)]
+    
+    def column(self, name: str, ordinals: Optional[List[int]] = None) -> List[Any]:
+        """Derived field values for all meetings or the given ordinals"""
+        values = self.columns[name]
+        if ordinals is None:
+            return list(values)
+        return [values[ordinal] for ordinal in ordinals]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Store size and spill counters"""
+        return {
+            'meetings': len(self._payloads),
+            'dated_meetings': len(self._dates),
+            'in_memory': len(self._payloads) - self._spilled,
+            'spilled': self._spilled,
+            'columns': list(self.columns)
+        }
+    
+    def close(self):
+        """Release the spill file; spilled meetings can no longer be read afterwards"""
+        if self._spill_fd is not None:
+            os.close(self._spill_fd)
+        self._spill_fd = None
+        self._spill_size = 0
@@ -384,20 +384,8 @@ class OrganizationalLearningService:
     def _get_meetings_in_period(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Get meetings within the specified time period"""
         try:
-            relevant_meetings = []
-            
-            for meeting in self.pattern_engine.meeting_history:
-                meeting_date_str = meeting.get('date')
-                if meeting_date_str:
-                    try:
-                        meeting_date = datetime.fromisoformat(meeting_date_str.replace('Z', '+00:00'))
-                        if start_date <= meeting_date <= end_date:
-                            relevant_meetings.append(meeting)
-                    except ValueError:
-                        # Skip meetings with invalid date formats
-                        continue
-            
-            return relevant_meetings
+            # Binary search over the engine's parsed, sorted meeting dates
+            return self.pattern_engine.history_store.in_period(start_date, end_date)
             
         except Exception as e:
             logger.error("Meeting period filtering failed", error=str(e))
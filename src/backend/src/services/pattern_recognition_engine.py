@@ -7,18 +7,23 @@ import os
 import asyncio
 import logging
 import uuid
-from typing import Dict, List, Optional, Any, Union, Tuple, Set
+from typing import Dict, List, Optional, Any, Callable, Union, Tuple, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import re
 import structlog
-from collections import defaultdict, Counter
+from bisect import bisect_right
+from collections import defaultdict, Counter, OrderedDict
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from .meeting_history_store import MeetingHistoryStore
+from .detector_graph import DetectorGraphRunner
 
 logger = structlog.get_logger(__name__)
 
@@ -125,11 +130,213 @@ class SystemicIssue:
     stakeholder_involvement: List[str]
     created_at: datetime = field(default_factory=datetime.utcnow)
 
+class IncrementalChallengeClusterer:
+    """Streaming TF-IDF vectors and k-means centroids for challenges in a meeting window
+    
+    Term counts come from a stateless HashingVectorizer, so each meeting is vectorized
+    once when it enters the window. Document frequencies are running counts over the
+    window, and centroids are updated by MiniBatchKMeans.partial_fit with only the
+    newly added challenges, which keeps cluster labels stable between runs.
+    """
+    
+    def __init__(self, n_clusters: int = 10, n_features: int = 2 ** 16, random_state: int = 42):
+        self.n_clusters = n_clusters
+        self.n_features = n_features
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            stop_words='english',
+            ngram_range=(1, 3),
+            alternate_sign=False,
+            norm=None
+        )
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+        self.fitted = False
+        
+        self.meetings: 'OrderedDict[Any, Tuple[List[Dict[str, Any]], sparse.csr_matrix]]' = OrderedDict()
+        self.document_frequency = np.zeros(n_features)
+        self.document_count = 0
+        self._seed_counts: List[sparse.csr_matrix] = []  # Challenges buffered until the first fit
+    
+    def add_meeting(self, key: Any, challenges: List[Dict[str, Any]]):
+        """Vectorize a meeting's challenges once and fold them into the centroids"""
+        counts = self.vectorizer.transform([challenge['text'] for challenge in challenges])
+        self.meetings[key] = (challenges, counts)
+        self._update_frequency(counts, 1)
+        
+        if counts.shape[0] == 0:
+            return
+        if self.fitted:
+            self.kmeans.partial_fit(self._weight(counts))
+            return
+        
+        self._seed_counts.append(counts)
+        if sum(seed.shape[0] for seed in self._seed_counts) >= self.n_clusters:
+            self.kmeans.partial_fit(self._weight(sparse.vstack(self._seed_counts)))
+            self.fitted = True
+            self._seed_counts = []
+    
+    def remove_meeting(self, key: Any):
+        """Drop a meeting that left the window from the document frequencies"""
+        _, counts = self.meetings.pop(key)
+        self._update_frequency(counts, -1)
+    
+    def _update_frequency(self, counts: sparse.csr_matrix, sign: int):
+        counts.sum_duplicates()
+        self.document_frequency += sign * np.bincount(counts.indices, minlength=self.n_features)
+        self.document_count += sign * counts.shape[0]
+    
+    def _weight(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF with the smoothed IDF of the current window"""
+        idf = np.log((1 + self.document_count) / (1 + self.document_frequency)) + 1
+        return normalize(sparse.csr_matrix(counts.multiply(idf)))
+    
+    def clusters(self) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+        """Challenges in the window grouped by their nearest centroid, or None before the first fit"""
+        if not self.fitted:
+            return None
+        
+        challenges = []
+        matrices = []
+        for meeting_challenges, counts in self.meetings.values():
+            if counts.shape[0]:
+                challenges.extend(meeting_challenges)
+                matrices.append(counts)
+        if not matrices:
+            return {}
+        
+        labels = self.kmeans.predict(self._weight(sparse.vstack(matrices)))
+        clusters = defaultdict(list)
+        for challenge, label in zip(challenges, labels):
+            clusters[int(label)].append(challenge)
+        return dict(clusters)
+
+class SegmentTags:
+    """Template terms and tags found in one lowercased segment"""
+    
+    __slots__ = ('text', 'terms', 'tags', 'matcher')
+    
+    def __init__(self, text: str, terms: Set[str], matcher: 'TemplateMatcher'):
+        self.text = text
+        self.terms = terms
+        self.tags: Set[Tuple[str, ...]] = {tag for term in terms for tag in matcher.term_tags[term]}
+        self.matcher = matcher
+    
+    def has(self, tag: Tuple[str, ...]) -> bool:
+        """Whether any keyword of a template category occurs in the segment"""
+        return tag in self.tags
+    
+    def contains(self, term: str) -> bool:
+        """Whether ``term`` occurs in the segment; terms outside the matcher are searched directly"""
+        if term in self.matcher.term_tags:
+            return term in self.terms
+        return term in self.text
+    
+    def matches(self, keywords: List[str]) -> List[str]:
+        """Keywords that occur in the segment, in the order given"""
+        return [keyword for keyword in keywords if self.contains(keyword)]
+
+class TemplateMatcher:
+    """Every keyword group of the pattern templates compiled into one matcher
+    
+    Nested template dicts are flattened into tag paths such as
+    ``('recurring_challenges', 'severity_indicators', 'high')``. All terms are
+    compiled into a prefix-trie regex that yields the longest term starting at a
+    position; the shorter terms that are prefixes of it come from a precomputed
+    table. A transcript is lowercased once and joined with NUL separators, then
+    searched in one sweep, each hit being mapped back to its segment by offset.
+    All detectors read their categories from the resulting ``SegmentTags``.
+    """
+    
+    def __init__(self, *templates: Dict[str, Any]):
+        self.term_tags: Dict[str, List[Tuple[str, ...]]] = defaultdict(list)
+        for template in templates:
+            self._compile(template, ())
+        self.term_tags = dict(self.term_tags)
+        self.terms = sorted(term for term in self.term_tags if term)
+        
+        # longest term at a position -> every term starting at that position
+        self.prefixes = {
+            term: [other for other in self.terms if term.startswith(other)]
+            for term in self.terms
+        }
+        self.pattern = re.compile(self._trie_pattern(self.terms)) if self.terms else None
+    
+    def _compile(self, node: Union[Dict[str, Any], List[str]], path: Tuple[str, ...]):
+        if isinstance(node, dict):
+            for key, child in node.items():
+                self._compile(child, path + (key,))
+            return
+        
+        for term in node:
+            if path not in self.term_tags[term]:
+                self.term_tags[term].append(path)
+    
+    @staticmethod
+    def _trie_pattern(terms: List[str]) -> str:
+        """Regex for a set of literals with shared prefixes factored out, longest match first"""
+        trie: Dict[str, Any] = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = True
+        
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if '' in node:
+                return f"(?:{body})?"
+            return body
+        
+        return build(trie)
+    
+    def _hits(self, text: str) -> List[Tuple[int, str]]:
+        """Start offset and longest term of every position where a term begins
+        
+        The search restarts one character after each hit, so terms overlapping a
+        longer match are still found while text without a term start is skipped
+        inside the regex engine.
+        """
+        hits = []
+        if self.pattern is None:
+            return hits
+        search = self.pattern.search
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            hits.append((start, match.group()))
+            match = search(text, start + 1)
+        return hits
+    
+    def scan(self, text: str) -> SegmentTags:
+        """Tag one piece of text"""
+        text = text.lower()
+        terms = set()
+        for _, longest in self._hits(text):
+            terms.update(self.prefixes[longest])
+        return SegmentTags(text, terms, self)
+    
+    def scan_segments(self, segments: List[Dict[str, Any]]) -> List[SegmentTags]:
+        """Tag the text of each transcript segment in a single scan of the transcript"""
+        texts = [segment.get('text', '').lower() for segment in segments]
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+        
+        found: Dict[int, Set[str]] = defaultdict(set)
+        for offset, longest in self._hits('\x00'.join(texts)):
+            found[bisect_right(starts, offset) - 1].update(self.prefixes[longest])
+        
+        return [SegmentTags(text, found.get(index, set()), self) for index, text in enumerate(texts)]
+
 class PatternRecognitionEngine:
     """Engine for detecting patterns across multiple meetings"""
     
     def __init__(self):
-        self.meeting_history = []  # Store meeting data for analysis
         self.detected_patterns = {}  # Cache of detected patterns
         self.best_practices = {}  # Cache of identified best practices
         self.emotional_indicators = {}  # Cache of emotional fatigue indicators
@@ -140,7 +347,9 @@ class PatternRecognitionEngine:
             'min_occurrences': 3,  # Minimum occurrences to consider a pattern
             'min_confidence': 0.6,  # Minimum confidence score
             'similarity_threshold': 0.7,  # Similarity threshold for clustering
-            'time_window_days': 90  # Time window for pattern analysis
+            'time_window_days': 90,  # Time window for pattern analysis
+            'challenge_window_meetings': int(os.getenv('PATTERN_CHALLENGE_WINDOW_MEETINGS', '10')),
+            'max_challenge_clusters': 10
         }
         
         # Text analysis components
@@ -149,9 +358,46 @@ class PatternRecognitionEngine:
             stop_words='english',
             ngram_range=(1, 3)
         )
+        self.incremental_clustering = os.getenv('PATTERN_INCREMENTAL_CLUSTERING', 'true').lower() == 'true'
+        self.challenge_clusterer = IncrementalChallengeClusterer(
+            n_clusters=self.pattern_thresholds['max_challenge_clusters']
+        )
+        
+        # Independent detectors run concurrently; an optional deadline returns partial results
+        self.detector_runner = DetectorGraphRunner(
+            max_workers=int(os.getenv('PATTERN_DETECTOR_WORKERS', '4')),
+            thread_name_prefix="pattern_detector"
+        )
+        self.analysis_deadline_seconds = float(os.getenv('PATTERN_ANALYSIS_DEADLINE_SECONDS', '0')) or None
         
         # Pattern templates for common organizational patterns
         self.pattern_templates = self._initialize_pattern_templates()
+        self.style_contexts = {
+            'interrupting': ['but', 'however', 'wait', 'actually'],
+            'dominating': ['i think', 'we should', 'let me', 'i will'],
+            'collaborative': ['what do you think', 'together', 'we could', 'how about'],
+            'supportive': ['great idea', 'i agree', 'that makes sense', 'good point']
+        }
+        self.template_matcher = TemplateMatcher(self.pattern_templates, {'style_contexts': self.style_contexts})
+        
+        # Meeting history with a date index and derived columns, shared with learning services
+        self.history_store = MeetingHistoryStore(
+            columns={
+                'success_score': self._calculate_meeting_success_score
+            },
+            spill_path=os.getenv('MEETING_HISTORY_SPILL_PATH'),
+            max_in_memory=int(os.getenv('MEETING_HISTORY_MAX_IN_MEMORY', '1000'))
+        )
+    
+    @property
+    def meeting_history(self) -> MeetingHistoryStore:
+        """Meeting data stored for analysis, in arrival order"""
+        return self.history_store
+    
+    @meeting_history.setter
+    def meeting_history(self, meetings: List[Dict[str, Any]]):
+        self.history_store.clear()
+        self.history_store.extend(meetings)
     
     def _initialize_pattern_templates(self) -> Dict[str, Dict[str, Any]]:
         """Initialize templates for common organizational patterns"""
@@ -201,30 +447,39 @@ class PatternRecognitionEngine:
             }
         }
     
-    async def analyze_meeting_patterns(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze patterns in a single meeting and update historical analysis"""
+    async def analyze_meeting_patterns(self, meeting_data: Dict[str, Any],
+                                       deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze patterns in a single meeting and update historical analysis
+        
+        Detectors run concurrently. With ``deadline_seconds`` (or
+        PATTERN_ANALYSIS_DEADLINE_SECONDS) the result holds the detectors that finished
+        in time and is flagged ``partial``, listing the rest in ``pending_detectors``.
+        Detectors left running by a previous call are waited for before this meeting
+        is added, since they read the history and update the challenge clusterer.
+        """
         try:
             meeting_id = meeting_data.get('meeting_id', str(uuid.uuid4()))
             
             logger.info("Analyzing meeting patterns", meeting_id=meeting_id)
             
-            # Add meeting to history
+            # Add meeting to history once no earlier detector is still reading it
+            await self.detector_runner.wait_idle()
             self.meeting_history.append(meeting_data)
             
-            # Detect patterns in current meeting
-            current_patterns = await self._detect_current_meeting_patterns(meeting_data)
-            
-            # Update cross-meeting pattern analysis
-            cross_meeting_patterns = await self._analyze_cross_meeting_patterns()
+            run = await self.detector_runner.run(
+                self._build_detector_graph(meeting_data),
+                deadline_seconds or self.analysis_deadline_seconds
+            )
             
-            # Detect best practices
-            best_practices = await self._detect_best_practices()
+            # Detect patterns in current meeting
+            current_patterns = run.results.get('current_meeting_patterns', [])
             
-            # Identify emotional fatigue indicators
-            emotional_indicators = await self._detect_emotional_fatigue()
+            # Cross-meeting patterns in detector order
+            cross_meeting_patterns = self._record_cross_meeting_patterns(run.results)
             
-            # Identify systemic issues
-            systemic_issues = await self._identify_systemic_issues()
+            best_practices = run.results.get('best_practices', [])
+            emotional_indicators = run.results.get('emotional_indicators', [])
+            systemic_issues = run.results.get('systemic_issues', [])
             
             analysis_result = {
                 'meeting_id': meeting_id,
@@ -236,13 +491,19 @@ class PatternRecognitionEngine:
                 'analysis_timestamp': datetime.utcnow().isoformat(),
                 'confidence_score': self._calculate_analysis_confidence(
                     current_patterns, cross_meeting_patterns
-                )
+                ),
+                'partial': run.partial,
+                'pending_detectors': run.pending,
+                'failed_detectors': run.failed,
+                'detector_timings_ms': run.timings_ms
             }
             
             logger.info("Meeting pattern analysis completed", 
                        meeting_id=meeting_id,
                        patterns_detected=len(cross_meeting_patterns),
-                       best_practices_found=len(best_practices))
+                       best_practices_found=len(best_practices),
+                       partial=run.partial,
+                       elapsed_ms=round(run.elapsed_ms, 1))
             
             return analysis_result
             
@@ -250,6 +511,45 @@ class PatternRecognitionEngine:
             logger.error("Meeting pattern analysis failed", error=str(e))
             raise
     
+    CROSS_MEETING_DETECTORS = (
+        'recurring_challenges', 'cross_meeting_behavioral', 'decision_making', 'strategic_alignment'
+    )
+    
+    def _build_detector_graph(self, meeting_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Detectors of analyze_meeting_patterns as ``{name: (coroutine function, depends_on)}``"""
+        detectors = {
+            'current_meeting_patterns': (lambda: self._detect_current_meeting_patterns(meeting_data), []),
+            'best_practices': (lambda: self._detect_best_practices(), []),
+            'emotional_indicators': (lambda: self._detect_emotional_fatigue(), []),
+            'systemic_issues': (lambda: self._identify_systemic_issues(), [])
+        }
+        
+        for name, detector in self._cross_meeting_detectors().items():
+            detectors[name] = (detector, [])
+        
+        return detectors
+    
+    def _cross_meeting_detectors(self) -> Dict[str, Callable]:
+        """Cross-meeting detectors in CROSS_MEETING_DETECTORS order, or none before 2 meetings are stored"""
+        if len(self.meeting_history) < 2:
+            return {}
+        
+        # Looked up when run, so a failing detector is reported by the runner
+        detectors = {
+            'recurring_challenges': lambda: self._detect_recurring_challenges(),
+            'cross_meeting_behavioral': lambda: self._detect_cross_meeting_behavioral_patterns(),
+            'decision_making': lambda: self._detect_decision_making_patterns(),
+            'strategic_alignment': lambda: self._detect_strategic_patterns()
+        }
+        return {name: detectors[name] for name in self.CROSS_MEETING_DETECTORS}
+    
+    def _record_cross_meeting_patterns(self, results: Dict[str, List[DetectedPattern]]) -> List[DetectedPattern]:
+        """Cross-meeting detector results in detector order, added to the pattern cache"""
+        patterns = [pattern for name in self.CROSS_MEETING_DETECTORS for pattern in results.get(name, [])]
+        for pattern in patterns:
+            self.detected_patterns[pattern.id] = pattern
+        return patterns
+    
     async def _detect_current_meeting_patterns(self, meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Detect patterns within a single meeting"""
         try:
@@ -279,8 +579,9 @@ class PatternRecognitionEngine:
             
         except Exception as e:
             logger.error("Current meeting pattern detection failed", error=str(e))
-            return []  
-  async def _analyze_transcript_patterns(self, transcript_data: Dict[str, Any], 
+            return []
+    
+    async def _analyze_transcript_patterns(self, transcript_data: Dict[str, Any], 
                                           meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Analyze transcript for recurring challenge and behavioral patterns"""
         try:
@@ -293,12 +594,15 @@ class PatternRecognitionEngine:
             # Combine all text for analysis
             full_text = ' '.join([segment.get('text', '') for segment in segments])
             
+            # Tag every segment once for all template detectors
+            segment_tags = self.template_matcher.scan_segments(segments)
+            
             # Detect recurring challenges
-            challenge_patterns = self._detect_challenge_patterns(segments, meeting_data)
+            challenge_patterns = self._detect_challenge_patterns(segments, meeting_data, segment_tags)
             patterns.extend(challenge_patterns)
             
             # Detect behavioral patterns
-            behavioral_patterns = self._detect_behavioral_patterns(segments, meeting_data)
+            behavioral_patterns = self._detect_behavioral_patterns(segments, meeting_data, segment_tags)
             patterns.extend(behavioral_patterns)
             
             # Detect emotional patterns
@@ -312,7 +616,8 @@ class PatternRecognitionEngine:
             return []
     
     def _detect_challenge_patterns(self, segments: List[Dict[str, Any]], 
-                                 meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                 meeting_data: Dict[str, Any],
+                                 segment_tags: Optional[List[SegmentTags]] = None) -> List[Dict[str, Any]]:
         """Detect recurring challenge patterns in transcript"""
         patterns = []
         
@@ -320,21 +625,20 @@ class PatternRecognitionEngine:
             challenge_template = self.pattern_templates['recurring_challenges']
             challenge_keywords = challenge_template['keywords']
             context_indicators = challenge_template['context_indicators']
+            segment_tags = segment_tags or self.template_matcher.scan_segments(segments)
             
-            for segment in segments:
-                text = segment.get('text', '').lower()
+            for segment, tags in zip(segments, segment_tags):
+                text = tags.text
                 speaker = segment.get('speaker', 'Unknown')
                 
                 # Check for challenge keywords
-                challenge_mentions = [kw for kw in challenge_keywords if kw in text]
-                
-                if challenge_mentions:
+                if tags.has(('recurring_challenges', 'keywords')):
                     # Check for recurring context indicators
-                    recurring_indicators = [ci for ci in context_indicators if ci in text]
-                    
-                    if recurring_indicators:
+                    if tags.has(('recurring_challenges', 'context_indicators')):
                         # This might be a recurring challenge
-                        severity = self._assess_challenge_severity(text, challenge_template)
+                        challenge_mentions = tags.matches(challenge_keywords)
+                        recurring_indicators = tags.matches(context_indicators)
+                        severity = self._assess_challenge_severity(text, challenge_template, tags)
                         
                         patterns.append({
                             'type': PatternType.RECURRING_CHALLENGE.value,
@@ -354,15 +658,17 @@ class PatternRecognitionEngine:
             return []
     
     def _detect_behavioral_patterns(self, segments: List[Dict[str, Any]], 
-                                  meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                  meeting_data: Dict[str, Any],
+                                  segment_tags: Optional[List[SegmentTags]] = None) -> List[Dict[str, Any]]:
         """Detect behavioral patterns in participant interactions"""
         patterns = []
         
         try:
             behavioral_template = self.pattern_templates['behavioral_patterns']
+            segment_tags = segment_tags or self.template_matcher.scan_segments(segments)
             
             # Analyze communication styles
-            communication_patterns = self._analyze_communication_styles(segments, behavioral_template)
+            communication_patterns = self._analyze_communication_styles(segments, behavioral_template, segment_tags)
             patterns.extend(communication_patterns)
             
             # Analyze decision-making patterns
@@ -380,21 +686,27 @@ class PatternRecognitionEngine:
             return []
     
     def _analyze_communication_styles(self, segments: List[Dict[str, Any]], 
-                                    behavioral_template: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                    behavioral_template: Dict[str, Any],
+                                    segment_tags: Optional[List[SegmentTags]] = None) -> List[Dict[str, Any]]:
         """Analyze communication style patterns"""
         patterns = []
         
         try:
             communication_styles = behavioral_template['communication_styles']
             speaker_styles = defaultdict(list)
+            segment_tags = segment_tags or self.template_matcher.scan_segments(segments)
+            compiled_styles = all(style in self.template_matcher.term_tags for style in communication_styles)
             
-            for segment in segments:
-                text = segment.get('text', '').lower()
+            for segment, tags in zip(segments, segment_tags):
+                if compiled_styles and not tags.terms:
+                    continue  # No style or style context can occur without a template term
+                
+                text = tags.text
                 speaker = segment.get('speaker', 'Unknown')
                 
                 # Identify communication style indicators
                 for style in communication_styles:
-                    if style in text or self._check_style_context(text, style):
+                    if tags.contains(style) or self._check_style_context(text, style, tags):
                         speaker_styles[speaker].append({
                             'style': style,
                             'context': text[:100],
@@ -425,34 +737,12 @@ class PatternRecognitionEngine:
             return []
     
     async def _analyze_cross_meeting_patterns(self) -> List[DetectedPattern]:
-        """Analyze patterns across multiple meetings"""
+        """Run the cross-meeting detectors of analyze_meeting_patterns one after another"""
         try:
-            if len(self.meeting_history) < 2:
-                return []  # Need at least 2 meetings for cross-meeting analysis
-            
-            detected_patterns = []
-            
-            # Analyze recurring challenges across meetings
-            challenge_patterns = await self._detect_recurring_challenges()
-            detected_patterns.extend(challenge_patterns)
-            
-            # Analyze behavioral consistency across meetings
-            behavioral_patterns = await self._detect_cross_meeting_behavioral_patterns()
-            detected_patterns.extend(behavioral_patterns)
-            
-            # Analyze decision-making patterns
-            decision_patterns = await self._detect_decision_making_patterns()
-            detected_patterns.extend(decision_patterns)
-            
-            # Analyze strategic alignment patterns
-            strategic_patterns = await self._detect_strategic_patterns()
-            detected_patterns.extend(strategic_patterns)
-            
-            # Update pattern cache
-            for pattern in detected_patterns:
-                self.detected_patterns[pattern.id] = pattern
-            
-            return detected_patterns
+            results = {}
+            for name, detector in self._cross_meeting_detectors().items():
+                results[name] = await detector()
+            return self._record_cross_meeting_patterns(results)
             
         except Exception as e:
             logger.error("Cross-meeting pattern analysis failed", error=str(e))
@@ -462,18 +752,23 @@ class PatternRecognitionEngine:
         """Detect challenges that appear across multiple meetings"""
         try:
             patterns = []
+            window = self.meeting_history.window(self.pattern_thresholds['challenge_window_meetings'])
             
-            # Extract all challenge mentions from meeting history
-            all_challenges = []
-            for meeting in self.meeting_history[-10:]:  # Last 10 meetings
-                meeting_challenges = self._extract_meeting_challenges(meeting)
-                all_challenges.extend(meeting_challenges)
-            
-            if not all_challenges:
-                return patterns
-            
-            # Cluster similar challenges
-            challenge_clusters = self._cluster_similar_challenges(all_challenges)
+            if self.incremental_clustering:
+                # Only meetings new to the window are extracted and vectorized
+                challenge_clusters = self._cluster_window_challenges(window)
+            else:
+                # Extract all challenge mentions from meeting history
+                all_challenges = []
+                for meeting in self.meeting_history[window.start:window.stop]:
+                    meeting_challenges = self._extract_meeting_challenges(meeting)
+                    all_challenges.extend(meeting_challenges)
+                
+                if not all_challenges:
+                    return patterns
+                
+                # Cluster similar challenges
+                challenge_clusters = self._cluster_similar_challenges(all_challenges)
             
             # Create patterns for clusters with multiple occurrences
             for cluster_id, cluster_challenges in challenge_clusters.items():
@@ -488,6 +783,33 @@ class PatternRecognitionEngine:
             logger.error("Recurring challenge detection failed", error=str(e))
             return []
     
+    def _cluster_window_challenges(self, window: range) -> Dict[int, List[Dict[str, Any]]]:
+        """Cluster challenges of the meetings at the ``window`` ordinals with the incremental clusterer
+        
+        Meetings are keyed by store ordinal and meeting id, not object identity:
+        spilled payloads come back as new dicts on every load.
+        """
+        clusterer = self.challenge_clusterer
+        history = self.history_store
+        keys = [(ordinal, history.meeting_ids[ordinal]) for ordinal in window]
+        
+        live = set(keys)
+        for key in [key for key in clusterer.meetings if key not in live]:
+            clusterer.remove_meeting(key)
+        
+        for key in keys:
+            if key not in clusterer.meetings:
+                clusterer.add_meeting(key, self._extract_meeting_challenges(history[key[0]]))
+        
+        clusters = clusterer.clusters()
+        if clusters is None:
+            # Too few challenges to seed the centroids yet
+            all_challenges = [
+                challenge for challenges, _ in clusterer.meetings.values() for challenge in challenges
+            ]
+            return self._cluster_similar_challenges(all_challenges)
+        return clusters
+    
     def _extract_meeting_challenges(self, meeting_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract challenge mentions from a single meeting"""
         challenges = []
@@ -497,20 +819,16 @@ class PatternRecognitionEngine:
             transcript_data = meeting_data.get('transcript_analysis', {})
             segments = transcript_data.get('segments', [])
             
-            challenge_keywords = self.pattern_templates['recurring_challenges']['keywords']
-            
-            for segment in segments:
-                text = segment.get('text', '').lower()
-                
+            for segment, tags in zip(segments, self.template_matcher.scan_segments(segments)):
                 # Check for challenge keywords
-                if any(keyword in text for keyword in challenge_keywords):
+                if tags.has(('recurring_challenges', 'keywords')):
                     challenges.append({
                         'text': segment.get('text', ''),
                         'speaker': segment.get('speaker', 'Unknown'),
                         'timestamp': segment.get('timestamp'),
                         'meeting_id': meeting_data.get('meeting_id'),
                         'meeting_date': meeting_data.get('date'),
-                        'context': self._extract_challenge_context(text)
+                        'context': self._extract_challenge_context(tags.text, tags)
                     })
             
             # Extract from identified risks
@@ -531,6 +849,12 @@ class PatternRecognitionEngine:
             logger.error("Challenge extraction failed", error=str(e))
             return []
     
+    def _extract_challenge_context(self, text: str, tags: Optional[SegmentTags] = None) -> str:
+        """Recurrence indicator mentioned alongside a challenge"""
+        tags = tags or self.template_matcher.scan(text)
+        indicators = tags.matches(self.pattern_templates['recurring_challenges']['context_indicators'])
+        return indicators[0] if indicators else 'general'
+    
     def _cluster_similar_challenges(self, challenges: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
         """Cluster similar challenges using text similarity"""
         try:
@@ -647,8 +971,9 @@ class PatternRecognitionEngine:
                 impact_analysis={},
                 intervention_recommendations=["Review pattern analysis methodology"],
                 confidence_score=0.1
-            )   
- async def _detect_best_practices(self) -> List[BestPractice]:
+            )
+    
+    async def _detect_best_practices(self) -> List[BestPractice]:
         """Detect best practices from successful meeting patterns"""
         try:
             best_practices = []
@@ -683,10 +1008,10 @@ class PatternRecognitionEngine:
         successful_meetings = []
         
         try:
-            for meeting in self.meeting_history:
-                success_score = self._calculate_meeting_success_score(meeting)
-                
-                if success_score >= 0.7:  # High success threshold
+            # Scores are computed once per meeting when it is stored
+            for ordinal, success_score in enumerate(self.history_store.column('success_score')):
+                if success_score is not None and success_score >= 0.7:  # High success threshold
+                    meeting = self.history_store[ordinal]
                     meeting['success_score'] = success_score
                     successful_meetings.append(meeting)
             
@@ -795,11 +1120,10 @@ class PatternRecognitionEngine:
                 transcript_data = meeting.get('transcript_analysis', {})
                 segments = transcript_data.get('segments', [])
                 
-                for segment in segments:
-                    text = segment.get('text', '').lower()
+                for segment, tags in zip(segments, self.template_matcher.scan_segments(segments)):
                     speaker = segment.get('speaker', 'Unknown')
                     
-                    fatigue_mentions = [kw for kw in fatigue_keywords if kw in text]
+                    fatigue_mentions = tags.matches(fatigue_keywords)
                     if fatigue_mentions:
                         participant_fatigue[speaker].append({
                             'meeting_id': meeting.get('meeting_id'),
@@ -932,29 +1256,24 @@ class PatternRecognitionEngine:
             return []
     
     # Helper methods for pattern analysis
-    def _assess_challenge_severity(self, text: str, template: Dict[str, Any]) -> str:
+    def _assess_challenge_severity(self, text: str, template: Dict[str, Any],
+                                   tags: Optional[SegmentTags] = None) -> str:
         """Assess severity of a challenge based on text content"""
         severity_indicators = template['severity_indicators']
         
-        text_lower = text.lower()
+        tags = tags or self.template_matcher.scan(text)
         
         for severity, keywords in severity_indicators.items():
-            if any(keyword in text_lower for keyword in keywords):
+            if any(tags.contains(keyword) for keyword in keywords):
                 return severity
         
         return 'medium'  # Default severity
     
-    def _check_style_context(self, text: str, style: str) -> bool:
+    def _check_style_context(self, text: str, style: str, tags: Optional[SegmentTags] = None) -> bool:
         """Check if text context matches a communication style"""
-        style_contexts = {
-            'interrupting': ['but', 'however', 'wait', 'actually'],
-            'dominating': ['i think', 'we should', 'let me', 'i will'],
-            'collaborative': ['what do you think', 'together', 'we could', 'how about'],
-            'supportive': ['great idea', 'i agree', 'that makes sense', 'good point']
-        }
-        
-        if style in style_contexts:
-            return any(context in text for context in style_contexts[style])
+        if style in self.style_contexts:
+            tags = tags or self.template_matcher.scan(text)
+            return tags.has(('style_contexts', style))
         
         return False
     
@@ -988,4 +1307,4 @@ class PatternRecognitionEngine:
             
         except Exception as e:
             logger.error("Confidence calculation failed", error=str(e))
-            return 0.5
\ No newline at end of file
+            return 0.5
@@ -3,6 +3,7 @@ Predictive Analytics Service
 Provides forecasting and predictive insights for organizational patterns and trends
 """
 
+import os
 import asyncio
 import logging
 import uuid
@@ -13,9 +14,7 @@ from enum import Enum
 import structlog
 from collections import defaultdict, deque
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import mean_squared_error, r2_score
+from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -118,6 +117,116 @@ class RiskForecast:
     impact_severity: str
     confidence_score: float
 
+class OnlineLeastSquares:
+    """Running sufficient statistics for a polynomial least-squares fit of value on time
+    
+    Points are added and removed in O(1); fits solve the small normal equations from
+    the power sums instead of refitting over the stored series. Time is measured in
+    days from ``origin`` to keep the power sums well conditioned.
+    """
+    
+    SECONDS_PER_DAY = 86400.0
+    
+    def __init__(self, max_degree: int = 2, origin: Optional[datetime] = None):
+        self.max_degree = max_degree
+        self.origin = origin
+        self.count = 0
+        self.x_power_sums = np.zeros(2 * max_degree + 1)  # sum(x^k)
+        self.xy_sums = np.zeros(max_degree + 1)  # sum(x^k * y)
+        self.y_squared_sum = 0.0
+    
+    def _days(self, timestamp: datetime) -> float:
+        if self.origin is None:
+            self.origin = timestamp
+        return (timestamp - self.origin).total_seconds() / self.SECONDS_PER_DAY
+    
+    def _update(self, timestamp: datetime, value: float, sign: float):
+        x = self._days(timestamp)
+        powers = x ** np.arange(2 * self.max_degree + 1)
+        self.count += int(sign)
+        self.x_power_sums += sign * powers
+        self.xy_sums += sign * value * powers[:self.max_degree + 1]
+        self.y_squared_sum += sign * value * value
+    
+    def add(self, timestamp: datetime, value: float):
+        """Include one observation"""
+        self._update(timestamp, value, 1.0)
+    
+    def remove(self, timestamp: datetime, value: float):
+        """Exclude an observation that left the window"""
+        self._update(timestamp, value, -1.0)
+    
+    def fit(self, degree: int) -> Tuple[np.ndarray, float]:
+        """Coefficients (lowest order first) and residual sum of squares"""
+        size = degree + 1
+        normal = np.array([[self.x_power_sums[i + j] for j in range(size)] for i in range(size)])
+        rhs = self.xy_sums[:size]
+        coefficients = np.linalg.lstsq(normal, rhs, rcond=None)[0]
+        residual = self.y_squared_sum - 2 * coefficients @ rhs + coefficients @ normal @ coefficients
+        return coefficients, max(float(residual), 0.0)
+
+class HeldOutScore:
+    """Running out-of-sample R² of a series' forecasts
+    
+    Each point is scored against the model fitted before it arrived, so the score
+    measures forecast error on points the model had not seen rather than the
+    in-sample fit. A point's error is removed again when it leaves the window.
+    """
+    
+    def __init__(self):
+        self.count = 0
+        self.squared_error_sum = 0.0
+        self.value_sum = 0.0
+        self.value_squared_sum = 0.0
+    
+    def _update(self, value: float, error: float, sign: float):
+        self.count += int(sign)
+        self.squared_error_sum += sign * error * error
+        self.value_sum += sign * value
+        self.value_squared_sum += sign * value * value
+    
+    def add(self, value: float, error: float):
+        """Include a point scored before it was fitted"""
+        self._update(value, error, 1.0)
+    
+    def remove(self, value: float, error: float):
+        """Exclude a scored point that left the window"""
+        self._update(value, error, -1.0)
+    
+    def r_squared(self) -> Optional[float]:
+        """Out-of-sample R², or None until two distinct values were scored"""
+        if self.count < 2:
+            return None
+        total = self.value_squared_sum - self.value_sum ** 2 / self.count
+        if total <= 0:
+            return None
+        return max(0.0, 1 - self.squared_error_sum / total)
+
+@dataclass
+class FittedTrendModel:
+    """Trend model fitted from running statistics for one data version"""
+    variable_name: str
+    data_version: int
+    degree: int
+    coefficients: np.ndarray
+    origin: datetime
+    last_timestamp: datetime
+    std_error: float
+    residual_dof: int
+    accuracy: float
+    data_points: int
+    
+    def interval_half_width(self, confidence: float = 0.95) -> float:
+        """Half-width of a two-sided interval from the residual standard error"""
+        return float(stats.t.ppf(0.5 + confidence / 2, self.residual_dof) * self.std_error)
+    
+    def predict(self, timestamps: List[datetime]) -> np.ndarray:
+        """Predicted values at the given timestamps"""
+        days = np.array([
+            (ts - self.origin).total_seconds() / OnlineLeastSquares.SECONDS_PER_DAY for ts in timestamps
+        ])
+        return np.polynomial.polynomial.polyval(days, self.coefficients)
+
 class PredictiveAnalyticsService:
     """Service for predictive analytics and forecasting"""
     
@@ -131,7 +240,23 @@ class PredictiveAnalyticsService:
         self.time_series_data = defaultdict(lambda: deque(maxlen=1000))  # variable -> time series
         
         # Forecasting models
-        self.models = {}
+        self.models: Dict[str, FittedTrendModel] = {}  # variable -> model for its current data version
+        self.estimators: Dict[str, OnlineLeastSquares] = {}  # variable -> running least-squares statistics
+        self.held_out_scores: Dict[str, HeldOutScore] = {}  # variable -> forecast error on unseen points
+        self.data_versions = defaultdict(int)  # variable -> number of changes to its series
+        self.forecast_cache = {}  # (variable, horizon) -> ForecastResult for the model's data version
+        
+        # Debounced model refresh
+        self._pending_refresh = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._evictions = defaultdict(int)
+        self.cache_stats = {
+            'model_hits': 0,
+            'model_refits': 0,
+            'forecast_hits': 0,
+            'forecast_misses': 0,
+            'refresh_batches': 0
+        }
         
         # Configuration
         self.config = {
@@ -140,7 +265,10 @@ class PredictiveAnalyticsService:
             'anomaly_detection_threshold': 2.0,  # standard deviations
             'trend_significance_threshold': 0.05,
             'seasonal_detection_min_periods': 4,
-            'max_forecast_horizon_days': 365
+            'max_forecast_horizon_days': 365,
+            'nonlinear_trend_improvement': 0.2,  # Residual reduction required for a quadratic trend
+            'default_model_accuracy': 0.5,  # Until enough points were scored out of sample
+            'forecast_refresh_debounce_seconds': float(os.getenv('FORECAST_REFRESH_DEBOUNCE_SECONDS', '2.0'))
         }
     
     async def add_time_series_data(self, variable_name: str, timestamp: datetime, value: float,
@@ -153,50 +281,179 @@ class PredictiveAnalyticsService:
                 'metadata': metadata or {}
             }
             
-            self.time_series_data[variable_name].append(data_point)
+            series = self.time_series_data[variable_name]
+            estimator = self.estimators.get(variable_name)
+            if estimator is None:
+                estimator = self.estimators[variable_name] = OnlineLeastSquares()
+            score = self.held_out_scores.get(variable_name)
+            if score is None:
+                score = self.held_out_scores[variable_name] = HeldOutScore()
+            
+            # Score the point against the current model before it is fitted
+            model = self.models.get(variable_name)
+            if model is not None:
+                data_point['forecast_error'] = float(value - model.predict([timestamp])[0])
+                score.add(value, data_point['forecast_error'])
+            
+            # The deque drops its oldest point when full; keep the statistics in step
+            if len(series) == series.maxlen:
+                evicted = series[0]
+                estimator.remove(evicted['timestamp'], evicted['value'])
+                if 'forecast_error' in evicted:
+                    score.remove(evicted['value'], evicted['forecast_error'])
+                self._evictions[variable_name] += 1
+            
+            series.append(data_point)
+            estimator.add(timestamp, value)
+            self.data_versions[variable_name] += 1
+            
+            # Subtraction drift is bounded by rebuilding once per full window turnover
+            if self._evictions[variable_name] >= series.maxlen:
+                self._rebuild_estimator(variable_name)
             
             # Trigger analysis if we have enough data
-            if len(self.time_series_data[variable_name]) >= self.config['min_data_points_for_forecast']:
+            if len(series) >= self.config['min_data_points_for_forecast']:
                 await self._update_forecasts(variable_name)
             
         except Exception as e:
             logger.error("Time series data addition failed", error=str(e))
     
+    def _rebuild_estimator(self, variable_name: str):
+        """Recompute running statistics exactly from the stored window"""
+        series = self.time_series_data[variable_name]
+        estimator = OnlineLeastSquares(origin=series[0]['timestamp'] if series else None)
+        score = HeldOutScore()
+        for point in series:
+            estimator.add(point['timestamp'], point['value'])
+            if 'forecast_error' in point:
+                score.add(point['value'], point['forecast_error'])
+        self.estimators[variable_name] = estimator
+        self.held_out_scores[variable_name] = score
+        self._evictions[variable_name] = 0
+    
+    async def _update_forecasts(self, variable_name: str):
+        """Schedule a debounced model refresh so bursts of points cause one refit"""
+        self._pending_refresh.add(variable_name)
+        
+        debounce = self.config['forecast_refresh_debounce_seconds']
+        if debounce <= 0:
+            self._refresh_pending_models()
+        elif self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._debounced_refresh(debounce))
+    
+    async def _debounced_refresh(self, delay: float):
+        """Refresh every variable that changed during the debounce window"""
+        await asyncio.sleep(delay)
+        self._refresh_pending_models()
+    
+    async def flush_forecast_refresh(self):
+        """Refresh pending models now instead of waiting for the debounce timer"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+        self._refresh_pending_models()
+    
+    def _refresh_pending_models(self):
+        """Refit models for all variables queued since the last refresh"""
+        pending, self._pending_refresh = self._pending_refresh, set()
+        for variable_name in pending:
+            try:
+                self._get_fitted_model(variable_name)
+            except Exception as e:
+                logger.error("Forecast model refresh failed", variable_name=variable_name, error=str(e))
+        if pending:
+            self.cache_stats['refresh_batches'] += 1
+    
+    def _get_fitted_model(self, variable_name: str) -> FittedTrendModel:
+        """Fitted trend model for the variable's current data, refit only when the data changed"""
+        version = self.data_versions[variable_name]
+        model = self.models.get(variable_name)
+        if model is not None and model.data_version == version:
+            self.cache_stats['model_hits'] += 1
+            return model
+        
+        estimator = self.estimators.get(variable_name)
+        series = self.time_series_data.get(variable_name)
+        if estimator is None or not series:
+            raise ValueError(f"No data for {variable_name}")
+        
+        # Use a quadratic trend only when it clearly improves on the linear fit
+        coefficients, residual = estimator.fit(1)
+        degree = 1
+        if estimator.count > 3:
+            quadratic, quadratic_residual = estimator.fit(2)
+            if quadratic_residual < residual * (1 - self.config['nonlinear_trend_improvement']):
+                coefficients, residual, degree = quadratic, quadratic_residual, 2
+        
+        # Residual degrees of freedom: the fit estimated degree + 1 coefficients
+        residual_dof = max(estimator.count - degree - 1, 1)
+        accuracy = self.held_out_scores[variable_name].r_squared()
+        model = FittedTrendModel(
+            variable_name=variable_name,
+            data_version=version,
+            degree=degree,
+            coefficients=coefficients,
+            origin=estimator.origin,
+            last_timestamp=series[-1]['timestamp'],
+            std_error=float(np.sqrt(residual / residual_dof)),
+            residual_dof=residual_dof,
+            accuracy=accuracy if accuracy is not None else self.config['default_model_accuracy'],
+            data_points=estimator.count
+        )
+        self.models[variable_name] = model
+        self.cache_stats['model_refits'] += 1
+        return model
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Model and forecast cache counters"""
+        return {
+            **self.cache_stats,
+            'cached_models': len(self.models),
+            'cached_forecasts': len(self.forecast_cache),
+            'pending_refresh': len(self._pending_refresh)
+        }
+    
     async def generate_pattern_frequency_forecast(self, pattern_id: str, 
                                                 forecast_horizon: ForecastHorizon) -> ForecastResult:
         """Generate forecast for pattern frequency"""
         try:
+            variable_name = self._pattern_variable(pattern_id)
+            
+            # Serve the cached forecast until the series changes
+            cache_key = (variable_name, forecast_horizon)
+            cached = self.forecast_cache.get(cache_key)
+            if cached is not None and cached[0] == self.data_versions[variable_name]:
+                self.cache_stats['forecast_hits'] += 1
+                return cached[1]
+            self.cache_stats['forecast_misses'] += 1
+            
             # Get historical pattern data
             time_series = await self._get_pattern_time_series(pattern_id)
             
             if len(time_series.timestamps) < self.config['min_data_points_for_forecast']:
                 raise ValueError(f"Insufficient data for forecasting pattern {pattern_id}")
             
-            # Prepare data for forecasting
-            X, y = self._prepare_time_series_data(time_series)
-            
-            # Choose appropriate model based on data characteristics
-            model = self._select_forecasting_model(time_series)
-            
-            # Train model
-            model.fit(X, y)
-            
-            # Generate forecast
-            forecast_periods = self._get_forecast_periods(forecast_horizon)
-            future_X = self._generate_future_features(X, forecast_periods)
-            predictions = model.predict(future_X)
-            
-            # Calculate confidence intervals
-            confidence_intervals = self._calculate_confidence_intervals(model, future_X, y)
+            model = self._get_fitted_model(variable_name)
             
             # Generate prediction timestamps
+            forecast_periods = self._get_forecast_periods(forecast_horizon)
             last_timestamp = time_series.timestamps[-1]
             prediction_timestamps = [
                 last_timestamp + timedelta(days=i+1) for i in range(forecast_periods)
             ]
             
-            # Assess model accuracy
-            model_accuracy = self._assess_model_accuracy(model, X, y)
+            # Generate forecast
+            predictions = model.predict(prediction_timestamps)
+            
+            # 95% intervals from the training residuals, Student t on the residual degrees of freedom
+            half_width = model.interval_half_width(0.95)
+            confidence_intervals = [
+                (float(pred - half_width), float(pred + half_width))
+                for pred in predictions
+            ]
+            
+            # Model accuracy is the R² of forecasts for points not yet fitted
+            model_accuracy = model.accuracy
             
             # Determine confidence level
             confidence_level = self._determine_confidence_level(model_accuracy, len(time_series.values))
@@ -231,6 +488,7 @@ class PredictiveAnalyticsService:
             )
             
             self.forecast_results[forecast_result.id] = forecast_result
+            self.forecast_cache[cache_key] = (model.data_version, forecast_result)
             
             logger.info("Pattern frequency forecast generated",
                        pattern_id=pattern_id,
@@ -381,102 +639,6 @@ class PredictiveAnalyticsService:
             logger.error("Intervention impact forecasting failed", error=str(e))
             return {}
     
-    def _prepare_time_series_data(self, time_series: TimeSeriesData) -> Tuple[np.ndarray, np.ndarray]:
-        """Prepare time series data for machine learning models"""
-        try:
-            # Convert timestamps to numeric features
-            timestamps = np.array([ts.timestamp() for ts in time_series.timestamps])
-            values = np.array(time_series.values)
-            
-            # Normalize timestamps to start from 0
-            timestamps = timestamps - timestamps[0]
-            
-            # Create feature matrix
-            X = timestamps.reshape(-1, 1)
-            
-            # Add polynomial features if trend is non-linear
-            if self._is_nonlinear_trend(values):
-                poly_features = PolynomialFeatures(degree=2)
-                X = poly_features.fit_transform(X)
-            
-            return X, values
-            
-        except Exception as e:
-            logger.error("Time series data preparation failed", error=str(e))
-            raise
-    
-    def _select_forecasting_model(self, time_series: TimeSeriesData):
-        """Select appropriate forecasting model based on data characteristics"""
-        try:
-            # For now, use linear regression as the base model
-            # In a production system, this would include more sophisticated model selection
-            model = LinearRegression()
-            
-            return model
-            
-        except Exception as e:
-            logger.error("Forecasting model selection failed", error=str(e))
-            return LinearRegression()
-    
-    def _calculate_confidence_intervals(self, model, X_future: np.ndarray, 
-                                      y_train: np.ndarray) -> List[Tuple[float, float]]:
-        """Calculate confidence intervals for predictions"""
-        try:
-            # Simple approach using training error
-            # In production, would use more sophisticated methods
-            predictions = model.predict(X_future)
-            
-            # Calculate prediction error from training data
-            X_train = X_future[:len(y_train)] if len(X_future) >= len(y_train) else X_future
-            if len(X_train) > 0:
-                train_predictions = model.predict(X_train[:len(y_train)])
-                mse = mean_squared_error(y_train, train_predictions)
-                std_error = np.sqrt(mse)
-            else:
-                std_error = np.std(y_train) * 0.1  # Conservative estimate
-            
-            # 95% confidence intervals
-            confidence_intervals = []
-            for pred in predictions:
-                lower = pred - 1.96 * std_error
-                upper = pred + 1.96 * std_error
-                confidence_intervals.append((lower, upper))
-            
-            return confidence_intervals
-            
-        except Exception as e:
-            logger.error("Confidence interval calculation failed", error=str(e))
-            # Return wide intervals as fallback
-            return [(pred - abs(pred) * 0.5, pred + abs(pred) * 0.5) for pred in model.predict(X_future)]
-    
-    def _assess_model_accuracy(self, model, X: np.ndarray, y: np.ndarray) -> float:
-        """Assess model accuracy using cross-validation or holdout"""
-        try:
-            if len(y) < 5:
-                return 0.5  # Default for insufficient data
-            
-            # Simple holdout validation
-            split_point = int(len(y) * 0.8)
-            X_train, X_test = X[:split_point], X[split_point:]
-            y_train, y_test = y[:split_point], y[split_point:]
-            
-            if len(y_test) == 0:
-                # Use R² score on training data
-                predictions = model.predict(X)
-                r2 = r2_score(y, predictions)
-                return max(0, r2)  # Ensure non-negative
-            
-            # Train on subset and test
-            model.fit(X_train, y_train)
-            test_predictions = model.predict(X_test)
-            r2 = r2_score(y_test, test_predictions)
-            
-            return max(0, r2)  # Ensure non-negative
-            
-        except Exception as e:
-            logger.error("Model accuracy assessment failed", error=str(e))
-            return 0.5
-    
     def _determine_confidence_level(self, model_accuracy: float, data_points: int) -> ConfidenceLevel:
         """Determine confidence level based on model accuracy and data quantity"""
         try:
@@ -521,6 +683,130 @@ class PredictiveAnalyticsService:
             logger.error("Trend direction analysis failed", error=str(e))
             return "stable"
     
+    def _pattern_variable(self, pattern_id: str) -> str:
+        """Time series variable holding a pattern's frequency"""
+        return f"pattern_{pattern_id}_frequency"
+    
+    async def _get_pattern_time_series(self, pattern_id: str) -> TimeSeriesData:
+        """Full stored history of a pattern's frequency"""
+        return self._build_time_series(list(self.time_series_data.get(self._pattern_variable(pattern_id), ())))
+    
+    async def _get_variable_time_series(self, variable_name: str, window_days: int) -> TimeSeriesData:
+        """Stored history of a variable within the trailing window"""
+        points = list(self.time_series_data.get(variable_name, ()))
+        if points:
+            cutoff = points[-1]['timestamp'] - timedelta(days=window_days)
+            points = [point for point in points if point['timestamp'] >= cutoff]
+        return self._build_time_series(points)
+    
+    def _build_time_series(self, points: List[Dict[str, Any]]) -> TimeSeriesData:
+        """Assemble stored data points into a TimeSeriesData"""
+        time_series = TimeSeriesData(
+            timestamps=[point['timestamp'] for point in points],
+            values=[float(point['value']) for point in points],
+            metadata={'data_points': len(points)},
+            data_quality_score=min(len(points) / 50, 1.0),
+            seasonality_detected=False,
+            trend_detected=False
+        )
+        if len(points) >= 3:
+            time_series.trend_detected = self._determine_trend_direction(time_series.values) != 'stable'
+        time_series.seasonality_detected = self._detect_seasonality(time_series) is not None
+        return time_series
+    
+    def _determine_trend_direction(self, values: List[float]) -> str:
+        """Direction of the linear trend across the values"""
+        if len(values) < 2:
+            return "stable"
+        slope = np.polyfit(np.arange(len(values)), values, 1)[0]
+        scale = np.mean(np.abs(values)) or 1.0
+        relative_change = slope * (len(values) - 1) / scale
+        if relative_change > 0.05:
+            return "increasing"
+        elif relative_change < -0.05:
+            return "decreasing"
+        return "stable"
+    
+    def _get_forecast_periods(self, forecast_horizon: ForecastHorizon) -> int:
+        """Number of daily forecast periods for a horizon"""
+        periods = {
+            ForecastHorizon.SHORT_TERM: 28,
+            ForecastHorizon.MEDIUM_TERM: 90,
+            ForecastHorizon.LONG_TERM: 180,
+            ForecastHorizon.STRATEGIC: 365
+        }
+        return min(periods.get(forecast_horizon, 30), self.config['max_forecast_horizon_days'])
+    
+    def _detect_seasonality(self, time_series: TimeSeriesData) -> Optional[Dict[str, Any]]:
+        """Weekly seasonality from the lag-7 autocorrelation"""
+        period = 7
+        values = np.array(time_series.values, dtype=float)
+        if len(values) < period * self.config['seasonal_detection_min_periods']:
+            return None
+        
+        deviations = values - values.mean()
+        variance = float(deviations @ deviations)
+        if variance == 0:
+            return None
+        
+        autocorrelation = float(deviations[period:] @ deviations[:-period]) / variance
+        if autocorrelation < 0.5:
+            return None
+        return {'period_days': period, 'strength': autocorrelation}
+    
+    def _generate_forecast_insights(self, time_series: TimeSeriesData, predictions: np.ndarray,
+                                    trend_direction: str) -> List[str]:
+        """Generate key insights from a forecast"""
+        insights = []
+        current = time_series.values[-1]
+        projected = float(predictions[-1]) if len(predictions) else current
+        
+        if trend_direction == "increasing":
+            insights.append(f"Frequency is projected to rise from {current:.1f} to {projected:.1f}")
+        elif trend_direction == "decreasing":
+            insights.append(f"Frequency is projected to fall from {current:.1f} to {projected:.1f}")
+        else:
+            insights.append(f"Frequency is expected to remain near {current:.1f}")
+        
+        if time_series.seasonality_detected:
+            insights.append("Weekly seasonality detected in historical data")
+        if time_series.data_quality_score < 0.5:
+            insights.append("Limited history; forecast should be treated as indicative")
+        
+        return insights
+    
+    def _identify_forecast_risks(self, time_series: TimeSeriesData, predictions: np.ndarray) -> List[str]:
+        """Identify risks that may undermine a forecast"""
+        risks = []
+        values = np.array(time_series.values, dtype=float)
+        mean = values.mean()
+        
+        if mean != 0 and values.std() / abs(mean) > 0.5:
+            risks.append("High historical volatility")
+        if len(predictions) and float(np.min(predictions)) < 0:
+            risks.append("Projection falls below zero; trend unlikely to continue linearly")
+        if len(values) < 2 * self.config['min_data_points_for_forecast']:
+            risks.append("Short history")
+        
+        return risks
+    
+    def _generate_forecast_recommendations(self, predictions: np.ndarray, trend_direction: str,
+                                           risk_factors: List[str]) -> List[str]:
+        """Generate recommendations from a forecast"""
+        recommendations = []
+        
+        if trend_direction == "increasing":
+            recommendations.append("Plan capacity for the growing pattern frequency")
+        elif trend_direction == "decreasing":
+            recommendations.append("Investigate drivers behind the declining pattern frequency")
+        else:
+            recommendations.append("Maintain current monitoring cadence")
+        
+        if risk_factors:
+            recommendations.append("Review the forecast as new data arrives")
+        
+        return recommendations
+    
     async def get_predictive_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive data for predictive analytics dashboard"""
         try:
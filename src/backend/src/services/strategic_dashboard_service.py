@@ -5,6 +5,7 @@ Provides comprehensive visualization and tracking for strategic alignment across
 
 import os
 import asyncio
+import hashlib
 import logging
 import uuid
 from typing import Dict, List, Optional, Any, Tuple
@@ -13,7 +14,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 import structlog
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import numpy as np
 
 logger = structlog.get_logger(__name__)
@@ -105,6 +106,49 @@ class ActionTrackingItem:
     impact_metrics: Dict[str, float]
     last_updated: datetime
 
+class DashboardRollup:
+    """Running aggregates behind dashboard metrics, updated as opportunities,
+    actions and analyses land instead of being recomputed per request"""
+    
+    def __init__(self):
+        self.opportunity_count = 0
+        self.opportunities_by_status: Dict[str, int] = defaultdict(int)
+        self.opportunities_by_priority: Dict[str, int] = defaultdict(int)
+        self.priority_score_sum = 0.0
+        
+        self.action_count = 0
+        self.actions_by_status: Dict[str, int] = defaultdict(int)
+        self.action_progress_sum = 0.0
+        
+        self.alignment_sums: Dict[str, float] = defaultdict(float)
+        self.alignment_counts: Dict[str, int] = defaultdict(int)
+        self.analyses_recorded = 0
+    
+    def add_opportunity(self, opportunity: StrategicOpportunityMap):
+        """Fold a new opportunity into the aggregates"""
+        self.opportunity_count += 1
+        self.opportunities_by_status[opportunity.status] += 1
+        self.opportunities_by_priority[opportunity.priority_level] += 1
+        self.priority_score_sum += opportunity.impact_score * (1 - opportunity.effort_score)
+        self.add_alignment(opportunity.framework_alignment)
+    
+    def add_action(self, action: ActionTrackingItem):
+        """Fold a new tracked action into the aggregates"""
+        self.action_count += 1
+        self.actions_by_status[action.status] += 1
+        self.action_progress_sum += action.progress_percentage
+    
+    def add_alignment(self, framework_alignment: Dict[str, float]):
+        """Fold per-framework alignment scores into the running means"""
+        for framework, score in (framework_alignment or {}).items():
+            self.alignment_sums[framework] += float(score)
+            self.alignment_counts[framework] += 1
+    
+    def alignment_average(self, framework: str) -> Optional[float]:
+        """Mean alignment for a framework, or None before any data"""
+        count = self.alignment_counts.get(framework, 0)
+        return self.alignment_sums[framework] / count if count else None
+
 class StrategicDashboardService:
     """Service for strategic alignment visualization and tracking"""
     
@@ -116,9 +160,24 @@ class StrategicDashboardService:
         self.dashboard_configs = self._initialize_dashboard_configs()
         self.metric_calculators = self._initialize_metric_calculators()
         
-        # Cache for performance
-        self.cache = {}
+        # Incrementally maintained aggregates; a version bump marks dependent dashboards stale
+        self.rollup = DashboardRollup()
+        self.dashboard_versions = {dashboard_type: 0 for dashboard_type in self.dashboard_configs}
+        
+        # Bounded LRU cache with stale-while-revalidate and coalesced builds
+        self.cache: "OrderedDict[str, Tuple[Dict[str, Any], datetime, int]]" = OrderedDict()
         self.cache_ttl = 300  # 5 minutes
+        self.cache_stale_ttl = int(os.getenv('DASHBOARD_CACHE_STALE_SECONDS', '3600'))
+        self.cache_max_entries = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', '128'))
+        self._inflight_builds: Dict[str, asyncio.Task] = {}
+        self.cache_stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'background_refreshes': 0,
+            'evictions': 0
+        }
     
     def _initialize_dashboard_configs(self) -> Dict[str, Dict[str, Any]]:
         """Initialize dashboard configuration templates"""
@@ -238,53 +297,90 @@ class StrategicDashboardService:
             'trend_analysis': self._calculate_trend_analysis
         }
     
+    # Rollup data sources: dashboards that must refresh when each kind of data lands
+    DASHBOARD_DEPENDENCIES = {
+        'opportunities': ['overview'],
+        'actions': ['overview'],
+        'alignment': ['overview', 'sdg_alignment', 'doughnut_economy', 'agreement_economy']
+    }
+    
+    def _mark_stale(self, source: str):
+        """Bump the version of every dashboard built from a data source"""
+        for dashboard_type in self.DASHBOARD_DEPENDENCIES.get(source, []):
+            if dashboard_type in self.dashboard_versions:
+                self.dashboard_versions[dashboard_type] += 1
+    
+    # Framework analyzer keys mapped to the rollup's alignment components
+    ANALYZER_FRAMEWORKS = {
+        'sdg': 'sdg',
+        'doughnut_economy': 'doughnut',
+        'agreement_economy': 'agreement'
+    }
+    
+    async def record_analysis(self, analysis: Dict[str, Any]):
+        """Fold a completed analysis' framework alignment scores into the rollups
+        
+        Accepts either a ``framework_alignment`` score mapping or the
+        ``framework_analyses`` result of the strategic framework analyzer, which
+        records every successful analysis here.
+        """
+        try:
+            framework_alignment = analysis.get('framework_alignment')
+            if framework_alignment is None:
+                framework_alignment = {
+                    self.ANALYZER_FRAMEWORKS.get(framework, framework): framework_analysis['overall_score']
+                    for framework, framework_analysis in analysis.get('framework_analyses', {}).items()
+                }
+            self.rollup.add_alignment(framework_alignment)
+            self.rollup.analyses_recorded += 1
+            self._mark_stale('alignment')
+            
+        except Exception as e:
+            logger.error("Dashboard rollup update failed", error=str(e))
+    
+    @staticmethod
+    def _cache_key(dashboard_type: str, filters: Dict[str, Any] = None,
+                   time_range: Dict[str, datetime] = None) -> str:
+        """Stable cache key (unlike hash(), identical across processes and restarts)"""
+        payload = json.dumps([dashboard_type, filters or {}, time_range or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
     async def generate_dashboard_data(self, dashboard_type: str, 
                                     filters: Dict[str, Any] = None,
                                     time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
         """Generate comprehensive dashboard data"""
         try:
+            if dashboard_type not in self.dashboard_configs:
+                raise ValueError(f"Unknown dashboard type: {dashboard_type}")
+            
             # Check cache first
-            cache_key = f"{dashboard_type}_{hash(str(filters))}_{hash(str(time_range))}"
+            cache_key = self._cache_key(dashboard_type, filters, time_range)
             if cache_key in self.cache:
-                cached_data, timestamp = self.cache[cache_key]
-                if (datetime.utcnow() - timestamp).seconds < self.cache_ttl:
+                cached_data, timestamp, version = self.cache[cache_key]
+                self.cache.move_to_end(cache_key)
+                age = (datetime.utcnow() - timestamp).total_seconds()
+                
+                if age < self.cache_ttl and version == self.dashboard_versions.get(dashboard_type):
+                    self.cache_stats['hits'] += 1
+                    return cached_data
+                
+                if age < self.cache_ttl + self.cache_stale_ttl:
+                    # Serve stale data and rebuild in the background
+                    self.cache_stats['stale_hits'] += 1
+                    if cache_key not in self._inflight_builds:
+                        self.cache_stats['background_refreshes'] += 1
+                        self._start_build(cache_key, dashboard_type, filters, time_range)
                     return cached_data
             
-            # Get dashboard configuration
-            config = self.dashboard_configs.get(dashboard_type, {})
-            if not config:
-                raise ValueError(f"Unknown dashboard type: {dashboard_type}")
-            
-            # Generate dashboard data
-            dashboard_data = {
-                'dashboard_id': str(uuid.uuid4()),
-                'type': dashboard_type,
-                'title': config['title'],
-                'description': config['description'],
-                'generated_at': datetime.utcnow().isoformat(),
-                'filters': filters or {},
-                'time_range': {
-                    'start': time_range.get('start').isoformat() if time_range and time_range.get('start') else None,
-                    'end': time_range.get('end').isoformat() if time_range and time_range.get('end') else None
-                },
-                'sections': [],
-                'metrics': await self._generate_key_metrics(dashboard_type, filters, time_range),
-                'visualizations': await self._generate_visualizations(dashboard_type, filters, time_range),
-                'insights': await self._generate_dashboard_insights(dashboard_type, filters, time_range),
-                'recommendations': await self._generate_dashboard_recommendations(dashboard_type, filters, time_range)
-            }
-            
-            # Generate sections
-            for section_config in config.get('sections', []):
-                section_data = await self._generate_section_data(
-                    section_config, dashboard_type, filters, time_range
-                )
-                dashboard_data['sections'].append(section_data)
-            
-            # Cache the result
-            self.cache[cache_key] = (dashboard_data, datetime.utcnow())
+            self.cache_stats['misses'] += 1
+            task = self._inflight_builds.get(cache_key)
+            if task is not None:
+                # Another viewer is already building this dashboard
+                self.cache_stats['coalesced'] += 1
+            else:
+                task = self._start_build(cache_key, dashboard_type, filters, time_range)
             
-            return dashboard_data
+            return await asyncio.shield(task)
             
         except Exception as e:
             logger.error("Dashboard data generation failed", error=str(e), dashboard_type=dashboard_type)
@@ -295,6 +391,86 @@ class StrategicDashboardService:
                 'generated_at': datetime.utcnow().isoformat()
             }
     
+    def _start_build(self, cache_key: str, dashboard_type: str,
+                     filters: Dict[str, Any] = None,
+                     time_range: Dict[str, datetime] = None) -> asyncio.Task:
+        """Start a single shared build for a cache key"""
+        task = asyncio.create_task(self._build_and_cache(cache_key, dashboard_type, filters, time_range))
+        self._inflight_builds[cache_key] = task
+        task.add_done_callback(lambda finished: self._finish_build(cache_key, finished))
+        return task
+    
+    def _finish_build(self, cache_key: str, task: asyncio.Task):
+        """Forget a finished build; background failures are logged"""
+        if self._inflight_builds.get(cache_key) is task:
+            del self._inflight_builds[cache_key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Dashboard build failed", cache_key=cache_key, error=str(task.exception()))
+    
+    async def _build_and_cache(self, cache_key: str, dashboard_type: str,
+                               filters: Dict[str, Any] = None,
+                               time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
+        """Build a dashboard and store it in the LRU cache"""
+        version = self.dashboard_versions.get(dashboard_type)
+        dashboard_data = await self._build_dashboard_data(dashboard_type, filters, time_range)
+        
+        # Cache the result, tagged with the rollup version it was built from
+        self.cache[cache_key] = (dashboard_data, datetime.utcnow(), version)
+        self.cache.move_to_end(cache_key)
+        while len(self.cache) > self.cache_max_entries:
+            self.cache.popitem(last=False)
+            self.cache_stats['evictions'] += 1
+        
+        return dashboard_data
+    
+    async def _build_dashboard_data(self, dashboard_type: str,
+                                    filters: Dict[str, Any] = None,
+                                    time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
+        """Generate every part of a dashboard concurrently"""
+        # Get dashboard configuration
+        config = self.dashboard_configs.get(dashboard_type, {})
+        if not config:
+            raise ValueError(f"Unknown dashboard type: {dashboard_type}")
+        
+        section_configs = config.get('sections', [])
+        metrics, visualizations, insights, recommendations, *sections = await asyncio.gather(
+            self._generate_key_metrics(dashboard_type, filters, time_range),
+            self._generate_visualizations(dashboard_type, filters, time_range),
+            self._generate_dashboard_insights(dashboard_type, filters, time_range),
+            self._generate_dashboard_recommendations(dashboard_type, filters, time_range),
+            *[
+                self._generate_section_data(section_config, dashboard_type, filters, time_range)
+                for section_config in section_configs
+            ]
+        )
+        
+        return {
+            'dashboard_id': str(uuid.uuid4()),
+            'type': dashboard_type,
+            'title': config['title'],
+            'description': config['description'],
+            'generated_at': datetime.utcnow().isoformat(),
+            'filters': filters or {},
+            'time_range': {
+                'start': time_range.get('start').isoformat() if time_range and time_range.get('start') else None,
+                'end': time_range.get('end').isoformat() if time_range and time_range.get('end') else None
+            },
+            'sections': sections,
+            'metrics': metrics,
+            'visualizations': visualizations,
+            'insights': insights,
+            'recommendations': recommendations
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Dashboard cache counters"""
+        return {
+            **self.cache_stats,
+            'entries': len(self.cache),
+            'max_entries': self.cache_max_entries,
+            'inflight_builds': len(self._inflight_builds)
+        }
+    
     async def _generate_key_metrics(self, dashboard_type: str, 
                                    filters: Dict[str, Any] = None,
                                    time_range: Dict[str, datetime] = None) -> List[Dict[str, Any]]:
@@ -584,24 +760,18 @@ class StrategicDashboardService:
             'insights': []
         }
         
-        # Generate visualizations for this section
-        for viz_id in section_config.get('visualizations', []):
-            viz_data = await self._generate_specific_visualization(
-                viz_id, dashboard_type, filters, time_range
-            )
-            if viz_data:
-                section_data['visualizations'].append(viz_data)
-        
-        # Generate section-specific metrics
-        section_metrics = await self._generate_section_metrics(
-            section_config['id'], dashboard_type, filters, time_range
+        # Generate visualizations, section-specific metrics and insights concurrently
+        section_metrics, section_insights, *visualizations = await asyncio.gather(
+            self._generate_section_metrics(section_config['id'], dashboard_type, filters, time_range),
+            self._generate_section_insights(section_config['id'], dashboard_type, filters, time_range),
+            *[
+                self._generate_specific_visualization(viz_id, dashboard_type, filters, time_range)
+                for viz_id in section_config.get('visualizations', [])
+            ]
         )
-        section_data['metrics'] = section_metrics
         
-        # Generate section insights
-        section_insights = await self._generate_section_insights(
-            section_config['id'], dashboard_type, filters, time_range
-        )
+        section_data['visualizations'] = [viz_data for viz_data in visualizations if viz_data]
+        section_data['metrics'] = section_metrics
         section_data['insights'] = section_insights
         
         return section_data  
@@ -613,6 +783,19 @@ class StrategicDashboardService:
         try:
             # Mock calculation - in real implementation, this would query actual data
             base_score = 0.72
+            components = {
+                'sdg_alignment': 0.68,
+                'doughnut_alignment': 0.75,
+                'agreement_alignment': 0.73
+            }
+            
+            # Prefer rolled-up alignment from recorded analyses and opportunities
+            for framework in ('sdg', 'doughnut', 'agreement'):
+                average = self.rollup.alignment_average(framework)
+                if average is not None:
+                    components[f'{framework}_alignment'] = average
+            if any(self.rollup.alignment_counts.get(f, 0) for f in ('sdg', 'doughnut', 'agreement')):
+                base_score = float(np.mean(list(components.values())))
             
             # Simulate trend calculation
             trend_direction = 'up'
@@ -622,11 +805,7 @@ class StrategicDashboardService:
                 'score': base_score,
                 'trend': trend_direction,
                 'change_percentage': change_percentage,
-                'components': {
-                    'sdg_alignment': 0.68,
-                    'doughnut_alignment': 0.75,
-                    'agreement_alignment': 0.73
-                },
+                'components': components,
                 'last_updated': datetime.utcnow().isoformat()
             }
         except Exception as e:
@@ -773,6 +952,20 @@ class StrategicDashboardService:
                                          time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
         """Calculate opportunity metrics"""
         try:
+            rollup = self.rollup
+            if rollup.opportunity_count:
+                completed_opportunities = rollup.opportunities_by_status.get('completed', 0)
+                return {
+                    'count': rollup.opportunity_count - completed_opportunities,
+                    'total': rollup.opportunity_count,
+                    'completed': completed_opportunities,
+                    'completion_rate': completed_opportunities / rollup.opportunity_count,
+                    'trend': 'stable',
+                    'change_percentage': 0,
+                    'by_priority': dict(rollup.opportunities_by_priority),
+                    'by_status': dict(rollup.opportunities_by_status)
+                }
+            
             # Mock opportunity data
             total_opportunities = 24
             active_opportunities = 18
@@ -801,10 +994,41 @@ class StrategicDashboardService:
             logger.error("Opportunity count calculation failed", error=str(e))
             return {'count': 0, 'trend': 'stable', 'change_percentage': 0}
     
+    async def _calculate_opportunity_score(self, filters: Dict[str, Any] = None,
+                                         time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
+        """Calculate mean opportunity priority (impact weighted by ease)"""
+        try:
+            rollup = self.rollup
+            score = rollup.priority_score_sum / rollup.opportunity_count if rollup.opportunity_count else 0.5
+            
+            return {
+                'score': score,
+                'opportunities': rollup.opportunity_count,
+                'trend': 'stable',
+                'change_percentage': 0
+            }
+        except Exception as e:
+            logger.error("Opportunity score calculation failed", error=str(e))
+            return {'score': 0.5, 'trend': 'stable', 'change_percentage': 0}
+    
     async def _calculate_action_progress(self, filters: Dict[str, Any] = None,
                                        time_range: Dict[str, datetime] = None) -> Dict[str, Any]:
         """Calculate action progress metrics"""
         try:
+            rollup = self.rollup
+            if rollup.action_count:
+                completed_actions = rollup.actions_by_status.get('completed', 0)
+                return {
+                    'completion_rate': completed_actions / rollup.action_count,
+                    'total_actions': rollup.action_count,
+                    'completed_actions': completed_actions,
+                    'in_progress_actions': rollup.actions_by_status.get('in_progress', 0),
+                    'blocked_actions': rollup.actions_by_status.get('blocked', 0),
+                    'trend': 'stable',
+                    'change_percentage': 0,
+                    'average_progress': rollup.action_progress_sum / rollup.action_count
+                }
+            
             # Mock action data
             total_actions = 45
             completed_actions = 32
@@ -1479,6 +1703,10 @@ class StrategicDashboardService:
             )
             
             self.opportunity_maps[opportunity_map.id] = opportunity_map
+            self.rollup.add_opportunity(opportunity_map)
+            self._mark_stale('opportunities')
+            if opportunity_map.framework_alignment:
+                self._mark_stale('alignment')
             
             logger.info("Strategic opportunity map created", opportunity_id=opportunity_map.id)
             return opportunity_map.id
@@ -1505,6 +1733,8 @@ class StrategicDashboardService:
             )
             
             self.action_tracking[action_item.id] = action_item
+            self.rollup.add_action(action_item)
+            self._mark_stale('actions')
             
             logger.info("Action tracking item created", action_id=action_item.id)
             return action_item.id
@@ -1516,6 +1746,9 @@ class StrategicDashboardService:
     async def get_dashboard_summary(self, dashboard_type: str = 'overview') -> Dict[str, Any]:
         """Get a summary of dashboard key metrics"""
         try:
+            if dashboard_type not in self.dashboard_configs:
+                raise ValueError(f"Unknown dashboard type: {dashboard_type}")
+            
             summary = {
                 'dashboard_type': dashboard_type,
                 'summary_generated_at': datetime.utcnow().isoformat(),
@@ -13,9 +13,12 @@ from enum import Enum
 import json
 import re
 import structlog
+from bisect import bisect_left
 from collections import defaultdict
 import numpy as np
 
+from .strategic_dashboard_service import strategic_dashboard_service
+
 logger = structlog.get_logger(__name__)
 
 class FrameworkType(Enum):
@@ -81,11 +84,122 @@ class CrossFrameworkSynthesis:
     strategic_priorities: List[str]
     implementation_roadmap: List[Dict[str, Any]]
 
+class DocumentScan:
+    """Term occurrences and sentence offsets for one document, from a single pass"""
+    
+    # Keywords are used as regex fragments when extracting evidence sentences
+    REGEX_SPECIAL = re.compile(r'[\\^$.|?*+()\[\]{}]')
+    
+    def __init__(self, content: str, occurrences: Dict[str, List[int]], known_terms: frozenset):
+        self.content = content
+        self.occurrences = occurrences
+        self.known_terms = known_terms
+        self._content_lower: Optional[str] = None
+        # Offsets are only shared with the lowercased text when case folding keeps lengths
+        self.exact_offsets = content.isascii()
+        self.sentence_ends = [m.start() for m in re.finditer(r'[.!?]', content)]
+    
+    def contains(self, term: str) -> bool:
+        """Equivalent of ``term in content.lower()``"""
+        if term in self.known_terms:
+            return term in self.occurrences
+        
+        # Terms outside the compiled lexicon (e.g. ad-hoc elements) fall back to a scan
+        if self._content_lower is None:
+            self._content_lower = self.content.lower()
+        return term in self._content_lower
+    
+    def keyword_sentences(self, keyword: str, limit: int = 2) -> List[str]:
+        """First ``limit`` terminated sentences containing the keyword"""
+        if (not self.exact_offsets or self.REGEX_SPECIAL.search(keyword)
+                or keyword.lower() not in self.known_terms):
+            return re.findall(f"[^.!?]*{keyword}[^.!?]*[.!?]", self.content, re.IGNORECASE)[:limit]
+        
+        sentences = []
+        seen = set()
+        for position in sorted(self.occurrences.get(keyword.lower(), ())):
+            index = bisect_left(self.sentence_ends, position)
+            if index == len(self.sentence_ends):
+                break  # Unterminated trailing text never counts as evidence
+            if index in seen:
+                continue
+            seen.add(index)
+            start = self.sentence_ends[index - 1] + 1 if index > 0 else 0
+            sentences.append(self.content[start:self.sentence_ends[index] + 1])
+            if len(sentences) >= limit:
+                break
+        return sentences
+
+class FrameworkLexicon:
+    """Every framework keyword and indicator word compiled into one matcher
+    
+    The pattern is a prefix trie matched as a lookahead at every offset, so a
+    single scan finds the longest term starting at each position; shorter terms
+    contained in it are recovered from a precomputed containment table.
+    """
+    
+    def __init__(self, frameworks: Dict[FrameworkType, List[FrameworkElement]]):
+        terms = set()
+        for elements in frameworks.values():
+            for element in elements:
+                terms.update(keyword.lower() for keyword in element.keywords)
+                for indicator in element.indicators:
+                    terms.update(indicator.lower().split())
+        self.terms = sorted(term for term in terms if term)
+        self.known_terms = frozenset(self.terms)
+        
+        # term -> [(contained term, offset), ...] including the term itself at 0
+        self.contained = {
+            term: [
+                (other, offset)
+                for other in self.terms
+                for offset in range(len(term) - len(other) + 1)
+                if term.startswith(other, offset)
+            ]
+            for term in self.terms
+        }
+        self.pattern = re.compile(f"(?=({self._trie_pattern(self.terms)}))")
+    
+    @staticmethod
+    def _trie_pattern(terms: List[str]) -> str:
+        """Regex for a set of literals with shared prefixes factored out, longest match first"""
+        trie: Dict[str, Any] = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = True
+        
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if '' in node:
+                return f"(?:{body})?"
+            return body
+        
+        return build(trie)
+    
+    def scan(self, content: str) -> DocumentScan:
+        """Find every term occurrence in one pass over the lowercased content"""
+        positions: Dict[str, set] = defaultdict(set)
+        for match in self.pattern.finditer(content.lower()):
+            longest = match.group(1)
+            if not longest:
+                continue
+            start = match.start()
+            for term, offset in self.contained[longest]:
+                positions[term].add(start + offset)
+        
+        return DocumentScan(content, {term: sorted(found) for term, found in positions.items()}, self.known_terms)
+
 class StrategicFrameworkAnalyzer:
     """Comprehensive strategic framework alignment analyzer"""
     
     def __init__(self):
         self.frameworks = self._initialize_frameworks()
+        self.lexicon = FrameworkLexicon(self.frameworks)
         self.alignment_history = defaultdict(list)
         self.cross_framework_patterns = {}
         
@@ -323,21 +437,25 @@ class StrategicFrameworkAnalyzer:
             if frameworks_to_analyze is None:
                 frameworks_to_analyze = list(FrameworkType)
             
-            framework_analyses = {}
-            
-            # Analyze each framework
-            for framework_type in frameworks_to_analyze:
-                analysis = await self._analyze_single_framework(
-                    content, framework_type, organization_context
-                )
-                framework_analyses[framework_type.value] = analysis
+            # Scan the document once for every framework term
+            document = self.lexicon.scan(content)
+            
+            # Analyze frameworks concurrently from the shared scan
+            analyses = await asyncio.gather(*[
+                self._analyze_single_framework(content, framework_type, organization_context, document)
+                for framework_type in frameworks_to_analyze
+            ])
+            framework_analyses = {
+                framework_type.value: analysis
+                for framework_type, analysis in zip(frameworks_to_analyze, analyses)
+            }
             
             # Perform cross-framework synthesis
             synthesis = await self._perform_cross_framework_synthesis(
                 framework_analyses, content, organization_context
             )
             
-            return {
+            result = {
                 'framework_analyses': {k: self._serialize_framework_analysis(v) 
                                      for k, v in framework_analyses.items()},
                 'cross_framework_synthesis': self._serialize_synthesis(synthesis),
@@ -346,6 +464,11 @@ class StrategicFrameworkAnalyzer:
                 'frameworks_analyzed': [f.value for f in frameworks_to_analyze]
             }
             
+            # Keep the dashboard alignment rollups current with each completed analysis
+            await strategic_dashboard_service.record_analysis(result)
+            
+            return result
+        
         except Exception as e:
             logger.error("Strategic alignment analysis failed", error=str(e))
             return {
@@ -355,20 +478,19 @@ class StrategicFrameworkAnalyzer:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-
-# Global strategic framework analyzer instance
-strategic_framework_analyzer = StrategicFrameworkAnalyzer()    
-   
- async def _analyze_single_framework(self, content: str, framework_type: FrameworkType,
-                                      organization_context: Dict[str, Any] = None) -> FrameworkAnalysis:
+    
+    async def _analyze_single_framework(self, content: str, framework_type: FrameworkType,
+                                      organization_context: Dict[str, Any] = None,
+                                      document: Optional[DocumentScan] = None) -> FrameworkAnalysis:
         """Analyze alignment with a single strategic framework"""
         try:
             framework_elements = self.frameworks.get(framework_type, [])
             element_assessments = []
+            document = document or self.lexicon.scan(content)
             
             # Analyze each element in the framework
             for element in framework_elements:
-                assessment = await self._assess_element_alignment(content, element, organization_context)
+                assessment = await self._assess_element_alignment(content, element, organization_context, document)
                 element_assessments.append(assessment)
             
             # Calculate overall framework score
@@ -422,21 +544,21 @@ strategic_framework_analyzer = StrategicFrameworkAnalyzer()
             )
     
     async def _assess_element_alignment(self, content: str, element: FrameworkElement,
-                                      organization_context: Dict[str, Any] = None) -> AlignmentAssessment:
+                                      organization_context: Dict[str, Any] = None,
+                                      document: Optional[DocumentScan] = None) -> AlignmentAssessment:
         """Assess alignment with a specific framework element"""
         try:
-            content_lower = content.lower()
+            document = document or self.lexicon.scan(content)
             
             # Keyword matching
             keyword_matches = 0
             evidence = []
             
             for keyword in element.keywords:
-                if keyword.lower() in content_lower:
+                if document.contains(keyword.lower()):
                     keyword_matches += 1
                     # Find sentences containing the keyword
-                    sentences = re.findall(f"[^.!?]*{keyword}[^.!?]*[.!?]", content, re.IGNORECASE)
-                    evidence.extend(sentences[:2])  # Limit evidence per keyword
+                    evidence.extend(document.keyword_sentences(keyword, limit=2))  # Limit evidence per keyword
             
             # Calculate base alignment score
             keyword_score = min(1.0, keyword_matches / len(element.keywords)) if element.keywords else 0.0
@@ -444,7 +566,7 @@ strategic_framework_analyzer = StrategicFrameworkAnalyzer()
             # Indicator matching
             indicator_matches = 0
             for indicator in element.indicators:
-                if any(word in content_lower for word in indicator.lower().split()):
+                if any(document.contains(word) for word in indicator.lower().split()):
                     indicator_matches += 1
             
             indicator_score = min(1.0, indicator_matches / len(element.indicators)) if element.indicators else 0.0
@@ -1139,4 +1261,7 @@ strategic_framework_analyzer = StrategicFrameworkAnalyzer()
             'integrated_recommendations': synthesis.integrated_recommendations,
             'strategic_priorities': synthesis.strategic_priorities,
             'implementation_roadmap': synthesis.implementation_roadmap
-        }
\ No newline at end of file
+        }
+
+# Global strategic framework analyzer instance
+strategic_framework_analyzer = StrategicFrameworkAnalyzer()
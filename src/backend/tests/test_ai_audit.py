@@ -0,0 +1,136 @@
+"""
+Tests for the AI Decision Audit System
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from src.services.ai_audit import (
+    AIAuditSystem,
+    AuditEvent,
+    AuditEventType,
+    AuditLevel,
+    AuditSegmentStore,
+    IndexedAuditLog
+)
+
+class TestAIAuditSystem:
+    """Test indexed audit queries and segment persistence"""
+    
+    @pytest.fixture
+    def audit_system(self, tmp_path, monkeypatch):
+        """Create audit system storing segments in a temporary directory"""
+        monkeypatch.setenv('AUDIT_STORAGE_PATH', str(tmp_path))
+        return AIAuditSystem()
+    
+    @pytest.mark.asyncio
+    async def test_audit_trail_filters(self, audit_system):
+        """Trail queries combine index filters and return newest first"""
+        for i in range(20):
+            await audit_system.log_event(
+                AuditEventType.TASK_COMPLETED if i % 2 else AuditEventType.TASK_STARTED,
+                AuditLevel.INFO,
+                f"performer_{i % 3}",
+                {'index': i},
+                session_id=f"session_{i % 4}"
+            )
+        
+        trail = await audit_system.get_audit_trail(
+            session_id='session_1', event_type=AuditEventType.TASK_COMPLETED
+        )
+        
+        assert [e['event_data']['index'] for e in trail] == [17, 13, 9, 5, 1]
+        
+        limited = await audit_system.get_audit_trail(performer_id='performer_0', limit=2)
+        assert [e['event_data']['index'] for e in limited] == [18, 15]
+    
+    @pytest.mark.asyncio
+    async def test_audit_trail_time_range(self, audit_system):
+        """Time ranges are resolved against the time-ordered log"""
+        start = datetime(2024, 1, 1)
+        for i in range(10):
+            audit_system.audit_events.append(AuditEvent(
+                id=str(i), event_type=AuditEventType.MESSAGE_SENT, level=AuditLevel.INFO,
+                performer_id='performer', session_id=None, task_id=None, message_id=None,
+                timestamp=start + timedelta(minutes=i), event_data={'index': i}
+            ))
+        
+        trail = await audit_system.get_audit_trail(
+            start_time=start + timedelta(minutes=3), end_time=start + timedelta(minutes=5)
+        )
+        
+        assert [e['event_data']['index'] for e in trail] == [5, 4, 3]
+    
+    @pytest.mark.asyncio
+    async def test_segments_replayed_at_startup(self, audit_system, monkeypatch, tmp_path):
+        """Events and decision traces written to segments survive a restart"""
+        await audit_system.log_event(
+            AuditEventType.TASK_STARTED, AuditLevel.INFO, 'performer', {'step': 1}, session_id='s1'
+        )
+        trace_id = await audit_system.trace_decision(
+            'performer', 'classification', {}, [{'step': 'reason'}], {'label': 'x'}, 0.9,
+            session_id='s1'
+        )
+        await audit_system.segment_store.flush()
+        
+        restarted = AIAuditSystem()
+        await restarted.initialize()
+        try:
+            trail = await restarted.get_audit_trail(session_id='s1')
+            traces = await restarted.get_decision_trace(trace_id=trace_id)
+        finally:
+            await restarted.shutdown()
+        
+        assert {e['event_type'] for e in trail} == {'task_started', 'decision_made'}
+        assert traces[0]['final_decision'] == {'label': 'x'}
+    
+    @pytest.mark.asyncio
+    async def test_startup_replays_only_newest_records(self, audit_system, monkeypatch):
+        """Replay stops once both in-memory logs are full"""
+        for i in range(30):
+            await audit_system.log_event(AuditEventType.TASK_STARTED, AuditLevel.INFO, 'performer', {'index': i})
+            await audit_system.trace_decision('performer', 'classification', {'index': i}, [], {}, 0.5)
+        await audit_system.segment_store.flush()
+        
+        monkeypatch.setenv('MAX_MEMORY_AUDIT_EVENTS', '5')
+        restarted = AIAuditSystem()
+        parsed = []
+        replay = restarted.segment_store.replay
+        restarted.segment_store.replay = lambda **kwargs: (parsed.append(1) or record for record in replay(**kwargs))
+        
+        assert restarted._replay_segments() == 10
+        assert len(restarted.audit_events) == 5
+        assert [t.input_data['index'] for t in restarted.decision_traces.query({})] == [29, 28, 27, 26, 25]
+        # Three records per iteration: stopped after the newest five iterations, not all 90
+        assert len(parsed) <= 15
+
+class TestAuditSegmentStore:
+    """Test batched segment writes"""
+    
+    def test_full_batch_written_inline_without_flusher(self, tmp_path):
+        store = AuditSegmentStore(str(tmp_path), batch_size=10)
+        for i in range(25):
+            store.append('audit_event', {'index': i})
+        
+        assert store.records_written == 20
+        assert store.buffered_records == 5
+        assert [data['index'] for _, data in store.replay()] == list(range(20))
+        assert [data['index'] for _, data in store.replay(newest_first=True)] == list(range(19, -1, -1))
+
+class TestIndexedAuditLog:
+    """Test the bounded indexed log"""
+    
+    def test_capacity_evicts_oldest_from_indexes(self):
+        """Evicted records disappear from every index"""
+        log = IndexedAuditLog(capacity=3, index_fields={'performer_id': lambda e: e.performer_id})
+        start = datetime(2024, 1, 1)
+        for i in range(5):
+            log.append(AuditEvent(
+                id=str(i), event_type=AuditEventType.MESSAGE_SENT, level=AuditLevel.INFO,
+                performer_id=f"p{i % 2}", session_id=None, task_id=None, message_id=None,
+                timestamp=start + timedelta(minutes=i), event_data={}
+            ))
+        
+        assert len(log) == 3
+        assert [e.id for e in log.query({'performer_id': 'p0'})] == ['4', '2']
+        assert log.expire_before(start + timedelta(minutes=4)) == 2
+        assert [e.id for e in log.query({})] == ['4']
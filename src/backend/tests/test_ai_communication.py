@@ -0,0 +1,245 @@
+"""
+Tests for the inter-AI Communication Hub
+"""
+
+import pytest
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from src.services.ai_communication import (
+    AICommunicationHub,
+    AIMessage,
+    AIMessageHandler,
+    MessageHistory,
+    MessageType,
+    MessagePriority
+)
+
+class RecordingHandler(AIMessageHandler):
+    """Handler that records deliveries, optionally after a delay"""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = []
+    
+    async def handle_message(self, message: AIMessage) -> Optional[AIMessage]:
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+        return None
+    
+    def can_handle(self, message_type: MessageType) -> bool:
+        return True
+
+def make_message(sender: str, recipient: Optional[str], priority: MessagePriority) -> AIMessage:
+    return AIMessage(
+        id=str(uuid.uuid4()),
+        sender_id=sender,
+        recipient_id=recipient,
+        message_type=MessageType.INSIGHT_SHARE,
+        priority=priority,
+        content={'priority': priority.name}
+    )
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+class TestAICommunicationHub:
+    """Test message delivery"""
+    
+    @pytest.fixture
+    def hub(self):
+        """Create communication hub instance"""
+        hub = AICommunicationHub()
+        yield hub
+        for task in [getattr(hub, 'dispatch_task', None), getattr(hub, 'processing_task', None),
+                     *hub._worker_tasks, *hub._broadcast_tasks]:
+            if task:
+                task.cancel()
+    
+    @pytest.mark.asyncio
+    async def test_direct_messages_delivered_by_priority(self, hub):
+        """Queued direct messages for a recipient are delivered highest priority first"""
+        hub.mailbox_concurrency = 1
+        sender, recipient = RecordingHandler(), RecordingHandler()
+        hub.register_performer('sender', {}, sender)
+        hub.register_performer('recipient', {}, recipient)
+        
+        for priority in (MessagePriority.LOW, MessagePriority.CRITICAL, MessagePriority.MEDIUM):
+            assert await hub.send_message(make_message('sender', 'recipient', priority))
+        
+        await hub.initialize()
+        await wait_until(lambda: len(recipient.received) == 3)
+        
+        assert [m.priority for m in recipient.received] == [
+            MessagePriority.CRITICAL, MessagePriority.MEDIUM, MessagePriority.LOW
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_broadcast_not_blocked_by_slow_handler(self, hub):
+        """A slow or hung handler times out without delaying other recipients"""
+        hub.handler_timeout = 0.2
+        fast, slow = RecordingHandler(), RecordingHandler(delay=5.0)
+        hub.register_performer('sender', {}, RecordingHandler())
+        hub.register_performer('fast', {}, fast)
+        hub.register_performer('slow', {}, slow)
+        await hub.initialize()
+        
+        await hub.broadcast_message('sender', MessageType.STATUS_UPDATE, {'status': 'ready'})
+        
+        await wait_until(lambda: len(fast.received) == 1, timeout=0.1)
+        assert len(hub._broadcast_tasks) == 1  # Held until the slow delivery finishes
+        await wait_until(lambda: hub.metrics['delivery_timeouts'] == 1)
+        assert slow.received == []
+        await wait_until(lambda: not hub._broadcast_tasks)
+    
+    @pytest.mark.asyncio
+    async def test_initialize_is_idempotent(self, hub):
+        """Initializing twice does not start a second set of workers"""
+        hub.register_performer('recipient', {}, RecordingHandler())
+        await hub.initialize()
+        dispatch_task, workers = hub.dispatch_task, list(hub._worker_tasks)
+        
+        await hub.initialize()
+        assert hub.dispatch_task is dispatch_task
+        assert hub._worker_tasks == workers
+    
+    @pytest.mark.asyncio
+    async def test_only_handled_messages_counted_received(self, hub):
+        """Timed-out direct messages are not counted as received"""
+        hub.handler_timeout = 0.05
+        fast, slow = RecordingHandler(), RecordingHandler(delay=1.0)
+        hub.register_performer('fast', {}, fast)
+        hub.register_performer('slow', {}, slow)
+        await hub.initialize()
+        
+        await hub.send_message(make_message('fast', 'slow', MessagePriority.MEDIUM))
+        await wait_until(lambda: hub.metrics['delivery_timeouts'] == 1)
+        assert hub.metrics['messages_received'] == 0
+        
+        await hub.send_message(make_message('slow', 'fast', MessagePriority.MEDIUM))
+        await wait_until(lambda: hub.metrics['messages_received'] == 1)
+    
+    @pytest.mark.asyncio
+    async def test_delivery_latency_reported(self, hub):
+        """Communication status reports delivery latency percentiles"""
+        recipient = RecordingHandler()
+        hub.register_performer('sender', {}, RecordingHandler())
+        hub.register_performer('recipient', {}, recipient)
+        await hub.initialize()
+        
+        for _ in range(10):
+            await hub.send_message(make_message('sender', 'recipient', MessagePriority.MEDIUM))
+        await wait_until(lambda: len(recipient.received) == 10)
+        
+        status = await hub.get_communication_status()
+        
+        assert status['delivery_latency']['samples'] == 10
+        assert 0.0 <= status['delivery_latency']['p50'] <= status['delivery_latency']['p99']
+        assert status['queued_messages'] == 0
+
+class TestMessageHistory:
+    """Test the ring-buffer message history"""
+    
+    def _message(self, sender: str, session_id: Optional[str] = None,
+                 message_type: MessageType = MessageType.INSIGHT_SHARE) -> AIMessage:
+        message = make_message(sender, None, MessagePriority.MEDIUM)
+        message.session_id = session_id
+        message.message_type = message_type
+        return message
+    
+    def test_capacity_evicts_oldest_and_indexes(self):
+        """The ring keeps the newest messages and indexes drop evicted ones"""
+        history = MessageHistory(capacity=3)
+        messages = [self._message('a', 's1'), self._message('b', 's1'),
+                    self._message('a', 's2'), self._message('c', 's2')]
+        for message in messages:
+            history.append(message)
+        
+        assert len(history) == 3
+        assert list(history) == messages[1:]
+        assert history.by_sender('a') == [messages[2]]
+        assert history.by_session('s1') == [messages[1]]
+        assert history.by_session('s2') == messages[2:]
+    
+    def test_retention_and_time_queries(self):
+        """Expiry removes only messages older than the cut-off"""
+        history = MessageHistory(capacity=10)
+        start = datetime(2024, 1, 1)
+        messages = [self._message('a') for _ in range(5)]
+        for offset, message in enumerate(messages):
+            history.append(message, recorded_at=start + timedelta(hours=offset))
+        
+        assert history.since(start + timedelta(hours=3)) == messages[3:]
+        assert history.expire_before(start + timedelta(hours=2)) == 2
+        assert list(history) == messages[2:]
+        assert history.by_type(MessageType.INSIGHT_SHARE) == messages[2:]
+    
+    @pytest.mark.asyncio
+    async def test_conflict_resolution_uses_session_insights(self):
+        """Confidence conflicts without inline insights use those shared in the session"""
+        hub = AICommunicationHub()
+        for performer_id in ('a', 'b'):
+            hub.register_performer(performer_id, {}, RecordingHandler())
+        session = await hub.initiate_collaboration('a', ['a', 'b'], 'topic', 'objective')
+        
+        for sender, confidence, value in (('a', 0.8, 1.0), ('b', 0.2, 0.0)):
+            message = self._message(sender, session.id)
+            message.content = {'confidence': confidence, 'data': {'score': value}}
+            await hub.send_message(message)
+        
+        resolved = await hub.resolve_conflict(session.id, {'type': 'confidence_disagreement'})
+        
+        assert resolved
+        assert session.resolution['resolution_type'] == 'weighted_average'
+        assert session.resolution['result']['score'] == pytest.approx(0.8)
+    
+    @pytest.mark.asyncio
+    async def test_conflict_resolution_weights_each_key_separately(self):
+        """Session insights on other keys neither join the average nor dilute it"""
+        hub = AICommunicationHub()
+        for performer_id in ('a', 'b', 'c'):
+            hub.register_performer(performer_id, {}, RecordingHandler())
+        session = await hub.initiate_collaboration('a', ['a', 'b', 'c'], 'topic', 'objective')
+        
+        for sender, confidence, data in (('a', 0.8, {'score': 1.0}), ('b', 0.2, {'score': 0.0}),
+                                         ('c', 0.9, {'budget': 50.0})):
+            message = self._message(sender, session.id)
+            message.content = {'confidence': confidence, 'data': data}
+            await hub.send_message(message)
+        
+        assert await hub.resolve_conflict(session.id, {'type': 'confidence_disagreement'})
+        assert session.resolution['result'] == {'score': pytest.approx(0.8)}
+        
+        resolution = await hub._resolve_collaboration_conflict(
+            session, {'type': 'confidence_disagreement', 'insights': [{'confidence': 0.2, 'data': {'score': 0.5}}]})
+        assert resolution['result'] == {'score': pytest.approx((0.8 + 0.5 * 0.2) / 1.2)}
+        
+        resolution = await hub._resolve_collaboration_conflict(
+            session, {'type': 'confidence_disagreement', 'keys': ['budget']})
+        assert resolution['resolution_type'] == 'human_review_required'  # Only one insight on budget
+    
+    @pytest.mark.asyncio
+    async def test_non_numeric_insights_need_human_review(self):
+        """Insights whose data cannot be averaged are flagged instead of failing"""
+        hub = AICommunicationHub()
+        for performer_id in ('a', 'b'):
+            hub.register_performer(performer_id, {}, RecordingHandler())
+        session = await hub.initiate_collaboration('a', ['a', 'b'], 'topic', 'objective')
+        
+        for sender, confidence, value in (('a', 0.8, 'grow'), ('b', 0.2, 'hold')):
+            message = self._message(sender, session.id)
+            message.content = {'confidence': confidence, 'data': {'strategy': value}}
+            await hub.send_message(message)
+        
+        assert await hub.resolve_conflict(session.id, {'type': 'confidence_disagreement'})
+        assert session.resolution['resolution_type'] == 'human_review_required'
+        
+        insights = [{'confidence': 0.6, 'data': {'strategy': 'grow'}},
+                    {'confidence': 0.4, 'data': {'strategy': 'hold'}}]
+        resolution = await hub._resolve_collaboration_conflict(
+            session, {'type': 'confidence_disagreement', 'insights': insights})
+        assert resolution['resolution_type'] == 'human_review_required'
@@ -4,6 +4,8 @@ Tests for Exponential Opportunity Analyzer
 
 import pytest
 import asyncio
+import random
+import time
 from unittest.mock import Mock, patch
 from src.services.exponential_opportunity_analyzer import (
     ExponentialOpportunityAnalyzer,
@@ -355,5 +357,114 @@ class TestExponentialOpportunityAnalyzer:
         assert exponential_opportunity_analyzer is not None
         assert isinstance(exponential_opportunity_analyzer, ExponentialOpportunityAnalyzer)
 
+FILLER = "the team discussed plans for next quarter with partners and customers".split()
+
+def make_meetings(analyzer: ExponentialOpportunityAnalyzer, count: int, seed: int):
+    rng = random.Random(seed)
+    vocabulary = analyzer.term_matrix.terms + ['platform', 'marketplace', 'ecosystem', 'chain', 'maintain']
+    meetings = []
+    for i in range(count):
+        words = [
+            rng.choice(vocabulary) if rng.random() < 0.15 else rng.choice(FILLER)
+            for _ in range(rng.randint(0, 200))
+        ]
+        if rng.random() < 0.1:
+            words = [word.upper() for word in words]
+        meetings.append({'meeting_id': f"meeting-{i}", 'content': ' '.join(words)})
+    return meetings
+
+class TestBatchAnalysis:
+    """Test the sparse multi-meeting screening path"""
+    
+    @pytest.fixture
+    def analyzer(self):
+        return ExponentialOpportunityAnalyzer()
+    
+    def _substring_technologies(self, analyzer, content, focus_domains):
+        """Reference per-keyword scan the term matrix replaces"""
+        content_lower = content.lower()
+        relevant = []
+        for tech in analyzer.exponential_technologies.values():
+            if tech.domain not in focus_domains:
+                continue
+            keyword_matches = sum(1 for k in tech.keywords if k.lower() in content_lower)
+            use_case_matches = sum(1 for u in tech.use_cases if u.lower() in content_lower)
+            if (keyword_matches * 0.6 + use_case_matches * 0.4) / max(len(tech.keywords), 1) > 0.2:
+                relevant.append(tech)
+        relevant.sort(key=lambda t: t.disruption_potential, reverse=True)
+        return [tech.id for tech in relevant[:10]]
+    
+    def test_screening_matches_substring_scan(self, analyzer):
+        """Sparse scores select the same technologies as per-keyword scans"""
+        meetings = make_meetings(analyzer, 200, seed=7)
+        contents = [meeting['content'] for meeting in meetings]
+        focus_domains = [ExponentialDomain.DIGITAL, ExponentialDomain.PHYSICAL]
+        
+        technologies, patterns = analyzer._screen_meetings(contents, focus_domains)
+        
+        for content, meeting_techs, meeting_patterns in zip(contents, technologies, patterns):
+            assert [t.id for t in meeting_techs] == self._substring_technologies(analyzer, content, focus_domains)
+            aligned_ids = {t.id for t in meeting_techs}
+            for pattern in meeting_patterns:
+                related = analyzer.opportunity_patterns[pattern['pattern_id']]['related_technologies']
+                assert pattern['tech_alignment'] == any(tech_id in aligned_ids for tech_id in related)
+    
+    def test_contained_terms_are_found(self, analyzer):
+        """Terms inside longer words still count, as with substring search"""
+        presence = analyzer.term_matrix.vectorize(['robotic process automation in the blockchain'])
+        found = {analyzer.term_matrix.terms[col] for col in presence.indices}
+        assert {'robotic process automation', 'automation', 'blockchain', 'ai'} <= found
+    
+    @pytest.mark.asyncio
+    async def test_batch_runs_full_analysis_for_top_candidates(self, analyzer, monkeypatch):
+        """Readiness and roadmaps are only generated for the top_k meetings"""
+        meetings = make_meetings(analyzer, 50, seed=3)
+        meetings.append({'meeting_id': 'empty', 'content': ''})
+        roadmap_calls = []
+        original = analyzer._generate_transformation_roadmap
+        
+        async def counting_roadmap(*args, **kwargs):
+            roadmap_calls.append(1)
+            return await original(*args, **kwargs)
+        
+        monkeypatch.setattr(analyzer, '_generate_transformation_roadmap', counting_roadmap)
+        result = await analyzer.analyze_meetings_batch(meetings, top_k=5)
+        
+        assert 'error' not in result
+        assert result['meetings_analyzed'] == 51
+        assert result['candidates_analyzed'] == len(roadmap_calls) == 5
+        
+        scores = {entry['meeting_id']: entry['screening_score'] for entry in result['screening']}
+        top_scores = [scores[analysis['meeting_id']] for analysis in result['top_opportunities']]
+        assert top_scores == sorted(scores.values(), reverse=True)[:5]
+        assert scores['empty'] == 0
+        
+        single = await analyzer.analyze_exponential_opportunities(
+            next(m['content'] for m in meetings if m['meeting_id'] == result['top_opportunities'][0]['meeting_id'])
+        )
+        top = result['top_opportunities'][0]
+        assert top['exponential_potential'] == single['exponential_potential']
+        assert top['relevant_technologies'] == single['relevant_technologies']
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_batch_benchmark(self, analyzer):
+        """Benchmark 1k meetings batched against per-meeting analysis"""
+        meetings = make_meetings(analyzer, 1000, seed=11)
+        
+        start = time.perf_counter()
+        result = await analyzer.analyze_meetings_batch(meetings, top_k=10)
+        batch_elapsed = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for meeting in meetings:
+            await analyzer.analyze_exponential_opportunities(meeting['content'])
+        single_elapsed = time.perf_counter() - start
+        
+        print(f"\n1k meetings: batch {batch_elapsed * 1000:.1f} ms, "
+              f"per-meeting {single_elapsed * 1000:.1f} ms")
+        assert result['meetings_analyzed'] == 1000
+        assert result['candidates_analyzed'] == 10
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
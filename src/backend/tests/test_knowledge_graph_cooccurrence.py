@@ -0,0 +1,207 @@
+"""
+Tests for sparse co-occurrence relationship extraction
+"""
+
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.services.knowledge_graph_cooccurrence import CooccurrenceMatrix, segment_incidence
+from src.services.knowledge_graph_service import KnowledgeGraphService, RelationshipType
+
+VOCABULARY = [f"term{i:03d}" for i in range(120)]
+
+def make_meeting(rng: random.Random, index: int, segments: int = 30, terms: int = 20) -> dict:
+    present = rng.sample(VOCABULARY[:60] if index % 2 else VOCABULARY, terms)
+    return {
+        'meeting_id': f"meeting-{index}",
+        'date': (datetime(2024, 1, 1) + timedelta(days=index)).isoformat(),
+        'transcript_analysis': {'segments': [
+            {'text': ' '.join(rng.sample(present, rng.randrange(1, 5))) + ' were discussed'}
+            for _ in range(segments)
+        ]},
+        'decisions': [{'title': present[0].upper(), 'description': f"adopt {present[1]}"}],
+        'actions': []
+    }
+
+def meeting_concepts(meeting: dict) -> list:
+    text = ' '.join(segment['text'] for segment in meeting['transcript_analysis']['segments'])
+    return [{'name': term, 'relevance_score': 0.5} for term in VOCABULARY if term in text]
+
+async def ingest(service: KnowledgeGraphService, meeting: dict) -> list:
+    """The relationship steps of ``process_meeting_knowledge``"""
+    date = datetime.fromisoformat(meeting['date'])
+    concepts = await service._update_concepts(meeting_concepts(meeting), meeting['meeting_id'], date)
+    candidates = await service._extract_relationships(meeting, concepts)
+    relationships = await service._update_relationships(candidates, meeting['meeting_id'], date)
+    await service._update_graph_structure(concepts, relationships)
+    if service.store:
+        service._persist_meeting_delta(meeting['meeting_id'], concepts, relationships, [])
+    return relationships
+
+def brute_force_counts(meetings: list) -> dict:
+    """Segments mentioning each concept pair (and each concept alone) across meetings"""
+    counts = {}
+    for meeting in meetings:
+        for text in KnowledgeGraphService()._meeting_segments(meeting):
+            present = sorted({term for term in VOCABULARY if term in text.lower()})
+            for a, b in itertools.combinations_with_replacement(present, 2):
+                counts[(a, b)] = counts.get((a, b), 0) + 1
+    return counts
+
+class TestCooccurrenceMatrix:
+    """Test the sparse incidence and running counts against direct counting"""
+    
+    def test_segment_incidence(self):
+        texts = ['Budget review', 'hiring plan and budget', '', 'the hiring budget budget']
+        incidence = segment_incidence(['budget', 'Hiring', 'roadmap', ''], texts)
+        assert incidence.toarray().tolist() == [[1, 1, 0, 1], [0, 1, 0, 1], [0, 0, 0, 0], [0, 0, 0, 0]]
+        
+        texts = ['she said so', 'AI roadmap', 'retail ai.', 'c++ and c']
+        incidence = segment_incidence(['ai', 'c++', 'c'], texts)
+        assert incidence.toarray().tolist() == [[0, 1, 1, 0], [0, 0, 0, 1], [0, 0, 0, 1]]
+    
+    def test_running_counts_match_all_meetings(self):
+        rng = random.Random(1)
+        matrix = CooccurrenceMatrix()
+        meetings = [make_meeting(rng, i) for i in range(6)]
+        for meeting in meetings:
+            texts = KnowledgeGraphService()._meeting_segments(meeting)
+            names = [concept['name'] for concept in meeting_concepts(meeting)]
+            matrix.add(names, segment_incidence(names, texts))
+        
+        for (a, b), count in brute_force_counts(meetings).items():
+            assert matrix.matrix[matrix.index[a], matrix.index[b]] == count
+            assert matrix.matrix[matrix.index[b], matrix.index[a]] == count
+        assert matrix.matrix.sum() == sum(
+            count * (1 if a == b else 2) for (a, b), count in brute_force_counts(meetings).items())
+        
+        pairs = [('term001', 'term002'), ('term003', 'term004')]
+        strengths, counts = matrix.strengths([pair for pair in pairs if all(p in matrix.index for p in pair)])
+        dense = matrix.matrix.toarray()
+        for (a, b), strength in zip(pairs, strengths.tolist()):
+            i, j = matrix.index[a], matrix.index[b]
+            assert strength == pytest.approx(dense[i, j] / math.sqrt(dense[i, i] * dense[j, j]))
+    
+    def test_increments_and_table_round_trip(self):
+        rng = random.Random(2)
+        matrix, replayed = CooccurrenceMatrix(), CooccurrenceMatrix()
+        for i in range(4):
+            meeting = make_meeting(rng, i)
+            names = [concept['name'] for concept in meeting_concepts(meeting)]
+            local = matrix.add(names, segment_incidence(names, KnowledgeGraphService()._meeting_segments(meeting)))
+            replayed.apply_increments(matrix.increments(names, local))
+        
+        def as_dict(m):
+            coo = m.matrix.tocoo()
+            return {(m.ids[i], m.ids[j]): c for i, j, c in zip(coo.row, coo.col, coo.data) if c}
+        
+        assert as_dict(replayed) == as_dict(matrix)
+        node_ids = list(reversed(matrix.ids))
+        position = {concept_id: i for i, concept_id in enumerate(node_ids)}
+        restored = CooccurrenceMatrix.from_table(matrix.to_table(position.__getitem__), node_ids)
+        assert as_dict(restored) == as_dict(matrix)
+
+class TestServiceRelationships:
+    """Test relationship extraction and maintenance in the service"""
+    
+    @pytest.mark.asyncio
+    async def test_relationships_follow_threshold(self):
+        service = KnowledgeGraphService()
+        rng = random.Random(3)
+        meetings = [make_meeting(rng, i) for i in range(8)]
+        for meeting in meetings:
+            await ingest(service, meeting)
+        
+        counts = brute_force_counts(meetings)
+        names = {concept.id: concept.name for concept in service.concepts.values()}
+        threshold = service.config['relationship_strength_threshold']
+        assert service.relationships
+        for relationship in service.relationships.values():
+            a, b = sorted([names[relationship.source_concept_id], names[relationship.target_concept_id]])
+            expected = counts[(a, b)] / math.sqrt(counts[(a, a)] * counts[(b, b)])
+            assert relationship.relationship_type == RelationshipType.RELATES_TO
+            assert relationship.context['source'] == 'co_occurrence'
+            assert relationship.strength == pytest.approx(expected)
+            assert service.graph.has_edge(relationship.source_concept_id, relationship.target_concept_id)
+        
+        # Only pairs crossing the threshold become relationships; existing ones are refreshed
+        existing = set(service.relationships)
+        last = await ingest(service, meetings[-1])
+        counts = brute_force_counts(meetings + [meetings[-1]])
+        for relationship in last:
+            a, b = sorted([names[relationship.source_concept_id], names[relationship.target_concept_id]])
+            assert relationship.strength == pytest.approx(counts[(a, b)] / math.sqrt(counts[(a, a)] * counts[(b, b)]))
+            assert relationship.strength >= threshold or relationship.id in existing
+        
+        pages = service.query_relationships(limit=500)
+        assert pages['total_count'] == len(service.relationships)
+        assert len({(r.source_concept_id, r.target_concept_id) for r in service.relationships.values()}) == \
+            len(service.relationships)
+    
+    @pytest.mark.asyncio
+    async def test_counts_survive_restart(self, tmp_path):
+        rng = random.Random(4)
+        service = KnowledgeGraphService(data_dir=str(tmp_path))
+        for i in range(3):
+            await ingest(service, make_meeting(rng, i))
+        
+        service.store.close()
+        replayed = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert replayed.cooccurrence.ids == service.cooccurrence.ids
+        assert (replayed.cooccurrence.matrix != service.cooccurrence.matrix).nnz == 0
+        
+        replayed.save_snapshot()
+        await ingest(replayed, make_meeting(rng, 3))
+        replayed.store.close()
+        service = replayed
+        restored = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert sorted(restored.cooccurrence.ids) == sorted(service.cooccurrence.ids)
+        for a, b in [(0, 1), (2, 5), (3, 3)]:
+            ids = service.cooccurrence.ids
+            assert restored.cooccurrence.strengths([(ids[a], ids[b])])[1][0] == \
+                service.cooccurrence.strengths([(ids[a], ids[b])])[1][0]
+        assert restored.relationships.keys() == service.relationships.keys()
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_ingestion_benchmark(self):
+        """Per-meeting relationship cost after 300 meetings, incremental versus recounting history"""
+        rng = random.Random(5)
+        meetings = [make_meeting(rng, i, segments=60, terms=20) for i in range(300)]
+        service = KnowledgeGraphService()
+        for meeting in meetings[:-1]:
+            await ingest(service, meeting)
+        
+        def recount(history):
+            """Pairwise counts over every meeting's concept lists, as strengths from scratch require"""
+            counts = {}
+            for meeting in history:
+                names = [concept['name'] for concept in meeting_concepts(meeting)]
+                for text in service._meeting_segments(meeting):
+                    present = [name for name in names if name in text.lower()]
+                    for a in present:
+                        for b in present:
+                            counts[(a, b)] = counts.get((a, b), 0) + 1
+            return counts
+        
+        start = time.perf_counter()
+        counts = recount(meetings)
+        recount_ms = (time.perf_counter() - start) * 1000
+        
+        meeting = meetings[-1]
+        concepts = await service._update_concepts(meeting_concepts(meeting), meeting['meeting_id'], datetime(2025, 1, 1))
+        start = time.perf_counter()
+        candidates = await service._extract_relationships(meeting, concepts)
+        incremental_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"\nrelationship strengths for meeting 300: recount history {recount_ms:.1f} ms, "
+              f"sparse incremental {incremental_ms:.2f} ms ({len(candidates)} relationships, "
+              f"{service.cooccurrence.matrix.nnz} nonzero counts)")
+        index = service.cooccurrence.index
+        names = {concept.id: concept.name for concept in service.concepts.values()}
+        for concept_id in index:
+            assert service.cooccurrence.matrix[index[concept_id], index[concept_id]] == \
+                counts[(names[concept_id], names[concept_id])]
@@ -0,0 +1,211 @@
+"""
+Tests for the CSR knowledge graph index
+"""
+
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import networkx as nx
+import pytest
+from src.services.knowledge_graph_index import CSRGraphIndex
+from src.services.knowledge_graph_metrics import VersionedDiGraph
+from src.services.knowledge_graph_service import (
+    KnowledgeGraphService,
+    Concept,
+    ConceptType,
+    RelationshipType
+)
+
+def make_concepts(count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    concepts = {}
+    for i in range(count):
+        concept = Concept(
+            id=f"c{i}",
+            name=f"concept {i}",
+            concept_type=rng.choice(list(ConceptType)),
+            description='',
+            attributes={'source': 'transcript'},
+            first_mentioned=start,
+            last_mentioned=start + timedelta(hours=i),
+            mention_count=rng.randrange(1, 50),
+            importance_score=rng.random(),
+            evolution_history=[],
+            related_meetings={f"m{rng.randrange(500)}"}
+        )
+        concepts[concept.id] = concept
+    return concepts
+
+def random_edge(rng: random.Random, count: int):
+    return (f"c{rng.randrange(count)}", f"c{rng.randrange(count)}", {
+        'relationship_type': rng.choice(list(RelationshipType)).value,
+        'weight': round(rng.random(), 3)
+    })
+
+def make_graph(concepts: dict, edges: int, seed: int) -> VersionedDiGraph:
+    rng = random.Random(seed)
+    graph = VersionedDiGraph()
+    graph.bulk_load(concepts, (random_edge(rng, len(concepts)) for _ in range(edges)))
+    return graph
+
+def assert_matches_graph(index: CSRGraphIndex, graph: VersionedDiGraph):
+    for node in graph.nodes:
+        expected = {(v, round(data.get('weight', 1.0), 5), data.get('relationship_type'))
+                    for v, data in graph.adj[node].items()}
+        assert {(n['id'], round(n['weight'], 5), n['relationship_type']) for n in index.neighbors(node)} == expected
+        assert {p['id'] for p in index.neighbors(node, 'in')} == set(graph.pred[node])
+    live = sum(1 for node in index.node_ids if node in graph)
+    assert live == graph.number_of_nodes()
+    assert len(index.targets) == graph.number_of_edges()
+
+class TestCSRGraphIndex:
+    """Test CSR queries and incremental refresh against networkx"""
+    
+    @pytest.fixture
+    def concepts(self):
+        return make_concepts(200, seed=1)
+    
+    def test_incremental_refresh_tracks_mutations(self, concepts):
+        rng = random.Random(2)
+        graph = make_graph(concepts, 800, seed=2)
+        index = CSRGraphIndex()
+        index.refresh(graph, concepts)
+        assert_matches_graph(index, graph)
+        
+        for _ in range(5):
+            for _ in range(30):
+                u, v, data = random_edge(rng, len(concepts))
+                graph.add_edge(u, v, **data)
+            graph.remove_edges_from(rng.sample(list(graph.edges()), 20))
+            graph.remove_node(f"c{rng.randrange(len(concepts))}")
+            graph.add_edge('external', 'c0', weight=0.5)
+            concepts['c1'].importance_score = 2.0
+            graph.add_node('c1')
+            
+            rebuilds = index._rebuild
+            index._rebuild = None  # Refresh must take the incremental path
+            index.refresh(graph, concepts)
+            index._rebuild = rebuilds
+            assert index.version == graph.version
+            assert_matches_graph(index, graph)
+            assert index.record('c1').importance_score == 2.0
+    
+    def test_change_log_overflow_rebuilds(self, concepts):
+        graph = make_graph(concepts, 300, seed=3)
+        graph.change_log_size = 10
+        index = CSRGraphIndex()
+        index.refresh(graph, concepts)
+        
+        rng = random.Random(3)
+        for _ in range(20):
+            u, v, data = random_edge(rng, len(concepts))
+            graph.add_edge(u, v, **data)
+        assert graph.changed_since(index.version) is None
+        index.refresh(graph, concepts)
+        assert_matches_graph(index, graph)
+    
+    def test_k_hop_matches_bfs(self, concepts):
+        graph = make_graph(concepts, 400, seed=4)
+        index = CSRGraphIndex()
+        index.refresh(graph, concepts)
+        
+        expected = nx.single_source_shortest_path_length(graph.to_undirected(as_view=True), 'c0', cutoff=3)
+        assert index.k_hop('c0', 3) == expected
+        
+        outgoing = nx.single_source_shortest_path_length(graph, 'c0', cutoff=2)
+        assert index.k_hop('c0', 2, direction='out') == outgoing
+        
+        limited = index.k_hop('c0', 3, limit=25)
+        assert len(limited) == min(25, len(expected))
+        nearest = sorted(expected.values())[:len(limited)]
+        assert sorted(limited.values()) == nearest
+        assert all(expected[node] == hop for node, hop in limited.items())
+        
+        causes = graph.edge_subgraph([(u, v) for u, v, t in graph.edges(data='relationship_type') if t == 'causes'])
+        typed = index.k_hop('c0', 2, relationship_types=['causes'])
+        if 'c0' in causes:
+            assert typed == nx.single_source_shortest_path_length(causes.to_undirected(), 'c0', cutoff=2)
+        else:
+            assert typed == {'c0': 0}
+    
+    def test_type_filters(self, concepts):
+        graph = make_graph(concepts, 400, seed=5)
+        index = CSRGraphIndex()
+        index.refresh(graph, concepts)
+        
+        solves = {(u, v) for u, v, t in graph.edges(data='relationship_type') if t == 'solves'}
+        assert {(u, v) for u, v, _ in index.edges(['solves'])} == solves
+        assert index.neighbors('missing') == []
+
+class TestServiceGraphQueries:
+    """Test the service query methods and benchmark them against the dict structures"""
+    
+    @pytest.mark.asyncio
+    async def test_service_queries(self):
+        service = KnowledgeGraphService()
+        service.concepts = make_concepts(50, seed=6)
+        service.graph = make_graph(service.concepts, 150, seed=6)
+        
+        top = await service.get_top_concepts(5)
+        assert [c['id'] for c in top] == [
+            c.id for c in sorted(service.concepts.values(), key=service.current_importance, reverse=True)[:5]
+        ]
+        
+        service.graph.add_edge('c0', 'c49', relationship_type='supports', weight=0.9)
+        neighbors = service.get_graph_index().neighbors('c0', relationship_types=['supports'])
+        assert {'id': 'c49', 'weight': pytest.approx(0.9), 'relationship_type': 'supports'} in neighbors
+        
+        subgraph = service.get_concept_subgraph('c0', hops=1)
+        node = next(node for node in subgraph['nodes'] if node['id'] == 'c49')
+        assert node['distance'] == 1
+        assert node['importance_score'] == pytest.approx(service.current_importance(service.concepts['c49']),
+                                                         rel=1e-6)
+    
+    @pytest.mark.benchmark
+    def test_benchmark_100k_concepts(self):
+        """Memory and query latency at 100k concepts / 400k edges, dict structures versus CSR"""
+        count, edge_count = 100_000, 400_000
+        
+        tracemalloc.start()
+        concepts = make_concepts(count, seed=7)
+        graph = make_graph(concepts, edge_count, seed=7)
+        current_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        index = CSRGraphIndex()
+        tracemalloc.start()
+        index.refresh(graph, concepts)
+        csr_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        rng = random.Random(8)
+        nodes = [f"c{rng.randrange(count)}" for _ in range(200)]
+        
+        def timed(func):
+            start = time.perf_counter()
+            for node in nodes:
+                func(node)
+            return (time.perf_counter() - start) / len(nodes) * 1e6
+        
+        dict_neighbors = timed(lambda node: [
+            (v, d['relationship_type']) for v, d in graph.adj[node].items() if d['relationship_type'] == 'causes'
+        ])
+        csr_neighbors = timed(lambda node: index.neighbors(node, relationship_types=['causes']))
+        
+        undirected = graph.to_undirected(as_view=True)
+        index.k_hop(nodes[0], 1)  # Builds the undirected view once
+        dict_k_hop = timed(lambda node: nx.single_source_shortest_path_length(undirected, node, cutoff=3))
+        csr_k_hop = timed(lambda node: index.k_hop(node, 3))
+        
+        start = time.perf_counter()
+        graph.add_edge('c1', 'c2', relationship_type='causes', weight=0.5)
+        index.refresh(graph, concepts)
+        refresh_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"\n{count} concepts / {edge_count} edges: dicts + networkx {current_bytes / 1e6:.0f} MB, "
+              f"CSR + slotted records {csr_bytes / 1e6:.0f} MB (arrays {index.memory_bytes() / 1e6:.1f} MB)\n"
+              f"typed neighbors {dict_neighbors:.1f} vs {csr_neighbors:.1f} us, "
+              f"3-hop {dict_k_hop:.0f} vs {csr_k_hop:.0f} us, incremental refresh {refresh_ms:.1f} ms")
+        assert csr_bytes < current_bytes / 4
@@ -0,0 +1,164 @@
+"""
+Tests for incremental knowledge graph connectivity metrics
+"""
+
+import random
+import time
+import networkx as nx
+import pytest
+from src.services.knowledge_graph_metrics import (
+    VersionedDiGraph,
+    IncrementalClustering,
+    estimate_average_path_length
+)
+from src.services.knowledge_graph_service import KnowledgeGraphService
+
+def random_graph(nodes: int, edges: int, seed: int) -> VersionedDiGraph:
+    rng = random.Random(seed)
+    graph = VersionedDiGraph()
+    graph.add_nodes_from(range(nodes))
+    for _ in range(edges):
+        graph.add_edge(rng.randrange(nodes), rng.randrange(nodes), weight=rng.random())
+    return graph
+
+class TestIncrementalClustering:
+    """Test triangle counts against networkx"""
+    
+    @pytest.mark.parametrize('seed', range(3))
+    def test_matches_networkx_through_mutations(self, seed):
+        """Inserts, reciprocal edges, self-loops and removals keep clustering exact"""
+        rng = random.Random(seed)
+        graph = random_graph(60, 300, seed)
+        assert graph.clustering.average_clustering() == pytest.approx(
+            nx.average_clustering(graph.to_undirected()))
+        
+        edges = list(graph.edges())
+        graph.remove_edges_from(rng.sample(edges, 50))
+        graph.remove_edge(*next(iter(graph.edges())))
+        graph.remove_nodes_from([1, 2])
+        graph.remove_node(3)
+        graph.add_edges_from([(10, 11), (11, 10), (12, 12)])
+        graph.add_node('isolated')
+        
+        expected = nx.average_clustering(graph.to_undirected())
+        assert graph.clustering.average_clustering() == pytest.approx(expected)
+        assert set(graph.clustering.adjacency) == set(graph.nodes())
+    
+    def test_version_tracks_structural_changes(self):
+        graph = VersionedDiGraph()
+        graph.add_edge('a', 'b')
+        version = graph.version
+        graph.add_edge('b', 'c')
+        assert graph.version > version
+        
+        copy = graph.copy()
+        assert copy.clustering.adjacency == graph.clustering.adjacency
+        
+        graph.clear()
+        assert graph.clustering.average_clustering() == 0.0
+    
+    def test_changed_since(self):
+        graph = VersionedDiGraph()
+        graph.add_edge('a', 'b')
+        version = graph.version
+        graph.add_edge('b', 'c')
+        graph.add_node('d')
+        
+        assert graph.changed_since(version) >= {'b', 'd'}
+        assert graph.changed_since(graph.version) == set()
+        graph.clear()
+        assert graph.changed_since(version) is None
+    
+    def test_bulk_load_matches_incremental(self):
+        incremental = random_graph(60, 300, 8)
+        loaded = VersionedDiGraph()
+        loaded.bulk_load(incremental.nodes(data=True), incremental.edges(data=True))
+        
+        assert loaded.clustering.triangles == incremental.clustering.triangles
+        assert loaded.clustering.average_clustering() == pytest.approx(
+            incremental.clustering.average_clustering())
+        
+        loaded.add_edge(0, 59)
+        assert loaded.clustering.average_clustering() == pytest.approx(
+            nx.average_clustering(loaded.to_undirected()))
+    
+    def test_triangle_counts(self):
+        clustering = IncrementalClustering()
+        for u, v in [('a', 'b'), ('b', 'c'), ('a', 'c'), ('c', 'd')]:
+            clustering.add_edge(u, v)
+        assert clustering.triangles == {'a': 1, 'b': 1, 'c': 1, 'd': 0}
+        
+        clustering.remove_edge('a', 'b')
+        assert clustering.triangles == {'a': 0, 'b': 0, 'c': 0, 'd': 0}
+
+class TestPathLengthEstimator:
+    """Test the sampled BFS average path length"""
+    
+    def test_exact_when_every_node_sampled(self):
+        graph = random_graph(80, 200, 4)
+        undirected = graph.to_undirected()
+        largest = max(nx.connected_components(undirected), key=len)
+        
+        estimate = estimate_average_path_length(graph.clustering.adjacency, relative_error=0.0, max_samples=1000)
+        assert estimate['exact']
+        assert estimate['average_path_length'] == pytest.approx(
+            nx.average_shortest_path_length(undirected.subgraph(largest)))
+    
+    def test_estimate_within_error_bound(self):
+        graph = random_graph(800, 2400, 5)
+        undirected = graph.to_undirected()
+        largest = max(nx.connected_components(undirected), key=len)
+        exact = nx.average_shortest_path_length(undirected.subgraph(largest))
+        
+        estimate = estimate_average_path_length(graph.clustering.adjacency, relative_error=0.02, seed=1)
+        assert not estimate['exact']
+        assert estimate['samples'] < len(largest)
+        assert abs(estimate['average_path_length'] - exact) <= 3 * estimate['error_bound']
+        assert abs(estimate['average_path_length'] - exact) / exact < 0.05
+
+class TestServiceConnectivityMetrics:
+    """Test cached metrics on the knowledge graph service"""
+    
+    @pytest.mark.asyncio
+    async def test_cache_invalidated_by_graph_version(self):
+        service = KnowledgeGraphService()
+        service.graph = random_graph(300, 900, 6)
+        
+        first = await service._calculate_connectivity_metrics()
+        assert await service._calculate_connectivity_metrics() == first
+        
+        service.graph.add_edge(0, 299)
+        service.graph.add_edge(299, 1)
+        service.graph.add_edge(1, 0)
+        updated = await service._calculate_connectivity_metrics()
+        assert updated['average_clustering'] == pytest.approx(
+            nx.average_clustering(service.graph.to_undirected()))
+        assert updated['density'] == pytest.approx(nx.density(service.graph))
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_summary_benchmark(self):
+        """Benchmark connectivity metrics on a 600-concept graph, exact versus sampled"""
+        service = KnowledgeGraphService()
+        service.graph = random_graph(600, 2400, 7)
+        
+        start = time.perf_counter()
+        exact = await service._calculate_connectivity_metrics(exact=True)
+        exact_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        sampled = await service._calculate_connectivity_metrics()
+        sampled_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        cached = await service._calculate_connectivity_metrics()
+        cached_time = time.perf_counter() - start
+        
+        print(f"\nconnectivity metrics, 600 nodes / 2400 edges: exact {exact_time * 1000:.0f} ms, "
+              f"sampled {sampled_time * 1000:.0f} ms ({sampled['path_length_samples']} BFS), "
+              f"cached {cached_time * 1e6:.0f} us")
+        assert sampled['average_clustering'] == pytest.approx(exact['average_clustering'])
+        assert abs(sampled['average_path_length'] - exact['average_path_length']) <= \
+            max(3 * sampled['path_length_error_bound'], 0.05 * exact['average_path_length'])
+        assert sampled['path_length_samples'] < exact['path_length_samples']
+        assert cached == sampled
@@ -0,0 +1,338 @@
+"""
+Tests for the knowledge graph query layer
+"""
+
+import heapq
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.services.knowledge_graph_query import (
+    KnowledgeGraphQueryIndex,
+    encode_cursor,
+    decay_importance
+)
+from src.services.knowledge_graph_service import (
+    KnowledgeGraphService,
+    Concept,
+    ConceptType,
+    Relationship,
+    RelationshipType
+)
+
+def make_concepts(count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    concepts = {}
+    for i in range(count):
+        concept = Concept(
+            id=f"c{i:06d}",
+            name=f"{rng.choice(['budget', 'hiring', 'roadmap', 'pricing'])} {i}",
+            concept_type=rng.choice(list(ConceptType)[:4]),
+            description='',
+            attributes={},
+            first_mentioned=start,
+            last_mentioned=start + timedelta(days=rng.randrange(60)),
+            mention_count=rng.randrange(1, 10),
+            importance_score=round(rng.random(), 2),  # Ties exercise the id tie-break
+            evolution_history=[],
+            related_meetings=set()
+        )
+        concepts[concept.id] = concept
+    return concepts
+
+def make_relationships(concepts: dict, count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    ids = list(concepts)
+    now = datetime(2024, 3, 1)
+    relationships = {}
+    for _ in range(count):
+        relationship = Relationship(
+            id=str(uuid.UUID(int=rng.getrandbits(128))),
+            source_concept_id=rng.choice(ids),
+            target_concept_id=rng.choice(ids),
+            relationship_type=rng.choice(list(RelationshipType)[:3]),
+            strength=round(rng.random(), 2),
+            confidence=0.5,
+            evidence=[],
+            first_observed=now,
+            last_observed=now,
+            observation_count=1,
+            context={}
+        )
+        relationships[relationship.id] = relationship
+    return relationships
+
+def all_pages(query, **filters) -> list:
+    items, cursor = [], None
+    while True:
+        page = query(cursor=cursor, **filters)
+        items.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return items
+
+SORT_KEYS = {
+    'importance': lambda c: (-c.importance_score, c.id),
+    'mention_count': lambda c: (-c.mention_count, c.id),
+    'last_mentioned': lambda c: (-c.last_mentioned.timestamp(), c.id)
+}
+
+class TestKnowledgeGraphQueryIndex:
+    """Test cursor pages against filtering and sorting the full collections"""
+    
+    @pytest.fixture
+    def data(self):
+        concepts = make_concepts(500, seed=1)
+        relationships = make_relationships(concepts, 1500, seed=1)
+        index = KnowledgeGraphQueryIndex()
+        index.rebuild(concepts, relationships)
+        return index, concepts, relationships
+    
+    @pytest.mark.parametrize('sort', list(SORT_KEYS))
+    @pytest.mark.parametrize('filters', [
+        {},
+        {'concept_type': 'decision'},
+        {'min_importance': 0.5, 'min_mentions': 3},
+        {'mentioned_after': datetime(2024, 2, 1, tzinfo=timezone.utc), 'search': 'BUDGET'},
+        {'concept_type': 'topic', 'min_importance': 0.25}
+    ])
+    def test_concept_pages_match_full_sort(self, data, sort, filters):
+        index, concepts, _ = data
+        expected = [
+            c for c in concepts.values()
+            if (c.importance_score >= filters.get('min_importance', 0)
+                and c.mention_count >= filters.get('min_mentions', 0)
+                and c.last_mentioned >= filters.get('mentioned_after', datetime.min.replace(tzinfo=timezone.utc))
+                and filters.get('search', '').lower() in c.name.lower()
+                and c.concept_type.value == filters.get('concept_type', c.concept_type.value))
+        ]
+        expected.sort(key=SORT_KEYS[sort])
+        
+        paged = all_pages(lambda **kw: index.query_concepts(concepts, sort=sort, limit=37, **kw), **filters)
+        assert [c.id for c in paged] == [c.id for c in expected]
+        
+        first = index.query_concepts(concepts, sort=sort, limit=37, **filters)
+        if first['total_count'] is not None:
+            assert first['total_count'] == len(expected)
+        
+        skipped = index.query_concepts(concepts, sort=sort, limit=5, offset=10, **filters)
+        assert [c.id for c in skipped['items']] == [c.id for c in expected[10:15]]
+    
+    def test_upsert_reorders(self, data):
+        index, concepts, _ = data
+        top = index.query_concepts(concepts, limit=1)['items'][0]
+        concept = concepts['c000042']
+        concept.importance_score = top.importance_score + 1
+        index.upsert_concept(concept)
+        assert index.query_concepts(concepts, limit=1)['items'][0] is concept
+        
+        index.remove_concept('c000042')
+        assert concept not in all_pages(lambda **kw: index.query_concepts(concepts, limit=100, **kw))
+    
+    def test_relationship_pages(self, data):
+        index, concepts, relationships = data
+        key = lambda r: (-r.strength, r.id)
+        
+        expected = sorted((r for r in relationships.values()
+                           if r.relationship_type.value == 'causes' and r.strength >= 0.3), key=key)
+        paged = all_pages(lambda **kw: index.query_relationships(
+            relationships, relationship_type='causes', min_strength=0.3, limit=50, **kw))
+        assert paged == expected
+        assert index.query_relationships(relationships, relationship_type='causes',
+                                         min_strength=0.3)['total_count'] == len(expected)
+        
+        source = next(iter(relationships.values())).source_concept_id
+        expected = sorted((r for r in relationships.values() if r.source_concept_id == source), key=key)
+        paged = all_pages(lambda **kw: index.query_relationships(relationships, source_concept=source,
+                                                                 limit=2, **kw))
+        assert paged == expected
+    
+    def test_scan_cap_resumes_from_cursor(self, data):
+        _, concepts, relationships = data
+        index = KnowledgeGraphQueryIndex(max_scan_rows=20)
+        index.rebuild(concepts, relationships)
+        expected = sorted((c for c in concepts.values() if 'budget' in c.name and c.mention_count >= 5),
+                          key=SORT_KEYS['importance'])
+        
+        pages = []
+        cursor = None
+        while True:
+            page = index.query_concepts(concepts, search='budget', min_mentions=5, limit=10, cursor=cursor)
+            pages.append(page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert [c.id for page in pages for c in page] == [c.id for c in expected]
+        assert any(len(page) < 10 for page in pages[:-1])
+        
+        # An offset the cap cuts short is carried in the cursor
+        skipped = all_pages(lambda **kw: index.query_concepts(concepts, search='budget', min_mentions=5,
+                                                              limit=10, **kw), offset=15)
+        assert [c.id for c in skipped] == [c.id for c in expected[15:]]
+    
+    def test_invalid_arguments_rejected(self, data):
+        index, concepts, _ = data
+        with pytest.raises(ValueError):
+            index.query_concepts(concepts, cursor='not-a-cursor')
+        with pytest.raises(ValueError):
+            index.query_concepts(concepts, sort='mention_count', cursor=encode_cursor('importance', 0.5, 'c1'))
+        with pytest.raises(ValueError):
+            index.query_concepts(concepts, sort='name')
+        with pytest.raises(ValueError):
+            index.query_concepts(concepts, limit=0)
+        with pytest.raises(ValueError):
+            index.query_relationships({}, limit=-1)
+        
+        assert index.query_concepts(concepts, limit=5, offset=-3)['items'] == \
+            index.query_concepts(concepts, limit=5)['items']
+
+class TestServiceQueries:
+    """Test the service query methods and benchmark them against full materialization"""
+    
+    def test_subgraph_limits(self):
+        service = KnowledgeGraphService()
+        service.concepts = make_concepts(300, seed=2)
+        rng = random.Random(2)
+        ids = list(service.concepts)
+        for _ in range(1200):
+            service.graph.add_edge(rng.choice(ids), rng.choice(ids),
+                                   relationship_type=rng.choice(['causes', 'supports']), weight=rng.random())
+        
+        subgraph = service.get_concept_subgraph(ids[0], hops=3, limit=40, max_edges=25)
+        node_ids = {node['id'] for node in subgraph['nodes']}
+        assert len(node_ids) == 40
+        assert subgraph['truncated']
+        assert len(subgraph['edges']) == 25
+        assert all(edge['source'] in node_ids and edge['target'] in node_ids for edge in subgraph['edges'])
+        assert subgraph['nodes'][0] == {**subgraph['nodes'][0], 'id': ids[0], 'distance': 0}
+        
+        typed = service.get_concept_subgraph(ids[0], hops=1, relationship_types=['supports'])
+        assert all(edge['relationship_type'] == 'supports' for edge in typed['edges'])
+    
+    @pytest.mark.asyncio
+    async def test_update_concepts_keeps_index_current(self):
+        service = KnowledgeGraphService()
+        await service._update_concepts([
+            {'name': 'Pricing', 'relevance_score': 0.9},
+            {'name': 'Hiring', 'relevance_score': 0.4}
+        ], 'm1', datetime(2024, 1, 1))
+        assert [c.name for c in service.query_concepts()['items']] == ['Pricing', 'Hiring']
+        
+        await service._update_concepts([{'name': 'hiring', 'relevance_score': 1.0}], 'm2', datetime(2024, 1, 2))
+        page = service.query_concepts(sort='mention_count', limit=1)
+        assert page['items'][0].name == 'Hiring'
+        assert page['next_cursor'] is not None
+    
+    @pytest.mark.benchmark
+    def test_first_page_benchmark(self):
+        """First page of a filtered listing at 100k concepts, index versus filter-and-sort"""
+        service = KnowledgeGraphService()
+        service.concepts = make_concepts(100_000, seed=3)
+        service._rebuild_query_index()
+        
+        def full_scan():
+            filtered = [c for c in service.concepts.values() if c.concept_type.value == 'decision']
+            filtered = [c for c in filtered if c.mention_count >= 2]
+            filtered.sort(key=service.current_importance, reverse=True)
+            return filtered[:50]
+        
+        start = time.perf_counter()
+        expected = full_scan()
+        scan_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        page = service.query_concepts(concept_type='decision', min_mentions=2, limit=50)
+        index_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        deep = service.query_concepts(concept_type='decision', min_mentions=2, limit=50, cursor=page['next_cursor'])
+        cursor_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"\nfirst page of 50 at 100k concepts: filter-and-sort {scan_ms:.1f} ms, "
+              f"index {index_ms:.2f} ms, next page {cursor_ms:.2f} ms")
+        assert [c.id for c in page['items']] == [c.id for c in expected]
+        assert len(deep['items']) == 50
+
+class TestImportanceDecay:
+    """Test lazily decayed importance against decaying every score"""
+    
+    def test_closed_form_matches_daily_decay(self):
+        start = datetime(2024, 1, 1)
+        score = 0.8
+        for _ in range(10):
+            score *= 0.95
+        assert decay_importance(0.8, start, start + timedelta(days=10), 0.95) == pytest.approx(score)
+        assert decay_importance(0.8, start, start + timedelta(hours=12), 0.95) == pytest.approx(0.8 * 0.95 ** 0.5)
+        assert decay_importance(0.8, start, start - timedelta(days=1), 0.95) == 0.8
+    
+    @pytest.mark.parametrize('days', [60, 365])
+    def test_ranking_matches_decayed_scores(self, days):
+        concepts = make_concepts(400, seed=4)
+        rng = random.Random(4)
+        for concept in concepts.values():
+            concept.importance_score = rng.random()  # Unrounded, so decayed scores do not tie
+        index = KnowledgeGraphQueryIndex(importance_decay_factor=0.9)
+        index.rebuild(concepts, {})
+        at = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=days)
+        current = lambda c: decay_importance(c.importance_score, c.last_mentioned, at, 0.9)
+        
+        expected = sorted(concepts.values(), key=lambda c: (-current(c), c.id))
+        paged = all_pages(lambda **kw: index.query_concepts(concepts, limit=64, at=at, **kw))
+        assert [c.id for c in paged] == [c.id for c in expected]
+        
+        threshold = (current(expected[100]) + current(expected[101])) / 2
+        above = index.query_concepts(concepts, min_importance=threshold, limit=500, at=at)
+        assert {c.id for c in above['items']} == {c.id for c in expected[:101]}
+        assert above['total_count'] == len(above['items'])
+    
+    def test_recent_mention_outranks_stale_score(self):
+        service = KnowledgeGraphService()
+        service.concepts = make_concepts(2, seed=5)
+        stale, recent = service.concepts.values()
+        stale.importance_score, stale.last_mentioned = 0.9, datetime(2024, 1, 1)
+        recent.importance_score, recent.last_mentioned = 0.6, datetime(2024, 1, 21)
+        
+        assert service.top_concepts(2, at=datetime(2024, 1, 21)) == [recent, stale]
+        assert service.current_importance(stale, datetime(2024, 1, 21)) == pytest.approx(0.9 * 0.95 ** 20)
+    
+    @pytest.mark.asyncio
+    async def test_update_decays_before_blending(self):
+        service = KnowledgeGraphService()
+        await service._update_concepts([{'name': 'Pricing', 'relevance_score': 0.9}], 'm1', datetime(2024, 1, 1))
+        await service._update_concepts([{'name': 'Pricing', 'relevance_score': 0.5}], 'm2', datetime(2024, 1, 11))
+        concept = service._find_concept_by_name('pricing')
+        assert concept.importance_score == pytest.approx(0.9 * 0.95 ** 10 * 0.8 + 0.5 * 0.2)
+        assert concept.last_mentioned == datetime(2024, 1, 11)
+        
+        # A late-processed earlier meeting does not move the decay reference back
+        await service._update_concepts([{'name': 'Pricing', 'relevance_score': 0.5}], 'm0', datetime(2024, 1, 5))
+        assert concept.last_mentioned == datetime(2024, 1, 11)
+        
+        summary = await service.get_knowledge_graph_summary()
+        assert summary['top_concepts'][0]['importance_score'] == pytest.approx(service.current_importance(concept), rel=1e-6)
+    
+    @pytest.mark.benchmark
+    def test_top_k_benchmark(self):
+        """Top 10 concepts at 100k, index versus rescoring every concept"""
+        service = KnowledgeGraphService()
+        service.concepts = make_concepts(100_000, seed=6)
+        service._rebuild_query_index()
+        now = datetime(2024, 4, 1, tzinfo=timezone.utc)
+        
+        start = time.perf_counter()
+        expected = heapq.nlargest(10, service.concepts.values(), key=lambda c: service.current_importance(c, now))
+        rescore_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        top = service.top_concepts(10, at=now)
+        index_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        service.query_index.upsert_concept(expected[-1])
+        upsert_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"\ntop 10 of 100k by decayed importance: rescore all {rescore_ms:.1f} ms, "
+              f"index {index_ms:.3f} ms, index update {upsert_ms:.3f} ms")
+        assert top == expected
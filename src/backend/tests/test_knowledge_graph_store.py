@@ -0,0 +1,289 @@
+"""
+Tests for knowledge graph snapshot and write-ahead log persistence
+"""
+
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from src.services.knowledge_graph_store import KnowledgeGraphStore, encode_datetimes, decode_datetimes
+from src.services.knowledge_graph_service import (
+    KnowledgeGraphService,
+    Concept,
+    ConceptType,
+    Relationship,
+    RelationshipType,
+    KnowledgeEvolution,
+    EvolutionType
+)
+
+def make_concept(rng: random.Random, index: int) -> Concept:
+    mentioned = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index)
+    return Concept(
+        id=str(uuid.UUID(int=rng.getrandbits(128))),
+        name=f"concept {index}",
+        concept_type=rng.choice(list(ConceptType)),
+        description=f"context for concept {index}",
+        attributes={'source': 'transcript', 'score': rng.random()},
+        first_mentioned=mentioned,
+        last_mentioned=mentioned + timedelta(days=rng.randrange(30)),
+        mention_count=rng.randrange(1, 20),
+        importance_score=rng.random(),
+        evolution_history=[],
+        related_meetings={f"meeting-{rng.randrange(100)}"},
+        created_at=datetime(2024, 1, 1, 12, 30, 15, 250)
+    )
+
+def make_relationship(rng: random.Random, concepts: list) -> Relationship:
+    source, target = rng.sample(concepts, 2)
+    observed = datetime(2024, 2, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(10000))
+    return Relationship(
+        id=str(uuid.UUID(int=rng.getrandbits(128))),
+        source_concept_id=source.id,
+        target_concept_id=target.id,
+        relationship_type=rng.choice(list(RelationshipType)),
+        strength=rng.random(),
+        confidence=rng.random(),
+        evidence=[f"{source.name} came up with {target.name}"],
+        first_observed=observed,
+        last_observed=observed,
+        observation_count=rng.randrange(1, 5),
+        context={'meeting_id': f"meeting-{rng.randrange(100)}"}
+    )
+
+def make_evolution(concept: Concept) -> KnowledgeEvolution:
+    return KnowledgeEvolution(
+        id=str(uuid.uuid4()),
+        concept_id=concept.id,
+        evolution_type=EvolutionType.EMERGENCE,
+        timestamp=concept.first_mentioned,
+        description=f"{concept.name} emerged",
+        before_state={},
+        after_state={'mention_count': concept.mention_count},
+        triggers=['meeting'],
+        impact_score=0.5,
+        confidence=0.8,
+        metadata={}
+    )
+
+def meeting_deltas(concepts: int, relationships: int, meetings: int, seed: int):
+    """Synthetic per-meeting (concepts, relationships, evolutions) batches"""
+    rng = random.Random(seed)
+    concept_list = [make_concept(rng, i) for i in range(concepts)]
+    relationship_list = [make_relationship(rng, concept_list) for _ in range(relationships)]
+    for m in range(meetings):
+        yield (concept_list[m::meetings], relationship_list[m::meetings],
+               [make_evolution(c) for c in concept_list[m::meetings][:2]])
+
+def ingestion_meetings(count: int):
+    """Meeting payloads for ``process_meeting_knowledge`` sharing recurring concepts"""
+    return [
+        {
+            'meeting_id': f"meeting-{m}",
+            'date': '2024-01-15T10:00:00Z',
+            'transcript_analysis': {
+                'segments': [
+                    {'speaker': 'Alice', 'text': 'Deployment automation keeps failing on the staging cluster'},
+                    {'speaker': 'Bob', 'text': 'Automation of the staging cluster needs better monitoring'},
+                    {'speaker': 'Alice', 'text': f"Monitoring review number {m} covered deployment alerts"}
+                ]
+            },
+            'decisions': [{'title': 'Adopt Deployment Automation', 'description': 'Automate staging deployment',
+                           'confidence_score': 0.8}],
+            'actions': [{'title': 'Configure Monitoring', 'description': 'Add monitoring alerts for staging',
+                         'owner': 'Bob', 'confidence_score': 0.7}],
+            'strategic_implications': [{'title': 'Platform Consolidation',
+                                        'description': 'Consolidate staging platforms', 'confidence_score': 0.6}]
+        }
+        for m in range(count)
+    ]
+
+def assert_same_state(restored: KnowledgeGraphService, original: KnowledgeGraphService):
+    assert restored.concepts == original.concepts
+    assert restored.relationships == original.relationships
+    assert restored.evolution_history == original.evolution_history
+    assert dict(restored.graph.nodes(data=True)) == dict(original.graph.nodes(data=True))
+    assert sorted(restored.graph.edges(data=True), key=str) == sorted(original.graph.edges(data=True), key=str)
+
+class TestKnowledgeGraphStore:
+    """Test WAL framing, torn writes and snapshot rotation"""
+    
+    def test_wal_append_and_replay(self, tmp_path):
+        store = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        assert store.append({'meeting_id': 'a'}) == 1
+        assert store.append({'meeting_id': 'b'}) == 2
+        store.close()
+        
+        reopened = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        assert reopened.sequence == 2
+        assert list(reopened.replay()) == [(1, {'meeting_id': 'a'}), (2, {'meeting_id': 'b'})]
+        assert list(reopened.replay(1)) == [(2, {'meeting_id': 'b'})]
+    
+    def test_torn_tail_is_truncated(self, tmp_path):
+        store = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        store.append({'meeting_id': 'a'})
+        store.append({'meeting_id': 'b'})
+        store.close()
+        
+        (segment,) = [name for name in os.listdir(tmp_path) if name.startswith('wal-')]
+        path = tmp_path / segment
+        path.write_bytes(path.read_bytes()[:-3])
+        
+        reopened = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        assert reopened.sequence == 1
+        assert reopened.append({'meeting_id': 'c'}) == 2
+        assert [delta['meeting_id'] for _, delta in reopened.replay()] == ['a', 'c']
+    
+    def test_snapshot_compacts_wal(self, tmp_path):
+        store = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        store.append({'meeting_id': 'a'})
+        store.write_snapshot({'table': {'values': np.arange(3), 'names': ['x', 'é']}})
+        store.append({'meeting_id': 'b'})
+        store.close()
+        
+        reopened = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        sequence, tables, _ = reopened.load_snapshot()
+        assert sequence == 1
+        assert tables['table']['values'].tolist() == [0, 1, 2]
+        assert list(tables['table']['names']) == ['x', 'é']
+        assert tables['table']['names'][1] == 'é'
+        assert [delta['meeting_id'] for _, delta in reopened.replay(sequence)] == ['b']
+        assert sorted(name for name in os.listdir(tmp_path) if name.startswith('wal-')) == ['wal-000000000002.log']
+    
+    def test_directory_has_one_owner(self, tmp_path):
+        store = KnowledgeGraphStore(str(tmp_path), fsync=False)
+        with pytest.raises(BlockingIOError):
+            KnowledgeGraphStore(str(tmp_path), fsync=False)
+        store.close()
+        KnowledgeGraphStore(str(tmp_path), fsync=False).close()
+    
+    def test_datetime_columns_round_trip(self):
+        values = [
+            datetime(2024, 3, 1, 9, 30, 0, 123456, tzinfo=timezone.utc),
+            datetime(1999, 12, 31, 23, 59, 59),
+            datetime(2024, 3, 1, 9, 30, tzinfo=timezone(timedelta(hours=2)))
+        ]
+        assert decode_datetimes(*encode_datetimes(values)) == values
+
+class TestServicePersistence:
+    """Test service restore from snapshot plus WAL tail"""
+    
+    @pytest.mark.asyncio
+    async def test_restart_restores_snapshot_and_wal_tail(self, tmp_path):
+        service = KnowledgeGraphService(data_dir=str(tmp_path))
+        service.config['snapshot_interval_meetings'] = 3
+        for meeting, (concepts, relationships, evolutions) in enumerate(meeting_deltas(40, 120, 5, seed=1)):
+            for concept in concepts:
+                service.concepts[concept.id] = concept
+            for relationship in relationships:
+                service.relationships[relationship.id] = relationship
+            service.evolution_history.extend(evolutions)
+            await service._update_graph_structure(concepts, relationships)
+            service._persist_meeting_delta(f"meeting-{meeting}", concepts, relationships, evolutions)
+        service.graph.add_edge('external-a', 'external-b', weight=0.25)
+        service.graph.add_edge('external-b', 'external-a')
+        service.save_snapshot()
+        
+        # One more meeting after the latest snapshot, only in the WAL
+        concept = next(iter(service.concepts.values()))
+        concept.mention_count += 1
+        concept.related_meetings.add('meeting-late')
+        service._persist_meeting_delta('meeting-late', [concept], [], [])
+        service.store.close()
+        
+        assert service.store.snapshot_sequence() == 5
+        restored = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert restored._deltas_since_snapshot == 1
+        assert_same_state(restored, service)
+        assert restored.graph.clustering.average_clustering() == pytest.approx(
+            service.graph.clustering.average_clustering())
+    
+    @pytest.mark.asyncio
+    async def test_ingested_meetings_restore_from_wal(self, tmp_path):
+        service = KnowledgeGraphService(data_dir=str(tmp_path))
+        for day, meeting in enumerate(ingestion_meetings(3)):
+            meeting['date'] = f"2024-01-{15 + day}T10:00:00Z"
+            result = await service.process_meeting_knowledge(meeting)
+            assert result['knowledge_graph_stats']['total_concepts'] == len(service.concepts)
+        service.store.close()
+        
+        assert service.relationships
+        assert service._find_concept_by_name('Platform Consolidation') is not None
+        restored = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert restored._deltas_since_snapshot == 3
+        assert_same_state(restored, service)
+    
+    @pytest.mark.asyncio
+    async def test_failed_meeting_is_not_logged(self, tmp_path, monkeypatch):
+        service = KnowledgeGraphService(data_dir=str(tmp_path))
+        first, second = ingestion_meetings(2)
+        
+        async def fail(concepts, relationships):
+            raise RuntimeError("graph update failed")
+        
+        with monkeypatch.context() as patched:
+            patched.setattr(service, '_update_graph_structure', fail)
+            with pytest.raises(RuntimeError):
+                await service.process_meeting_knowledge(first)
+        assert list(service.store.replay()) == []
+        assert service._unpersisted_cooccurrence == []
+        
+        await service.process_meeting_knowledge(second)
+        assert [delta['meeting_id'] for _, delta in service.store.replay()] == ['meeting-1']
+        service.store.close()
+    
+    def test_failed_restore_detaches_store(self, tmp_path):
+        service = KnowledgeGraphService(data_dir=str(tmp_path))
+        concepts, relationships, evolutions = next(meeting_deltas(10, 20, 1, seed=3))
+        service._persist_meeting_delta('meeting-0', concepts, relationships, evolutions)
+        service.save_snapshot()
+        service.store.close()
+        
+        os.remove(tmp_path / 'snapshot-000000000001' / 'meta.json')
+        files = sorted(os.listdir(tmp_path))
+        restored = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert restored.store is None
+        assert restored.save_snapshot() is None
+        assert sorted(os.listdir(tmp_path)) == files
+    
+    def test_second_process_runs_without_store(self, tmp_path):
+        owner = KnowledgeGraphService(data_dir=str(tmp_path))
+        other = KnowledgeGraphService(data_dir=str(tmp_path))
+        assert owner.store is not None
+        assert other.store is None
+        owner.store.close()
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_cold_start_benchmark(self, tmp_path):
+        """Benchmark restart from a snapshot versus replaying every meeting from the WAL"""
+        concepts, relationships, meetings = 20_000, 100_000, 400
+        
+        replay_dir, snapshot_dir = str(tmp_path / 'replay'), str(tmp_path / 'snapshot')
+        writers = [KnowledgeGraphService(data_dir=replay_dir), KnowledgeGraphService(data_dir=snapshot_dir)]
+        for writer in writers:
+            writer.store.fsync = False
+            writer.config['snapshot_interval_meetings'] = meetings + 1
+        for meeting, delta in enumerate(meeting_deltas(concepts, relationships, meetings, seed=2)):
+            for writer in writers:
+                writer._persist_meeting_delta(f"meeting-{meeting}", *delta)
+        writers[1]._restore_from_store()
+        writers[1].save_snapshot()
+        for writer in writers:
+            writer.store.close()
+        
+        start = time.perf_counter()
+        replayed = KnowledgeGraphService(data_dir=replay_dir)
+        replay_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        restored = KnowledgeGraphService(data_dir=snapshot_dir)
+        snapshot_time = time.perf_counter() - start
+        
+        print(f"\ncold start, {concepts} concepts / {relationships} relationships: "
+              f"WAL replay of {meetings} meetings {replay_time:.2f} s, snapshot {snapshot_time:.2f} s")
+        assert restored.graph.number_of_edges() == replayed.graph.number_of_edges()
+        assert_same_state(restored, replayed)
@@ -0,0 +1,152 @@
+"""
+Tests for the AI performer LLM gateway against a local stub server
+"""
+
+import pytest
+import asyncio
+import openai
+from contextlib import asynccontextmanager
+from aiohttp import web
+
+def _completion(content: str):
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion',
+        'created': 0,
+        'model': 'stub-model',
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop'
+        }],
+        'usage': {'prompt_tokens': 5, 'completion_tokens': 5, 'total_tokens': 10}
+    }
+
+class StubServer:
+    """Local OpenAI-compatible server that replays scripted responses"""
+    
+    def __init__(self, script, delay: float = 0.0):
+        self.script = list(script)
+        self.delay = delay
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def handle(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            status = self.script.pop(0) if self.script else 200
+            if status != 200:
+                return web.json_response({'error': {'message': f'status {status}'}}, status=status)
+            return web.json_response(_completion('ok'))
+        finally:
+            self.in_flight -= 1
+
+@asynccontextmanager
+async def stub_client(script=(), delay: float = 0.0):
+    """Run a stub server and yield it with a client pointing at it"""
+    server = StubServer(script, delay)
+    app = web.Application()
+    app.router.add_post('/v1/chat/completions', server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    try:
+        port = runner.addresses[0][1]
+        yield server, openai.AsyncOpenAI(api_key='test', base_url=f'http://127.0.0.1:{port}/v1')
+    finally:
+        await runner.cleanup()
+
+@pytest.fixture(scope='module')
+def llm_gateway(import_with_human_needs_stub):
+    return import_with_human_needs_stub('src.services.ai_performers.llm_gateway')
+
+@pytest.fixture
+def gateway(llm_gateway):
+    """Gateway with fast backoff for tests"""
+    gateway = llm_gateway.LLMGateway()
+    gateway.backoff_base = 0.01
+    gateway.backoff_max = 0.05
+    return gateway
+
+MESSAGES = [{'role': 'user', 'content': 'hello'}]
+
+class TestLLMGateway:
+    """Test retries, deadlines and concurrency limits"""
+    
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_and_server_errors(self, gateway):
+        """429 and 5xx responses are retried until success"""
+        async with stub_client(script=[429, 503, 200]) as (server, client):
+            
+            response = await gateway.chat_completion(client, 'stub-model', MESSAGES, 0.2, 50)
+            
+            assert response.choices[0].message.content == 'ok'
+            assert server.requests == 3
+            assert gateway.stats['retries'] == 2
+            assert gateway.stats['rate_limited'] == 1
+            assert gateway.get_stats()['latency']['stub-model']['count'] == 3
+    
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, gateway):
+        """A 400 response fails immediately"""
+        async with stub_client(script=[400]) as (server, client):
+            
+            with pytest.raises(openai.BadRequestError):
+                await gateway.chat_completion(client, 'stub-model', MESSAGES, 0.2, 50)
+            
+            assert server.requests == 1
+            assert gateway.stats['failures'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_deadline_spans_retries(self, gateway):
+        """Retries share the call's deadline instead of each getting a fresh one"""
+        async with stub_client(script=[503, 503, 503], delay=0.1) as (server, client):
+            gateway.max_retries = 10
+            
+            start = asyncio.get_running_loop().time()
+            with pytest.raises((asyncio.TimeoutError, openai.APITimeoutError, openai.InternalServerError)):
+                await gateway.chat_completion(client, 'stub-model', MESSAGES, 0.2, 50, timeout=0.25)
+            elapsed = asyncio.get_running_loop().time() - start
+            
+            assert elapsed < 1.0
+            assert server.requests <= 3
+            assert gateway.stats['failures'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_slow_call_times_out_at_deadline(self, gateway):
+        """A call slower than the deadline fails without a retry that could not finish"""
+        async with stub_client(delay=0.5) as (server, client):
+            gateway.max_retries = 3
+            
+            with pytest.raises((asyncio.TimeoutError, openai.APITimeoutError)):
+                await gateway.chat_completion(client, 'stub-model', MESSAGES, 0.2, 50, timeout=0.05)
+            
+            assert gateway.stats['retries'] == 0
+            assert gateway.stats['timeouts'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_per_model_concurrency_limit(self, gateway):
+        """No more than max_concurrency_per_model calls reach the provider at once"""
+        gateway.max_concurrency_per_model = 2
+        async with stub_client(delay=0.05) as (server, client):
+            await asyncio.gather(*[
+                gateway.chat_completion(client, 'stub-model', MESSAGES, 0.2, 50) for _ in range(6)
+            ])
+            
+            assert server.requests == 6
+            assert server.max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_token_bucket_throttles(self, llm_gateway):
+        """Requests beyond the per-minute budget wait for refill"""
+        bucket = llm_gateway.TokenBucket(rate_per_minute=600)  # 10 per second
+        bucket.tokens = 0
+        
+        waited = await bucket.acquire(1)
+        
+        assert waited == pytest.approx(0.1, abs=0.05)
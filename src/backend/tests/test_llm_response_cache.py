@@ -0,0 +1,139 @@
+"""
+Tests for the AI performer LLM response cache
+"""
+
+import pytest
+import asyncio
+
+@pytest.fixture(scope='module')
+def response_cache(import_with_human_needs_stub):
+    return import_with_human_needs_stub('src.services.ai_performers.response_cache')
+
+class TestLLMResponseCache:
+    """Test response caching and request coalescing"""
+    
+    @pytest.fixture
+    def cache(self, response_cache, tmp_path):
+        """Create cache backed by a temporary directory"""
+        cache = response_cache.LLMResponseCache()
+        cache.enabled = True
+        cache.storage_path = str(tmp_path)
+        return cache
+    
+    def test_make_key_depends_on_all_inputs(self, response_cache):
+        """Every request parameter changes the content address"""
+        LLMResponseCache = response_cache.LLMResponseCache
+        base = LLMResponseCache.make_key('pattern_analyzer', 'gpt-4', 'system', 'user', 0.2)
+        
+        assert base == LLMResponseCache.make_key('pattern_analyzer', 'gpt-4', 'system', 'user', 0.2)
+        assert base != LLMResponseCache.make_key('structural_extractor', 'gpt-4', 'system', 'user', 0.2)
+        assert base != LLMResponseCache.make_key('pattern_analyzer', 'gpt-4', 'system', 'user', 0.7)
+        assert base != LLMResponseCache.make_key('pattern_analyzer', 'gpt-4', 'system', 'other', 0.2)
+    
+    @pytest.mark.asyncio
+    async def test_memory_and_disk_hits(self, cache):
+        """Repeated requests are served from memory, then from disk after a restart"""
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            return 'response'
+        
+        assert await cache.get_or_compute('key', compute) == ('response', 'miss')
+        assert await cache.get_or_compute('key', compute) == ('response', 'memory')
+        
+        cache.clear()
+        assert await cache.get_or_compute('key', compute) == ('response', 'disk')
+        assert len(calls) == 1
+        assert cache.get_stats()['hit_rate'] == pytest.approx(2 / 3)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self, cache):
+        """Concurrent lookups for the same key share one computation"""
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'response'
+        
+        results = await asyncio.gather(*[cache.get_or_compute('key', compute) for _ in range(5)])
+        
+        assert len(calls) == 1
+        assert [value for value, _ in results] == ['response'] * 5
+        assert sorted(source for _, source in results) == ['coalesced'] * 4 + ['miss']
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over_to_waiter(self, cache):
+        """Cancelling the leading request does not cancel requests waiting on it"""
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'response'
+        
+        leader = asyncio.create_task(cache.get_or_compute('key', compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_compute('key', compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert len(calls) == 2
+        assert [value for value, _ in results] == ['response'] * 3
+        assert sorted(source for _, source in results) == ['coalesced'] * 2 + ['miss']
+    
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, cache):
+        """A failed computation propagates to waiters and is retried next time"""
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('rate limited')
+        
+        async def succeeding():
+            return 'response'
+        
+        results = await asyncio.gather(
+            cache.get_or_compute('key', failing),
+            cache.get_or_compute('key', failing),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get_or_compute('key', succeeding) == ('response', 'miss')
+    
+    @pytest.mark.asyncio
+    async def test_ttl_and_size_eviction(self, cache):
+        """Expired entries are recomputed and the memory tier stays bounded"""
+        async def compute():
+            return 'response'
+        
+        cache.max_memory_entries = 2
+        for key in ('a', 'b', 'c'):
+            await cache.get_or_compute(key, compute)
+        
+        assert cache.get_stats()['memory_entries'] == 2
+        assert cache.stats['evictions'] == 1
+        
+        cache.ttl_seconds = -1
+        assert (await cache.get_or_compute('c', compute))[1] == 'miss'
+    
+    @pytest.mark.asyncio
+    async def test_disk_hit_keeps_original_age(self, response_cache, cache, monkeypatch):
+        """An entry promoted from disk expires a TTL after it was first written"""
+        async def compute():
+            return 'response'
+        
+        now = [1000.0]
+        monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+        cache.ttl_seconds = 100
+        await cache.get_or_compute('key', compute)
+        cache.clear()
+        
+        now[0] = 1080.0
+        assert (await cache.get_or_compute('key', compute))[1] == 'disk'
+        now[0] = 1150.0
+        assert (await cache.get_or_compute('key', compute))[1] == 'miss'
@@ -0,0 +1,139 @@
+"""
+Tests for the date-indexed meeting history store
+"""
+
+import time
+import random
+import pytest
+from datetime import datetime, timedelta
+from src.services.meeting_history_store import MeetingHistoryStore
+from src.services.pattern_recognition_engine import PatternRecognitionEngine
+
+BASE = datetime(2024, 1, 1)
+
+def make_meetings(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    meetings = []
+    for i in range(count):
+        date = BASE + timedelta(hours=rng.randint(0, 24 * 365))
+        formats = [date.isoformat() + 'Z', date.isoformat(), date, 'not a date', None]
+        meetings.append({
+            'meeting_id': f"meeting-{i}",
+            'date': rng.choice(formats) if rng.random() < 0.2 else date.isoformat() + 'Z',
+            'transcript_analysis': {'segments': [{'text': 'x'}] * rng.randint(0, 4)}
+        })
+    return meetings
+
+def linear_scan(meetings, start_date, end_date):
+    """Reference filter with every date parsed per query"""
+    matches = []
+    for meeting in meetings:
+        timestamp = MeetingHistoryStore.parse_date(meeting.get('date'))
+        if timestamp is not None and MeetingHistoryStore.parse_date(start_date) <= timestamp <= MeetingHistoryStore.parse_date(end_date):
+            matches.append(meeting)
+    return matches
+
+class TestMeetingHistoryStore:
+    """Test date index, columns, list semantics and spill"""
+    
+    def test_period_query_matches_linear_scan(self):
+        meetings = make_meetings(500)
+        store = MeetingHistoryStore()
+        store.extend(meetings)
+        
+        for start_day, end_day in [(0, 30), (100, 101), (200, 400), (-10, -1)]:
+            start_date = BASE + timedelta(days=start_day)
+            end_date = BASE + timedelta(days=end_day)
+            result = store.in_period(start_date, end_date)
+            expected = linear_scan(meetings, start_date, end_date)
+            assert sorted(m['meeting_id'] for m in result) == sorted(m['meeting_id'] for m in expected)
+            timestamps = [MeetingHistoryStore.parse_date(m['date']) for m in result]
+            assert timestamps == sorted(timestamps)
+    
+    def test_list_semantics_and_columns(self):
+        meetings = make_meetings(20)
+        store = MeetingHistoryStore(columns={
+            'segment_count': lambda m: len(m['transcript_analysis']['segments']),
+            'broken': lambda m: m['missing']
+        })
+        store.extend(meetings)
+        
+        assert len(store) == 20
+        assert store[-5:] == meetings[-5:]
+        assert store[3] is meetings[3]
+        assert list(store) == meetings
+        assert store.column('segment_count') == [len(m['transcript_analysis']['segments']) for m in meetings]
+        assert store.column('segment_count', [0, 2]) == [len(meetings[0]['transcript_analysis']['segments']),
+                                                        len(meetings[2]['transcript_analysis']['segments'])]
+        assert store.column('broken') == [None] * 20
+    
+    def test_spill_keeps_newest_in_memory(self, tmp_path):
+        meetings = make_meetings(50)
+        store = MeetingHistoryStore(spill_path=str(tmp_path / 'history.jsonl'), max_in_memory=10)
+        store.extend(meetings)
+        
+        stats = store.get_stats()
+        assert stats['spilled'] == 40
+        assert stats['in_memory'] == 10
+        assert store[-1] is meetings[-1]
+        assert store[0]['meeting_id'] == 'meeting-0'
+        assert [m['meeting_id'] for m in store[5:15]] == [f"meeting-{i}" for i in range(5, 15)]
+        
+        start_date, end_date = BASE, BASE + timedelta(days=120)
+        assert sorted(m['meeting_id'] for m in store.in_period(start_date, end_date)) == \
+            sorted(m['meeting_id'] for m in linear_scan(meetings, start_date, end_date))
+        store.close()
+    
+    def test_stores_sharing_spill_path_keep_separate_files(self, tmp_path):
+        """Stores configured with one spill path (e.g. worker processes) never share a file"""
+        spill_path = str(tmp_path / 'history.jsonl')
+        first, second = (MeetingHistoryStore(spill_path=spill_path, max_in_memory=2) for _ in range(2))
+        first.extend(make_meetings(5))
+        second.extend(make_meetings(5, seed=1))
+        expected = [m['date'] for m in second]
+        
+        first.clear()
+        
+        assert [m['date'] for m in second] == expected
+        assert second.get_stats()['spilled'] == 3
+        second.close()
+    
+    def test_spill_file_leaves_nothing_on_disk(self, tmp_path):
+        """The spill file is unlinked once created, so closing leaves the directory empty"""
+        store = MeetingHistoryStore(spill_path=str(tmp_path / 'history.jsonl'), max_in_memory=2)
+        store.extend(make_meetings(10))
+        
+        assert store[0]['meeting_id'] == 'meeting-0'
+        assert list(tmp_path.iterdir()) == []
+        store.close()
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_engine_history_is_store_backed(self):
+        engine = PatternRecognitionEngine()
+        engine.meeting_history = [{'meeting_id': 'a', 'date': '2024-02-01T10:00:00Z'}]
+        engine.meeting_history.append({'meeting_id': 'b', 'date': '2024-03-01T10:00:00Z'})
+        
+        assert len(engine.meeting_history) == 2
+        assert len(engine.history_store.column('success_score')) == 2
+        assert [m['meeting_id'] for m in engine.history_store.in_period(datetime(2024, 2, 15), datetime(2024, 4, 1))] == ['b']
+    
+    @pytest.mark.benchmark
+    def test_period_query_benchmark(self):
+        """Benchmark period queries against re-parsing every date"""
+        meetings = make_meetings(50000, seed=1)
+        store = MeetingHistoryStore()
+        store.extend(meetings)
+        start_date, end_date = BASE + timedelta(days=180), BASE + timedelta(days=187)
+        
+        start = time.perf_counter()
+        for _ in range(20):
+            indexed = store.in_period(start_date, end_date)
+        indexed_elapsed = (time.perf_counter() - start) / 20
+        
+        start = time.perf_counter()
+        expected = linear_scan(meetings, start_date, end_date)
+        scan_elapsed = time.perf_counter() - start
+        
+        print(f"\n50k meetings, one-week period: indexed {indexed_elapsed * 1000:.2f} ms, "
+              f"linear scan {scan_elapsed * 1000:.1f} ms")
+        assert len(indexed) == len(expected)
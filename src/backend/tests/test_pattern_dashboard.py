@@ -4,7 +4,7 @@ Tests for Pattern Dashboard and Visualization Services
 
 import pytest
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from unittest.mock import Mock, patch
 from src.services.pattern_visualization_service import (
     PatternVisualizationService,
@@ -457,28 +457,6 @@ class TestPredictiveAnalyticsService:
         with pytest.raises(ValueError, match="Insufficient data for trend analysis"):
             await service.analyze_trends('nonexistent_variable')
 
-    def test_prepare_time_series_data(self, service):
-        """Test time series data preparation"""
-        from src.services.predictive_analytics_service import TimeSeriesData
-        
-        timestamps = [datetime.utcnow() - timedelta(days=i) for i in range(5, 0, -1)]
-        values = [0.1, 0.3, 0.5, 0.7, 0.9]
-        
-        time_series = TimeSeriesData(
-            timestamps=timestamps,
-            values=values,
-            metadata={},
-            data_quality_score=0.8,
-            seasonality_detected=False,
-            trend_detected=True
-        )
-        
-        X, y = service._prepare_time_series_data(time_series)
-        
-        assert X.shape[0] == len(timestamps)
-        assert len(y) == len(values)
-        assert y.tolist() == values
-
     def test_determine_confidence_level(self, service):
         """Test confidence level determination"""
         from src.services.predictive_analytics_service import ConfidenceLevel
@@ -4,7 +4,10 @@ Tests for Pattern Recognition Engine
 
 import pytest
 import asyncio
+import random
+import time
 from datetime import datetime, timedelta
+from collections import Counter
 from unittest.mock import Mock, patch
 from src.services.pattern_recognition_engine import (
     PatternRecognitionEngine,
@@ -14,7 +17,9 @@ from src.services.pattern_recognition_engine import (
     SystemicIssue,
     PatternType,
     PatternSeverity,
-    PatternTrend
+    PatternTrend,
+    IncrementalChallengeClusterer,
+    TemplateMatcher
 )
 
 class TestPatternRecognitionEngine:
@@ -123,6 +128,49 @@ class TestPatternRecognitionEngine:
         assert result['meeting_id'] == 'test-meeting-001'
         assert isinstance(result['current_meeting_patterns'], list)
 
+    @pytest.mark.asyncio
+    async def test_analyze_meeting_patterns_reports_detector_timings(self, engine, sample_meeting_data):
+        """Every detector of the graph is timed when no deadline applies"""
+        engine.meeting_history.append(dict(sample_meeting_data, meeting_id='earlier'))
+        result = await engine.analyze_meeting_patterns(sample_meeting_data)
+        
+        detectors = engine._build_detector_graph(sample_meeting_data)
+        assert set(result['detector_timings_ms']) | set(result['failed_detectors']) == set(detectors)
+        assert result['partial'] is False
+        assert result['pending_detectors'] == []
+
+    @pytest.mark.asyncio
+    async def test_analyze_meeting_patterns_deadline(self, engine, sample_meeting_data):
+        """Detectors past the latency budget are left out and the result is flagged partial"""
+        async def slow_best_practices():
+            time.sleep(0.5)
+            return ['late']
+        engine._detect_best_practices = slow_best_practices
+        
+        result = await engine.analyze_meeting_patterns(sample_meeting_data, deadline_seconds=0.2)
+        
+        assert result['partial'] is True
+        assert result['pending_detectors'] == ['best_practices']
+        assert result['best_practices'] == []
+        assert 'current_meeting_patterns' in result['detector_timings_ms']
+    
+    @pytest.mark.asyncio
+    async def test_next_analysis_waits_for_pending_detectors(self, engine, sample_meeting_data):
+        """History is not appended to while a detector from the previous call still reads it"""
+        seen = []
+        async def slow_best_practices():
+            length = len(engine.meeting_history)
+            time.sleep(0.3)
+            seen.append((length, len(engine.meeting_history)))
+            return []
+        engine._detect_best_practices = slow_best_practices
+        
+        first = await engine.analyze_meeting_patterns(sample_meeting_data, deadline_seconds=0.05)
+        await engine.analyze_meeting_patterns(dict(sample_meeting_data, meeting_id='next'))
+        
+        assert first['pending_detectors'] == ['best_practices']
+        assert seen == [(1, 1), (2, 2)]
+    
     @pytest.mark.asyncio
     async def test_detect_current_meeting_patterns(self, engine, sample_meeting_data):
         """Test current meeting pattern detection"""
@@ -197,6 +245,9 @@ class TestPatternRecognitionEngine:
         
         assert isinstance(patterns, list)
         # Should detect patterns across meetings
+        graph = engine._build_detector_graph(multiple_meetings_data[-1])
+        assert set(engine.CROSS_MEETING_DETECTORS) <= set(graph)
+        assert all(engine.detected_patterns[pattern.id] is pattern for pattern in patterns)
 
     def test_extract_meeting_challenges(self, engine, sample_meeting_data):
         """Test challenge extraction from meeting"""
@@ -474,5 +525,266 @@ class TestPatternDataStructures:
         assert len(issue.root_causes) == 1
 
 
+CHALLENGE_TOPICS = [
+    "the deployment pipeline problem keeps breaking releases",
+    "database connection issue causing production timeouts",
+    "hiring budget constraint blocking the new team",
+    "customer onboarding difficulty with the mobile app",
+    "security audit concern about vendor access",
+]
+
+def make_challenge_meeting(index: int, rng: random.Random) -> dict:
+    segments = [
+        {
+            'speaker': rng.choice(['Alice', 'Bob', 'Carol']),
+            'text': f"{rng.choice(CHALLENGE_TOPICS)} {rng.choice(['again', 'this week', 'still'])}",
+            'timestamp': (datetime(2024, 1, 1) + timedelta(days=index)).isoformat()
+        }
+        for _ in range(rng.randint(2, 5))
+    ]
+    return {'meeting_id': f"meeting-{index}", 'transcript_analysis': {'segments': segments}}
+
+class TestIncrementalChallengeClustering:
+    """Test hashed TF-IDF vectors with streaming centroids"""
+    
+    @pytest.fixture
+    def engine(self):
+        engine = PatternRecognitionEngine()
+        engine.pattern_thresholds['challenge_window_meetings'] = 50
+        return engine
+    
+    def test_each_meeting_extracted_once(self, engine):
+        rng = random.Random(1)
+        calls = []
+        extract = engine._extract_meeting_challenges
+        engine._extract_meeting_challenges = lambda meeting: calls.append(meeting['meeting_id']) or extract(meeting)
+        
+        for i in range(20):
+            engine.meeting_history.append(make_challenge_meeting(i, rng))
+            engine._cluster_window_challenges(engine.meeting_history.window(50))
+        
+        # Once, when the meeting enters the window
+        assert len(calls) == 20
+        assert engine.challenge_clusterer.fitted
+    
+    def test_clusters_group_topics_and_stay_stable(self, engine):
+        """Same-topic challenges share a label and labels survive new meetings"""
+        rng = random.Random(2)
+        for i in range(30):
+            engine.meeting_history.append(make_challenge_meeting(i, rng))
+        
+        before = engine._cluster_window_challenges(range(len(engine.meeting_history)))
+        labels_before = {id(c): label for label, members in before.items() for c in members}
+        
+        engine.meeting_history.append(make_challenge_meeting(30, rng))
+        after = engine._cluster_window_challenges(range(len(engine.meeting_history)))
+        labels_after = {id(c): label for label, members in after.items() for c in members}
+        
+        unchanged = sum(labels_after[key] == label for key, label in labels_before.items())
+        assert unchanged / len(labels_before) >= 0.9
+        
+        for members in after.values():
+            topics = {next(t for t in CHALLENGE_TOPICS if c['text'].startswith(t)) for c in members}
+            assert len(topics) == 1
+    
+    def test_window_eviction_updates_frequencies(self, engine):
+        engine.pattern_thresholds['challenge_window_meetings'] = 5
+        rng = random.Random(3)
+        for i in range(12):
+            engine.meeting_history.append(make_challenge_meeting(i, rng))
+            engine._cluster_window_challenges(engine.meeting_history.window(5))
+        
+        clusterer = engine.challenge_clusterer
+        window_challenges = sum(len(challenges) for challenges, _ in clusterer.meetings.values())
+        assert len(clusterer.meetings) == 5
+        assert clusterer.document_count == window_challenges
+        assert clusterer.document_frequency.max() <= window_challenges
+    
+    def test_spilled_meetings_are_not_added_twice(self, engine, tmp_path):
+        """Meetings loaded back from the spill file keep their clusterer entry"""
+        engine.history_store.spill_path = str(tmp_path / 'history.jsonl')
+        engine.history_store.max_in_memory = 3
+        rng = random.Random(5)
+        for i in range(10):
+            engine.meeting_history.append(make_challenge_meeting(i, rng))
+        
+        engine._cluster_window_challenges(engine.meeting_history.window(8))
+        document_count = engine.challenge_clusterer.document_count
+        engine._cluster_window_challenges(engine.meeting_history.window(8))
+        
+        assert engine.history_store.get_stats()['spilled'] == 7
+        assert len(engine.challenge_clusterer.meetings) == 8
+        assert engine.challenge_clusterer.document_count == document_count
+        engine.history_store.close()
+    
+    def test_falls_back_before_centroids_are_seeded(self):
+        clusterer = IncrementalChallengeClusterer(n_clusters=10)
+        clusterer.add_meeting('m1', [{'text': 'deployment problem'}, {'text': 'database issue'}])
+        assert clusterer.clusters() is None
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_window_benchmark(self, engine):
+        """Benchmark recurring-challenge detection per new meeting with a 200-meeting window"""
+        rng = random.Random(4)
+        engine.pattern_thresholds['challenge_window_meetings'] = 200
+        history = [make_challenge_meeting(i, rng) for i in range(220)]
+        
+        timings = {}
+        for incremental in (False, True):
+            engine.incremental_clustering = incremental
+            engine.meeting_history = list(history[:200])
+            engine.challenge_clusterer = IncrementalChallengeClusterer()
+            await engine._detect_recurring_challenges()
+            
+            start = time.perf_counter()
+            for meeting in history[200:]:
+                engine.meeting_history.append(meeting)
+                await engine._detect_recurring_challenges()
+            timings[incremental] = (time.perf_counter() - start) / 20
+        
+        print(f"\nrecurring challenges, 200-meeting window: full refit {timings[False] * 1000:.1f} ms, "
+              f"incremental {timings[True] * 1000:.1f} ms per meeting")
+
+def make_transcript_segments(engine: PatternRecognitionEngine, count: int, seed: int,
+                             density: float = 0.15) -> list:
+    """Segments mixing template keywords and filler, one every five seconds"""
+    rng = random.Random(seed)
+    vocabulary = engine.template_matcher.terms
+    filler = "so the team looked at the plan for next week and the numbers".split()
+    start = datetime(2024, 1, 15, 10, 0)
+    segments = []
+    for i in range(count):
+        words = [rng.choice(vocabulary) if rng.random() < density else rng.choice(filler)
+                 for _ in range(rng.randint(8, 30))]
+        if rng.random() < 0.1:
+            words = [word.upper() for word in words]
+        segments.append({
+            'speaker': rng.choice(['Alice', 'Bob', 'Carol', 'Dan']),
+            'text': ' '.join(words),
+            'timestamp': (start + timedelta(seconds=5 * i)).isoformat()
+        })
+    return segments
+
+def reference_challenge_patterns(engine, segments, meeting_data):
+    """Per-keyword challenge detection as it was before the compiled matcher"""
+    template = engine.pattern_templates['recurring_challenges']
+    patterns = []
+    for segment in segments:
+        text = segment.get('text', '').lower()
+        speaker = segment.get('speaker', 'Unknown')
+        mentions = [kw for kw in template['keywords'] if kw in text]
+        if not mentions:
+            continue
+        indicators = [ci for ci in template['context_indicators'] if ci in text]
+        if not indicators:
+            continue
+        severity = next((level for level, keywords in template['severity_indicators'].items()
+                         if any(keyword in text for keyword in keywords)), 'medium')
+        patterns.append({
+            'type': PatternType.RECURRING_CHALLENGE.value,
+            'title': f"Recurring Challenge Mentioned by {speaker}",
+            'description': text[:200] + "..." if len(text) > 200 else text,
+            'severity': severity,
+            'speaker': speaker,
+            'timestamp': segment.get('timestamp'),
+            'evidence': mentions + indicators,
+            'meeting_id': meeting_data.get('meeting_id')
+        })
+    return patterns
+
+def reference_style_context(text, style):
+    style_contexts = {
+        'interrupting': ['but', 'however', 'wait', 'actually'],
+        'dominating': ['i think', 'we should', 'let me', 'i will'],
+        'collaborative': ['what do you think', 'together', 'we could', 'how about'],
+        'supportive': ['great idea', 'i agree', 'that makes sense', 'good point']
+    }
+    if style in style_contexts:
+        return any(context in text for context in style_contexts[style])
+    return False
+
+def reference_speaker_styles(engine, segments):
+    """Per-keyword communication style tagging as it was before the compiled matcher"""
+    styles = []
+    for segment in segments:
+        text = segment.get('text', '').lower()
+        for style in engine.pattern_templates['behavioral_patterns']['communication_styles']:
+            if style in text or reference_style_context(text, style):
+                styles.append((segment.get('speaker'), style, text[:100]))
+    return styles
+
+class TestTemplateMatcher:
+    """Test the compiled template matcher shared by in-meeting detectors"""
+    
+    @pytest.fixture
+    def engine(self):
+        return PatternRecognitionEngine()
+    
+    def test_tags_cover_nested_categories(self):
+        matcher = TemplateMatcher({'t': {'a': ['risk', 'urgent'], 'levels': {'high': ['urgent']}}})
+        tags = matcher.scan('An URGENT risk')
+        
+        assert tags.tags == {('t', 'a'), ('t', 'levels', 'high')}
+        assert tags.has(('t', 'levels', 'high'))
+        assert tags.matches(['urgent', 'risk', 'zeppelin']) == ['urgent', 'risk']
+        assert tags.contains('an urgent')  # Terms outside the table fall back to a direct search
+    
+    def test_overlapping_terms_map_to_their_segments(self):
+        matcher = TemplateMatcher({'t': ['brisk', 'risk', 'isk ab', 'about']})
+        tags = matcher.scan_segments([{'text': 'A BRISK about'}, {'text': 'risk'}, {}, {'text': 'isk'}])
+        
+        assert [segment.terms for segment in tags] == [{'brisk', 'risk', 'isk ab', 'about'}, {'risk'}, set(), set()]
+    
+    @pytest.mark.parametrize('seed', range(3))
+    def test_detectors_match_per_keyword_scans(self, engine, seed):
+        """Challenge, severity and style output is identical to the per-keyword loops"""
+        segments = make_transcript_segments(engine, 300, seed)
+        meeting_data = {'meeting_id': 'meeting-1'}
+        
+        assert engine._detect_challenge_patterns(segments, meeting_data) == \
+            reference_challenge_patterns(engine, segments, meeting_data)
+        
+        template = engine.pattern_templates['behavioral_patterns']
+        patterns = engine._analyze_communication_styles(segments, template)
+        expected = reference_speaker_styles(engine, segments)
+        for pattern in patterns:
+            speaker_styles = [(style, context) for speaker, style, context in expected
+                              if speaker == pattern['speaker']]
+            assert pattern['evidence'] == [context for _, context in speaker_styles]
+            assert pattern['pattern_frequency'] == Counter(
+                style for style, _ in speaker_styles).most_common(1)[0][1]
+    
+    @pytest.mark.benchmark
+    def test_two_hour_transcript_benchmark(self, engine):
+        """Benchmark challenge and behavioral detection over a two-hour transcript"""
+        segments = make_transcript_segments(engine, 1440, 7, density=0.03)
+        meeting_data = {'meeting_id': 'meeting-1'}
+        template = engine.pattern_templates['behavioral_patterns']
+        
+        def per_keyword():
+            reference_challenge_patterns(engine, segments, meeting_data)
+            reference_speaker_styles(engine, segments)
+        
+        def compiled():
+            segment_tags = engine.template_matcher.scan_segments(segments)
+            engine._detect_challenge_patterns(segments, meeting_data, segment_tags)
+            engine._analyze_communication_styles(segments, template, segment_tags)
+        
+        def best_of(run, rounds=7):
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        
+        baseline = best_of(per_keyword)
+        elapsed = best_of(compiled)
+        
+        print(f"\n2-hour transcript (1440 segments): per-keyword scans {baseline * 1000:.1f} ms, "
+              f"compiled matcher {elapsed * 1000:.1f} ms")
+        assert elapsed < baseline
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Tests for Predictive Analytics Service online forecasting
+"""
+
+import time
+import asyncio
+import pytest
+import numpy as np
+from scipy import stats
+from collections import deque
+from datetime import datetime, timedelta
+from src.services.predictive_analytics_service import (
+    PredictiveAnalyticsService,
+    OnlineLeastSquares,
+    ForecastHorizon
+)
+
+BASE = datetime(2024, 1, 1)
+
+def make_service(debounce: float = 0.0) -> PredictiveAnalyticsService:
+    service = PredictiveAnalyticsService()
+    service.config['forecast_refresh_debounce_seconds'] = debounce
+    return service
+
+async def ingest(service, variable_name: str, count: int, start: int = 0, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for i in range(start, start + count):
+        value = 20 + 0.5 * i + 0.01 * i * i + rng.normal(0, 2)
+        await service.add_time_series_data(variable_name, BASE + timedelta(days=i), value)
+
+class TestOnlineLeastSquares:
+    """Test running sufficient statistics against a batch fit"""
+    
+    @pytest.mark.parametrize('degree', [1, 2])
+    def test_matches_polyfit(self, degree):
+        rng = np.random.default_rng(degree)
+        x = np.sort(rng.uniform(0, 400, 300))
+        y = 3 - 0.2 * x + 0.001 * x ** 2 + rng.normal(0, 1, 300)
+        
+        estimator = OnlineLeastSquares(origin=BASE)
+        for xi, yi in zip(x, y):
+            estimator.add(BASE + timedelta(days=float(xi)), float(yi))
+        coefficients, residual = estimator.fit(degree)
+        
+        expected = np.polyfit(x, y, degree)[::-1]
+        assert coefficients == pytest.approx(expected, rel=1e-6, abs=1e-8)
+        assert residual == pytest.approx(np.sum((np.polyval(expected[::-1], x) - y) ** 2), rel=1e-6)
+    
+    def test_remove_reverses_add(self):
+        estimator = OnlineLeastSquares(origin=BASE)
+        for i in range(20):
+            estimator.add(BASE + timedelta(days=i), float(i * 2))
+        estimator.add(BASE + timedelta(days=50), 1000.0)
+        estimator.remove(BASE + timedelta(days=50), 1000.0)
+        
+        coefficients, residual = estimator.fit(1)
+        assert coefficients == pytest.approx([0.0, 2.0], abs=1e-9)
+        assert residual == pytest.approx(0.0, abs=1e-6)
+
+class TestForecastCaching:
+    """Test the fitted model cache and debounced refresh"""
+    
+    @pytest.mark.asyncio
+    async def test_forecast_served_from_cache_until_data_changes(self):
+        service = make_service()
+        await ingest(service, 'pattern_p1_frequency', 60)
+        
+        first = await service.generate_pattern_frequency_forecast('p1', ForecastHorizon.SHORT_TERM)
+        second = await service.generate_pattern_frequency_forecast('p1', ForecastHorizon.SHORT_TERM)
+        assert second is first
+        assert service.cache_stats['forecast_hits'] == 1
+        
+        await ingest(service, 'pattern_p1_frequency', 1, start=60)
+        third = await service.generate_pattern_frequency_forecast('p1', ForecastHorizon.SHORT_TERM)
+        assert third is not first
+        assert third.prediction_timestamps[0] == BASE + timedelta(days=61)
+        assert len(third.predicted_values) == 28
+    
+    @pytest.mark.asyncio
+    async def test_forecast_matches_batch_fit(self):
+        """Predictions equal a polynomial fit over the stored window"""
+        service = make_service()
+        await ingest(service, 'pattern_p2_frequency', 80)
+        forecast = await service.generate_pattern_frequency_forecast('p2', ForecastHorizon.SHORT_TERM)
+        
+        model = service.models['pattern_p2_frequency']
+        assert model.degree == 2
+        points = list(service.time_series_data['pattern_p2_frequency'])
+        x = np.arange(len(points), dtype=float)
+        y = np.array([point['value'] for point in points])
+        expected = np.polyval(np.polyfit(x, y, 2), np.arange(80, 108, dtype=float))
+        assert forecast.predicted_values == pytest.approx(expected.tolist(), rel=1e-6)
+        assert 0.9 < forecast.model_accuracy <= 1.0
+        
+        residual = float(np.sum((y - np.polyval(np.polyfit(x, y, 2), x)) ** 2))
+        assert model.std_error == pytest.approx(np.sqrt(residual / (80 - 3)), rel=1e-6)
+        half_width = stats.t.ppf(0.975, 80 - 3) * model.std_error
+        lower, upper = forecast.confidence_intervals[0]
+        assert (upper - lower) / 2 == pytest.approx(half_width, rel=1e-6)
+    
+    @pytest.mark.asyncio
+    async def test_accuracy_scores_points_before_fitting(self):
+        """Accuracy is the R² of each point's forecast made before the point was fitted"""
+        service = make_service()
+        rng = np.random.default_rng(5)
+        for i in range(60):
+            await service.add_time_series_data('noise', BASE + timedelta(days=i), float(rng.normal(10, 1)))
+        
+        points = list(service.time_series_data['noise'])
+        assert 'forecast_error' not in points[9] and 'forecast_error' in points[10]
+        scored = [point for point in points if 'forecast_error' in point]
+        values = np.array([point['value'] for point in scored])
+        errors = np.array([point['forecast_error'] for point in scored])
+        expected = max(0.0, 1 - np.sum(errors ** 2) / np.sum((values - values.mean()) ** 2))
+        
+        model = service._get_fitted_model('noise')
+        assert model.accuracy == pytest.approx(expected)
+        x = np.arange(60, dtype=float)
+        y = np.array([point['value'] for point in points])
+        in_sample = 1 - np.sum((y - np.polyval(np.polyfit(x, y, model.degree), x)) ** 2) / np.sum((y - y.mean()) ** 2)
+        assert model.accuracy < in_sample
+    
+    @pytest.mark.asyncio
+    async def test_window_eviction_keeps_statistics_in_step(self):
+        service = make_service()
+        service.time_series_data['pattern_p3_frequency'] = deque(maxlen=50)
+        await ingest(service, 'pattern_p3_frequency', 130)
+        
+        model = service._get_fitted_model('pattern_p3_frequency')
+        assert model.data_points == 50
+        x = np.arange(80, 130, dtype=float)
+        y = np.array([point['value'] for point in service.time_series_data['pattern_p3_frequency']])
+        fitted = model.predict([BASE + timedelta(days=float(i)) for i in x])
+        assert fitted == pytest.approx(np.polyval(np.polyfit(x, y, model.degree), x), rel=1e-6)
+    
+    @pytest.mark.asyncio
+    async def test_debounced_refresh_batches_refits(self):
+        """A burst of points triggers one refit per variable"""
+        service = make_service(debounce=0.05)
+        await ingest(service, 'a', 200)
+        await ingest(service, 'b', 200)
+        assert service.cache_stats['model_refits'] == 0
+        
+        await asyncio.sleep(0.1)
+        assert service.cache_stats['model_refits'] == 2
+        assert service.cache_stats['refresh_batches'] == 1
+        assert service.models['a'].data_version == service.data_versions['a']
+    
+    @pytest.mark.benchmark
+    @pytest.mark.asyncio
+    async def test_ingest_cost_independent_of_history(self):
+        """Per-point ingest stays flat as the series grows"""
+        service = make_service(debounce=60.0)
+        timings = []
+        for start in (0, 900):
+            began = time.perf_counter()
+            await ingest(service, 'growth', 100, start=start)
+            timings.append((time.perf_counter() - began) / 100)
+        
+        print(f"\ningest per point: first 100 {timings[0] * 1e6:.1f} us, "
+              f"after 900 {timings[1] * 1e6:.1f} us")
+        await service.flush_forecast_refresh()
+        assert service.cache_stats['model_refits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_insufficient_data_raises(self):
+        service = make_service()
+        await ingest(service, 'pattern_short_frequency', 5)
+        with pytest.raises(ValueError):
+            await service.generate_pattern_frequency_forecast('short', ForecastHorizon.SHORT_TERM)
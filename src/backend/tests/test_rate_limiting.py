@@ -0,0 +1,110 @@
+"""
+Tests for the GCRA rate limiter
+"""
+
+import time
+import pytest
+import fakeredis
+from src.security.rate_limiting import RateLimiter
+
+def make_limiter(redis_client=None, lease_max_tokens: int = 10) -> RateLimiter:
+    limiter = RateLimiter(redis_client=redis_client)
+    limiter.lease_max_tokens = lease_max_tokens
+    return limiter
+
+class TestRedisRateLimiting:
+    """Test the atomic Redis script backend"""
+    
+    @pytest.fixture
+    def redis_client(self):
+        return fakeredis.FakeRedis(decode_responses=True)
+    
+    @pytest.mark.parametrize('lease_max_tokens', [1, 10])
+    def test_allows_limit_then_denies(self, redis_client, lease_max_tokens):
+        """Exactly ``limit`` requests pass within the window"""
+        limiter = make_limiter(redis_client, lease_max_tokens)
+        results = [limiter.check_rate_limit('user:1', 100, 60) for _ in range(120)]
+        
+        assert sum(r['allowed'] for r in results) == 100
+        assert all(r['allowed'] for r in results[:100])
+        denied = results[-1]
+        assert denied['remaining'] == 0
+        assert denied['reset_time'] >= int(time.time())
+    
+    def test_remaining_counts_down(self, redis_client):
+        """Headers reflect remaining capacity including leased tokens"""
+        limiter = make_limiter(redis_client)
+        remaining = [limiter.check_rate_limit('user:1', 50, 60)['remaining'] for _ in range(5)]
+        assert remaining == [49, 48, 47, 46, 45]
+    
+    def test_shared_limit_across_instances(self, redis_client):
+        """Several app processes sharing Redis never exceed the limit together"""
+        limiters = [make_limiter(redis_client) for _ in range(4)]
+        allowed = sum(
+            limiters[i % 4].check_rate_limit('user:shared', 200, 60)['allowed']
+            for i in range(400)
+        )
+        assert allowed <= 200
+        assert allowed >= 190  # Unspent leases are the only loss
+    
+    def test_leases_are_bounded(self, redis_client):
+        """One-off clients do not accumulate leases"""
+        limiter = make_limiter(redis_client)
+        limiter.lease_max_keys = 50
+        for i in range(200):
+            limiter.check_rate_limit(f"ip:{i}", 100, 60)
+        
+        assert len(limiter._leases) == 50
+        assert 'rate_limit:ip:199:60' in limiter._leases
+        
+        for lease in limiter._leases.values():
+            lease.expires_at = 0
+        limiter.check_rate_limit('ip:new', 100, 60)
+        assert list(limiter._leases) == ['rate_limit:ip:new:60']  # Expired leases are swept on insert
+    
+    def test_redis_failure_allows_request(self):
+        """Requests are allowed when Redis is unavailable"""
+        limiter = make_limiter(fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True))
+        limiter.redis_client.connection_pool.connection_kwargs['server'].connected = False
+        assert limiter.check_rate_limit('user:1', 1, 60)['allowed']
+    
+    @pytest.mark.benchmark
+    def test_round_trip_benchmark(self, redis_client):
+        """Benchmark checks per Redis call with and without local leases"""
+        checks = 5000
+        timings = {}
+        for lease_max_tokens in (1, 10):
+            limiter = make_limiter(redis_client, lease_max_tokens)
+            start = time.perf_counter()
+            for i in range(checks):
+                limiter.check_rate_limit(f"user:{lease_max_tokens}:{i % 10}", 10000, 3600)
+            timings[lease_max_tokens] = (time.perf_counter() - start) / checks
+            calls = limiter.stats['redis_calls']
+            print(f"\nlease {lease_max_tokens}: {calls} Redis calls for {checks} checks, "
+                  f"{timings[lease_max_tokens] * 1e6:.1f} us per check")
+            
+            if lease_max_tokens == 1:
+                assert calls == checks
+            else:
+                assert calls <= checks / 5
+
+class TestMemoryRateLimiting:
+    """Test the bounded in-memory backend"""
+    
+    def test_allows_limit_then_denies(self):
+        limiter = make_limiter()
+        results = [limiter.check_rate_limit('ip:1', 10, 60) for _ in range(15)]
+        
+        assert [r['allowed'] for r in results] == [True] * 10 + [False] * 5
+        assert results[9]['remaining'] == 0
+    
+    def test_lru_eviction_bounds_memory(self):
+        """Old clients are evicted once the key limit is reached"""
+        limiter = make_limiter()
+        limiter.memory_max_keys = 100
+        for i in range(1000):
+            limiter.check_rate_limit(f"ip:{i}", 10, 60)
+        
+        assert len(limiter._memory_store) == 100
+        assert limiter.stats['memory_evictions'] == 900
+        assert 'rate_limit:ip:999:60' in limiter._memory_store
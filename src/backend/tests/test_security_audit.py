@@ -0,0 +1,345 @@
+"""
+Tests for the partitioned security audit log
+"""
+
+import gzip
+import json
+import time
+import pytest
+from datetime import datetime, timedelta
+from src.security.audit import (
+    AuditLogger,
+    AuditSegmentIndex,
+    AuditWriter,
+    PartitionedAuditStore,
+    AuditEventType,
+    AuditSeverity
+)
+
+def make_entry(timestamp: datetime, event_type: str = 'api_access', severity: str = 'low',
+               user_id: str = None, outcome: str = 'success') -> dict:
+    return {
+        'timestamp': timestamp.isoformat(),
+        'event_type': event_type,
+        'severity': severity,
+        'message': 'test',
+        'outcome': outcome,
+        'user_id': user_id,
+        'additional_data': {}
+    }
+
+class TestAuditSegmentIndex:
+    """Test postings, bitmaps and rollups of a single segment"""
+    
+    def test_candidates_intersect_postings_and_bitmaps(self):
+        """Filters combine event_type, user_id and severity"""
+        index = AuditSegmentIndex('2024-01-01')
+        base = datetime(2024, 1, 1)
+        index.add(make_entry(base, 'authentication', 'high', 'alice', 'failure'))
+        index.add(make_entry(base, 'authentication', 'medium', 'alice'))
+        index.add(make_entry(base, 'data_access', 'low', 'bob'))
+        index.add(make_entry(base, 'authentication', 'high', 'bob', 'failure'))
+        
+        assert index.candidates() is None
+        assert index.candidates(event_type='authentication') == [0, 1, 3]
+        assert index.candidates(event_type='authentication', user_id='alice') == [0, 1]
+        assert index.candidates(event_type='authentication', severity='high') == [0, 3]
+        assert index.candidates(severity='low') == [2]
+        assert index.candidates(user_id='carol') == []
+        
+        assert index.rollup['failed_authentications'] == 2
+        assert sorted(index.rollup['unique_users']) == ['alice', 'bob']
+    
+    def test_round_trip(self):
+        """Sidecar serialization preserves the index"""
+        index = AuditSegmentIndex('2024-01-01')
+        for i in range(20):
+            index.add(make_entry(datetime(2024, 1, 1, 0, i), severity='high' if i % 3 == 0 else 'low'))
+        
+        restored = AuditSegmentIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+        assert restored.candidates(severity='high') == index.candidates(severity='high')
+        assert restored.start_time == index.start_time
+        assert restored.rollup == index.rollup
+
+class TestPartitionedAuditStore:
+    """Test daily segments, sealing and indexed search"""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        return PartitionedAuditStore(str(tmp_path / 'audit'), retention_days=3650)
+    
+    def _populate(self, store, days: int = 5, per_day: int = 50):
+        entries = []
+        start = datetime(2024, 3, 1)
+        for day in range(days):
+            for i in range(per_day):
+                entry = make_entry(
+                    start + timedelta(days=day, minutes=i),
+                    event_type='authentication' if i % 5 == 0 else 'api_access',
+                    severity='high' if i % 7 == 0 else 'low',
+                    user_id=f"user-{i % 4}",
+                    outcome='failure' if i % 10 == 0 else 'success'
+                )
+                store.append(entry)
+                entries.append(entry)
+        return entries
+    
+    def test_sealing_compresses_and_indexes(self, store, tmp_path):
+        """Completed days become gzip segments with sidecars"""
+        self._populate(store, days=3)
+        store.seal_completed_days(today='2024-03-03')
+        
+        assert store.sealed_dates() == ['2024-03-01', '2024-03-02']
+        directory = tmp_path / 'audit'
+        [sealed] = directory.glob('audit-2024-03-01.*.jsonl.gz')
+        with gzip.open(sealed, 'rt') as f:
+            assert len(f.readlines()) == 50
+        assert len(list(directory.glob('audit-2024-03-01.*.idx.json'))) == 1
+        assert len(list(directory.glob('audit-2024-03-01.*.stats.json'))) == 1
+        assert not list(directory.glob('audit-2024-03-0[12].*.jsonl'))
+        assert len(list(directory.glob('audit-2024-03-03.*.jsonl'))) == 1
+    
+    def test_search_matches_full_scan(self, store):
+        """Indexed search returns what a linear scan would"""
+        entries = self._populate(store)
+        store.seal_completed_days(today='2024-03-04')
+        
+        start_date = datetime(2024, 3, 2, 0, 20)
+        end_date = datetime(2024, 3, 4, 0, 10)
+        results = store.search(start_date=start_date, end_date=end_date,
+                               event_type='authentication', user_id='user-0', limit=1000)
+        
+        expected = [
+            e for e in entries
+            if start_date <= datetime.fromisoformat(e['timestamp']) <= end_date
+            and e['event_type'] == 'authentication' and e['user_id'] == 'user-0'
+        ]
+        assert results == expected
+        
+        high = store.search(severity='high', limit=3)
+        assert high == [e for e in entries if e['severity'] == 'high'][:3]
+    
+    def test_statistics_from_rollups(self, store):
+        """Rollups merge across sealed and active segments"""
+        entries = self._populate(store, days=4)
+        store.seal_completed_days(today='2024-03-04')
+        
+        stats = store.statistics('2024-03-02')
+        recent = [e for e in entries if e['timestamp'] >= '2024-03-02']
+        assert stats['total_events'] == len(recent)
+        assert stats['events_by_type']['authentication'] == sum(
+            1 for e in recent if e['event_type'] == 'authentication'
+        )
+        assert stats['failed_authentications'] == sum(
+            1 for e in recent if e['event_type'] == 'authentication' and e['outcome'] != 'success'
+        )
+        assert stats['unique_users'] == 4
+    
+    def test_late_record_for_sealed_day(self, store):
+        """A late record for a sealed day goes to a new segment of that day"""
+        self._populate(store, days=2, per_day=10)
+        store.seal_completed_days(today='2024-03-02')
+        
+        store.append(make_entry(datetime(2024, 3, 1, 23, 59), user_id='late'))
+        store.seal_completed_days(today='2024-03-02')
+        
+        assert store.search(user_id='late') != []
+        assert store.statistics('2024-03-01')['total_events'] == 21
+        assert len(list(store.directory.glob('audit-2024-03-01.*.jsonl.gz'))) == 2
+    
+    def test_workers_share_directory(self, tmp_path):
+        """Stores of several workers write their own segments and see each other's records"""
+        first = PartitionedAuditStore(str(tmp_path / 'audit'), retention_days=3650)
+        second = PartitionedAuditStore(str(tmp_path / 'audit'), retention_days=3650)
+        base = datetime(2024, 3, 1)
+        entries = []
+        for i in range(40):
+            entry = make_entry(base + timedelta(minutes=i), user_id=f"user-{i % 3}")
+            (first if i % 2 else second).append(entry)
+            entries.append(entry)
+        
+        for store in (first, second):
+            assert store.search(user_id='user-1', limit=100) == [e for e in entries if e['user_id'] == 'user-1']
+            assert store.search(limit=100) == entries
+        
+        # The first writer still holds its segment, so only the second one is sealed
+        second.seal_completed_days(today='2024-03-02')
+        assert len(list(first.directory.glob('audit-2024-03-01.*.jsonl.gz'))) == 1
+        assert first.search(limit=100) == entries
+        
+        first.seal_completed_days(today='2024-03-02')
+        assert not list(first.directory.glob('audit-*.jsonl'))
+        assert second.search(limit=100) == entries
+        assert second.statistics('2024-03-01')['total_events'] == 40
+
+class TestAuditWriter:
+    """Test the background batched audit writer"""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        return PartitionedAuditStore(str(tmp_path / 'audit'), retention_days=3650)
+    
+    def test_batches_and_flush(self, store):
+        """Queued records are written in batches and visible after flush"""
+        writer = AuditWriter(store, batch_size=100, fsync_interval=0.0)
+        base = datetime(2024, 3, 1)
+        for i in range(250):
+            assert writer.submit(make_entry(base + timedelta(seconds=i), user_id=f"u{i}"))
+        
+        assert writer.flush(timeout=5.0)
+        assert len(store.search(limit=1000)) == 250
+        
+        writer.shutdown()
+        stats = writer.get_stats()
+        assert stats['written'] == 250
+        assert stats['dropped'] == 0
+        assert stats['batches'] < 250
+        assert stats['fsyncs'] >= 1
+    
+    def test_drop_newest_when_full(self, store):
+        """A full queue drops new records and counts them"""
+        writer = AuditWriter(store, max_queue_size=5, overflow_policy='drop_newest')
+        store._lock.acquire()  # Stall the writer thread mid-batch
+        try:
+            accepted = sum(
+                writer.submit(make_entry(datetime(2024, 3, 1, 0, 0, i))) for i in range(50)
+            )
+        finally:
+            store._lock.release()
+        
+        writer.shutdown()
+        stats = writer.get_stats()
+        assert accepted < 50
+        assert stats['dropped'] == 50 - accepted
+        assert stats['written'] == accepted
+    
+    def test_block_is_default_and_times_out(self, store):
+        """A full queue blocks the caller for at most block_timeout before dropping"""
+        writer = AuditWriter(store, max_queue_size=5, block_timeout=0.05)
+        assert writer.overflow_policy == 'block'
+        store._lock.acquire()
+        try:
+            accepted = sum(
+                writer.submit(make_entry(datetime(2024, 3, 1, 0, 0, i))) for i in range(20)
+            )
+        finally:
+            store._lock.release()
+        
+        writer.shutdown()
+        stats = writer.get_stats()
+        assert accepted < 20
+        assert stats['dropped'] == 20 - accepted
+        assert stats['written'] == accepted
+    
+    def test_drop_oldest_keeps_newest(self, store):
+        """drop_oldest evicts the head of the queue"""
+        writer = AuditWriter(store, max_queue_size=5, batch_size=1, overflow_policy='drop_oldest')
+        store._lock.acquire()
+        try:
+            for i in range(50):
+                assert writer.submit(make_entry(datetime(2024, 3, 1, 0, 0, i), user_id=f"u{i}"))
+        finally:
+            store._lock.release()
+        
+        writer.shutdown()
+        written = [entry['user_id'] for entry in store.search(limit=100)]
+        assert written[-1] == 'u49'
+        assert writer.get_stats()['dropped'] == 50 - len(written)
+    
+    def test_unknown_policy_rejected(self, store):
+        with pytest.raises(ValueError):
+            AuditWriter(store, overflow_policy='spill')
+    
+    def test_unserializable_record_dropped_alone(self, store):
+        """A record that cannot be serialized is dropped without losing its batch"""
+        writer = AuditWriter(store, batch_size=100)
+        base = datetime(2024, 3, 1)
+        bad = make_entry(base)
+        bad['additional_data'] = {'when': base}
+        entries = [make_entry(base + timedelta(seconds=i), user_id=f"u{i}") for i in range(10)]
+        
+        assert not writer.submit(bad)
+        for entry in entries:
+            assert writer.submit(entry)
+        entries[0]['user_id'] = 'changed'
+        
+        writer.shutdown()
+        stats = writer.get_stats()
+        assert (stats['written'], stats['dropped'], stats['write_errors']) == (10, 1, 0)
+        assert [entry['user_id'] for entry in store.search(limit=100)] == [f"u{i}" for i in range(10)]
+    
+    def test_writer_seals_when_day_rolls_over(self, store):
+        writer = AuditWriter(store, flush_interval=0.01)
+        assert writer.submit(make_entry(datetime(2024, 3, 1)))
+        assert writer.flush(timeout=5.0)
+        
+        writer._sealed_day = '2024-03-01'
+        deadline = time.monotonic() + 5.0
+        while store.sealed_dates() != ['2024-03-01'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert store.sealed_dates() == ['2024-03-01']
+        writer.shutdown()
+
+class TestAuditLogger:
+    """Test the audit logger on top of the segment store"""
+    
+    @pytest.fixture
+    def audit_log_file(self, tmp_path, monkeypatch):
+        path = tmp_path / 'logs' / 'audit.log'
+        monkeypatch.setenv('AUDIT_LOG_FILE', str(path))
+        monkeypatch.delenv('AUDIT_SEGMENT_DIR', raising=False)
+        return path
+    
+    def test_log_and_search(self, audit_log_file):
+        """Logged events are searchable and counted"""
+        audit = AuditLogger()
+        audit.log_authentication('alice', 'failure', ip_address='10.0.0.1')
+        audit.log_data_access('bob', '/meetings/1')
+        audit.log_security_violation('sql_injection', user_id='mallory')
+        
+        results = audit.search_audit_logs(event_type=AuditEventType.AUTHENTICATION)
+        assert [r['user_id'] for r in results] == ['alice']
+        assert audit.search_audit_logs(severity=AuditSeverity.HIGH, user_id='mallory')[0]['action'] == 'sql_injection'
+        
+        stats = audit.get_audit_statistics(days=1)
+        assert stats['total_events'] == 3
+        assert stats['security_violations'] == 1
+        assert stats['failed_authentications'] == 1
+        audit.shutdown()
+    
+    @pytest.mark.benchmark
+    def test_request_path_overhead_benchmark(self, audit_log_file, monkeypatch):
+        """Benchmark per-call log_api_access overhead, synchronous vs batched writer"""
+        calls = 2000
+        timings = {}
+        for mode in ('false', 'true'):
+            monkeypatch.setenv('AUDIT_ASYNC_WRITES', mode)
+            monkeypatch.setenv('AUDIT_SEGMENT_DIR', str(audit_log_file.parent / f"audit-{mode}"))
+            audit = AuditLogger()
+            
+            start = time.perf_counter()
+            for i in range(calls):
+                audit.log_api_access('/api/meetings', 'GET', user_id=f"user-{i % 10}",
+                                     ip_address='10.0.0.1', response_code=200, processing_time=0.01)
+            timings[mode] = (time.perf_counter() - start) / calls
+            
+            audit.shutdown()
+            assert audit.store.statistics('2000-01-01')['total_events'] == calls
+        
+        print(f"\naudit call overhead: synchronous {timings['false'] * 1e6:.1f} us, "
+              f"batched writer {timings['true'] * 1e6:.1f} us")
+    
+    def test_legacy_log_imported(self, audit_log_file):
+        """An existing flat audit.log is moved into segments once, on request"""
+        audit_log_file.parent.mkdir(parents=True)
+        old = make_entry(datetime.utcnow() - timedelta(days=2), user_id='legacy')
+        audit_log_file.write_text(json.dumps(old) + '\n')
+        
+        audit = AuditLogger()
+        assert audit_log_file.exists()
+        assert audit.import_legacy_log() == 1
+        assert audit.import_legacy_log() == 0
+        assert not audit_log_file.exists()
+        assert audit.search_audit_logs(user_id='legacy') == [old]
+        audit.shutdown()
@@ -575,5 +575,122 @@ class TestStrategicDashboardService:
         assert strategic_dashboard_service is not None
         assert isinstance(strategic_dashboard_service, StrategicDashboardService)
 
+class TestDashboardRollupsAndCaching:
+    """Test incremental rollups, stale-while-revalidate and coalesced builds"""
+    
+    @pytest.fixture
+    def dashboard_service(self):
+        """Create dashboard service instance for testing"""
+        return StrategicDashboardService()
+    
+    @pytest.mark.asyncio
+    async def test_rollups_drive_metrics(self, dashboard_service):
+        """Opportunities, actions and analyses update metrics incrementally"""
+        await dashboard_service.create_opportunity_map({
+            'name': 'A', 'impact_score': 0.8, 'effort_score': 0.5,
+            'priority_level': 'high', 'status': 'completed', 'framework_alignment': {'sdg': 0.6}
+        })
+        await dashboard_service.create_opportunity_map({
+            'name': 'B', 'impact_score': 0.4, 'effort_score': 0.0,
+            'priority_level': 'low', 'status': 'planned'
+        })
+        await dashboard_service.track_action_progress({'title': 'X', 'status': 'blocked'})
+        await dashboard_service.record_analysis({'framework_alignment': {'sdg': 0.8, 'doughnut': 0.5}})
+        
+        opportunities = await dashboard_service._calculate_opportunity_count()
+        assert opportunities['total'] == 2
+        assert opportunities['count'] == 1
+        assert opportunities['by_priority'] == {'high': 1, 'low': 1}
+        
+        score = await dashboard_service._calculate_opportunity_score()
+        assert score['score'] == pytest.approx((0.4 + 0.4) / 2)
+        
+        actions = await dashboard_service._calculate_action_progress()
+        assert actions['blocked_actions'] == 1
+        
+        alignment = await dashboard_service._calculate_overall_alignment()
+        assert alignment['components']['sdg_alignment'] == pytest.approx(0.7)
+        assert alignment['components']['doughnut_alignment'] == pytest.approx(0.5)
+    
+    def test_cache_key_is_stable(self, dashboard_service):
+        """Cache keys do not depend on dict ordering or process hash seeds"""
+        key_a = dashboard_service._cache_key('overview', {'a': 1, 'b': 2})
+        key_b = dashboard_service._cache_key('overview', {'b': 2, 'a': 1})
+        assert key_a == key_b
+        assert key_a != dashboard_service._cache_key('overview', {'a': 1})
+    
+    @pytest.mark.asyncio
+    async def test_entries_older_than_a_day_are_not_fresh(self, dashboard_service):
+        """Freshness uses total_seconds, so day-old entries are not served"""
+        dashboard_service.cache_stale_ttl = 0
+        first = await dashboard_service.generate_dashboard_data('overview')
+        
+        key = dashboard_service._cache_key('overview')
+        data, timestamp, version = dashboard_service.cache[key]
+        dashboard_service.cache[key] = (data, timestamp - timedelta(days=1, seconds=10), version)
+        
+        second = await dashboard_service.generate_dashboard_data('overview')
+        assert second['dashboard_id'] != first['dashboard_id']
+    
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, dashboard_service):
+        """New data serves the cached dashboard once while it is rebuilt"""
+        first = await dashboard_service.generate_dashboard_data('sdg_alignment')
+        await dashboard_service.record_analysis({'framework_alignment': {'sdg': 0.9}})
+        
+        stale = await dashboard_service.generate_dashboard_data('sdg_alignment')
+        assert stale['dashboard_id'] == first['dashboard_id']
+        assert dashboard_service.cache_stats['stale_hits'] == 1
+        
+        await asyncio.gather(*dashboard_service._inflight_builds.values())
+        fresh = await dashboard_service.generate_dashboard_data('sdg_alignment')
+        assert fresh['dashboard_id'] != first['dashboard_id']
+        assert dashboard_service.cache_stats['hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_viewers_share_one_build(self, dashboard_service):
+        """Simultaneous misses for the same dashboard are coalesced"""
+        with patch.object(dashboard_service, '_build_dashboard_data',
+                          wraps=dashboard_service._build_dashboard_data) as build:
+            results = await asyncio.gather(*[
+                dashboard_service.generate_dashboard_data('overview') for _ in range(10)
+            ])
+        
+        assert build.call_count == 1
+        assert len({result['dashboard_id'] for result in results}) == 1
+        assert dashboard_service.cache_stats['coalesced'] == 9
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, dashboard_service):
+        """Least recently used dashboards are evicted"""
+        dashboard_service.cache_max_entries = 3
+        for i in range(5):
+            await dashboard_service.generate_dashboard_data('doughnut_economy', {'page': i})
+        
+        assert len(dashboard_service.cache) == 3
+        assert dashboard_service.cache_stats['evictions'] == 2
+        assert dashboard_service._cache_key('doughnut_economy', {'page': 0}) not in dashboard_service.cache
+    
+    @pytest.mark.asyncio
+    async def test_framework_analyses_feed_rollups(self, dashboard_service):
+        """Each completed strategic framework analysis lands in the alignment rollups"""
+        from src.services.strategic_framework_analyzer import StrategicFrameworkAnalyzer
+        
+        with patch('src.services.strategic_framework_analyzer.strategic_dashboard_service', dashboard_service):
+            result = await StrategicFrameworkAnalyzer().analyze_strategic_alignment(
+                "We will end poverty with regenerative, transparent and collaborative partnerships."
+            )
+        
+        assert dashboard_service.rollup.analyses_recorded == 1
+        analyses = result['framework_analyses']
+        alignment = await dashboard_service._calculate_overall_alignment()
+        assert alignment['components']['sdg_alignment'] == pytest.approx(analyses['sdg']['overall_score'])
+        assert alignment['components']['doughnut_alignment'] == pytest.approx(
+            analyses['doughnut_economy']['overall_score']
+        )
+        assert alignment['components']['agreement_alignment'] == pytest.approx(
+            analyses['agreement_economy']['overall_score']
+        )
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
@@ -262,15 +262,10 @@ class RealTimeVoiceProcessor:
             
             # Compare with known speakers (simplified)
             best_match = None
-            best_similarity = 0.0
+            best_rows, best_similarities = self.speaker_engine.speaker_store.match(embedding)
             
-            for speaker_name, known_embedding in self.speaker_engine.speaker_embeddings.items():
-                from sklearn.metrics.pairwise import cosine_similarity
-                similarity = cosine_similarity([embedding], [known_embedding])[0][0]
-                
-                if similarity > best_similarity and similarity > 0.7:
-                    best_similarity = similarity
-                    best_match = speaker_name
+            if best_rows[0] >= 0 and best_similarities[0] > 0.7:
+                best_match = self.speaker_engine.speaker_store.name(best_rows[0])
             
             return best_match
             
@@ -5,6 +5,7 @@ Handles speaker diarization and identification
 
 import os
 import io
+import json
 import asyncio
 import tempfile
 import pickle
@@ -14,8 +15,9 @@ import numpy as np
 import librosa
 import soundfile as sf
 from pydub import AudioSegment
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.spatial.distance import pdist, squareform
+from sklearn.metrics import silhouette_score
 import torch
 from datetime import datetime
 import structlog
@@ -24,15 +26,196 @@ from models import Speaker, SpeakerIdentificationResult, SpeakerTrainingResponse
 
 logger = structlog.get_logger(__name__)
 
+class SpeakerEmbeddingStore:
+    """Enrolled speaker embeddings kept as one L2-normalized float32 matrix
+    
+    Rows live in a preallocated, memory-mapped ``.npy`` file that is updated in
+    place, so loading is independent of the number of enrolled speakers and
+    matching a batch of embeddings is a single matrix multiply. An enrollment
+    writes its row into a slot the JSON index does not reference yet, flushes it
+    and then replaces the index that maps rows to names, so an interrupted save
+    leaves the previous index describing intact rows. A removed speaker's row
+    becomes a free slot for the next enrollment; when no slot is left the matrix
+    is copied to a new generation file of twice the capacity.
+    """
+    
+    MATRIX_PREFIX = "embeddings"
+    INDEX_FILENAME = "speakers.json"
+    INITIAL_CAPACITY = 8
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = os.path.join(path, self.INDEX_FILENAME)
+        self.matrix_path: Optional[str] = None
+        self._generation = 0
+        self._matrix: Optional[np.memmap] = None
+        self._names: List[Optional[str]] = []  # Name per row; None marks a free slot
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def __contains__(self, speaker_name: str) -> bool:
+        return speaker_name in self._rows
+    
+    @property
+    def names(self) -> List[str]:
+        return [name for name in self._names if name is not None]
+    
+    def name(self, row: int) -> str:
+        """Speaker enrolled at a matrix row"""
+        return self._names[row]
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized embeddings of the rows in the index, free slots included"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[:len(self._names)]
+    
+    @staticmethod
+    def normalize(embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+    
+    def load(self):
+        """Memory-map the persisted matrix named by the index"""
+        if not os.path.exists(self.index_path):
+            return
+        
+        with open(self.index_path, 'r') as f:
+            index = json.load(f)
+        
+        names, generation = index['names'], index['generation']
+        matrix_path = self._generation_path(generation)
+        matrix = np.lib.format.open_memmap(matrix_path, mode='r+')
+        if len(names) > matrix.shape[0]:
+            raise ValueError(f"Speaker index has {len(names)} rows for {matrix.shape[0]} embeddings")
+        
+        self._matrix = matrix
+        self._names = names
+        self._rows = {name: row for row, name in enumerate(names) if name is not None}
+        self._free = [row for row, name in enumerate(names) if name is None]
+        self.matrix_path = matrix_path
+        self._generation = generation
+        self._remove_stale_generations()
+    
+    def add(self, speaker_name: str, embedding: np.ndarray):
+        """Insert or replace a speaker's embedding"""
+        vector = self.normalize(embedding)[0]
+        row = self._writable_row(len(vector))
+        self._matrix[row] = vector
+        self._matrix.flush()
+        
+        names = list(self._names)
+        if row == len(names):
+            names.append(speaker_name)
+        else:
+            names[row] = speaker_name
+        replaced = self._rows.get(speaker_name)
+        if replaced is not None:
+            names[replaced] = None
+        self._write_index(self._generation, names)
+        
+        self._names = names
+        self._rows[speaker_name] = row
+        if row in self._free:
+            self._free.remove(row)
+        if replaced is not None:
+            self._free.append(replaced)
+    
+    def remove(self, speaker_name: str) -> bool:
+        """Remove a speaker, freeing its row for the next enrollment"""
+        row = self._rows.get(speaker_name)
+        if row is None:
+            return False
+        
+        names = list(self._names)
+        names[row] = None
+        self._write_index(self._generation, names)
+        
+        self._names = names
+        del self._rows[speaker_name]
+        self._free.append(row)
+        return True
+    
+    def match(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best enrolled row and cosine similarity for each query embedding"""
+        queries = self.normalize(embeddings)
+        if not self._rows:
+            return np.full(len(queries), -1), np.zeros(len(queries), dtype=np.float32)
+        
+        similarities = queries @ self.matrix.T
+        if self._free:
+            similarities[:, self._free] = -np.inf
+        best_rows = np.argmax(similarities, axis=1)
+        return best_rows, similarities[np.arange(len(queries)), best_rows]
+    
+    def _writable_row(self, dimension: int) -> int:
+        """A row the index does not reference, growing the file when none is left"""
+        if self._matrix is None:
+            self._grow(dimension, self.INITIAL_CAPACITY)
+        elif dimension != self._matrix.shape[1]:
+            raise ValueError(f"Embedding has {dimension} dimensions, store has {self._matrix.shape[1]}")
+        
+        if self._free:
+            return self._free[-1]
+        if len(self._names) == self._matrix.shape[0]:
+            self._grow(dimension, 2 * self._matrix.shape[0])
+        return len(self._names)
+    
+    def _grow(self, dimension: int, capacity: int):
+        """Copy the rows into a new generation file of the given capacity and switch the index to it"""
+        os.makedirs(self.path, exist_ok=True)
+        
+        generation = self._generation + 1
+        matrix_path = self._generation_path(generation)
+        matrix = np.lib.format.open_memmap(matrix_path, mode='w+', dtype=np.float32,
+                                           shape=(capacity, dimension))
+        if self._matrix is not None:
+            matrix[:len(self._names)] = self.matrix
+        matrix.flush()
+        self._write_index(generation, self._names)
+        
+        self._matrix = matrix
+        self.matrix_path = matrix_path
+        self._generation = generation
+        self._remove_stale_generations()
+    
+    def _generation_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"{self.MATRIX_PREFIX}-{generation}.npy")
+    
+    def _write_index(self, generation: int, names: List[Optional[str]]):
+        """Atomically replace the index; this is the commit point of every change"""
+        index_tmp = f"{self.index_path}.tmp"
+        with open(index_tmp, 'w') as f:
+            json.dump({'generation': generation, 'names': names}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_tmp, self.index_path)
+    
+    def _remove_stale_generations(self):
+        """Drop earlier generations and any left behind by an interrupted grow"""
+        for filename in os.listdir(self.path):
+            if filename.startswith(self.MATRIX_PREFIX) and filename.endswith('.npy'):
+                stale_path = os.path.join(self.path, filename)
+                if stale_path != self.matrix_path:
+                    os.remove(stale_path)
+
 class SpeakerIdentificationEngine:
     """Speaker identification and diarization engine"""
     
     def __init__(self):
-        self.speaker_embeddings = {}  # Store trained speaker embeddings
         self.speaker_models_path = "models/speakers"
+        self.speaker_store = SpeakerEmbeddingStore(self.speaker_models_path)  # Enrolled speaker embeddings
         self.embedding_model = None
         self.clustering_threshold = 0.7
         self.min_segment_duration = 1.0  # Minimum segment duration in seconds
+        self.max_speakers = 10
+        self.max_clustering_samples = 2000  # Larger inputs are clustered on a subsample
+        self.assignment_batch_size = 4096  # Rows per batch when assigning to centroids
         
     async def initialize(self):
         """Initialize the speaker identification engine"""
@@ -135,15 +318,8 @@ class SpeakerIdentificationEngine:
             # Cluster segments by speaker
             embeddings_array = np.array(embeddings)
             
-            # Use agglomerative clustering
-            n_clusters = self._estimate_speaker_count(embeddings_array)
-            clustering = AgglomerativeClustering(
-                n_clusters=n_clusters,
-                linkage='average',
-                metric='cosine'
-            )
-            
-            cluster_labels = clustering.fit_predict(embeddings_array)
+            # Cluster once and cut the shared dendrogram at the estimated speaker count
+            cluster_labels = self._cluster_embeddings(embeddings_array)
             
             # Group segments by speaker
             speakers = {}
@@ -195,27 +371,81 @@ class SpeakerIdentificationEngine:
             logger.error("Feature extraction failed", error=str(e))
             return np.zeros(39)  # Return zero vector if extraction fails
     
-    def _estimate_speaker_count(self, embeddings: np.ndarray) -> int:
+    def _cosine_distances(self, embeddings: np.ndarray) -> np.ndarray:
+        """Condensed pairwise cosine distances between embeddings"""
+        distances = pdist(embeddings, metric='cosine')
+        # Zero vectors from failed feature extraction have no defined angle
+        return np.clip(np.nan_to_num(distances, nan=1.0), 0.0, 2.0)
+    
+    def _subsample_indices(self, n_samples: int) -> np.ndarray:
+        """Deterministic subsample of window indices for clustering"""
+        rng = np.random.default_rng(0)
+        return np.sort(rng.choice(n_samples, self.max_clustering_samples, replace=False))
+    
+    def _cluster_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
+        """Assign a speaker label to every embedding using a single linkage tree"""
+        n_samples = len(embeddings)
+        if n_samples < 2:
+            return np.zeros(n_samples, dtype=int)
+        
+        if n_samples > self.max_clustering_samples:
+            # Cluster a subsample, then assign every window to its nearest centroid
+            sample_indices = self._subsample_indices(n_samples)
+            sample_labels = self._cluster_embeddings(embeddings[sample_indices])
+            return self._assign_to_centroids(embeddings, embeddings[sample_indices], sample_labels)
+        
+        condensed = self._cosine_distances(embeddings)
+        linkage_matrix = linkage(condensed, method='average')
+        n_clusters = self._estimate_speaker_count(
+            embeddings,
+            linkage_matrix=linkage_matrix,
+            distance_matrix=squareform(condensed)
+        )
+        
+        return fcluster(linkage_matrix, t=n_clusters, criterion='maxclust') - 1
+    
+    def _assign_to_centroids(self, embeddings: np.ndarray, sample_embeddings: np.ndarray,
+                             sample_labels: np.ndarray) -> np.ndarray:
+        """Label embeddings by cosine similarity to the centroids of a clustered sample"""
+        cluster_ids = np.unique(sample_labels)
+        centroids = np.array([sample_embeddings[sample_labels == c].mean(axis=0) for c in cluster_ids])
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        
+        labels = np.empty(len(embeddings), dtype=int)
+        for start in range(0, len(embeddings), self.assignment_batch_size):
+            batch = embeddings[start:start + self.assignment_batch_size]
+            batch = batch / np.maximum(np.linalg.norm(batch, axis=1, keepdims=True), 1e-12)
+            labels[start:start + len(batch)] = cluster_ids[np.argmax(batch @ centroids.T, axis=1)]
+        
+        return labels
+    
+    def _estimate_speaker_count(self, embeddings: np.ndarray,
+                                linkage_matrix: Optional[np.ndarray] = None,
+                                distance_matrix: Optional[np.ndarray] = None) -> int:
         """Estimate the number of speakers using silhouette analysis"""
         try:
             if len(embeddings) < 2:
                 return 1
             
-            max_speakers = min(10, len(embeddings) // 2)
+            if linkage_matrix is None or distance_matrix is None:
+                if len(embeddings) > self.max_clustering_samples:
+                    embeddings = embeddings[self._subsample_indices(len(embeddings))]
+                condensed = self._cosine_distances(embeddings)
+                linkage_matrix = linkage(condensed, method='average')
+                distance_matrix = squareform(condensed)
+            
+            max_speakers = min(self.max_speakers, len(embeddings) // 2)
             best_score = -1
             best_n_clusters = 1
             
             for n_clusters in range(2, max_speakers + 1):
-                clustering = AgglomerativeClustering(
-                    n_clusters=n_clusters,
-                    linkage='average',
-                    metric='cosine'
-                )
-                labels = clustering.fit_predict(embeddings)
+                # Cut the shared dendrogram instead of refitting for every k
+                labels = fcluster(linkage_matrix, t=n_clusters, criterion='maxclust')
+                n_labels = len(np.unique(labels))
+                if n_labels < 2 or n_labels >= len(embeddings):
+                    continue
                 
-                # Calculate silhouette score
-                from sklearn.metrics import silhouette_score
-                score = silhouette_score(embeddings, labels, metric='cosine')
+                score = silhouette_score(distance_matrix, labels, metric='precomputed')
                 
                 if score > best_score:
                     best_score = score
@@ -231,22 +461,18 @@ class SpeakerIdentificationEngine:
         """Identify known speakers from diarized segments"""
         identified_speakers = []
         
+        # Match every diarized speaker against all enrolled speakers at once
+        best_rows, best_similarities = (np.array([], dtype=int), np.array([]))
+        if diarized_speakers:
+            best_rows, best_similarities = self.speaker_store.match(
+                np.array([speaker_data['average_embedding'] for speaker_data in diarized_speakers])
+            )
+        
         for i, speaker_data in enumerate(diarized_speakers):
-            speaker_embedding = speaker_data['average_embedding']
-            
-            # Try to match with known speakers
             best_match = None
-            best_similarity = 0.0
-            
-            for known_speaker_name, known_embedding in self.speaker_embeddings.items():
-                similarity = cosine_similarity(
-                    [speaker_embedding], 
-                    [known_embedding]
-                )[0][0]
-                
-                if similarity > best_similarity and similarity > self.clustering_threshold:
-                    best_similarity = similarity
-                    best_match = known_speaker_name
+            best_similarity = float(best_similarities[i])
+            if best_rows[i] >= 0 and best_similarity > self.clustering_threshold:
+                best_match = self.speaker_store.name(best_rows[i])
             
             # Create speaker object
             speaker_id = f"speaker_{i}"
@@ -318,14 +544,11 @@ class SpeakerIdentificationEngine:
             audio_array = np.array(audio_segment.get_array_of_samples(), dtype=np.float32)
             embedding = self._extract_speaker_embedding(audio_array, audio_segment.frame_rate)
             
-            # Store embedding
-            self.speaker_embeddings[speaker_name] = embedding
-            
-            # Save to disk
+            # Store embedding (persisted to disk by the store)
             await self._save_speaker_model(speaker_name, embedding)
             
             response = SpeakerTrainingResponse(
-                speaker_id=f"speaker_{len(self.speaker_embeddings)}",
+                speaker_id=f"speaker_{len(self.speaker_store)}",
                 speaker_name=speaker_name,
                 training_status=ProcessingStatus.COMPLETED,
                 accuracy_score=0.9,  # Placeholder
@@ -342,10 +565,8 @@ class SpeakerIdentificationEngine:
     async def _save_speaker_model(self, speaker_name: str, embedding: np.ndarray):
         """Save speaker model to disk"""
         try:
-            model_path = os.path.join(self.speaker_models_path, f"{speaker_name}.pkl")
-            with open(model_path, 'wb') as f:
-                pickle.dump(embedding, f)
-            logger.info("Speaker model saved", speaker_name=speaker_name, path=model_path)
+            self.speaker_store.add(speaker_name, embedding)
+            logger.info("Speaker model saved", speaker_name=speaker_name, path=self.speaker_store.matrix_path)
         except Exception as e:
             logger.error("Failed to save speaker model", error=str(e))
     
@@ -355,35 +576,41 @@ class SpeakerIdentificationEngine:
             if not os.path.exists(self.speaker_models_path):
                 return
             
-            for filename in os.listdir(self.speaker_models_path):
-                if filename.endswith('.pkl'):
-                    speaker_name = filename[:-4]  # Remove .pkl extension
-                    model_path = os.path.join(self.speaker_models_path, filename)
-                    
-                    with open(model_path, 'rb') as f:
-                        embedding = pickle.load(f)
-                        self.speaker_embeddings[speaker_name] = embedding
+            self.speaker_store.load()
+            await self._migrate_legacy_speaker_models()
             
-            logger.info("Loaded speaker models", count=len(self.speaker_embeddings))
+            logger.info("Loaded speaker models", count=len(self.speaker_store))
             
         except Exception as e:
             logger.error("Failed to load speaker models", error=str(e))
     
+    async def _migrate_legacy_speaker_models(self):
+        """Fold per-speaker .pkl files from older versions into the store"""
+        legacy_files = [f for f in os.listdir(self.speaker_models_path) if f.endswith('.pkl')]
+        
+        for filename in legacy_files:
+            speaker_name = filename[:-4]  # Remove .pkl extension
+            model_path = os.path.join(self.speaker_models_path, filename)
+            
+            with open(model_path, 'rb') as f:
+                embedding = pickle.load(f)
+            
+            if speaker_name not in self.speaker_store:
+                self.speaker_store.add(speaker_name, embedding)
+            os.remove(model_path)
+        
+        if legacy_files:
+            logger.info("Migrated legacy speaker models", count=len(legacy_files))
+    
     async def list_speakers(self) -> List[str]:
         """List all trained speakers"""
-        return list(self.speaker_embeddings.keys())
+        return self.speaker_store.names
     
     async def delete_speaker(self, speaker_name: str):
         """Delete a trained speaker"""
         try:
-            # Remove from memory
-            if speaker_name in self.speaker_embeddings:
-                del self.speaker_embeddings[speaker_name]
-            
-            # Remove from disk
-            model_path = os.path.join(self.speaker_models_path, f"{speaker_name}.pkl")
-            if os.path.exists(model_path):
-                os.remove(model_path)
+            # Remove from memory and disk
+            self.speaker_store.remove(speaker_name)
             
             logger.info("Speaker deleted", speaker_name=speaker_name)
             
@@ -0,0 +1,148 @@
+"""
+Tests for speaker clustering and the enrolled speaker embedding store
+"""
+
+import os
+import numpy as np
+import pytest
+
+# The engine module imports the audio stack at load time
+for module in ('librosa', 'soundfile', 'pydub', 'torch'):
+    pytest.importorskip(module)
+
+from speaker_identification import SpeakerEmbeddingStore, SpeakerIdentificationEngine
+
+def make_speakers(counts, dimension: int = 39, seed: int = 0):
+    """Embeddings around well separated random directions, with their true labels"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(len(counts), dimension)) * 5
+    embeddings = np.concatenate([
+        center + rng.normal(scale=0.3, size=(count, dimension)) for center, count in zip(centers, counts)
+    ])
+    labels = np.repeat(np.arange(len(counts)), counts)
+    return embeddings, labels
+
+def same_partition(labels, expected) -> bool:
+    pairs = {(int(a), int(b)) for a, b in zip(labels, expected)}
+    return len(pairs) == len(set(labels)) == len(set(expected))
+
+class TestSpeakerClustering:
+    """Test speaker count estimation and clustering on a shared linkage tree"""
+    
+    @pytest.fixture
+    def engine(self):
+        return SpeakerIdentificationEngine()
+    
+    def test_clusters_separated_speakers(self, engine):
+        embeddings, expected = make_speakers([12, 9, 15])
+        labels = engine._cluster_embeddings(embeddings)
+        assert same_partition(labels, expected)
+    
+    def test_estimate_reuses_given_linkage(self, engine):
+        embeddings, _ = make_speakers([10, 10, 10, 10], seed=1)
+        assert engine._estimate_speaker_count(embeddings) == 4
+    
+    def test_large_inputs_cluster_a_subsample(self, engine):
+        engine.max_clustering_samples = 40
+        engine.assignment_batch_size = 16
+        embeddings, expected = make_speakers([60, 45, 50], seed=2)
+        
+        labels = engine._cluster_embeddings(embeddings)
+        assert len(labels) == len(embeddings)
+        assert same_partition(labels, expected)
+        assert np.array_equal(engine._subsample_indices(len(embeddings)),
+                              engine._subsample_indices(len(embeddings)))
+    
+    def test_degenerate_inputs(self, engine):
+        assert list(engine._cluster_embeddings(np.ones((1, 39)))) == [0]
+        
+        # Zero vectors from failed feature extraction must not produce NaN distances
+        embeddings = np.vstack([np.zeros((3, 39)), make_speakers([6, 6], seed=3)[0]])
+        labels = engine._cluster_embeddings(embeddings)
+        assert len(labels) == len(embeddings)
+
+class TestSpeakerEmbeddingStore:
+    """Test matching, persistence and reload of enrolled speakers"""
+    
+    def test_match_and_remove(self, tmp_path):
+        store = SpeakerEmbeddingStore(str(tmp_path))
+        rows, similarities = store.match(np.ones(4))
+        assert rows[0] == -1
+        
+        store.add('alice', np.array([1.0, 0, 0, 0]))
+        store.add('bob', np.array([0, 1.0, 0, 0]))
+        store.add('carol', np.array([0, 0, 1.0, 0]))
+        
+        rows, similarities = store.match(np.array([[0, 2.0, 0.1, 0], [0.1, 0, 3.0, 0]]))
+        assert [store.name(row) for row in rows] == ['bob', 'carol']
+        assert similarities[0] == pytest.approx(2 / np.sqrt(4.01))
+        
+        assert store.remove('alice')
+        assert not store.remove('alice')
+        assert store.names == ['bob', 'carol']
+        rows, _ = store.match(np.array([1.0, 0, 0.2, 0]))
+        assert store.name(rows[0]) == 'carol'
+        
+        # A new enrollment takes the freed row
+        store.add('dave', np.array([0, 0, 0, 1.0]))
+        assert store.names == ['dave', 'bob', 'carol']
+    
+    def test_reload_is_memory_mapped(self, tmp_path):
+        store = SpeakerEmbeddingStore(str(tmp_path))
+        for i in range(20):
+            store.add(f"speaker {i}", np.eye(32)[i])
+        
+        reloaded = SpeakerEmbeddingStore(str(tmp_path))
+        reloaded.load()
+        assert len(reloaded) == 20
+        assert isinstance(reloaded.matrix.base, np.memmap) or isinstance(reloaded.matrix, np.memmap)
+        rows, _ = reloaded.match(np.eye(32)[7])
+        assert reloaded.name(rows[0]) == 'speaker 7'
+        
+        reloaded.add('late', np.ones(32))
+        assert 'late' in reloaded
+        assert len(reloaded) == 21
+    
+    def test_enrollments_update_the_file_in_place(self, tmp_path):
+        store = SpeakerEmbeddingStore(str(tmp_path))
+        store.add('speaker 0', np.eye(4)[0])
+        path = store.matrix_path
+        inode = os.stat(path).st_ino
+        for i in range(1, 8):
+            store.add(f"speaker {i}", np.eye(4)[i % 4])
+        assert store.matrix_path == path and os.stat(path).st_ino == inode
+        
+        # The ninth row doubles the capacity in a new generation
+        store.add('speaker 8', np.ones(4))
+        assert store.matrix_path != path
+        assert sorted(os.listdir(tmp_path)) == ['embeddings-2.npy', 'speakers.json']
+        assert np.load(store.matrix_path, mmap_mode='r').shape == (16, 4)
+        
+        store.add('speaker 3', np.eye(4)[0])
+        reloaded = SpeakerEmbeddingStore(str(tmp_path))
+        reloaded.load()
+        assert sorted(reloaded.names) == sorted(store.names)
+        assert len(reloaded) == 9
+        rows, similarities = reloaded.match(np.eye(4)[0])
+        assert similarities[0] == pytest.approx(1.0)
+    
+    def test_interrupted_save_keeps_last_committed_rows(self, tmp_path):
+        store = SpeakerEmbeddingStore(str(tmp_path))
+        store.add('alice', np.array([1.0, 0]))
+        store.add('bob', np.array([0, 1.0]))
+        
+        # A row written without its index update, and a grow that died before switching the index
+        store._matrix[2] = [1.0, 0]
+        store._matrix.flush()
+        with open(tmp_path / 'embeddings-2.npy', 'wb') as f:
+            f.write(b'partial')
+        
+        reloaded = SpeakerEmbeddingStore(str(tmp_path))
+        reloaded.load()
+        assert reloaded.names == ['alice', 'bob']
+        assert sorted(os.listdir(tmp_path)) == ['embeddings-1.npy', 'speakers.json']
+        
+        reloaded.add('carol', np.array([1.0, 1.0]))
+        again = SpeakerEmbeddingStore(str(tmp_path))
+        again.load()
+        assert again.names == ['alice', 'bob', 'carol']